@@ -3,6 +3,7 @@ AI Analysis endpoints for AI News Aggregator
 Provides article analysis, batch processing, and task management
 """
 
+import asyncio
 import uuid
 import logging
 from datetime import datetime, timedelta
@@ -17,6 +18,7 @@ from sqlalchemy import and_, desc, asc
 # Importar servicios y modelos
 from app.core.config import get_settings
 from app.core.redis_cache import get_redis_client
+from app.core.ai_cache import get_ai_result_cache
 from app.core.rate_limiter import RateLimiter
 from app.services.ai_processor import AIProcessor, AIAnalysisResult
 from app.db.models import Article, ArticleAnalysis, AnalysisTask, ProcessingStatus, AnalysisTaskStatus
@@ -41,6 +43,10 @@ class AnalyzeArticleRequest(BaseModel):
     content: str = Field(..., min_length=10, max_length=50000, description="Contenido del artículo a analizar")
     use_openai: bool = Field(default=False, description="Usar OpenAI para análisis")
     force_reprocess: bool = Field(default=False, description="Forzar reprocesamiento incluso si ya existe análisis")
+    analysis_mode: Optional[str] = Field(
+        default=None, pattern="^(separate|fused)$",
+        description="separate: una llamada por análisis; fused: una sola llamada con los cuatro (por defecto AI_ANALYSIS_MODE)"
+    )
     
     @validator('content')
     def validate_content(cls, v):
@@ -96,6 +102,10 @@ class ReprocessRequest(BaseModel):
     status_filter: Optional[str] = Field(default=None, description="Filtrar por estado: pending, failed, completed")
     use_openai: bool = Field(default=False, description="Usar OpenAI para análisis")
     max_articles: Optional[int] = Field(default=None, ge=1, le=1000, description="Máximo número de artículos a reprocesar")
+    offline: bool = Field(
+        default=False,
+        description="Enviar el análisis a la Batch API del proveedor (precio batch, sin tiempo real); requiere use_openai"
+    )
     
     @validator('status_filter')
     def validate_status_filter(cls, v):
@@ -201,6 +211,7 @@ async def analyze_article(
     - **content**: Contenido completo del artículo a analizar (requerido)
     - **use_openai**: Usar OpenAI en lugar de modelos locales
     - **force_reprocess**: Forzar reprocesamiento aunque ya exista análisis
+    - **analysis_mode**: separate (cuatro llamadas) o fused (una llamada combinada)
     """
     try:
         article_identifier = request.article_id or request.url or f"manual_{uuid.uuid4()}"
@@ -258,7 +269,8 @@ async def analyze_article(
             input_data={
                 "content_length": len(request.content),
                 "use_openai": request.use_openai,
-                "force_reprocess": request.force_reprocess
+                "force_reprocess": request.force_reprocess,
+                "analysis_mode": request.analysis_mode
             }
         )
         db.add(task)
@@ -271,10 +283,11 @@ async def analyze_article(
         db.commit()
         
         # Realizar análisis
-        result = await processor.analyze_article(
+        result = await processor.analyze_article_legacy(
             article_id=article_identifier,
             content=request.content,
-            use_openai=request.use_openai
+            use_openai=request.use_openai,
+            mode=request.analysis_mode
         )
         
         # Actualizar tarea como completada
@@ -630,7 +643,11 @@ async def reprocess_articles(
     - **status_filter**: Filtrar por estado (pending, failed, completed)
     - **use_openai**: Usar OpenAI para reprocesamiento
     - **max_articles**: Límite máximo de artículos a reprocesar
+    - **offline**: Enviar el lote a la Batch API; la tarea termina cuando se aplican los resultados
     """
+    if request.offline and not request.use_openai:
+        raise HTTPException(status_code=400, detail="El modo offline requiere use_openai")
+    
     try:
         # Construir query base
         query = db.query(Article)
@@ -670,7 +687,8 @@ async def reprocess_articles(
                 "article_ids": [str(a.id) for a in articles],
                 "status_filter": request.status_filter,
                 "use_openai": request.use_openai,
-                "max_articles": request.max_articles
+                "max_articles": request.max_articles,
+                "offline": request.offline
             }
         )
         db.add(task)
@@ -682,6 +700,9 @@ async def reprocess_articles(
         task.started_at = datetime.utcnow()
         db.commit()
         
+        if request.offline:
+            return await _submit_offline_reprocess(articles, task, db)
+        
         # Procesar artículos
         results = []
         processed_count = 0
@@ -785,6 +806,31 @@ async def reprocess_articles(
         )
 
 
+async def _submit_offline_reprocess(articles: List[Article], task: AnalysisTask, db: Session) -> Dict[str, Any]:
+    """Envía los artículos a la Batch API; el seguimiento del lote cierra la tarea al aplicar los resultados"""
+    from app.tasks.batch_tasks import submit_offline_batch
+    
+    article_data = [
+        {"id": str(article.id), "title": article.title, "content": article.content or article.title}
+        for article in articles
+    ]
+    job = await asyncio.to_thread(submit_offline_batch, article_data, "comprehensive", str(task.id))
+    
+    for article in articles:
+        article.processing_status = ProcessingStatus.PROCESSING.value
+    task.output_data = {"progress": 0.0, "batch_job": job.to_dict(), "total": len(articles)}
+    db.commit()
+    
+    return {
+        "status": "submitted",
+        "task_id": task.id,
+        "message": f"Lote offline enviado: {len(job.article_ids)} artículos, resultados al terminar el lote",
+        "total_articles": len(articles),
+        "batch_id": job.provider_batch_id,
+        "progress": 0.0
+    }
+
+
 @router.get("/analytics/summary", response_model=Dict[str, Any])
 async def get_analysis_analytics(
     db: Session = Depends(get_db),
@@ -831,6 +877,9 @@ async def get_analysis_analytics(
             AnalysisTask.created_at >= datetime.utcnow() - timedelta(days=1)
         ).count()
         
+        # Caché de resultados de IA: este proceso y total de la flota (API + workers)
+        ai_cache = get_ai_result_cache()
+        
         return {
             "status": "success",
             "data": {
@@ -856,6 +905,10 @@ async def get_analysis_analytics(
                 },
                 "activity": {
                     "recent_tasks_24h": recent_tasks
+                },
+                "cache": {
+                    "process": ai_cache.get_stats(),
+                    "fleet": await ai_cache.get_fleet_stats()
                 }
             }
         }
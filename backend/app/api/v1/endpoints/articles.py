@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends, Query, status
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
 from sqlalchemy import (
-    select, delete, update, func, and_, or_, desc, asc, text,
+    select, delete, update, func, and_, or_, desc, literal_column,
     String, DateTime, Float
 )
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,6 +14,12 @@ from app.db.database import get_database
 from app.db.models import Article, Source  # Removido ProcessingStatus ya que no se usa más
 from app.core.config import get_settings
 from app.core.redis_cache import get_cache
+from app.utils.duplicate_clustering import collapse_duplicate_groups
+from app.utils.counting import (
+    CountStrategy, count_rows, resolve_count_strategy,
+    add_window_count, split_window_count, window_count_result
+)
+from app.utils.pagination import KeysetCursor, QueryBuilder, null_safe_sort_key, query_fingerprint
 
 router = APIRouter()
 settings = get_settings()
@@ -102,6 +108,10 @@ class PaginatedArticlesResponse(BaseModel):
     pages: int
     has_next: bool
     has_prev: bool
+    total_is_exact: bool = True
+    total_display: Optional[str] = None
+    count_strategy: str = "exact"
+    next_cursor: Optional[str] = None
     filters_applied: Dict[str, Any] = {}
     sort_info: Dict[str, str] = {}
 
@@ -247,8 +257,8 @@ def build_filters_query(filters: ArticleFilters):
     return conditions
 
 
-def build_sort_expression(sort: ArticleSort):
-    """Construir expresión de ordenamiento para SQLAlchemy"""
+def build_sort_key(sort: ArticleSort):
+    """Construir clave de ordenamiento sin NULL (paginación keyset sobre (clave, id))"""
     sort_field_map = {
         'published_at': Article.published_at,
         'created_at': Article.created_at,
@@ -256,16 +266,11 @@ def build_sort_expression(sort: ArticleSort):
         'relevance_score': Article.relevance_score,
         'sentiment_score': Article.sentiment_score,
         'bias_score': Article.bias_score,
-        'view_count': text('0'),  # Placeholder para view_count
+        'view_count': literal_column('0'),  # Placeholder para view_count
         'title': Article.title
     }
     
-    sort_field = sort_field_map.get(sort.sort_by, Article.published_at)
-    
-    if sort.sort_order == 'desc':
-        return desc(sort_field)
-    else:
-        return asc(sort_field)
+    return null_safe_sort_key(sort_field_map.get(sort.sort_by, Article.published_at))
 
 
 # =============================================================================
@@ -290,6 +295,9 @@ async def get_articles(
     topic_tags: Optional[str] = Query(None, description="Etiquetas de temas (separadas por coma)"),
     sort_by: str = Query("published_at", description="Campo de ordenamiento"),
     sort_order: str = Query("desc", description="Dirección del ordenamiento (asc/desc)"),
+    collapse_duplicates: bool = Query(False, description="Mostrar un solo artículo por grupo de duplicados"),
+    count_strategy: Optional[CountStrategy] = Query(None, description="Conteo del total: exact, estimated, capped, window"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior (sustituye a page)"),
     session: AsyncSession = Depends(get_database),
     cache = Depends(get_cache)
 ):
@@ -297,6 +305,8 @@ async def get_articles(
     Obtener lista paginada de artículos con filtros avanzados y ordenamiento múltiple
     """
     try:
+        strategy = count_strategy or resolve_count_strategy(None)
+        
         # Parsear parámetros de lista
         source_ids_list = [UUID(x.strip()) for x in source_ids.split(",")] if source_ids else []
         source_names_list = [x.strip() for x in source_names.split(",")] if source_names else []
@@ -323,29 +333,65 @@ async def get_articles(
         
         # Construir ordenamiento
         sort = ArticleSort(sort_by=sort_by, sort_order=sort_order)
+        sort_key = build_sort_key(sort)
+        descending = sort.sort_order == 'desc'
+        
+        # El cursor solo vale para el mismo orden y filtros
+        sort_spec = f"{sort.sort_by}:{sort.sort_order}"
+        fingerprint = query_fingerprint(filters.dict(), collapse_duplicates)
+        try:
+            after = KeysetCursor.decode(cursor, sort_spec, fingerprint) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if strategy == CountStrategy.WINDOW and after is not None:
+            # Tras el cursor la ventana solo vería las filas restantes
+            strategy = CountStrategy.EXACT
         
         # Construir condiciones de filtro
         conditions = build_filters_query(filters)
         
-        # Contar total de registros
-        count_query = select(func.count(Article.id)).where(and_(*conditions)) if conditions else select(func.count(Article.id))
-        total_result = await session.execute(count_query)
-        total = total_result.scalar()
+        # Colapsar grupos de duplicados: un representante por grupo (el canónico si pasa los filtros)
+        if collapse_duplicates:
+            conditions.append(collapse_duplicate_groups(select(Article.id).where(*conditions)))
+        
+        # Contar total de registros (window: en la misma consulta de la página)
+        count_statement = select(Article.id).where(and_(*conditions)) if conditions else select(Article.id)
+        if strategy != CountStrategy.WINDOW:
+            count = await session.run_sync(count_rows, count_statement, strategy)
         
         # Calcular paginación
         offset = (page - 1) * per_page
         
         # Construir query principal
-        query = select(Article).options(selectinload(Article.source))
+        query = QueryBuilder.add_keyset_columns(
+            select(Article).options(selectinload(Article.source)), [sort_key]
+        )
         
         if conditions:
             query = query.where(and_(*conditions))
         
-        query = query.order_by(build_sort_expression(sort)).limit(per_page).offset(offset)
+        if strategy == CountStrategy.WINDOW:
+            query = add_window_count(query)
+        
+        # Ordenar por (clave, id) y continuar tras el cursor (keyset) o saltar offset filas
+        query = QueryBuilder.apply_keyset(query, [sort_key], Article.id, descending, after)
+        if after is None:
+            query = query.offset(offset)
+        query = query.limit(per_page)
         
         # Ejecutar query
         result = await session.execute(query)
-        articles = result.scalars().all()
+        rows = result.all()
+        if strategy == CountStrategy.WINDOW:
+            rows, window_total = split_window_count(rows)
+            count = await session.run_sync(window_count_result, count_statement, window_total, offset)
+        articles = [article for article, _ in rows]
+        total = count.total
+        
+        next_cursor = None
+        if rows and len(rows) == per_page:
+            last_article, last_key = rows[-1]
+            next_cursor = KeysetCursor.encode(sort_spec, fingerprint, [last_key, last_article.id])
         
         # Convertir a response format
         articles_response = []
@@ -392,7 +438,8 @@ async def get_articles(
             "date_range": [date_from, date_to],
             "relevance_score_min": relevance_score_min,
             "processing_statuses": processing_statuses_list,
-            "topic_tags": topic_tags_list
+            "topic_tags": topic_tags_list,
+            "collapse_duplicates": collapse_duplicates
         }
         
         return PaginatedArticlesResponse(
@@ -403,10 +450,16 @@ async def get_articles(
             pages=pages,
             has_next=has_next,
             has_prev=has_prev,
+            total_is_exact=count.is_exact,
+            total_display=count.display,
+            count_strategy=count.strategy.value,
+            next_cursor=next_cursor,
             filters_applied=filters_applied,
             sort_info={"sort_by": sort_by, "sort_order": sort_order}
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
+from uuid import UUID
 from pydantic import BaseModel
 import logging
 
 from app.services.search_service import search_service
+from app.utils.counting import CountStrategy
+from app.utils.query_log import get_query_log
 from app.db.database import get_db
 from sqlalchemy.orm import Session
 
@@ -68,10 +71,16 @@ class SearchResponse(BaseModel):
     message: str
     query: str
     total: int
+    total_is_exact: bool = True
+    total_display: Optional[str] = None
+    count_strategy: str = "exact"
+    next_cursor: Optional[str] = None
     results: List[SearchResult]
     filters_applied: Dict[str, Any]
     search_time_ms: float
     facets: Optional[Dict[str, Any]] = None
+    did_you_mean: Optional[str] = None
+    related_terms: List[str] = []
 
 
 class SearchSuggestionsResponse(BaseModel):
@@ -109,6 +118,9 @@ async def advanced_search(
     offset: int = Query(0, ge=0, description="Offset para paginación"),
     semantic_search: bool = Query(False, description="Usar búsqueda semántica con IA"),
     include_facets: bool = Query(True, description="Incluir facets de filtrado"),
+    collapse_duplicates: bool = Query(False, description="Mostrar un solo artículo por grupo de duplicados"),
+    count_strategy: Optional[CountStrategy] = Query(None, description="Conteo del total: exact, estimated, capped, window"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior (sustituye a offset)"),
     db: Session = Depends(get_db)
 ):
     """
@@ -123,6 +135,9 @@ async def advanced_search(
     - **sort**: Ordenamiento (relevance, date, sentiment, source)
     - **semantic_search**: Usar búsqueda semántica con IA
     - **include_facets**: Incluir información de facets para UI
+    - **collapse_duplicates**: Un solo artículo por grupo de duplicados
+    - **count_strategy**: Cómo calcular el total (capped/estimated evitan el COUNT completo)
+    - **cursor**: Paginación keyset; cada página cuesta lo mismo sin importar su profundidad
     """
     try:
         start_time = datetime.now()
@@ -146,6 +161,8 @@ async def advanced_search(
             filters['min_relevance'] = min_relevance
         if min_bias_score is not None:
             filters['min_bias_score'] = min_bias_score
+        if collapse_duplicates:
+            filters['collapse_duplicates'] = True
         
         # Ejecutar búsqueda
         results = await search_service.advanced_search(
@@ -156,9 +173,15 @@ async def advanced_search(
             offset=offset,
             semantic_search=semantic_search,
             include_facets=include_facets,
-            db=db
+            db=db,
+            count_strategy=count_strategy.value if count_strategy else None,
+            cursor=cursor
         )
         
+        # Registrar la búsqueda para trending (solo la primera página; sin E/S en la petición)
+        if cursor is None and offset == 0:
+            get_query_log().record(search_term)
+        
         search_time = (datetime.now() - start_time).total_seconds() * 1000
         
         return SearchResponse(
@@ -166,12 +189,20 @@ async def advanced_search(
             message=f"Búsqueda completada: {len(results.get('results', []))} resultados encontrados",
             query=search_term,
             total=results.get('total', 0),
+            total_is_exact=results.get('total_is_exact', True),
+            total_display=results.get('total_display'),
+            count_strategy=results.get('count_strategy', 'exact'),
+            next_cursor=results.get('next_cursor'),
             results=results.get('results', []),
             filters_applied=filters,
             search_time_ms=search_time,
-            facets=results.get('facets')
+            facets=results.get('facets'),
+            did_you_mean=results.get('did_you_mean'),
+            related_terms=results.get('related_terms', [])
         )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error en búsqueda avanzada: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error en búsqueda: {str(e)}")
@@ -327,6 +358,49 @@ async def semantic_search(
         raise HTTPException(status_code=500, detail=f"Error en búsqueda semántica: {str(e)}")
 
 
+@router.get("/search/similar/{article_id}")
+async def similar_articles(
+    article_id: UUID,
+    limit: int = Query(10, ge=1, le=50, description="Límite de resultados"),
+    similarity_threshold: float = Query(0.0, ge=0.0, le=1.0, description="Umbral de similitud"),
+    db: Session = Depends(get_db)
+):
+    """
+    Artículos más parecidos a uno dado (vecinos más cercanos en el índice semántico)
+
+    - **article_id**: ID del artículo de referencia
+    - **similarity_threshold**: Umbral mínimo de similitud
+    """
+    try:
+        start_time = datetime.now()
+
+        results = await search_service.find_similar_articles(
+            article_id=str(article_id),
+            limit=limit,
+            similarity_threshold=similarity_threshold,
+            db=db
+        )
+        if results is None:
+            raise HTTPException(status_code=404, detail="Artículo no encontrado")
+
+        search_time = (datetime.now() - start_time).total_seconds() * 1000
+
+        return {
+            "status": "success",
+            "article_id": str(article_id),
+            "total": results.get('total', 0),
+            "results": results.get('results', []),
+            "search_time_ms": search_time,
+            "avg_similarity": results.get('avg_similarity', 0.0)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error buscando artículos similares: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error buscando artículos similares: {str(e)}")
+
+
 @router.get("/search/health")
 async def search_health_check():
     """
@@ -4,6 +4,8 @@ Core functionality modules for AI News Aggregator
 This module provides essential backend services including:
 - Configuration management
 - Redis caching system
+- Shared pooled HTTP transport for news clients
+- Upstream response cache with conditional requests
 - Rate limiting with token bucket algorithm
 - FastAPI middleware integration
 - Utility functions for cache and rate limiting operations
@@ -12,9 +14,21 @@ This module provides essential backend services including:
 from .config import settings
 from .redis_cache import (
     RedisCacheManager,
+    LoopCacheManagers,
     cache_manager,
+    loop_cache_managers,
     get_cache_manager
 )
+from .http_client import (
+    HTTPTransport,
+    http_transport,
+    get_http_transport
+)
+from .response_cache import (
+    HTTPResponseCache,
+    response_cache,
+    get_response_cache
+)
 from .rate_limiter import (
     RateLimitManager,
     RateLimitConfig,
@@ -46,9 +60,21 @@ __all__ = [
     
     # Redis Cache
     "RedisCacheManager",
+    "LoopCacheManagers",
     "cache_manager", 
+    "loop_cache_managers",
     "get_cache_manager",
     
+    # HTTP Transport
+    "HTTPTransport",
+    "http_transport",
+    "get_http_transport",
+    
+    # Upstream Response Cache
+    "HTTPResponseCache",
+    "response_cache",
+    "get_response_cache",
+    
     # Rate Limiting
     "RateLimitManager",
     "RateLimitConfig",
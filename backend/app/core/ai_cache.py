@@ -0,0 +1,261 @@
+"""
+AI Result Cache
+
+This module provides the two-tier cache in front of the OpenAI analyzers:
+- Keys: SHA-256 of the prepared content + analysis type + model + prompt version
+- Local tier: in-process LRU bounded by entries, bytes and TTL
+- Shared tier: Redis, so API and Celery workers reuse each other's paid results
+- Hit ratio and dollars saved, per process and aggregated for the fleet in Redis
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from redis.exceptions import RedisError, ConnectionError, TimeoutError
+
+from .config import settings
+from .redis_cache import RedisCacheManager, loop_cache_managers
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ai_result"
+STATS_KEY = "ai_result:stats"
+
+
+class AIResultCache:
+    """
+    Cache of analysis results shared by every analyzer instance
+
+    Values are JSON-compatible payloads of the form {"result": ..., "cost": ...},
+    where cost is what the original OpenAI call was billed: every later hit adds
+    it to the dollars saved. Lookups check the local LRU first and then Redis
+    (hits from Redis are promoted to the local tier). Like the search cache, the
+    Redis connection of the running event loop is used and the cache degrades to
+    the local tier if Redis is unavailable.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        local_ttl: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        cache_manager: Optional[RedisCacheManager] = None
+    ):
+        """
+        Initialize the AI result cache (defaults come from settings)
+
+        Args:
+            ttl: Seconds a result is kept in Redis
+            local_ttl: Seconds a result is kept in the local tier
+            max_entries: Maximum results in the local tier
+            max_bytes: Maximum serialized bytes in the local tier
+            enabled: Whether analysis results are cached at all
+            cache_manager: Connected cache manager to use instead of one per loop
+        """
+        self.ttl = ttl or settings.AI_RESULT_CACHE_TTL
+        self.local_ttl = local_ttl or settings.AI_RESULT_CACHE_LOCAL_TTL
+        self.max_entries = max_entries or settings.AI_RESULT_CACHE_LOCAL_MAX_ENTRIES
+        self.max_bytes = max_bytes or settings.AI_RESULT_CACHE_LOCAL_MAX_BYTES
+        self.enabled = settings.AI_RESULT_CACHE_ENABLED if enabled is None else enabled
+        self._cache_manager = cache_manager
+        self._local: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._local_bytes = 0
+        self._stats = {"local_hits": 0, "shared_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "saved_usd": 0.0}
+        # Counters not yet added to the fleet totals in Redis
+        self._unreported = {"hits": 0, "misses": 0, "saved_usd": 0.0}
+
+    @staticmethod
+    def make_key(content: str, analysis_type: str, model: str, prompt_version: str, variant: str = "") -> str:
+        """
+        Build the cache key of an analysis
+
+        Args:
+            content: Prepared content sent to the model
+            analysis_type: sentiment, topic, summary, relevance...
+            model: Model the analysis is requested from
+            prompt_version: Version of the analyzer prompt (bump it to drop old results)
+            variant: Extra request parameters that change the answer (summary length, preferences)
+        """
+        digest = hashlib.sha256(f"{variant}\x00{content}".encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{analysis_type}:{model}:{prompt_version}:{digest}"
+
+    async def _get_manager(self) -> Optional[RedisCacheManager]:
+        """Get the connected cache manager of the running loop, or None if Redis is down"""
+        if self._cache_manager is not None:
+            return self._cache_manager
+        return await loop_cache_managers.get()
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a live entry from the local tier and mark it as recently used"""
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, size, payload = entry
+        if expires_at <= time.time():
+            del self._local[key]
+            self._local_bytes -= size
+            return None
+        self._local.move_to_end(key)
+        return payload
+
+    def _set_local(self, key: str, payload: Dict[str, Any], size: int) -> None:
+        """Add an entry to the local tier, evicting the least recently used ones over the limits"""
+        if size > self.max_bytes:
+            return
+        previous = self._local.pop(key, None)
+        if previous is not None:
+            self._local_bytes -= previous[1]
+        self._local[key] = (time.time() + self.local_ttl, size, payload)
+        self._local_bytes += size
+
+        while len(self._local) > self.max_entries or self._local_bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._local.popitem(last=False)
+            self._local_bytes -= evicted_size
+            self._stats["evictions"] += 1
+
+    def _record_hit(self, payload: Dict[str, Any], tier: str) -> None:
+        """Count a hit and the dollars its original call cost"""
+        saved = float(payload.get("cost") or 0.0)
+        self._stats[f"{tier}_hits"] += 1
+        self._stats["saved_usd"] += saved
+        self._unreported["hits"] += 1
+        self._unreported["saved_usd"] += saved
+
+    def _report_stats(self, pipeline) -> None:
+        """Add the unreported counters to the fleet totals in a pipeline"""
+        if self._unreported["hits"]:
+            pipeline.hincrby(STATS_KEY, "hits", self._unreported["hits"])
+            pipeline.hincrbyfloat(STATS_KEY, "saved_usd", self._unreported["saved_usd"])
+        if self._unreported["misses"]:
+            pipeline.hincrby(STATS_KEY, "misses", self._unreported["misses"])
+        self._unreported = {"hits": 0, "misses": 0, "saved_usd": 0.0}
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached payload from the local tier or Redis
+
+        Returns:
+            The payload stored with set, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        payload = self._get_local(key)
+        if payload is not None:
+            self._record_hit(payload, "local")
+            return payload
+
+        manager = await self._get_manager()
+        if manager is not None:
+            try:
+                pipeline = manager.redis.pipeline(transaction=False)
+                pipeline.get(key)
+                self._report_stats(pipeline)
+                raw = (await pipeline.execute())[0]
+                if raw:
+                    payload = json.loads(raw)
+                    self._set_local(key, payload, len(raw))
+                    self._record_hit(payload, "shared")
+                    return payload
+            except (RedisError, ConnectionError, TimeoutError, ValueError) as e:
+                logger.error(f"AI result cache get error for key {key}: {e}")
+
+        self._stats["misses"] += 1
+        self._unreported["misses"] += 1
+        return None
+
+    async def set(self, key: str, result: Any, cost: float = 0.0, ttl: Optional[int] = None) -> bool:
+        """
+        Cache a result in both tiers
+
+        Args:
+            key: Cache key from make_key
+            result: JSON-compatible result
+            cost: Dollars the call that produced the result cost
+            ttl: Seconds to keep it in Redis (defaults to the cache ttl)
+
+        Returns:
+            True if the result reached Redis
+        """
+        if not self.enabled:
+            return False
+
+        payload = {"result": result, "cost": cost}
+        raw = json.dumps(payload, default=str)
+        self._set_local(key, payload, len(raw))
+        self._stats["stores"] += 1
+
+        manager = await self._get_manager()
+        if manager is None:
+            return False
+        try:
+            pipeline = manager.redis.pipeline(transaction=False)
+            pipeline.set(key, raw, ex=ttl or self.ttl)
+            self._report_stats(pipeline)
+            await pipeline.execute()
+            return True
+        except (RedisError, ConnectionError, TimeoutError) as e:
+            logger.error(f"AI result cache store error for key {key}: {e}")
+            return False
+
+    def clear_local(self) -> None:
+        """Empty the local tier of this process"""
+        self._local.clear()
+        self._local_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit ratio, dollars saved and local tier usage of this process"""
+        hits = self._stats["local_hits"] + self._stats["shared_hits"]
+        lookups = hits + self._stats["misses"]
+        return dict(
+            self._stats,
+            saved_usd=round(self._stats["saved_usd"], 6),
+            hits=hits,
+            lookups=lookups,
+            hit_ratio=hits / lookups if lookups else 0.0,
+            local_entries=len(self._local),
+            local_bytes=self._local_bytes
+        )
+
+    async def get_fleet_stats(self) -> Dict[str, Any]:
+        """Get hits, misses and dollars saved by every process (as reported so far)"""
+        manager = await self._get_manager()
+        if manager is None:
+            return {}
+        try:
+            pipeline = manager.redis.pipeline(transaction=False)
+            self._report_stats(pipeline)
+            pipeline.hgetall(STATS_KEY)
+            totals = (await pipeline.execute())[-1] or {}
+        except (RedisError, ConnectionError, TimeoutError) as e:
+            logger.error(f"AI result cache stats error: {e}")
+            return {}
+
+        hits, misses = int(totals.get("hits", 0)), int(totals.get("misses", 0))
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "saved_usd": round(float(totals.get("saved_usd", 0.0)), 6)
+        }
+
+    async def close(self) -> None:
+        """Report pending counters and close the Redis connection of the running loop"""
+        await self.get_fleet_stats()
+        if self._cache_manager is None:
+            await loop_cache_managers.close()
+
+
+# Global AI result cache instance
+ai_result_cache = AIResultCache()
+
+
+def get_ai_result_cache() -> AIResultCache:
+    """Get the shared AI result cache instance"""
+    return ai_result_cache
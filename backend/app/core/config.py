@@ -42,6 +42,78 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = Field(default="gpt-3.5-turbo", description="OpenAI model to use")
     MAX_ARTICLES_PER_REQUEST: int = Field(default=50, description="Max articles per API request")
     AI_ANALYSIS_TIMEOUT: int = Field(default=30, description="AI analysis timeout in seconds")
+    AI_ANALYSIS_MODE: str = Field(default="separate", description="Comprehensive analysis mode: separate (one call per analysis) or fused (one structured call)")
+    AI_PACKING_ENABLED: bool = Field(default=True, description="Pack several articles into one request for batch sentiment/topic classification")
+    AI_PACKING_TOKEN_BUDGET: int = Field(default=3000, description="Estimated input tokens per packed request")
+    AI_PACKING_MAX_ARTICLES: int = Field(default=20, description="Maximum articles per packed request")
+    AI_PACKING_ARTICLE_TOKENS: int = Field(default=150, description="Tokens of headline and lead sent per packed article")
+    AI_PACKING_MAX_OUTPUT_TOKENS: int = Field(default=3000, description="Maximum response tokens of a packed request")
+    AI_BATCH_PROVIDER: str = Field(default="openai", description="Offline batch provider: openai (Batch API) or local (file-based stand-in)")
+    AI_BATCH_JOB_DIR: str = Field(default="/tmp/ai_batch_jobs", description="Directory for offline batch JSONL job files")
+    AI_BATCH_COMPLETION_WINDOW: str = Field(default="24h", description="Completion window requested for offline batches")
+    AI_BATCH_POLL_SECONDS: int = Field(default=300, description="Seconds between status checks of an offline batch")
+    AI_BATCH_MAX_WAIT_SECONDS: int = Field(default=90000, description="Seconds after which an unfinished offline batch is failed")
+    AI_BATCH_MAX_POLL_ERRORS: int = Field(default=5, description="Consecutive poll/download/apply errors before an offline batch is failed")
+    AI_CONTENT_TOKEN_BUDGETS: dict = Field(
+        default={"sentiment": 500, "topic": 500, "topics": 500, "summary": 750, "relevance": 500},
+        description="Article tokens sent per analysis type (cut at a sentence boundary)"
+    )
+    AI_TOKENIZER_CACHE_SIZE: int = Field(default=4096, description="Texts whose token layout is memoized per process")
+    NEWS_FETCH_TIMEOUT: float = Field(default=20.0, description="Per-provider news fetch timeout in seconds")
+    NEWS_INCREMENTAL_FETCH: bool = Field(default=True, description="Fetch only articles newer than each provider's watermark")
+    NEWS_FETCH_MAX_PAGES: int = Field(default=5, description="Maximum pages per provider in an incremental fetch")
+    NEWS_WATERMARK_TTL: int = Field(default=604800, description="Seconds to keep an unused provider watermark")
+    NEWS_WATERMARK_MAX_SEEN_IDS: int = Field(default=500, description="Recent article URLs remembered per watermark")
+    
+    # Shared HTTP transport for news clients
+    HTTP_MAX_CONNECTIONS: int = Field(default=100, description="Total pooled HTTP connections per process")
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = Field(default=10, description="Pooled HTTP connections per host")
+    HTTP_MAX_CONCURRENCY: int = Field(default=20, description="Maximum in-flight outgoing HTTP requests")
+    HTTP_DNS_CACHE_TTL: int = Field(default=300, description="DNS cache TTL in seconds")
+    HTTP_KEEPALIVE_TIMEOUT: float = Field(default=30.0, description="Idle keep-alive timeout in seconds")
+    
+    # Upstream response cache for news clients
+    NEWS_RESPONSE_CACHE_ENABLED: bool = Field(default=True, description="Cache news provider responses in Redis")
+    NEWS_RESPONSE_CACHE_TTL: int = Field(default=300, description="Seconds to serve responses without validators from cache")
+    NEWS_RESPONSE_CACHE_MAX_AGE: int = Field(default=86400, description="Seconds to keep responses for conditional revalidation")
+    
+    # Search Suggestions
+    SEARCH_SUGGESTIONS_REFRESH_SECONDS: int = Field(default=300, description="Seconds between in-process suggestion index reloads")
+    SEARCH_TERMS_MAX: int = Field(default=20000, description="Maximum mined article terms in the suggestion vocabulary")
+    SEARCH_TERMS_MIN_DOCS: int = Field(default=3, description="Minimum articles containing a term to suggest it")
+    SEARCH_TERMS_WINDOW_DAYS: int = Field(default=30, description="Days of articles mined for suggestion terms")
+    SEARCH_FACETS_CACHE_TTL: int = Field(default=60, description="Seconds facet counts are reused for the same query and filters")
+    SEARCH_FACETS_CACHE_MAX_ENTRIES: int = Field(default=1000, description="Maximum cached facet count sets per process")
+    TERM_DICTIONARY_REFRESH_SECONDS: int = Field(default=600, description="Seconds between incremental loads of new articles into the spelling/expansion dictionary")
+    TERM_DICTIONARY_MAX_ARTICLES: int = Field(default=50000, description="Most recent articles read by the first dictionary load")
+    TERM_DICTIONARY_MAX_TERMS: int = Field(default=30000, description="Most frequent title/topic terms used for corrections and expansions")
+    TERM_DICTIONARY_MAX_EDIT_DISTANCE: int = Field(default=2, description="Maximum edit distance of did-you-mean corrections")
+    SEARCH_RESULT_CACHE_ENABLED: bool = Field(default=True, description="Cache advanced search pages (ordered ids and total) in Redis")
+    SEARCH_RESULT_CACHE_TTL: int = Field(default=300, description="Seconds a cached search page lives if no article invalidates it")
+    SEARCH_RESULT_CACHE_DOCUMENT_TTL: int = Field(default=3600, description="Seconds a hydrated article document is cached for search pages")
+    
+    # Search Query Log (trending searches)
+    QUERY_LOG_ENABLED: bool = Field(default=True, description="Record search queries for trending searches")
+    QUERY_LOG_BUFFER_SIZE: int = Field(default=10000, description="Queries buffered per process before the oldest are dropped")
+    QUERY_LOG_FLUSH_SIZE: int = Field(default=200, description="Buffered queries that trigger a bulk write to the Redis stream")
+    QUERY_LOG_FLUSH_SECONDS: float = Field(default=5.0, description="Seconds after which buffered queries are written on the next search")
+    QUERY_LOG_STREAM_MAXLEN: int = Field(default=200000, description="Approximate cap of unaggregated queries kept in the Redis stream")
+    QUERY_LOG_TOP_K: int = Field(default=100, description="Heavy-hitter queries tracked per hour and timeframe")
+    QUERY_LOG_SKETCH_WIDTH: int = Field(default=2048, description="Count-Min sketch counters per row")
+    QUERY_LOG_SKETCH_DEPTH: int = Field(default=4, description="Count-Min sketch rows")
+    
+    # Semantic Search
+    SEMANTIC_SEARCH_ENABLED: bool = Field(default=True, description="Embed articles on insert for semantic search")
+    SEMANTIC_EMBEDDING_BACKEND: str = Field(default="hashing", description="Embedding backend: hashing (no model) or transformer (local CPU model)")
+    SEMANTIC_EMBEDDING_MODEL: str = Field(default="sentence-transformers/all-MiniLM-L6-v2", description="Hugging Face model for the transformer backend")
+    SEMANTIC_EMBEDDING_DIM: int = Field(default=384, description="Vector dimension of the hashing backend")
+    SEMANTIC_INDEX_BACKEND: str = Field(default="hnsw", description="Nearest-neighbour index: hnsw (in-process) or pgvector")
+    SEMANTIC_INDEX_REFRESH_SECONDS: int = Field(default=60, description="Seconds between incremental loads of new vectors into the in-process index")
+    SEMANTIC_INDEX_MAX_ARTICLES: int = Field(default=100000, description="Most recent article vectors loaded into the in-process index")
+
+    # Result Counting
+    PAGINATION_COUNT_STRATEGY: str = Field(default="exact", description="Default listing count strategy: exact, estimated, capped or window")
+    PAGINATION_COUNT_CAP: int = Field(default=10000, description="Rows counted before a capped total is reported as N+")
     
     # Rate Limiting
     NEWS_API_RATE_LIMIT: int = Field(default=100, description="News API requests per hour")
@@ -54,6 +126,11 @@ class Settings(BaseSettings):
     # Cache Configuration
     CACHE_TTL: int = Field(default=3600, description="Cache TTL in seconds")
     ARTICLE_CACHE_TTL: int = Field(default=1800, description="Article cache TTL in seconds")
+    AI_RESULT_CACHE_ENABLED: bool = Field(default=True, description="Cache OpenAI analysis results in process and in Redis")
+    AI_RESULT_CACHE_TTL: int = Field(default=604800, description="Seconds an analysis result is shared through Redis")
+    AI_RESULT_CACHE_LOCAL_TTL: int = Field(default=3600, description="Seconds an analysis result is kept in the in-process LRU")
+    AI_RESULT_CACHE_LOCAL_MAX_ENTRIES: int = Field(default=2000, description="Maximum analysis results in the in-process LRU")
+    AI_RESULT_CACHE_LOCAL_MAX_BYTES: int = Field(default=16 * 1024 * 1024, description="Maximum serialized bytes in the in-process LRU")
     
     # Celery Configuration
     CELERY_BROKER_URL: str = Field(default="redis://localhost:6379", description="Celery broker URL")
@@ -0,0 +1,149 @@
+"""
+Shared HTTP Transport
+
+This module provides a per-process HTTP transport shared by all news clients:
+- Keep-alive connection pooling (aiohttp and requests)
+- DNS caching
+- Per-host and total connection limits
+- HTTP compression (gzip/deflate)
+- Global concurrency limit for outgoing requests
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "AI-News-Aggregator/1.0",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+
+class HTTPTransport:
+    """
+    Pooled HTTP transport shared by every news client in the process
+
+    aiohttp sessions are bound to the event loop that created them, so one
+    session is kept per running loop. The API server reuses a single loop and
+    closes it on shutdown; Celery tasks run each cycle in a new loop with
+    asyncio.run and close the session at the end of the cycle.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_connections_per_host: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        dns_cache_ttl: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None
+    ):
+        """
+        Initialize the transport (defaults come from settings)
+
+        Args:
+            max_connections: Total pooled connections
+            max_connections_per_host: Pooled connections per host
+            max_concurrency: Maximum in-flight requests across all clients
+            dns_cache_ttl: Seconds to cache DNS resolutions
+            keepalive_timeout: Seconds to keep idle connections open
+        """
+        self.max_connections = max_connections or settings.HTTP_MAX_CONNECTIONS
+        self.max_connections_per_host = max_connections_per_host or settings.HTTP_MAX_CONNECTIONS_PER_HOST
+        self.max_concurrency = max_concurrency or settings.HTTP_MAX_CONCURRENCY
+        self.dns_cache_ttl = dns_cache_ttl or settings.HTTP_DNS_CACHE_TTL
+        self.keepalive_timeout = keepalive_timeout or settings.HTTP_KEEPALIVE_TIMEOUT
+
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._requests_session: Optional[requests.Session] = None
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a pooled aiohttp session for the running loop"""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive_timeout,
+            enable_cleanup_closed=True
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=DEFAULT_HEADERS,
+            auto_decompress=True
+        )
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled aiohttp session of the running event loop"""
+        loop = asyncio.get_running_loop()
+
+        # Forget sessions of loops that are already closed; short-lived loops
+        # (asyncio.run) must await close() before finishing
+        for stale_loop in [stale for stale in self._sessions if stale.is_closed()]:
+            self._sessions.pop(stale_loop)
+            self._semaphores.pop(stale_loop, None)
+
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = self._create_session()
+            self._sessions[loop] = session
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return session
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """
+        Borrow the shared session for one request
+
+        Holds a slot of the global concurrency limit while in use and never
+        closes the session, so connections stay alive for the next request.
+        """
+        session = self.get_session()
+        async with self._semaphores[asyncio.get_running_loop()]:
+            yield session
+
+    def requests_session(self) -> requests.Session:
+        """Get the pooled requests session used by synchronous client methods"""
+        if self._requests_session is None:
+            adapter = HTTPAdapter(
+                pool_connections=max(1, self.max_connections // self.max_connections_per_host),  # pooled hosts
+                pool_maxsize=self.max_connections_per_host
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            self._requests_session = session
+        return self._requests_session
+
+    async def close(self) -> None:
+        """Close the session of the running loop (application shutdown or end of a task cycle)"""
+        loop = asyncio.get_running_loop()
+        self._semaphores.pop(loop, None)
+        session = self._sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+
+    def close_sync(self) -> None:
+        """Close the synchronous requests session"""
+        if self._requests_session is not None:
+            self._requests_session.close()
+            self._requests_session = None
+
+
+# Global transport instance
+http_transport = HTTPTransport()
+
+
+def get_http_transport() -> HTTPTransport:
+    """Get the shared HTTP transport instance"""
+    return http_transport
@@ -8,8 +8,10 @@ This module provides comprehensive Redis cache functionality including:
 - Connection pooling and error handling
 """
 
+import asyncio
 import json
 import logging
+import time
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime, timedelta
 import redis.asyncio as redis
@@ -378,9 +380,70 @@ class RedisCacheManager:
             return {}
 
 
+class LoopCacheManagers:
+    """
+    Connected RedisCacheManager per running event loop
+
+    redis.asyncio connections are bound to the loop that opened them, and
+    Celery tasks run each cycle in a new loop with asyncio.run, so background
+    code can't reuse the global cache_manager connected by the API server.
+    If Redis is down, get() returns None and retries after retry_after seconds.
+    """
+
+    def __init__(self, retry_after: int = 300):
+        """
+        Initialize the per-loop registry
+
+        Args:
+            retry_after: Seconds to wait before reconnecting after a failure
+        """
+        self.retry_after = retry_after
+        self._managers: Dict[asyncio.AbstractEventLoop, RedisCacheManager] = {}
+        self._locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+        self._unavailable_until: Dict[asyncio.AbstractEventLoop, float] = {}
+
+    async def get(self) -> Optional[RedisCacheManager]:
+        """Get the connected cache manager of the running loop, or None if Redis is down"""
+        loop = asyncio.get_running_loop()
+        for stale_loop in [stale for stale in self._locks if stale.is_closed()]:
+            self._locks.pop(stale_loop)
+            self._managers.pop(stale_loop, None)
+            self._unavailable_until.pop(stale_loop, None)
+
+        async with self._locks.setdefault(loop, asyncio.Lock()):
+            manager = self._managers.get(loop)
+            if manager is not None:
+                return manager
+            if time.time() < self._unavailable_until.get(loop, 0):
+                return None
+
+            manager = RedisCacheManager()
+            try:
+                await manager.connect()
+            except Exception as e:
+                logger.warning(f"Redis unavailable for this event loop: {e}")
+                self._unavailable_until[loop] = time.time() + self.retry_after
+                return None
+
+            self._managers[loop] = manager
+            return manager
+
+    async def close(self) -> None:
+        """Close the connection of the running loop (application shutdown or end of a task cycle)"""
+        loop = asyncio.get_running_loop()
+        self._locks.pop(loop, None)
+        self._unavailable_until.pop(loop, None)
+        manager = self._managers.pop(loop, None)
+        if manager is not None:
+            await manager.disconnect()
+
+
 # Global cache manager instance
 cache_manager = RedisCacheManager()
 
+# Per-loop connections for background work
+loop_cache_managers = LoopCacheManagers()
+
 
 async def get_cache_manager() -> RedisCacheManager:
     """Get global cache manager instance"""
@@ -0,0 +1,165 @@
+"""
+Upstream HTTP Response Cache
+
+This module provides a Redis-backed cache for news provider responses:
+- Stored body, ETag and Last-Modified per request signature
+- Conditional requests (If-None-Match / If-Modified-Since) answered by 304
+- TTL-based freshness for APIs that don't send validators
+- Per-provider hit/miss statistics
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from .config import settings
+from .redis_cache import RedisCacheManager, loop_cache_managers
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "news_http"
+
+# Credentials never take part in the request signature
+SECRET_PARAMS = {"api-key", "apikey", "api_key"}
+
+
+class HTTPResponseCache:
+    """
+    Response cache in front of the news provider clients
+
+    Like the shared HTTP transport, the asyncio Redis connection is bound to the
+    event loop that created it, so the connection of the running loop is taken
+    from loop_cache_managers. If Redis is unavailable the cache degrades to
+    plain requests.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        max_age: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        cache_manager: Optional[RedisCacheManager] = None
+    ):
+        """
+        Initialize the response cache (defaults come from settings)
+
+        Args:
+            ttl: Seconds a response without validators is served without a request
+            max_age: Seconds a stored response is kept for revalidation
+            enabled: Whether responses are cached at all
+            cache_manager: Connected cache manager to use instead of one per loop
+        """
+        self.ttl = ttl or settings.NEWS_RESPONSE_CACHE_TTL
+        self.max_age = max_age or settings.NEWS_RESPONSE_CACHE_MAX_AGE
+        self.enabled = settings.NEWS_RESPONSE_CACHE_ENABLED if enabled is None else enabled
+        self._cache_manager = cache_manager
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def make_key(provider: str, url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+        """Build the cache key of a request from its URL and non-secret params"""
+        signature = json.dumps([
+            url,
+            sorted(
+                (str(name), str(value)) for name, value in (params or {}).items()
+                if str(name).lower() not in SECRET_PARAMS
+            )
+        ])
+        digest = hashlib.sha256(signature.encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{provider}:{digest}"
+
+    async def _get_manager(self) -> Optional[RedisCacheManager]:
+        """Get the connected cache manager of the running loop, or None if Redis is down"""
+        if self._cache_manager is not None:
+            return self._cache_manager
+        return await loop_cache_managers.get()
+
+    async def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the stored response for a key"""
+        if not self.enabled:
+            return None
+        manager = await self._get_manager()
+        if manager is None:
+            return None
+        entry = await manager.get(key)
+        return entry if isinstance(entry, dict) and "data" in entry else None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Whether a stored response can be served without asking upstream"""
+        if entry.get("etag") or entry.get("last_modified"):
+            return False  # Validators available: revalidate with a conditional request
+        return time.time() - entry.get("stored_at", 0) < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Validator headers to replay for a stored response"""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    async def store(self, key: str, data: Any, response_headers: Optional[Mapping[str, str]] = None) -> bool:
+        """Store a response body with its validators"""
+        if not self.enabled:
+            return False
+        manager = await self._get_manager()
+        if manager is None:
+            return False
+        response_headers = response_headers or {}
+        entry = {
+            "data": data,
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+            "stored_at": time.time()
+        }
+        return await manager.set(key, entry, ttl=self.max_age)
+
+    async def refresh(self, key: str, entry: Dict[str, Any]) -> bool:
+        """Extend a stored response after upstream confirmed it with a 304"""
+        manager = await self._get_manager()
+        if manager is None:
+            return False
+        return await manager.set(key, dict(entry, stored_at=time.time()), ttl=self.max_age)
+
+    def record(self, provider: str, outcome: str) -> None:
+        """Count a cache outcome ('hits', 'revalidated' or 'misses') for a provider"""
+        stats = self._stats.setdefault(provider, {"hits": 0, "revalidated": 0, "misses": 0})
+        stats[outcome] += 1
+
+    def get_stats(self, provider: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get hit/miss statistics of this process
+
+        Args:
+            provider: Provider name (all providers if None)
+
+        Returns:
+            Counters and hit rate, per provider unless one is given
+        """
+        def summarize(stats: Dict[str, int]) -> Dict[str, Any]:
+            served = stats["hits"] + stats["revalidated"]
+            total = served + stats["misses"]
+            return dict(stats, requests=total, hit_rate=served / total if total else 0.0)
+
+        if provider is not None:
+            return summarize(self._stats.get(provider, {"hits": 0, "revalidated": 0, "misses": 0}))
+        return {name: summarize(stats) for name, stats in self._stats.items()}
+
+    async def close(self) -> None:
+        """Close the Redis connection of the running loop (application shutdown or end of a task cycle)"""
+        if self._cache_manager is None:
+            await loop_cache_managers.close()
+
+
+# Global response cache instance
+response_cache = HTTPResponseCache()
+
+
+def get_response_cache() -> HTTPResponseCache:
+    """Get the shared upstream response cache instance"""
+    return response_cache
@@ -0,0 +1,334 @@
+"""
+Search Result Cache
+
+This module provides a Redis-backed cache for advanced search pages:
+- Canonical keys: normalized query text and filters, so equivalent searches share an entry
+- Entries hold only the ordered article ids, the total and the next cursor
+- Article documents hydrated with a single MGET and shared by every cached page
+- Tag-based invalidation (source id x publication day) when articles land or change
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import unicodedata
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+
+from redis.exceptions import RedisError, ConnectionError, TimeoutError
+
+from .config import settings
+from .redis_cache import RedisCacheManager, loop_cache_managers
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "search_ids"
+DOCUMENT_PREFIX = "search_doc"
+TAG_PREFIX = "search_tag"
+
+# Wildcard tag component: any source / any day
+ANY = "*"
+
+# Longer date ranges (or many source x day pairs) are tagged with any day
+MAX_DAY_BUCKETS = 31
+MAX_TAGS = 256
+
+# Document fields stored as ISO strings and restored as datetimes
+DATETIME_FIELDS = ("published_at", "ai_processed_at")
+
+
+def _day_bucket(value: Any) -> Optional[str]:
+    """Day bucket (YYYY-MM-DD) of a datetime, date or ISO string"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat() if isinstance(value, date) else None
+
+
+class SearchResultCache:
+    """
+    Result cache in front of SearchService.advanced_search
+
+    Each entry is tagged with the (source id, day) pairs its filters cover, and
+    every tag is a Redis set of the entries that depend on it. When an article is
+    inserted, updated or deleted only the entries of its source and publication
+    day (plus the wildcard tags) are dropped; the TTL is just a backstop for
+    changes made outside the ORM. Like the response cache, the Redis connection
+    of the running event loop is used and the cache degrades to plain queries
+    if Redis is unavailable.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        document_ttl: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        cache_manager: Optional[RedisCacheManager] = None
+    ):
+        """
+        Initialize the search result cache (defaults come from settings)
+
+        Args:
+            ttl: Seconds a result page is kept without being invalidated
+            document_ttl: Seconds a hydrated article document is kept
+            enabled: Whether search results are cached at all
+            cache_manager: Connected cache manager to use instead of one per loop
+        """
+        self.ttl = ttl or settings.SEARCH_RESULT_CACHE_TTL
+        self.document_ttl = document_ttl or settings.SEARCH_RESULT_CACHE_DOCUMENT_TTL
+        self.enabled = settings.SEARCH_RESULT_CACHE_ENABLED if enabled is None else enabled
+        self._cache_manager = cache_manager
+        self._pending: Set[asyncio.Task] = set()
+        self._stats = {"hits": 0, "misses": 0, "invalidated": 0}
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Query text as matched by the search: Unicode-normalized, case-folded, single-spaced"""
+        return " ".join(unicodedata.normalize("NFKC", query or "").casefold().split())
+
+    @staticmethod
+    def canonical_filters(filters: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        """Filters without empty values, with sorted unique lists, numbers as floats and ISO dates"""
+        canonical = {}
+        for name, value in (filters or {}).items():
+            if value is None or value == "" or value == [] or value == ():
+                continue
+            if isinstance(value, (list, tuple, set)):
+                value = sorted({str(item) for item in value})
+            elif isinstance(value, bool):
+                pass
+            elif isinstance(value, (int, float)):
+                value = float(value)
+            elif name.startswith("date_") and isinstance(value, str):
+                try:
+                    value = datetime.fromisoformat(value).isoformat()
+                except ValueError:
+                    pass
+            canonical[name] = value
+        return canonical
+
+    @classmethod
+    def make_key(cls, query: str, filters: Optional[Mapping[str, Any]] = None, **params: Any) -> str:
+        """Build the cache key of a search from its query, filters and paging params"""
+        signature = json.dumps(
+            [cls.normalize_query(query), cls.canonical_filters(filters), params],
+            sort_keys=True,
+            default=str
+        )
+        digest = hashlib.sha256(signature.encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{digest}"
+
+    @staticmethod
+    def search_tags(
+        source_ids: Optional[Iterable[Any]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> List[str]:
+        """
+        Tags of a search: every (source, day) pair its filters can match
+
+        Args:
+            source_ids: Ids of the filtered sources (None: any source)
+            date_from: Lower bound of the publication date filter
+            date_to: Upper bound of the publication date filter
+
+        Returns:
+            Tags of the form "<source id|*>:<YYYY-MM-DD|*>"
+        """
+        sources = sorted({str(source_id) for source_id in source_ids}) if source_ids else [ANY]
+
+        days = [ANY]
+        first, last = _day_bucket(date_from), _day_bucket(date_to)
+        if first and last:
+            start, end = date.fromisoformat(first), date.fromisoformat(last)
+            span = (end - start).days + 1
+            if span <= 0:
+                days = []  # Empty range: nothing can match
+            elif span <= MAX_DAY_BUCKETS and span * len(sources) <= MAX_TAGS:
+                days = [(start + timedelta(days=offset)).isoformat() for offset in range(span)]
+
+        return [f"{source}:{day}" for source in sources for day in days]
+
+    @staticmethod
+    def article_tags(source_id: Any, published_at: Any) -> List[str]:
+        """Tags of every search an article with this source and publication date can appear in"""
+        source = str(source_id) if source_id is not None else None
+        day = _day_bucket(published_at)
+
+        tags = [f"{ANY}:{ANY}"]
+        if source:
+            tags.append(f"{source}:{ANY}")
+        if day:
+            tags.append(f"{ANY}:{day}")
+        if source and day:
+            tags.append(f"{source}:{day}")
+        return tags
+
+    async def _get_manager(self) -> Optional[RedisCacheManager]:
+        """Get the connected cache manager of the running loop, or None if Redis is down"""
+        if self._cache_manager is not None:
+            return self._cache_manager
+        return await loop_cache_managers.get()
+
+    async def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the cached page (ids, total, next cursor) for a key"""
+        if not self.enabled:
+            return None
+        manager = await self._get_manager()
+        if manager is None:
+            return None
+        entry = await manager.get(key)
+        if isinstance(entry, dict) and isinstance(entry.get("ids"), list):
+            self._stats["hits"] += 1
+            return entry
+        self._stats["misses"] += 1
+        return None
+
+    async def store(self, key: str, entry: Dict[str, Any], tags: Iterable[str]) -> bool:
+        """
+        Store a result page and register it under its tags
+
+        Args:
+            key: Cache key from make_key
+            entry: Page to cache; must contain the ordered "ids"
+            tags: Tags from search_tags (no tags: the entry is not cached)
+
+        Returns:
+            True if the entry was stored
+        """
+        tags = list(tags)
+        if not self.enabled or not tags:
+            return False
+        manager = await self._get_manager()
+        if manager is None:
+            return False
+        try:
+            pipeline = manager.redis.pipeline(transaction=False)
+            pipeline.set(key, json.dumps(entry, default=str), ex=self.ttl)
+            for tag in tags:
+                tag_key = f"{TAG_PREFIX}:{tag}"
+                pipeline.sadd(tag_key, key)
+                pipeline.expire(tag_key, self.ttl)
+            await pipeline.execute()
+            return True
+        except (RedisError, ConnectionError, TimeoutError) as e:
+            logger.error(f"Search cache store error for key {key}: {e}")
+            return False
+
+    async def get_documents(self, article_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the cached article documents of a page with one MGET"""
+        if not self.enabled or not article_ids:
+            return {}
+        manager = await self._get_manager()
+        if manager is None:
+            return {}
+        found = await manager.batch_get([f"{DOCUMENT_PREFIX}:{article_id}" for article_id in article_ids])
+
+        documents = {}
+        for key, document in found.items():
+            if not isinstance(document, dict):
+                continue
+            for field in DATETIME_FIELDS:
+                if isinstance(document.get(field), str):
+                    try:
+                        document[field] = datetime.fromisoformat(document[field])
+                    except ValueError:
+                        pass
+            documents[key.split(":", 1)[1]] = document
+        return documents
+
+    async def store_documents(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """Cache formatted article documents by their id"""
+        if not self.enabled:
+            return 0
+        items = {
+            f"{DOCUMENT_PREFIX}:{document['id']}": (document, self.document_ttl)
+            for document in documents
+        }
+        if not items:
+            return 0
+        manager = await self._get_manager()
+        if manager is None:
+            return 0
+        return await manager.batch_set(items)
+
+    async def invalidate(self, tags: Iterable[str], article_ids: Iterable[Any] = ()) -> int:
+        """
+        Drop the result pages registered under any of the tags and the given article documents
+
+        Returns:
+            Number of result pages dropped
+        """
+        tag_keys = [f"{TAG_PREFIX}:{tag}" for tag in sorted(set(tags))]
+        document_keys = [f"{DOCUMENT_PREFIX}:{article_id}" for article_id in set(article_ids)]
+        if not tag_keys and not document_keys:
+            return 0
+        manager = await self._get_manager()
+        if manager is None:
+            return 0
+        try:
+            entry_keys: Set[str] = set()
+            if tag_keys:
+                pipeline = manager.redis.pipeline(transaction=False)
+                for tag_key in tag_keys:
+                    pipeline.smembers(tag_key)
+                for members in await pipeline.execute():
+                    entry_keys.update(members or ())
+
+            await manager.redis.delete(*entry_keys, *tag_keys, *document_keys)
+            self._stats["invalidated"] += len(entry_keys)
+            if entry_keys:
+                logger.debug(f"Search cache invalidation: {len(entry_keys)} pages for {len(tag_keys)} tags")
+            return len(entry_keys)
+        except (RedisError, ConnectionError, TimeoutError) as e:
+            logger.error(f"Search cache invalidation error: {e}")
+            return 0
+
+    def schedule_invalidation(self, tags: Iterable[str], article_ids: Iterable[Any] = ()) -> bool:
+        """
+        Invalidate in the background from synchronous code (session events)
+
+        Returns:
+            False if there is no running event loop; the TTL then expires the pages
+        """
+        if not self.enabled:
+            return False
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+        task = loop.create_task(self.invalidate(list(tags), list(article_ids)))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/invalidation counters of this process"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return dict(self._stats, lookups=lookups, hit_rate=self._stats["hits"] / lookups if lookups else 0.0)
+
+    async def close(self) -> None:
+        """Finish scheduled invalidations and close the Redis connection of the running loop"""
+        loop = asyncio.get_running_loop()
+        pending = [task for task in self._pending if task.get_loop() is loop]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if self._cache_manager is None:
+            await loop_cache_managers.close()
+
+
+# Global search result cache instance
+search_cache = SearchResultCache()
+
+
+def get_search_cache() -> SearchResultCache:
+    """Get the shared search result cache instance"""
+    return search_cache
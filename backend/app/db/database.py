@@ -4,7 +4,7 @@ Database configuration and connection management
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 from app.core.config import settings
 
@@ -23,6 +23,21 @@ async_session_maker = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Engine for Celery tasks: each task runs its own event loop (asyncio.run), and
+# pooled asyncpg connections stay bound to the loop that opened them, so tasks
+# open and close their connections instead of sharing a pool
+task_engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    poolclass=NullPool,
+)
+
+task_session_maker = async_sessionmaker(
+    task_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
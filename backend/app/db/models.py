@@ -8,10 +8,11 @@ from typing import Optional, List
 from enum import Enum as PyEnum
 
 from sqlalchemy import (
-    Column, String, Text, DateTime, Boolean, Integer, 
-    Float, JSON, ForeignKey, Index, UniqueConstraint, Enum
+    Column, String, Text, DateTime, Boolean, Integer, BigInteger,
+    Float, JSON, ForeignKey, Index, UniqueConstraint, Enum, LargeBinary, func, literal_column,
+    DDL, event
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.orm import relationship
 
 # Import Base from database module to ensure single Base instance
@@ -73,10 +74,14 @@ class Article(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Duplicate Detection Fields
-    duplicate_group_id = Column(UUID(as_uuid=True))  # Para tracking de duplicados
+    duplicate_group_id = Column(UUID(as_uuid=True))  # ID del artículo canónico del grupo (NULL si no tiene duplicados)
     content_hash = Column(String(64))  # Hash del contenido para detección de duplicados (SHA-256)
+    simhash = Column(BigInteger)  # Huella SimHash de 64 bits del contenido (con signo)
     cache_expires_at = Column(DateTime)  # Para cache management
     
+    # Full-Text Search
+    search_vector = Column(TSVECTOR().with_variant(Text, 'sqlite'))  # título (A) + resumen (B) + contenido (C), mantenido por trigger
+    
     # AI Analysis Fields
     sentiment_score = Column(Float)  # -1.0 to 1.0
     sentiment_label = Column(String(20))  # 'positive', 'negative', 'neutral'
@@ -100,6 +105,62 @@ class Article(Base):
         Index('idx_articles_sentiment_label', 'sentiment_label'),
         Index('idx_articles_ai_processed_at', 'ai_processed_at'),
         Index('idx_articles_processing_status', 'processing_status'),
+        Index('idx_articles_search_vector', 'search_vector', postgresql_using='gin'),
+    )
+
+
+# search_vector trigger for databases created with Base.metadata.create_all
+# (same DDL as db/migrations/006_add_article_search_vector.sql)
+ARTICLE_SEARCH_VECTOR_FUNCTION = DDL("""
+CREATE OR REPLACE FUNCTION articles_search_vector_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.content, '')), 'C');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+""")
+
+ARTICLE_SEARCH_VECTOR_TRIGGER = DDL("""
+CREATE TRIGGER update_articles_search_vector
+BEFORE INSERT OR UPDATE OF title, summary, content ON articles
+FOR EACH ROW EXECUTE FUNCTION articles_search_vector_update()
+""")
+
+event.listen(Article.__table__, 'after_create', ARTICLE_SEARCH_VECTOR_FUNCTION.execute_if(dialect='postgresql'))
+event.listen(Article.__table__, 'after_create', ARTICLE_SEARCH_VECTOR_TRIGGER.execute_if(dialect='postgresql'))
+
+
+class ArticleLSHBand(Base):
+    """MinHash/LSH and SimHash band keys table for near-duplicate candidate lookup"""
+    __tablename__ = "article_lsh_bands"
+
+    article_id = Column(UUID(as_uuid=True), ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    band_key = Column(String(32), primary_key=True)  # '<campo><banda><hash>', ej. 't07a1b2...', 's02f3c1'
+    created_at = Column(DateTime, default=datetime.utcnow)  # Copia de articles.created_at
+
+    __table_args__ = (
+        Index('idx_article_lsh_bands_key_created', 'band_key', 'created_at'),
+    )
+
+
+class ArticleEmbedding(Base):
+    """Per-article embedding vectors for semantic search"""
+    __tablename__ = "article_embeddings"
+
+    article_id = Column(UUID(as_uuid=True), ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    model = Column(String(100), nullable=False)  # Backend que generó el vector; otros modelos no son comparables
+    dim = Column(Integer, nullable=False)
+    embedding = Column(LargeBinary, nullable=False)  # float32 de norma 1 (ndarray.tobytes())
+    indexed_at = Column(DateTime, default=datetime.utcnow)  # Marca para la carga incremental del índice HNSW
+    # Columna opcional embedding_vector vector(384) + índice HNSW con pgvector:
+    # db/migrations/009_create_article_embeddings.sql
+
+    __table_args__ = (
+        Index('idx_article_embeddings_model_indexed', 'model', 'indexed_at'),
     )
 
 
@@ -213,6 +274,17 @@ class TrendingTopic(Base):
     )
 
 
+class SearchTerm(Base):
+    """Search suggestion vocabulary (sources, trending topics and frequent article terms)"""
+    __tablename__ = "search_terms"
+
+    term = Column(String(255), primary_key=True)  # Texto mostrado en la sugerencia
+    term_type = Column(String(20), primary_key=True)  # 'source', 'topic', 'term'
+    weight = Column(Float, default=0.0)  # Artículos de la fuente, trend_score o documentos con el término
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    # Índice GIN lower(term) gin_trgm_ops: db/migrations/007_create_search_terms.sql
+
+
 class AnalysisTask(Base):
     """Async AI analysis tasks tracking table"""
     __tablename__ = "analysis_tasks"
@@ -275,6 +347,12 @@ Index('idx_articles_processed_at', Article.processed_at)
 Index('idx_articles_ai_processed_at', Article.ai_processed_at)
 Index('idx_articles_relevance_score', Article.relevance_score)
 Index('idx_articles_duplicate_group_id', Article.duplicate_group_id)
+Index('idx_articles_duplicate_group_key', func.coalesce(Article.duplicate_group_id, Article.id), Article.id)
+# Keyset pagination on (sort key, id); same COALESCE as utils.pagination.null_safe_sort_key
+Index('idx_articles_keyset_published_at', func.coalesce(Article.published_at, literal_column("'1970-01-01 00:00:00'", DateTime)), Article.id)
+Index('idx_articles_keyset_created_at', func.coalesce(Article.created_at, literal_column("'1970-01-01 00:00:00'", DateTime)), Article.id)
+Index('idx_articles_keyset_relevance', func.coalesce(Article.relevance_score, literal_column("-2")), Article.id)
+Index('idx_articles_keyset_sentiment', func.coalesce(Article.sentiment_score, literal_column("-2")), Article.id)
 Index('idx_articles_content_hash', Article.content_hash)
 Index('idx_articles_cache_expires_at', Article.cache_expires_at)
 Index('idx_sources_api_name', Source.api_name)
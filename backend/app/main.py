@@ -12,6 +12,10 @@ import logging
 
 from app.core.config import settings
 from app.core.redis_cache import get_cache_manager
+from app.core.http_client import get_http_transport
+from app.core.response_cache import get_response_cache
+from app.core.search_cache import get_search_cache
+from app.core.ai_cache import get_ai_result_cache
 from app.core.rate_limiter import get_rate_limit_manager
 from app.core.middleware import (
     RateLimitMiddleware, 
@@ -19,9 +23,15 @@ from app.core.middleware import (
     HealthCheckMiddleware
 )
 from app.utils.pagination_middleware import setup_pagination_middleware
+from app.utils.query_log import get_query_log
+from app.utils.tokenizer import warm_encoding
 from app.db.database import engine, Base
 from app.db import models  # Import models so SQLAlchemy can create tables
+from app.utils import deduplication  # Register LSH indexing of inserted articles
+from app.utils import semantic_index  # Register embedding of inserted articles
+from app.utils import search_cache_invalidation  # Register search cache invalidation on article commits
 from app.api.v1.api import api_router
+from app.services.search_service import search_service
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -104,6 +114,13 @@ async def startup_event():
         # DISABLED: Tables created manually via psql to avoid SQLAlchemy/asyncpg index bug
         # await create_tables()
         
+        # Load the BPE tokenizer off the event loop (the first load may download it)
+        warm_encoding(settings.OPENAI_MODEL)
+        
+        # Detect full-text search support once; searches only read the flag
+        async with engine.connect() as conn:
+            await conn.run_sync(search_service.detect_fulltext_index)
+        
         # Initialize Redis connection
         logger.info("Initializing Redis connection...")
         cache_manager = await get_cache_manager()
@@ -136,6 +153,14 @@ async def shutdown_event():
         cache_manager = await get_cache_manager()
         await cache_manager.disconnect()
         
+        # Close pooled HTTP connections of the news clients
+        await get_http_transport().close()
+        get_http_transport().close_sync()
+        await get_query_log().close()
+        await get_ai_result_cache().close()
+        await get_search_cache().close()
+        await get_response_cache().close()
+        
         print("👋 AI News Aggregator API shutting down...")
         
     except Exception as e:
@@ -0,0 +1,427 @@
+"""
+Modo batch offline para análisis de IA no urgente
+
+El reprocesamiento del backlog no necesita respuestas en tiempo real. En lugar
+de pagar precio síncrono y consumir el rate limit por petición, las peticiones
+de análisis se serializan en un archivo JSONL, se envían al endpoint batch del
+proveedor y, cuando el lote termina, los resultados se aplican en bloque a
+ArticleAnalysis. El throughput queda limitado por la ventana del lote y no por
+las peticiones por minuto.
+
+Características:
+- Una petición fused por artículo (el mismo prompt que el modo fused en línea)
+- Proveedor OpenAI (Batch API) y un sustituto local basado en archivos
+- Jobs serializables a dict para pasarlos entre tareas de Celery
+- Costo con el descuento del precio batch
+- Aplicación en bloque: una consulta de filas existentes y un solo commit
+"""
+
+import json
+import logging
+import shutil
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+try:
+    from openai import OpenAI
+except ImportError:
+    OpenAI = None
+
+from app.core.config import settings
+from app.db.models import AnalysisTask, AnalysisTaskStatus, Article, ArticleAnalysis, ProcessingStatus
+from app.services.ai_processor import AnalysisResult, ComprehensiveAnalyzer, CostOptimizer, result_to_payload
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# La Batch API factura la mitad del precio síncrono
+BATCH_PRICE_FACTOR = 0.5
+
+# Estados del proveedor que todavía pueden terminar
+PENDING_STATUSES = {"submitted", "validating", "in_progress", "finalizing", "cancelling"}
+
+# Campos del análisis fused que pide cada analysis_type de las tareas en lote
+OFFLINE_FIELDS = {
+    "comprehensive": ["sentiment", "topic", "summary", "relevance"],
+    "sentiment": ["sentiment"],
+    "basic": ["topic", "summary"],
+}
+
+# analysis_type de ArticleAnalysis de cada campo
+ANALYSIS_TYPES = {
+    "sentiment": "sentiment",
+    "topic": "topics",
+    "summary": "summary",
+    "relevance": "relevance",
+}
+
+
+@dataclass
+class BatchJob:
+    """Lote enviado al proveedor (serializable para Celery y AnalysisTask)"""
+    job_id: str
+    provider: str
+    provider_batch_id: str
+    input_file: str
+    article_ids: List[str]
+    fields: List[str]
+    model: str
+    submitted_at: float
+    status: str = "submitted"
+    output_file_id: Optional[str] = None
+    request_counts: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchJob":
+        return cls(**data)
+
+    @property
+    def is_pending(self) -> bool:
+        return self.status in PENDING_STATUSES
+
+
+class OpenAIBatchProvider:
+    """Batch API de OpenAI: subida del JSONL, creación del lote, estado y descarga"""
+
+    name = "openai"
+
+    def __init__(self, client: Optional[Any] = None, api_key: Optional[str] = None):
+        if client is None:
+            if OpenAI is None:
+                raise RuntimeError("El paquete openai no está instalado")
+            client = OpenAI(api_key=api_key or settings.OPENAI_API_KEY)
+        self.client = client
+
+    def submit(self, input_path: Path, metadata: Optional[Dict[str, str]] = None) -> str:
+        """Sube el archivo de peticiones y crea el lote; devuelve el id del lote"""
+        with open(input_path, "rb") as input_file:
+            uploaded = self.client.files.create(file=input_file, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=settings.AI_BATCH_COMPLETION_WINDOW,
+            metadata=metadata or {}
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> Tuple[str, Optional[str], Dict[str, int]]:
+        """Estado del lote, id del archivo de salida y contadores de peticiones"""
+        batch = self.client.batches.retrieve(batch_id)
+        counts = getattr(batch, "request_counts", None)
+        request_counts = {
+            "total": getattr(counts, "total", 0),
+            "completed": getattr(counts, "completed", 0),
+            "failed": getattr(counts, "failed", 0),
+        } if counts else {}
+        return batch.status, batch.output_file_id, request_counts
+
+    def download(self, file_id: str) -> str:
+        """Contenido JSONL del archivo de salida"""
+        return self.client.files.content(file_id).text
+
+
+class LocalBatchProvider:
+    """
+    Sustituto local de la Batch API basado en archivos
+
+    submit copia el JSONL de entrada al directorio del proveedor; la primera
+    consulta de estado procesa el lote respondiendo cada petición con
+    responder(body) y escribe la salida con el formato de la Batch API. Sin
+    responder, cada petición termina con error (para tests y desarrollo sin OpenAI).
+    """
+
+    name = "local"
+
+    def __init__(self, directory: Optional[str] = None,
+                 responder: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        self.directory = Path(directory or settings.AI_BATCH_JOB_DIR) / "local_provider"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.responder = responder
+
+    def submit(self, input_path: Path, metadata: Optional[Dict[str, str]] = None) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex}"
+        shutil.copyfile(input_path, self.directory / f"{batch_id}.input.jsonl")
+        return batch_id
+
+    def status(self, batch_id: str) -> Tuple[str, Optional[str], Dict[str, int]]:
+        output_path = self.directory / f"{batch_id}.output.jsonl"
+        if not output_path.exists():
+            self._process(batch_id, output_path)
+        lines = [json.loads(line) for line in output_path.read_text().splitlines() if line.strip()]
+        failed = sum(1 for line in lines if line.get("error"))
+        return "completed", output_path.name, {"total": len(lines), "completed": len(lines) - failed, "failed": failed}
+
+    def download(self, file_id: str) -> str:
+        return (self.directory / file_id).read_text()
+
+    def _process(self, batch_id: str, output_path: Path) -> None:
+        """Responde todas las peticiones del lote"""
+        output_lines = []
+        for line in (self.directory / f"{batch_id}.input.jsonl").read_text().splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            output = {"id": f"batch_req_{uuid.uuid4().hex}", "custom_id": request["custom_id"], "response": None, "error": None}
+            try:
+                if self.responder is None:
+                    raise RuntimeError("Proveedor local sin responder")
+                output["response"] = {"status_code": 200, "body": self.responder(request["body"])}
+            except Exception as e:
+                output["error"] = {"code": "local_error", "message": str(e)}
+            output_lines.append(json.dumps(output))
+        output_path.write_text("\n".join(output_lines) + "\n")
+
+
+def get_batch_provider(name: Optional[str] = None) -> Any:
+    """Proveedor batch configurado (AI_BATCH_PROVIDER)"""
+    name = name or settings.AI_BATCH_PROVIDER
+    if name == "local":
+        return LocalBatchProvider()
+    if name == "openai":
+        return OpenAIBatchProvider()
+    raise ValueError(f"Proveedor batch desconocido: {name}")
+
+
+class OfflineBatchAnalyzer:
+    """Construcción, envío, seguimiento y recogida de lotes de análisis offline"""
+
+    def __init__(self,
+                 provider: Optional[Any] = None,
+                 analyzer: Optional[ComprehensiveAnalyzer] = None,
+                 job_dir: Optional[str] = None,
+                 max_summary_words: int = 150):
+        """
+        Inicializa el analizador offline
+
+        Args:
+            provider: OpenAIBatchProvider, LocalBatchProvider o compatible (por defecto AI_BATCH_PROVIDER)
+            analyzer: Analizador que aporta el prompt fused y la interpretación de respuestas
+            job_dir: Directorio de los archivos JSONL de los lotes
+            max_summary_words: Longitud máxima de los resúmenes
+        """
+        self.provider = provider or get_batch_provider()
+        # Sin API key: solo construye prompts e interpreta respuestas
+        self.analyzer = analyzer or ComprehensiveAnalyzer()
+        self.job_dir = Path(job_dir or settings.AI_BATCH_JOB_DIR)
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+        self.max_summary_words = max_summary_words
+
+    def build_requests(self, articles: List[Dict[str, Any]], fields: List[str]) -> List[Dict[str, Any]]:
+        """
+        Una petición fused por artículo en el formato de la Batch API
+
+        Args:
+            articles: Artículos con 'id' y 'content' (o 'title'/'description')
+
+        Returns:
+            Líneas del JSONL; custom_id es el id del artículo
+        """
+        requests = []
+        seen = set()
+        for article in articles:
+            article_id = str(article.get("id") or "")
+            text = article.get("content") or article.get("description") or article.get("title") or ""
+            content = self.analyzer.sentiment_analyzer._prepare_content(text)
+            if not article_id or not content or article_id in seen:
+                continue
+            seen.add(article_id)
+            requests.append({
+                "custom_id": article_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": self.analyzer.fused_request_body(content, fields, max_summary_words=self.max_summary_words)
+            })
+        return requests
+
+    def submit(self, articles: List[Dict[str, Any]], analysis_type: str = "comprehensive") -> BatchJob:
+        """
+        Escribe el JSONL del lote y lo envía al proveedor
+
+        Raises:
+            ValueError: Si ningún artículo tiene contenido que analizar
+        """
+        fields = OFFLINE_FIELDS.get(analysis_type, OFFLINE_FIELDS["comprehensive"])
+        requests = self.build_requests(articles, fields)
+        if not requests:
+            raise ValueError("No hay artículos con contenido para el lote")
+
+        job_id = uuid.uuid4().hex
+        input_path = self.job_dir / f"{job_id}.input.jsonl"
+        input_path.write_text("".join(json.dumps(request, ensure_ascii=False) + "\n" for request in requests))
+
+        provider_batch_id = self.provider.submit(input_path, {"job_id": job_id, "analysis_type": analysis_type})
+        job = BatchJob(
+            job_id=job_id,
+            provider=self.provider.name,
+            provider_batch_id=provider_batch_id,
+            input_file=str(input_path),
+            article_ids=[request["custom_id"] for request in requests],
+            fields=fields,
+            model=requests[0]["body"]["model"],
+            submitted_at=time.time()
+        )
+        logger.info(f"Lote offline {job_id} enviado a {job.provider} ({provider_batch_id}) con {len(requests)} peticiones")
+        return job
+
+    def poll(self, job: BatchJob) -> BatchJob:
+        """Actualiza el estado del lote desde el proveedor"""
+        job.status, job.output_file_id, job.request_counts = self.provider.status(job.provider_batch_id)
+        logger.info(f"Lote offline {job.job_id}: {job.status} {job.request_counts}")
+        return job
+
+    def collect(self, job: BatchJob) -> Tuple[Dict[str, Dict[str, AnalysisResult]], Dict[str, str]]:
+        """
+        Interpreta la salida de un lote completado
+
+        Returns:
+            Resultados por id de artículo y campo, y error por id de los artículos sin resultado
+        """
+        results: Dict[str, Dict[str, AnalysisResult]] = {}
+        errors: Dict[str, str] = {}
+        output = self.provider.download(job.output_file_id) if job.output_file_id else ""
+
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            article_id = record.get("custom_id")
+            response = record.get("response") or {}
+            try:
+                if record.get("error"):
+                    raise ValueError(record["error"].get("message", "error del proveedor"))
+                if response.get("status_code") != 200:
+                    raise ValueError(f"HTTP {response.get('status_code')}")
+                body = response["body"]
+                result_data = json.loads(body["choices"][0]["message"]["content"])
+                if not isinstance(result_data, dict):
+                    raise ValueError("La respuesta no es un objeto JSON")
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                errors[article_id] = str(e)
+                continue
+
+            usage = body.get("usage") or {}
+            model = body.get("model") or job.model
+            cost = CostOptimizer.calculate_cost(
+                model, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+            ) * BATCH_PRICE_FACTOR
+            # Sin tiempo de procesamiento por petición: el lote entero es la unidad
+            fields = self.analyzer.fused_results_from_data(
+                result_data, job.fields, 0.0, usage.get("total_tokens", 0), cost, model
+            )
+            if fields:
+                results[article_id] = fields
+            else:
+                errors[article_id] = "Ningún campo válido en la respuesta"
+
+        for article_id in job.article_ids:
+            if article_id not in results and article_id not in errors:
+                errors[article_id] = "Sin respuesta en la salida del lote"
+
+        logger.info(f"Lote offline {job.job_id}: {len(results)} artículos con resultados, {len(errors)} con errores")
+        return results, errors
+
+
+def apply_batch_results(db: Session,
+                        results: Dict[str, Dict[str, AnalysisResult]],
+                        errors: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+    """
+    Aplica en bloque los resultados de un lote a ArticleAnalysis y a los artículos
+
+    Las filas existentes (article_id, analysis_type) se actualizan y las nuevas se
+    añaden, con una consulta por tabla y un solo commit. Los artículos con error
+    quedan en estado failed.
+
+    Returns:
+        Contadores de filas creadas y actualizadas y de artículos completados y fallidos
+    """
+    errors = errors or {}
+    article_ids = list(results) + [article_id for article_id in errors if article_id not in results]
+    if not article_ids:
+        return {"created": 0, "updated": 0, "completed": 0, "failed": 0}
+
+    articles = {str(article.id): article for article in db.query(Article).filter(Article.id.in_(article_ids)).all()}
+    existing = {
+        (str(row.article_id), row.analysis_type): row
+        for row in db.query(ArticleAnalysis).filter(ArticleAnalysis.article_id.in_(list(results))).all()
+    }
+
+    now = datetime.utcnow()
+    stats = {"created": 0, "updated": 0, "completed": 0, "failed": 0}
+    for article_id, fields in results.items():
+        article = articles.get(article_id)
+        if article is None:
+            logger.warning(f"Artículo {article_id} del lote no encontrado")
+            continue
+
+        for field_name, result in fields.items():
+            analysis_type = ANALYSIS_TYPES[field_name]
+            analysis_data = result_to_payload(result)["data"]
+            row = existing.get((article_id, analysis_type))
+            if row is None:
+                db.add(ArticleAnalysis(
+                    article_id=article.id,
+                    analysis_type=analysis_type,
+                    analysis_data=analysis_data,
+                    model_used=result.model,
+                    confidence_score=result.confidence,
+                    processed_at=now
+                ))
+                stats["created"] += 1
+            else:
+                row.analysis_data = analysis_data
+                row.model_used = result.model
+                row.confidence_score = result.confidence
+                row.processed_at = now
+                stats["updated"] += 1
+
+        if "sentiment" in fields:
+            article.sentiment_label = fields["sentiment"].sentiment.value
+            article.sentiment_score = fields["sentiment"].sentiment_score
+        if "topic" in fields:
+            article.topic_tags = fields["topic"].topic_keywords
+        if "summary" in fields:
+            article.summary = fields["summary"].summary
+        if "relevance" in fields:
+            article.relevance_score = fields["relevance"].relevance_score
+        article.processing_status = ProcessingStatus.COMPLETED.value
+        article.ai_processed_at = now
+        stats["completed"] += 1
+
+    for article_id in errors:
+        article = articles.get(article_id)
+        if article is not None and article_id not in results:
+            article.processing_status = ProcessingStatus.FAILED.value
+            stats["failed"] += 1
+
+    db.commit()
+    logger.info(f"Resultados de lote aplicados: {stats}")
+    return stats
+
+
+def finish_batch_task(db: Session, task_id: str, job: BatchJob,
+                      stats: Optional[Dict[str, int]] = None, error: Optional[str] = None) -> None:
+    """Cierra la AnalysisTask que siguió el lote con sus contadores o su error"""
+    task = db.query(AnalysisTask).filter(AnalysisTask.id == task_id).first()
+    if task is None:
+        return
+    task.status = AnalysisTaskStatus.FAILED if error else AnalysisTaskStatus.COMPLETED
+    task.completed_at = datetime.utcnow()
+    if task.started_at:
+        task.processing_duration_ms = int((task.completed_at - task.started_at).total_seconds() * 1000)
+    task.error_message = error
+    task.output_data = {
+        "progress": 1.0,
+        "batch_job": job.to_dict(),
+        **(stats or {})
+    }
+    db.commit()
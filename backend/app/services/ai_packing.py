@@ -0,0 +1,293 @@
+"""
+Packing de varios artículos en una sola petición al LLM
+
+Las clasificaciones cortas (sentimiento, tema) de titulares no necesitan una
+petición por artículo: el prompt de instrucciones pesa más que el propio texto.
+Este módulo agrupa N artículos por petición hasta un presupuesto de tokens y
+pide un array JSON con un elemento por artículo, identificado por un id corto,
+que después se reparte en resultados por artículo.
+
+Características:
+- Planificación en orden hasta el presupuesto de tokens de entrada y salida
+- Ids cortos en el prompt, independientes de los ids del llamador
+- Un reintento reempaquetado para los artículos que falten en la respuesta
+- Las respuestas cortadas por max_tokens se vuelven a pedir en dos mitades
+- Tokens de cada petición repartidos entre sus artículos
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.utils.tokenizer import count_prompt_tokens, get_token_counter
+
+logger = logging.getLogger(__name__)
+
+# Tokens de cada artículo además de su texto: id, corchetes y salto de línea
+ITEM_OVERHEAD_TOKENS = 8
+
+
+@dataclass
+class PackedAnswer:
+    """Respuesta de un artículo dentro de una petición empaquetada"""
+    data: Dict[str, Any]
+    model: str
+    input_tokens: int
+    output_tokens: int
+    processing_time: float
+
+
+class PackingScheduler:
+    """
+    Planificador de peticiones con varios artículos
+
+    Cada artículo se reduce a su titular y entradilla (max_item_tokens) y se
+    añaden artículos a la petición en curso mientras quepan en el presupuesto
+    de entrada, en max_items y en el máximo de tokens de salida. Si la respuesta
+    se corta por max_tokens, la petición se divide en dos mitades. Los artículos
+    que la respuesta omite o devuelve mal se reempaquetan una vez; los que
+    sigan sin respuesta no aparecen en el resultado y el llamador los analiza
+    con su petición individual.
+    """
+
+    def __init__(self,
+                 client: Any,
+                 model: str,
+                 token_budget: Optional[int] = None,
+                 max_items: Optional[int] = None,
+                 max_item_tokens: Optional[int] = None,
+                 max_output_tokens: Optional[int] = None,
+                 max_concurrent: int = 4,
+                 timeout: Optional[float] = None,
+                 rate_limiter: Optional[Any] = None):
+        """
+        Inicializa el planificador (los valores por defecto vienen de settings)
+
+        Args:
+            client: Cliente AsyncOpenAI
+            model: Modelo de las peticiones empaquetadas
+            token_budget: Tokens de entrada estimados por petición
+            max_items: Máximo de artículos por petición
+            max_item_tokens: Tokens de titular y entradilla enviados por artículo
+            max_output_tokens: Máximo de tokens de respuesta por petición
+            max_concurrent: Peticiones empaquetadas en vuelo a la vez
+            timeout: Segundos de espera de cada petición
+            rate_limiter: RateLimitHandler que registra cada petición
+        """
+        self.client = client
+        self.model = model
+        self.token_budget = token_budget or settings.AI_PACKING_TOKEN_BUDGET
+        self.max_items = max_items or settings.AI_PACKING_MAX_ARTICLES
+        self.max_item_tokens = max_item_tokens or settings.AI_PACKING_ARTICLE_TOKENS
+        self.max_output_tokens = max_output_tokens or settings.AI_PACKING_MAX_OUTPUT_TOKENS
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout or settings.AI_ANALYSIS_TIMEOUT
+        self.rate_limiter = rate_limiter
+        self.token_counter = get_token_counter(model)
+        self.stats = {"requests": 0, "items": 0, "answered": 0, "retried": 0, "split": 0, "missing": 0}
+
+    def estimate_tokens(self, text: str) -> int:
+        """Tokens del texto con el tokenizer del modelo"""
+        return max(1, self.token_counter.count(text))
+
+    def _truncate(self, text: str) -> str:
+        """Titular y entradilla: el texto recortado a max_item_tokens en un límite de frase (o de palabra)"""
+        return self.token_counter.truncate(re.sub(r'\s+', ' ', text).strip(), self.max_item_tokens)
+
+    def plan(self, token_counts: Sequence[int], prompt_tokens: int, output_tokens_per_item: int) -> List[List[int]]:
+        """
+        Agrupa los artículos en peticiones, en orden
+
+        Args:
+            token_counts: Tokens del texto de cada artículo
+            prompt_tokens: Tokens de las instrucciones comunes de cada petición
+            output_tokens_per_item: Tokens de respuesta esperados por artículo
+
+        Returns:
+            Índices de los artículos de cada petición
+        """
+        max_by_output = max(1, self.max_output_tokens // max(1, output_tokens_per_item))
+        max_items = min(self.max_items, max_by_output)
+
+        packs: List[List[int]] = []
+        current: List[int] = []
+        used = prompt_tokens
+        for index, tokens in enumerate(token_counts):
+            item_tokens = tokens + ITEM_OVERHEAD_TOKENS
+            if current and (used + item_tokens > self.token_budget or len(current) >= max_items):
+                packs.append(current)
+                current, used = [], prompt_tokens
+            current.append(index)
+            used += item_tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    def _build_prompt(self, instructions: str, item_schema: str, texts: Sequence[Tuple[str, str]]) -> str:
+        """Prompt con las instrucciones comunes y los artículos identificados por id"""
+        articles = "\n".join(f"[{item_id}] {text}" for item_id, text in texts)
+        return f"""
+{instructions}
+Responde con un objeto JSON {{"results": [...]}} con un elemento por artículo, sin omitir ninguno:
+{{"id": "<id del artículo>", {item_schema}}}
+
+Artículos:
+{articles}
+"""
+
+    @staticmethod
+    def _parse_items(content: str) -> Dict[str, Dict[str, Any]]:
+        """Elementos de la respuesta por id (acepta el array suelto o dentro de "results")"""
+        data = json.loads(content)
+        items = data.get("results", []) if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            raise ValueError("La respuesta no contiene un array de resultados")
+        return {
+            str(item["id"]): {key: value for key, value in item.items() if key != "id"}
+            for item in items if isinstance(item, dict) and "id" in item
+        }
+
+    async def _request(self,
+                       items: Sequence[Tuple[str, str]],
+                       instructions: str,
+                       item_schema: str,
+                       output_tokens_per_item: int,
+                       system_prompt: str) -> Dict[str, PackedAnswer]:
+        """
+        Una petición empaquetada
+
+        Args:
+            items: (clave del llamador, texto recortado) de cada artículo
+
+        Returns:
+            Respuesta por clave de los artículos devueltos (vacío si la petición falla)
+        """
+        start_time = time.time()
+        ids = {str(position): key for position, (key, _) in enumerate(items, 1)}
+        prompt = self._build_prompt(instructions, item_schema, [(str(position), text) for position, (_, text) in enumerate(items, 1)])
+        max_tokens = output_tokens_per_item * len(items)
+
+        if self.rate_limiter is not None and not self.rate_limiter.can_make_request():
+            wait_time = self.rate_limiter.get_wait_time()
+            logger.info(f"Rate limit alcanzado en petición empaquetada, esperando {wait_time:.2f}s")
+            await asyncio.sleep(wait_time)
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=0.1,
+                response_format={"type": "json_object"}
+            )
+            if inspect.isawaitable(response):
+                response = await asyncio.wait_for(response, timeout=self.timeout)
+            self.stats["requests"] += 1
+            if self.rate_limiter is not None:
+                self.rate_limiter.record_request()
+            choice = response.choices[0]
+            truncated = getattr(choice, "finish_reason", None) == "length"
+            parsed = {} if truncated else self._parse_items(choice.message.content.strip())
+        except Exception as e:
+            logger.error(f"Error en petición empaquetada de {len(items)} artículos: {str(e)}")
+            return {}
+
+        # Respuesta cortada por max_tokens: el JSON está incompleto, se piden las dos mitades
+        if truncated:
+            if len(items) == 1:
+                logger.warning(f"Respuesta empaquetada cortada con un solo artículo ({max_tokens} tokens)")
+                return {}
+            self.stats["split"] += 1
+            middle = len(items) // 2
+            logger.info(f"Respuesta empaquetada cortada con {len(items)} artículos, dividiendo la petición")
+            answers = await self._request(items[:middle], instructions, item_schema, output_tokens_per_item, system_prompt)
+            answers.update(await self._request(items[middle:], instructions, item_schema, output_tokens_per_item, system_prompt))
+            return answers
+
+        # Tokens de la petición repartidos según el texto de cada artículo
+        usage = getattr(response, "usage", None)
+        item_tokens = {item_id: self.estimate_tokens(text) + ITEM_OVERHEAD_TOKENS
+                       for item_id, (_, text) in zip(ids, items)}
+        input_tokens = count_prompt_tokens(response, messages, self.model)
+        output_tokens = getattr(usage, "completion_tokens", None) or max_tokens
+        total_item_tokens = sum(item_tokens.values())
+        processing_time = time.time() - start_time
+
+        answers = {}
+        for item_id, data in parsed.items():
+            if item_id not in ids or not data:
+                continue
+            answers[ids[item_id]] = PackedAnswer(
+                data=data,
+                model=getattr(response, "model", None) or self.model,
+                input_tokens=round(input_tokens * item_tokens[item_id] / total_item_tokens),
+                output_tokens=round(output_tokens / len(items)),
+                processing_time=processing_time
+            )
+        return answers
+
+    async def run(self,
+                  items: Sequence[Tuple[str, str]],
+                  instructions: str,
+                  item_schema: str,
+                  output_tokens_per_item: int,
+                  system_prompt: str = "Eres un experto analista de noticias. Respondes solo con JSON válido.") -> Dict[str, PackedAnswer]:
+        """
+        Analiza los artículos con peticiones empaquetadas
+
+        Args:
+            items: (clave única del llamador, texto) de cada artículo
+            instructions: Qué pedir para cada artículo
+            item_schema: Campos JSON de cada elemento de la respuesta, además de "id"
+            output_tokens_per_item: Tokens de respuesta esperados por artículo
+            system_prompt: Mensaje de sistema de las peticiones
+
+        Returns:
+            Respuesta por clave; las claves sin respuesta válida no aparecen
+        """
+        pending = [(key, self._truncate(text)) for key, text in items if text and text.strip()]
+        self.stats["items"] += len(pending)
+        prompt_tokens = self.estimate_tokens(self._build_prompt(instructions, item_schema, []))
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        answers: Dict[str, PackedAnswer] = {}
+
+        async def request_with_semaphore(pack):
+            async with semaphore:
+                return await self._request(pack, instructions, item_schema, output_tokens_per_item, system_prompt)
+
+        # Segunda ronda: los artículos sin respuesta, reempaquetados
+        for round_number in range(2):
+            if not pending:
+                break
+            if round_number:
+                self.stats["retried"] += len(pending)
+                logger.info(f"Reintentando {len(pending)} artículos sin respuesta en la petición empaquetada")
+
+            packs = self.plan([self.estimate_tokens(text) for _, text in pending], prompt_tokens, output_tokens_per_item)
+            for pack_answers in await asyncio.gather(
+                *(request_with_semaphore([pending[index] for index in pack]) for pack in packs)
+            ):
+                answers.update(pack_answers)
+            pending = [(key, text) for key, text in pending if key not in answers]
+
+        self.stats["answered"] += len(answers)
+        self.stats["missing"] += len(pending)
+        logger.info(f"Packing completado: {len(answers)} artículos respondidos, {len(pending)} sin respuesta")
+        return answers
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Peticiones realizadas y artículos por petición"""
+        return dict(
+            self.stats,
+            items_per_request=self.stats["answered"] / self.stats["requests"] if self.stats["requests"] else 0.0
+        )
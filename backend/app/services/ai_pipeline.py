@@ -31,7 +31,9 @@ from openai import AsyncOpenAI
 
 from ..db.models import Article, Source, ArticleAnalysis
 from ..utils.normalizer import NewsNormalizer
+from ..utils.tokenizer import truncate_for_analysis
 from ..core.config import settings
+from .ai_packing import PackingScheduler
 
 
 class AnalysisType(Enum):
@@ -78,10 +80,15 @@ class ProcessingConfig:
     max_retries: int = 3
     retry_delay: float = 1.0
     
+    # Packing: varios artículos por petición para sentiment y topics
+    packing_token_budget: int = settings.AI_PACKING_TOKEN_BUDGET
+    packing_max_articles: int = settings.AI_PACKING_MAX_ARTICLES
+    
     # Feature toggles
     enable_parallel_processing: bool = True
     enable_caching: bool = True
     enable_validation: bool = True
+    enable_packing: bool = settings.AI_PACKING_ENABLED
 
 
 @dataclass
@@ -310,13 +317,27 @@ class AIAnalysisPipeline:
         
         self.logger.info(f"Iniciando análisis IA de {len(articles)} artículos")
         
+        # Id estable por artículo para repartir los resultados empaquetados
+        article_ids = [str(article.get('id') or uuid.uuid4()) for article in articles]
+        
+        # Sentiment y topics de varios artículos por petición
+        packed_results: Dict[str, List[AnalysisResult]] = {}
+        if self.config.enable_packing and len(articles) > 1:
+            try:
+                packed_results = await self._analyze_packed(articles, article_ids)
+            except Exception as e:
+                self.logger.error(f"Error en análisis empaquetado, usando peticiones por artículo: {str(e)}")
+        
         # Análisis secuencial para cada artículo
         all_results = []
         
         if self.config.enable_parallel_processing:
             # Procesar en paralelo con límite de concurrencia
             semaphore = asyncio.Semaphore(self.config.max_concurrent_analyses)
-            tasks = [self._analyze_single_article_semaphore(article, semaphore) for article in articles]
+            tasks = [
+                self._analyze_single_article_semaphore(article, semaphore, article_id, packed_results.get(article_id))
+                for article, article_id in zip(articles, article_ids)
+            ]
             
             results = await asyncio.gather(*tasks, return_exceptions=True)
             
@@ -327,9 +348,9 @@ class AIAnalysisPipeline:
                     all_results.extend(result)
         else:
             # Procesamiento secuencial
-            for article in articles:
+            for article, article_id in zip(articles, article_ids):
                 try:
-                    results = await self._analyze_single_article(article)
+                    results = await self._analyze_single_article(article, article_id, packed_results.get(article_id))
                     all_results.extend(results)
                 except Exception as e:
                     self.logger.error(f"Error analizando artículo {article.get('title', 'unknown')}: {str(e)}")
@@ -337,19 +358,97 @@ class AIAnalysisPipeline:
         self.logger.info(f"Análisis completado: {len(all_results)} resultados")
         return all_results
     
-    async def _analyze_single_article_semaphore(self, article: Dict, semaphore: asyncio.Semaphore) -> List[AnalysisResult]:
+    async def _analyze_packed(self, articles: List[Dict[str, Any]],
+                              article_ids: List[str]) -> Dict[str, List[AnalysisResult]]:
+        """
+        Sentiment y topics de varios artículos por petición
+        
+        El titular y la entradilla de cada artículo se empaquetan hasta el
+        presupuesto de tokens de la configuración y la respuesta (un elemento
+        JSON por artículo) se reparte en resultados por artículo.
+        
+        Returns:
+            Resultados por id de artículo; los artículos sin respuesta no aparecen
+        """
+        scheduler = PackingScheduler(
+            self.openai_client,
+            self.config.openai_model,
+            token_budget=self.config.packing_token_budget,
+            max_items=self.config.packing_max_articles,
+            timeout=self.config.analysis_timeout
+        )
+        items = [
+            (article_id, f"{article.get('title', '')}. {article.get('content', '') or article.get('description', '')}")
+            for article, article_id in zip(articles, article_ids)
+        ]
+        answers = await scheduler.run(
+            items,
+            instructions="Analiza el sentimiento y los temas principales de cada una de estas noticias.",
+            item_schema='"sentiment_score": -1.0 a 1.0, "sentiment_label": "positive|negative|neutral", '
+                        '"topics": [3-8 temas específicos]',
+            output_tokens_per_item=60
+        )
+        
+        packed_results = {}
+        for article_id, answer in answers.items():
+            results = []
+            try:
+                score = max(-1.0, min(1.0, float(answer.data["sentiment_score"])))
+                sentiment = {
+                    "sentiment_score": score,
+                    "sentiment_label": answer.data.get("sentiment_label", "neutral")
+                }
+                results.append(self._packed_result(article_id, AnalysisType.SENTIMENT, sentiment, answer))
+            except (KeyError, TypeError, ValueError) as e:
+                self.logger.warning(f"Sentiment empaquetado no válido para {article_id[:8]}: {str(e)}")
+            
+            topics = answer.data.get("topics")
+            if isinstance(topics, list) and topics:
+                topics = [str(topic).strip() for topic in topics][:10]
+                results.append(self._packed_result(
+                    article_id, AnalysisType.TOPICS,
+                    {"topics": topics, "topic_count": len(topics), "extraction_method": "ai_packed"},
+                    answer
+                ))
+            
+            if results:
+                packed_results[article_id] = results
+        
+        self.logger.info(f"Análisis empaquetado: {scheduler.get_stats()}")
+        return packed_results
+    
+    def _packed_result(self, article_id: str, analysis_type: AnalysisType,
+                       result: Dict[str, Any], answer: Any) -> AnalysisResult:
+        """Resultado de un artículo a partir de su elemento de la respuesta empaquetada"""
+        return AnalysisResult(
+            article_id=article_id,
+            analysis_type=analysis_type,
+            result=result,
+            confidence_score=self._calculate_confidence(analysis_type, json.dumps(result)),
+            model_used=answer.model,
+            processing_time=answer.processing_time,
+            status=ProcessingStatus.COMPLETED
+        )
+    
+    async def _analyze_single_article_semaphore(self, article: Dict, semaphore: asyncio.Semaphore,
+                                                article_id: Optional[str] = None,
+                                                known_results: Optional[List[AnalysisResult]] = None) -> List[AnalysisResult]:
         """Analiza un artículo con control de semáforo"""
         async with semaphore:
-            return await self._analyze_single_article(article)
+            return await self._analyze_single_article(article, article_id, known_results)
     
-    async def _analyze_single_article(self, article: Dict[str, Any]) -> List[AnalysisResult]:
+    async def _analyze_single_article(self, article: Dict[str, Any],
+                                      article_id: Optional[str] = None,
+                                      known_results: Optional[List[AnalysisResult]] = None) -> List[AnalysisResult]:
         """
         Analiza un artículo individual con secuencia de análisis
         
         Análisis secuencial: sentiment → topics → summary → relevance → bias
+        Los tipos presentes en known_results (resultados empaquetados) no se piden.
         """
-        article_id = str(uuid.uuid4())
-        results = []
+        article_id = article_id or str(uuid.uuid4())
+        results = list(known_results or [])
+        known_types = {result.analysis_type for result in results}
         
         try:
             # Preparar contenido del artículo
@@ -358,7 +457,7 @@ class AIAnalysisPipeline:
             
             if not content:
                 self.logger.warning(f"Sin contenido para artículo: {title}")
-                return []
+                return results
             
             # Análisis secuencial
             analysis_sequence = [
@@ -370,6 +469,8 @@ class AIAnalysisPipeline:
             ]
             
             for analysis_type in analysis_sequence:
+                if analysis_type in known_types:
+                    continue
                 try:
                     start_time = asyncio.get_event_loop().time()
                     result = await self._perform_analysis(
@@ -456,9 +557,11 @@ class AIAnalysisPipeline:
     
     def _build_prompt(self, analysis_type: AnalysisType, title: str, content: str) -> str:
         """Construye prompt específico para cada tipo de análisis"""
+        # Contenido recortado en límite de frase al presupuesto de tokens del análisis
+        article_text = truncate_for_analysis(content, analysis_type.value, self.config.openai_model)
         base_prompt = f"""
 Título: {title}
-Contenido: {content[:2000]}{'...' if len(content) > 2000 else ''}
+Contenido: {article_text}{'...' if len(article_text) < len(content) else ''}
 
 """
         
@@ -17,11 +17,10 @@ import asyncio
 import time
 import json
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any, Union, Tuple
+from typing import Awaitable, Dict, List, Optional, Any, Union, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from enum import Enum
-import hashlib
 import re
 from concurrent.futures import ThreadPoolExecutor
 
@@ -34,10 +33,20 @@ except ImportError:
     AsyncOpenAI = None
     OpenAI = None
 
+from app.core.ai_cache import AIResultCache, get_ai_result_cache
+from app.core.config import settings
+from app.services.ai_packing import PackingScheduler
+from app.utils.tokenizer import (
+    content_token_budget, count_prompt_tokens, get_token_counter, truncate_for_analysis
+)
+
 # Configuración de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fecha o versión de un snapshot al final del nombre del modelo (-0125, -2024-05-13)
+DATED_MODEL_SUFFIX = re.compile(r"-\d{4}(-\d{2}-\d{2})?$")
+
 
 class SentimentType(Enum):
     """Tipos de sentimiento soportados"""
@@ -47,6 +56,12 @@ class SentimentType(Enum):
     MIXED = "mixed"
 
 
+class AnalysisMode(Enum):
+    """Modos del análisis comprehensivo"""
+    SEPARATE = "separate"  # Una llamada especializada por análisis
+    FUSED = "fused"  # Una sola llamada con los cuatro análisis en un JSON
+
+
 class TopicCategory(Enum):
     """Categorías de temas de noticias"""
     POLITICS = "politics"
@@ -137,6 +152,13 @@ class SentimentLabel(Enum):
     NEUTRAL = "neutral"
 
 
+# Clase de cada resultado por nombre, para reconstruirlos desde la caché compartida
+RESULT_TYPES = {
+    result_class.__name__: result_class
+    for result_class in (SentimentResult, TopicResult, SummaryResult, RelevanceResult)
+}
+
+
 class RateLimitHandler:
     """Manejador de rate limits para OpenAI API"""
     
@@ -206,10 +228,11 @@ class RetryHandler:
         
         for attempt in range(self.max_retries + 1):
             try:
-                if asyncio.iscoroutinefunction(func):
-                    return await func(*args, **kwargs)
-                else:
-                    return func(*args, **kwargs)
+                result = func(*args, **kwargs)
+                # make_request devuelve la corrutina del cliente asíncrono sin esperarla
+                if asyncio.iscoroutine(result):
+                    result = await result
+                return result
             except Exception as e:
                 last_exception = e
                 
@@ -242,15 +265,20 @@ class CostOptimizer:
     @staticmethod
     def calculate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
         """Calcula costo de una llamada a la API"""
-        if model not in CostOptimizer.PRICING:
+        pricing = CostOptimizer.PRICING.get(CostOptimizer.pricing_model(model))
+        if pricing is None:
             return 0.0
         
-        pricing = CostOptimizer.PRICING[model]
         input_cost = (input_tokens / 1_000_000) * pricing["input"]
         output_cost = (output_tokens / 1_000_000) * pricing["output"]
         
         return input_cost + output_cost
     
+    @staticmethod
+    def pricing_model(model: str) -> str:
+        """Modelo de PRICING de una respuesta: la API devuelve snapshots con fecha (gpt-3.5-turbo-0125)"""
+        return DATED_MODEL_SUFFIX.sub("", model or "")
+    
     @staticmethod
     def select_optimal_model(task_type: str) -> str:
         """Selecciona modelo óptimo según tipo de tarea"""
@@ -258,68 +286,128 @@ class CostOptimizer:
             "sentiment": "gpt-3.5-turbo",
             "topic_classification": "gpt-3.5-turbo", 
             "summary": "gpt-4",
-            "relevance": "gpt-3.5-turbo"
+            "relevance": "gpt-3.5-turbo",
+            "comprehensive": "gpt-3.5-turbo",
+            "packed_classification": "gpt-3.5-turbo"
         }
         
         return models.get(task_type, "gpt-3.5-turbo")
 
 
+def _json_default(value: Any) -> Any:
+    """Enums por su valor y fechas en ISO al serializar resultados"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def result_to_payload(result: AnalysisResult) -> Dict[str, Any]:
+    """Resultado de análisis como dict JSON (para la caché compartida)"""
+    return {
+        "type": type(result).__name__,
+        "data": json.loads(json.dumps(asdict(result), default=_json_default))
+    }
+
+
+def result_from_payload(payload: Dict[str, Any]) -> AnalysisResult:
+    """Reconstruir un resultado serializado con result_to_payload"""
+    result_class = RESULT_TYPES[payload["type"]]
+    data = dict(payload["data"])
+    data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+    if result_class is SentimentResult:
+        data["sentiment"] = SentimentType(data["sentiment"])
+    elif result_class is TopicResult:
+        data["primary_topic"] = TopicCategory(data["primary_topic"])
+        data["secondary_topics"] = [
+            (TopicCategory(topic), float(probability)) for topic, probability in data["secondary_topics"]
+        ]
+    return result_class(**data)
+
+
 class CacheManager:
-    """Gestor de cache para optimizar requests"""
+    """
+    Caché de resultados de un analizador sobre la caché compartida
+
+    La clave combina el hash del contenido, el tipo de análisis, el modelo y la
+    versión del prompt (ver app.core.ai_cache): API y workers de Celery
+    reutilizan los resultados ya pagados por cualquier proceso.
+    """
     
-    def __init__(self, ttl_seconds: int = 3600):  # 1 hora por defecto
-        self.cache = {}
+    def __init__(self, ttl_seconds: Optional[int] = None, prompt_version: str = "1",
+                 shared_cache: Optional[AIResultCache] = None):
         self.ttl = ttl_seconds
+        self.prompt_version = prompt_version
+        self.shared_cache = shared_cache or get_ai_result_cache()
     
-    def _generate_key(self, content: str, analysis_type: str) -> str:
+    def _generate_key(self, content: str, analysis_type: str, model: str, variant: str = "") -> str:
         """Genera clave única para cache"""
-        content_hash = hashlib.md5(content.encode()).hexdigest()
-        return f"{analysis_type}:{content_hash}"
+        return self.shared_cache.make_key(content, analysis_type, model, self.prompt_version, variant)
     
-    def get(self, content: str, analysis_type: str) -> Optional[Any]:
-        """Obtiene resultado del cache"""
-        key = self._generate_key(content, analysis_type)
-        
-        if key in self.cache:
-            cached_data = self.cache[key]
-            if datetime.now() - cached_data["timestamp"] < timedelta(seconds=self.ttl):
-                return cached_data["result"]
-            else:
-                del self.cache[key]
+    async def get(self, content: str, analysis_type: str, model: str, variant: str = "") -> Optional[AnalysisResult]:
+        """Obtiene resultado del cache (local o Redis)"""
+        payload = await self.shared_cache.get(self._generate_key(content, analysis_type, model, variant))
+        if payload is None:
+            return None
         
-        return None
+        try:
+            return result_from_payload(payload["result"])
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Resultado de {analysis_type} en cache no válido: {str(e)}")
+            return None
     
-    def set(self, content: str, analysis_type: str, result: Any):
-        """Guarda resultado en cache"""
-        key = self._generate_key(content, analysis_type)
-        self.cache[key] = {
-            "result": result,
-            "timestamp": datetime.now()
-        }
+    async def set(self, content: str, analysis_type: str, model: str, result: AnalysisResult, variant: str = "") -> bool:
+        """Guarda resultado en cache con el costo de la llamada que lo produjo"""
+        return await self.shared_cache.set(
+            self._generate_key(content, analysis_type, model, variant),
+            result_to_payload(result),
+            cost=result.cost,
+            ttl=self.ttl
+        )
     
     def clear(self):
-        """Limpia cache"""
-        self.cache.clear()
+        """Limpia el cache local del proceso (Redis caduca por TTL)"""
+        self.shared_cache.clear_local()
+
+
+def run_analysis(coroutine: Awaitable[Any], shared_cache: Optional[AIResultCache] = None) -> Any:
+    """
+    Ejecuta un análisis en un event loop propio (métodos síncronos y tareas Celery)
+    
+    Antes de que el loop termine cierra su conexión Redis a la caché compartida
+    y reporta los contadores pendientes de aciertos, fallos y dólares ahorrados.
+    """
+    async def run():
+        try:
+            return await coroutine
+        finally:
+            await (shared_cache or get_ai_result_cache()).close()
+    
+    return asyncio.run(run())
 
 
 class SentimentAnalyzer:
     """Analizador de sentimiento mejorado de artículos de noticias"""
     
+    # Cambiar al modificar el prompt: invalida los resultados cacheados
+    PROMPT_VERSION = "2"
+    
     def __init__(self, 
                  openai_api_key: Optional[str] = None,
                  default_model: str = "gpt-3.5-turbo",
                  requests_per_minute: int = 60,
                  requests_per_day: int = 10000,
-                 cache_ttl: int = 3600):
+                 cache_ttl: Optional[int] = None):
         
         self.default_model = default_model
         self.rate_limiter = RateLimitHandler(requests_per_minute, requests_per_day)
         self.retry_handler = RetryHandler()
         self.cost_optimizer = CostOptimizer()
-        self.cache = CacheManager(cache_ttl)
+        self.cache = CacheManager(cache_ttl, self.PROMPT_VERSION)
         
         # Inicializar clientes OpenAI
-        if openai_api_key:
+        if openai_api_key and AsyncOpenAI is not None:
             self.sync_client = OpenAI(api_key=openai_api_key)
             self.async_client = AsyncOpenAI(api_key=openai_api_key)
             logger.info("Clientes OpenAI inicializados para análisis de sentimiento")
@@ -341,8 +429,8 @@ class SentimentAnalyzer:
         return cleaned_text
     
     def _estimate_tokens(self, text: str) -> int:
-        """Estimación básica de tokens (4 caracteres por token aprox)"""
-        return len(text) // 4 + 100  # +100 para overhead del prompt
+        """Tokens del texto con el tokenizer del modelo"""
+        return get_token_counter(self.default_model).count(text) + 100  # +100 para overhead del prompt
     
     async def analyze_sentiment_async(self, text: str) -> SentimentResult:
         """Análisis de sentimiento asíncrono"""
@@ -350,7 +438,8 @@ class SentimentAnalyzer:
         
         # Verificar cache
         content = self._prepare_content(text)
-        cached_result = self.cache.get(content, "sentiment")
+        model = self.cost_optimizer.select_optimal_model("sentiment")
+        cached_result = await self.cache.get(content, "sentiment", model)
         if cached_result:
             logger.info("Usando resultado de sentiment del cache")
             return cached_result
@@ -372,18 +461,20 @@ Analiza el sentimiento de este artículo de noticias y proporciona:
 3. Etiquetas de emoción relevantes (máximo 3)
 
 Artículo:
-{content[:2000]}  # Limitar a 2000 caracteres
+{truncate_for_analysis(content, "sentiment", model)}
 
 Responde en formato JSON con las claves: sentiment, score, emotions
 """
         
+        messages = [
+            {"role": "system", "content": "Eres un experto analista de sentimientos especializado en noticias."},
+            {"role": "user", "content": prompt}
+        ]
+        
         def make_request():
             return self.async_client.chat.completions.create(
-                model=self.cost_optimizer.select_optimal_model("sentiment"),
-                messages=[
-                    {"role": "system", "content": "Eres un experto analista de sentimientos especializado en noticias."},
-                    {"role": "user", "content": prompt}
-                ],
+                model=model,
+                messages=messages,
                 max_tokens=150,
                 temperature=0.1
             )
@@ -395,40 +486,23 @@ Responde en formato JSON con las claves: sentiment, score, emotions
             result_text = response.choices[0].message.content.strip()
             result_data = json.loads(result_text)
             
-            sentiment = SentimentType(result_data.get("sentiment", "neutral"))
-            sentiment_score = float(result_data.get("score", 0.0))
-            emotion_tags = result_data.get("emotions", [])
-            
             # Calcular métricas
             processing_time = time.time() - start_time
-            input_tokens = self._estimate_tokens(content)
+            input_tokens = count_prompt_tokens(response, messages, model)
             output_tokens = response.usage.completion_tokens if response.usage else 150
             cost = self.cost_optimizer.calculate_cost(
                 response.model, input_tokens, output_tokens
             )
             
-            # Mantener compatibilidad con el formato anterior
-            legacy_label = SentimentLabel.POSITIVE if sentiment_score > 0.1 else (
-                SentimentLabel.NEGATIVE if sentiment_score < -0.1 else SentimentLabel.NEUTRAL
-            )
-            
-            result = SentimentResult(
-                timestamp=datetime.now(),
-                confidence=min(abs(sentiment_score), 1.0),
-                processing_time=processing_time,
-                tokens_used=input_tokens + output_tokens,
-                cost=cost,
-                model=response.model,
-                sentiment=sentiment,
-                sentiment_score=sentiment_score,
-                emotion_tags=emotion_tags
+            result = self._result_from_data(
+                result_data, processing_time, input_tokens + output_tokens, cost, response.model
             )
             
             # Guardar en cache
-            self.cache.set(content, "sentiment", result)
+            await self.cache.set(content, "sentiment", model, result)
             self.rate_limiter.record_request()
             
-            logger.info(f"Análisis de sentimiento completado: {sentiment.value} (score: {sentiment_score:.2f})")
+            logger.info(f"Análisis de sentimiento completado: {result.sentiment.value} (score: {result.sentiment_score:.2f})")
             return result
             
         except Exception as e:
@@ -436,6 +510,22 @@ Responde en formato JSON con las claves: sentiment, score, emotions
             # Fallback a análisis básico
             return await self._basic_sentiment_analysis_async(content, start_time)
     
+    def _result_from_data(self, result_data: Dict[str, Any], processing_time: float,
+                          tokens_used: int, cost: float, model: str) -> SentimentResult:
+        """Construye el resultado a partir del JSON devuelto por el modelo"""
+        sentiment_score = float(result_data.get("score", 0.0))
+        return SentimentResult(
+            timestamp=datetime.now(),
+            confidence=min(abs(sentiment_score), 1.0),
+            processing_time=processing_time,
+            tokens_used=tokens_used,
+            cost=cost,
+            model=model,
+            sentiment=SentimentType(result_data.get("sentiment", "neutral")),
+            sentiment_score=sentiment_score,
+            emotion_tags=list(result_data.get("emotions", []))
+        )
+    
     async def _basic_sentiment_analysis_async(self, content: str, start_time: float) -> SentimentResult:
         """Análisis básico de sentimiento sin OpenAI"""
         
@@ -493,12 +583,7 @@ Responde en formato JSON con las claves: sentiment, score, emotions
     
     def analyze_sentiment(self, text: str) -> SentimentResult:
         """Análisis de sentimiento síncrono"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.analyze_sentiment_async(text))
-        finally:
-            loop.close()
+        return run_analysis(self.analyze_sentiment_async(text), self.cache.shared_cache)
     
     # Legacy method for backward compatibility
     async def analyze(self, text: str, use_openai: bool = False) -> SentimentResult:
@@ -509,21 +594,24 @@ Responde en formato JSON con las claves: sentiment, score, emotions
 class TopicClassifier:
     """Clasificador automático mejorado de temas de noticias"""
     
+    # Cambiar al modificar el prompt: invalida los resultados cacheados
+    PROMPT_VERSION = "2"
+    
     def __init__(self, 
                  openai_api_key: Optional[str] = None,
                  default_model: str = "gpt-3.5-turbo",
                  requests_per_minute: int = 60,
                  requests_per_day: int = 10000,
-                 cache_ttl: int = 3600):
+                 cache_ttl: Optional[int] = None):
         
         self.default_model = default_model
         self.rate_limiter = RateLimitHandler(requests_per_minute, requests_per_day)
         self.retry_handler = RetryHandler()
         self.cost_optimizer = CostOptimizer()
-        self.cache = CacheManager(cache_ttl)
+        self.cache = CacheManager(cache_ttl, self.PROMPT_VERSION)
         
         # Inicializar clientes OpenAI
-        if openai_api_key:
+        if openai_api_key and AsyncOpenAI is not None:
             self.sync_client = OpenAI(api_key=openai_api_key)
             self.async_client = AsyncOpenAI(api_key=openai_api_key)
             logger.info("Clientes OpenAI inicializados para clasificación de temas")
@@ -543,8 +631,8 @@ class TopicClassifier:
         return cleaned_text
     
     def _estimate_tokens(self, text: str) -> int:
-        """Estimación básica de tokens"""
-        return len(text) // 4 + 100
+        """Tokens del texto con el tokenizer del modelo"""
+        return get_token_counter(self.default_model).count(text) + 100
     
     async def classify_topic_async(self, text: str) -> TopicResult:
         """Clasificación de tema asíncrona"""
@@ -552,7 +640,8 @@ class TopicClassifier:
         
         # Verificar cache
         content = self._prepare_content(text)
-        cached_result = self.cache.get(content, "topic")
+        model = self.cost_optimizer.select_optimal_model("topic_classification")
+        cached_result = await self.cache.get(content, "topic", model)
         if cached_result:
             logger.info("Usando resultado de topic classification del cache")
             return cached_result
@@ -584,18 +673,20 @@ Clasifica el tema principal de este artículo de noticias en una de estas catego
 - other: Otros temas
 
 Artículo:
-{content[:2000]}
+{truncate_for_analysis(content, "topic", model)}
 
 Responde en formato JSON con las claves: primary_topic, probability, secondary_topics (array de arrays con [topic, probability]), keywords (array)
 """
         
+        messages = [
+            {"role": "system", "content": "Eres un experto clasificador de noticias especializado en categorización de contenido."},
+            {"role": "user", "content": prompt}
+        ]
+        
         def make_request():
             return self.async_client.chat.completions.create(
-                model=self.cost_optimizer.select_optimal_model("topic_classification"),
-                messages=[
-                    {"role": "system", "content": "Eres un experto clasificador de noticias especializado en categorización de contenido."},
-                    {"role": "user", "content": prompt}
-                ],
+                model=model,
+                messages=messages,
                 max_tokens=200,
                 temperature=0.1
             )
@@ -607,44 +698,23 @@ Responde en formato JSON con las claves: primary_topic, probability, secondary_t
             result_text = response.choices[0].message.content.strip()
             result_data = json.loads(result_text)
             
-            primary_topic = TopicCategory(result_data.get("primary_topic", "other"))
-            topic_probability = float(result_data.get("probability", 0.5))
-            
-            # Procesar temas secundarios
-            secondary_topics_data = result_data.get("secondary_topics", [])
-            secondary_topics = [
-                (TopicCategory(topic), prob) 
-                for topic, prob in secondary_topics_data[:3]  # Top 3
-            ]
-            
-            topic_keywords = result_data.get("keywords", [])
-            
             # Calcular métricas
             processing_time = time.time() - start_time
-            input_tokens = self._estimate_tokens(content)
+            input_tokens = count_prompt_tokens(response, messages, model)
             output_tokens = response.usage.completion_tokens if response.usage else 200
             cost = self.cost_optimizer.calculate_cost(
                 response.model, input_tokens, output_tokens
             )
             
-            result = TopicResult(
-                timestamp=datetime.now(),
-                confidence=topic_probability,
-                processing_time=processing_time,
-                tokens_used=input_tokens + output_tokens,
-                cost=cost,
-                model=response.model,
-                primary_topic=primary_topic,
-                topic_probability=topic_probability,
-                secondary_topics=secondary_topics,
-                topic_keywords=topic_keywords
+            result = self._result_from_data(
+                result_data, processing_time, input_tokens + output_tokens, cost, response.model
             )
             
             # Guardar en cache
-            self.cache.set(content, "topic", result)
+            await self.cache.set(content, "topic", model, result)
             self.rate_limiter.record_request()
             
-            logger.info(f"Clasificación de tema completada: {primary_topic.value} (prob: {topic_probability:.2f})")
+            logger.info(f"Clasificación de tema completada: {result.primary_topic.value} (prob: {result.topic_probability:.2f})")
             return result
             
         except Exception as e:
@@ -652,14 +722,33 @@ Responde en formato JSON con las claves: primary_topic, probability, secondary_t
             # Fallback a clasificación por reglas
             return await self._classify_with_rules_async(content, start_time)
     
+    def _result_from_data(self, result_data: Dict[str, Any], processing_time: float,
+                          tokens_used: int, cost: float, model: str) -> TopicResult:
+        """Construye el resultado a partir del JSON devuelto por el modelo"""
+        topic_probability = float(result_data.get("probability", 0.5))
+        
+        # Procesar temas secundarios (top 3)
+        secondary_topics = [
+            (TopicCategory(topic), float(prob))
+            for topic, prob in result_data.get("secondary_topics", [])[:3]
+        ]
+        
+        return TopicResult(
+            timestamp=datetime.now(),
+            confidence=topic_probability,
+            processing_time=processing_time,
+            tokens_used=tokens_used,
+            cost=cost,
+            model=model,
+            primary_topic=TopicCategory(result_data.get("primary_topic", "other")),
+            topic_probability=topic_probability,
+            secondary_topics=secondary_topics,
+            topic_keywords=list(result_data.get("keywords", []))
+        )
+    
     def classify_topic(self, text: str) -> TopicResult:
         """Clasificación de tema síncrona"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.classify_topic_async(text))
-        finally:
-            loop.close()
+        return run_analysis(self.classify_topic_async(text), self.cache.shared_cache)
     
     async def _classify_with_rules_async(self, text: str, start_time: float) -> TopicResult:
         """Clasificación por reglas como fallback"""
@@ -786,21 +875,24 @@ Responde en formato JSON con las claves: primary_topic, probability, secondary_t
 class Summarizer:
     """Generador de resúmenes inteligentes de artículos"""
     
+    # Cambiar al modificar el prompt: invalida los resultados cacheados
+    PROMPT_VERSION = "2"
+    
     def __init__(self, 
                  openai_api_key: Optional[str] = None,
                  default_model: str = "gpt-4",
                  requests_per_minute: int = 60,
                  requests_per_day: int = 10000,
-                 cache_ttl: int = 3600):
+                 cache_ttl: Optional[int] = None):
         
         self.default_model = default_model
         self.rate_limiter = RateLimitHandler(requests_per_minute, requests_per_day)
         self.retry_handler = RetryHandler()
         self.cost_optimizer = CostOptimizer()
-        self.cache = CacheManager(cache_ttl)
+        self.cache = CacheManager(cache_ttl, self.PROMPT_VERSION)
         
         # Inicializar clientes OpenAI
-        if openai_api_key:
+        if openai_api_key and AsyncOpenAI is not None:
             self.sync_client = OpenAI(api_key=openai_api_key)
             self.async_client = AsyncOpenAI(api_key=openai_api_key)
             logger.info("Clientes OpenAI inicializados para summarización")
@@ -821,8 +913,8 @@ class Summarizer:
         return cleaned_text
     
     def _estimate_tokens(self, text: str) -> int:
-        """Estimación básica de tokens"""
-        return len(text) // 4 + 100
+        """Tokens del texto con el tokenizer del modelo"""
+        return get_token_counter(self.default_model).count(text) + 100
     
     async def summarize_async(self, text: str, max_words: int = 150) -> SummaryResult:
         """Generación de resumen asíncrona"""
@@ -830,8 +922,9 @@ class Summarizer:
         
         # Verificar cache
         content = self._prepare_content(text)
-        cache_key = f"{content[:100]}:{max_words}"  # Incluir longitud en clave
-        cached_result = self.cache.get(cache_key, "summary")
+        model = self.cost_optimizer.select_optimal_model("summary")
+        variant = f"max_words={max_words}"  # Incluir longitud en clave
+        cached_result = await self.cache.get(content, "summary", model, variant)
         if cached_result:
             logger.info("Usando resultado de summary del cache")
             return cached_result
@@ -855,7 +948,7 @@ Genera un resumen conciso y completo de este artículo de noticias con las sigui
 4. Mantener un tono neutral y informativo
 
 Artículo:
-{content[:3000]}  # Limitar a 3000 caracteres para mejor procesamiento
+{truncate_for_analysis(content, "summary", model)}
 
 Responde en formato JSON con las claves: 
 - summary: string con el resumen principal
@@ -863,13 +956,15 @@ Responde en formato JSON con las claves:
 - word_count: número de palabras del resumen
 """
         
+        messages = [
+            {"role": "system", "content": "Eres un experto redactor de resúmenes de noticias. Tu trabajo es crear resúmenes claros, precisos y concisos."},
+            {"role": "user", "content": prompt}
+        ]
+        
         def make_request():
             return self.async_client.chat.completions.create(
-                model=self.cost_optimizer.select_optimal_model("summary"),
-                messages=[
-                    {"role": "system", "content": "Eres un experto redactor de resúmenes de noticias. Tu trabajo es crear resúmenes claros, precisos y concisos."},
-                    {"role": "user", "content": prompt}
-                ],
+                model=model,
+                messages=messages,
                 max_tokens=400,
                 temperature=0.3
             )
@@ -881,37 +976,23 @@ Responde en formato JSON con las claves:
             result_text = response.choices[0].message.content.strip()
             result_data = json.loads(result_text)
             
-            summary = result_data.get("summary", "")
-            key_points = result_data.get("key_points", [])
-            word_count = int(result_data.get("word_count", len(summary.split())))
-            reading_time = word_count / 200  # 200 palabras por minuto
-            
             # Calcular métricas
             processing_time = time.time() - start_time
-            input_tokens = self._estimate_tokens(content)
+            input_tokens = count_prompt_tokens(response, messages, model)
             output_tokens = response.usage.completion_tokens if response.usage else 400
             cost = self.cost_optimizer.calculate_cost(
                 response.model, input_tokens, output_tokens
             )
             
-            result = SummaryResult(
-                timestamp=datetime.now(),
-                confidence=0.9,  # Alta confianza para resúmenes bien generados
-                processing_time=processing_time,
-                tokens_used=input_tokens + output_tokens,
-                cost=cost,
-                model=response.model,
-                summary=summary,
-                key_points=key_points,
-                word_count=word_count,
-                reading_time_minutes=reading_time
+            result = self._result_from_data(
+                result_data, processing_time, input_tokens + output_tokens, cost, response.model
             )
             
             # Guardar en cache
-            self.cache.set(cache_key, "summary", result)
+            await self.cache.set(content, "summary", model, result, variant)
             self.rate_limiter.record_request()
             
-            logger.info(f"Resumen generado: {word_count} palabras en {processing_time:.2f}s")
+            logger.info(f"Resumen generado: {result.word_count} palabras en {processing_time:.2f}s")
             return result
             
         except Exception as e:
@@ -919,14 +1000,30 @@ Responde en formato JSON con las claves:
             # Fallback a resumen simple
             return self._create_simple_summary(content, start_time, max_words)
     
+    def _result_from_data(self, result_data: Dict[str, Any], processing_time: float,
+                          tokens_used: int, cost: float, model: str) -> SummaryResult:
+        """Construye el resultado a partir del JSON devuelto por el modelo"""
+        summary = result_data.get("summary", "")
+        if not isinstance(summary, str) or not summary:
+            raise ValueError("Resumen vacío o no válido")
+        word_count = int(result_data.get("word_count", len(summary.split())))
+        
+        return SummaryResult(
+            timestamp=datetime.now(),
+            confidence=0.9,  # Alta confianza para resúmenes bien generados
+            processing_time=processing_time,
+            tokens_used=tokens_used,
+            cost=cost,
+            model=model,
+            summary=summary,
+            key_points=list(result_data.get("key_points", [])),
+            word_count=word_count,
+            reading_time_minutes=word_count / 200  # 200 palabras por minuto
+        )
+    
     def summarize(self, text: str, max_words: int = 150) -> SummaryResult:
         """Generación de resumen síncrona"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.summarize_async(text, max_words))
-        finally:
-            loop.close()
+        return run_analysis(self.summarize_async(text, max_words), self.cache.shared_cache)
     
     def _create_simple_summary(self, content: str, start_time: float, max_words: int) -> SummaryResult:
         """Crea un resumen simple como fallback"""
@@ -995,21 +1092,24 @@ Responde en formato JSON con las claves:
 class RelevanceScorer:
     """Scorer de relevancia de artículos para priorización"""
     
+    # Cambiar al modificar el prompt: invalida los resultados cacheados
+    PROMPT_VERSION = "2"
+    
     def __init__(self, 
                  openai_api_key: Optional[str] = None,
                  default_model: str = "gpt-3.5-turbo",
                  requests_per_minute: int = 60,
                  requests_per_day: int = 10000,
-                 cache_ttl: int = 3600):
+                 cache_ttl: Optional[int] = None):
         
         self.default_model = default_model
         self.rate_limiter = RateLimitHandler(requests_per_minute, requests_per_day)
         self.retry_handler = RetryHandler()
         self.cost_optimizer = CostOptimizer()
-        self.cache = CacheManager(cache_ttl)
+        self.cache = CacheManager(cache_ttl, self.PROMPT_VERSION)
         
         # Inicializar clientes OpenAI
-        if openai_api_key:
+        if openai_api_key and AsyncOpenAI is not None:
             self.sync_client = OpenAI(api_key=openai_api_key)
             self.async_client = AsyncOpenAI(api_key=openai_api_key)
             logger.info("Clientes OpenAI inicializados para relevance scoring")
@@ -1027,8 +1127,8 @@ class RelevanceScorer:
         return cleaned_text
     
     def _estimate_tokens(self, text: str) -> int:
-        """Estimación básica de tokens"""
-        return len(text) // 4 + 100
+        """Tokens del texto con el tokenizer del modelo"""
+        return get_token_counter(self.default_model).count(text) + 100
     
     async def score_relevance_async(self, 
                                   text: str, 
@@ -1038,9 +1138,9 @@ class RelevanceScorer:
         
         # Verificar cache
         content = self._prepare_content(text)
-        preferences_hash = hashlib.md5(str(user_preferences or {}).encode()).hexdigest()
-        cache_key = f"{content[:100]}:{preferences_hash}"
-        cached_result = self.cache.get(cache_key, "relevance")
+        model = self.cost_optimizer.select_optimal_model("relevance")
+        variant = json.dumps(user_preferences or {}, sort_keys=True)  # Preferencias en la clave
+        cached_result = await self.cache.get(content, "relevance", model, variant)
         if cached_result:
             logger.info("Usando resultado de relevance scoring del cache")
             return cached_result
@@ -1078,7 +1178,7 @@ Evalúa la relevancia de este artículo de noticias basándote en:
 {preferences_text}
 
 Artículo:
-{content[:2000]}
+{truncate_for_analysis(content, "relevance", model)}
 
 Responde en formato JSON con las claves:
 - relevance_score: puntuación general (0-1)
@@ -1087,13 +1187,15 @@ Responde en formato JSON con las claves:
 - relevance_factors: objeto con factores individuales (0-1)
 """
         
+        messages = [
+            {"role": "system", "content": "Eres un experto en análisis de relevancia de noticias y engagement metrics."},
+            {"role": "user", "content": prompt}
+        ]
+        
         def make_request():
             return self.async_client.chat.completions.create(
-                model=self.cost_optimizer.select_optimal_model("relevance"),
-                messages=[
-                    {"role": "system", "content": "Eres un experto en análisis de relevancia de noticias y engagement metrics."},
-                    {"role": "user", "content": prompt}
-                ],
+                model=model,
+                messages=messages,
                 max_tokens=250,
                 temperature=0.2
             )
@@ -1105,45 +1207,24 @@ Responde en formato JSON con las claves:
             result_text = response.choices[0].message.content.strip()
             result_data = json.loads(result_text)
             
-            relevance_score = float(result_data.get("relevance_score", 0.5))
-            importance_score = float(result_data.get("importance_score", 0.5))
-            trending_score = float(result_data.get("trending_score", 0.5))
-            relevance_factors = result_data.get("relevance_factors", {})
-            
-            # Ajustar por preferencias del usuario si existen
-            if user_preferences:
-                for factor, user_weight in user_preferences.items():
-                    if factor in relevance_factors:
-                        relevance_score += (relevance_factors[factor] - 0.5) * user_weight * 0.2
-                
-                relevance_score = max(0.0, min(1.0, relevance_score))
-            
             # Calcular métricas
             processing_time = time.time() - start_time
-            input_tokens = self._estimate_tokens(content)
+            input_tokens = count_prompt_tokens(response, messages, model)
             output_tokens = response.usage.completion_tokens if response.usage else 250
             cost = self.cost_optimizer.calculate_cost(
                 response.model, input_tokens, output_tokens
             )
             
-            result = RelevanceResult(
-                timestamp=datetime.now(),
-                confidence=relevance_score,
-                processing_time=processing_time,
-                tokens_used=input_tokens + output_tokens,
-                cost=cost,
-                model=response.model,
-                relevance_score=relevance_score,
-                relevance_factors=relevance_factors,
-                trending_score=trending_score,
-                importance_score=importance_score
+            result = self._result_from_data(
+                result_data, processing_time, input_tokens + output_tokens, cost, response.model,
+                user_preferences
             )
             
             # Guardar en cache
-            self.cache.set(cache_key, "relevance", result)
+            await self.cache.set(content, "relevance", model, result, variant)
             self.rate_limiter.record_request()
             
-            logger.info(f"Relevance scoring completado: {relevance_score:.2f}")
+            logger.info(f"Relevance scoring completado: {result.relevance_score:.2f}")
             return result
             
         except Exception as e:
@@ -1151,16 +1232,39 @@ Responde en formato JSON con las claves:
             # Fallback a scoring simple
             return self._create_simple_relevance_score(content, start_time)
     
+    def _result_from_data(self, result_data: Dict[str, Any], processing_time: float,
+                          tokens_used: int, cost: float, model: str,
+                          user_preferences: Optional[Dict[str, float]] = None) -> RelevanceResult:
+        """Construye el resultado a partir del JSON devuelto por el modelo"""
+        relevance_score = float(result_data.get("relevance_score", 0.5))
+        relevance_factors = dict(result_data.get("relevance_factors", {}))
+        
+        # Ajustar por preferencias del usuario si existen
+        if user_preferences:
+            for factor, user_weight in user_preferences.items():
+                if factor in relevance_factors:
+                    relevance_score += (relevance_factors[factor] - 0.5) * user_weight * 0.2
+            
+            relevance_score = max(0.0, min(1.0, relevance_score))
+        
+        return RelevanceResult(
+            timestamp=datetime.now(),
+            confidence=relevance_score,
+            processing_time=processing_time,
+            tokens_used=tokens_used,
+            cost=cost,
+            model=model,
+            relevance_score=relevance_score,
+            relevance_factors=relevance_factors,
+            trending_score=float(result_data.get("trending_score", 0.5)),
+            importance_score=float(result_data.get("importance_score", 0.5))
+        )
+    
     def score_relevance(self, 
                        text: str, 
                        user_preferences: Optional[Dict[str, float]] = None) -> RelevanceResult:
         """Scoring de relevancia síncrono"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.score_relevance_async(text, user_preferences))
-        finally:
-            loop.close()
+        return run_analysis(self.score_relevance_async(text, user_preferences), self.cache.shared_cache)
     
     def _create_simple_relevance_score(self, content: str, start_time: float) -> RelevanceResult:
         """Crea un scoring simple como fallback"""
@@ -1217,22 +1321,72 @@ Responde en formato JSON con las claves:
 class ComprehensiveAnalyzer:
     """Analizador comprehensivo que combina todos los análisis"""
     
-    def __init__(self, openai_api_key: Optional[str] = None, **kwargs):
+    # Cambiar al modificar el prompt combinado: invalida los resultados cacheados
+    FUSED_PROMPT_VERSION = "2"
+    
+    # Análisis del modo fused: tipo de tarea para el modelo y tokens de salida de cada uno
+    FUSED_TASKS = {
+        "sentiment": ("sentiment", 150),
+        "topic": ("topic_classification", 200),
+        "summary": ("summary", 400),
+        "relevance": ("relevance", 250),
+    }
+    
+    # Cambiar al modificar el prompt empaquetado: invalida los resultados cacheados
+    PACKED_PROMPT_VERSION = "2"
+    
+    # Campos del packing en lote (clasificaciones cortas) y tokens de salida por artículo:
+    # los dos campos de la salida fused ocupan unos 200 tokens
+    PACKED_FIELDS = ("sentiment", "topic")
+    PACKED_OUTPUT_TOKENS = 200
+    
+    def __init__(self, openai_api_key: Optional[str] = None, analysis_mode: Optional[str] = None, **kwargs):
         # Inicializar todos los analizadores
         self.sentiment_analyzer = SentimentAnalyzer(openai_api_key, **kwargs)
         self.topic_classifier = TopicClassifier(openai_api_key, **kwargs)
         self.summarizer = Summarizer(openai_api_key, **kwargs)
         self.relevance_scorer = RelevanceScorer(openai_api_key, **kwargs)
         
-        logger.info("ComprehensiveAnalyzer inicializado")
+        # Llamada combinada (modo fused)
+        self.analysis_mode = AnalysisMode(analysis_mode or settings.AI_ANALYSIS_MODE)
+        self.rate_limiter = RateLimitHandler(
+            kwargs.get("requests_per_minute", 60), kwargs.get("requests_per_day", 10000)
+        )
+        self.retry_handler = RetryHandler()
+        self.cost_optimizer = CostOptimizer()
+        self.async_client = AsyncOpenAI(api_key=openai_api_key) if openai_api_key and AsyncOpenAI is not None else None
+        
+        logger.info(f"ComprehensiveAnalyzer inicializado (modo {self.analysis_mode.value})")
+    
+    def _analyzers(self) -> Dict[str, Any]:
+        """Analizador especializado de cada campo del modo fused"""
+        return {
+            "sentiment": self.sentiment_analyzer,
+            "topic": self.topic_classifier,
+            "summary": self.summarizer,
+            "relevance": self.relevance_scorer,
+        }
     
     async def analyze_article_async(self, 
                                   article_id: str,
                                   content: str,
                                   user_preferences: Optional[Dict[str, float]] = None,
-                                  max_summary_words: int = 150) -> AIAnalysisResult:
-        """Análisis comprehensivo asíncrono de un artículo"""
-        logger.info(f"Iniciando análisis comprehensivo para artículo {article_id}")
+                                  max_summary_words: int = 150,
+                                  mode: Optional[str] = None,
+                                  known_results: Optional[Dict[str, AnalysisResult]] = None) -> AIAnalysisResult:
+        """
+        Análisis comprehensivo asíncrono de un artículo
+        
+        Args:
+            article_id: ID del artículo
+            content: Contenido a analizar
+            user_preferences: Pesos de factores de relevancia del usuario
+            max_summary_words: Longitud máxima del resumen
+            mode: separate (cuatro llamadas) o fused (una llamada); por defecto el del analizador
+            known_results: Análisis ya resueltos por campo (p. ej. por packing), que no se piden
+        """
+        analysis_mode = AnalysisMode(mode) if mode else self.analysis_mode
+        logger.info(f"Iniciando análisis comprehensivo para artículo {article_id} (modo {analysis_mode.value})")
         
         result = AIAnalysisResult(
             article_id=article_id,
@@ -1242,16 +1396,20 @@ class ComprehensiveAnalyzer:
         start_time = time.time()
         
         try:
-            # Ejecutar todos los análisis en paralelo
-            sentiment_task = self.sentiment_analyzer.analyze_sentiment_async(content)
-            topic_task = self.topic_classifier.classify_topic_async(content)
-            summary_task = self.summarizer.summarize_async(content, max_summary_words)
-            relevance_task = self.relevance_scorer.score_relevance_async(content, user_preferences)
-            
-            # Esperar a que todos terminen
-            sentiment_result, topic_result, summary_result, relevance_result = await asyncio.gather(
-                sentiment_task, topic_task, summary_task, relevance_task
-            )
+            if analysis_mode == AnalysisMode.FUSED:
+                sentiment_result, topic_result, summary_result, relevance_result = await self._analyze_fused_async(
+                    content, user_preferences, max_summary_words, known_results
+                )
+            else:
+                # Ejecutar en paralelo los análisis que no estén resueltos
+                analyses = self._specialized_calls(content, user_preferences, max_summary_words)
+                results = dict(known_results or {})
+                missing = [field for field in analyses if field not in results]
+                for field, field_result in zip(missing, await asyncio.gather(*(analyses[field]() for field in missing))):
+                    results[field] = field_result
+                sentiment_result, topic_result, summary_result, relevance_result = (
+                    results["sentiment"], results["topic"], results["summary"], results["relevance"]
+                )
             
             result.sentiment = sentiment_result
             result.topic = topic_result
@@ -1280,20 +1438,212 @@ class ComprehensiveAnalyzer:
             logger.error(f"Error en análisis comprehensivo para {article_id}: {str(e)}")
             raise
     
+    def _specialized_calls(self, content: str, user_preferences: Optional[Dict[str, float]],
+                           max_summary_words: int) -> Dict[str, Any]:
+        """Llamada especializada de cada campo, sin iniciar"""
+        return {
+            "sentiment": lambda: self.sentiment_analyzer.analyze_sentiment_async(content),
+            "topic": lambda: self.topic_classifier.classify_topic_async(content),
+            "summary": lambda: self.summarizer.summarize_async(content, max_summary_words),
+            "relevance": lambda: self.relevance_scorer.score_relevance_async(content, user_preferences),
+        }
+    
+    @staticmethod
+    def _field_schemas(max_summary_words: int = 150) -> Dict[str, str]:
+        """Clave y esquema JSON de cada análisis en las respuestas combinadas (fused y packing)"""
+        return {
+            "sentiment": '"sentiment": {"sentiment": "positive|negative|neutral|mixed", "score": -1 a 1, '
+                         '"emotions": [máximo 3 etiquetas de emoción]}',
+            "topic": '"topic": {"primary_topic": una de [' + ", ".join(category.value for category in TopicCategory)
+                     + '], "probability": 0-1, "secondary_topics": [[topic, probability]], "keywords": [strings]}',
+            "summary": f'"summary": {{"summary": resumen neutral de máximo {max_summary_words} palabras con los '
+                       f'datos y cifras importantes, "key_points": [3-5 puntos clave], "word_count": número}}',
+            "relevance": '"relevance": {"relevance_score": 0-1, "importance_score": 0-1, "trending_score": 0-1, '
+                         '"relevance_factors": {"current_events", "location_relevance", "topic_importance", '
+                         '"celebrity_involvement", "financial_impact", "political_significance", "public_interest": 0-1}}',
+        }
+    
+    def _build_fused_prompt(self, content: str, fields: List[str],
+                            user_preferences: Optional[Dict[str, float]], max_summary_words: int,
+                            model: Optional[str] = None) -> str:
+        """Prompt que pide los análisis indicados en un único objeto JSON"""
+        schemas = self._field_schemas(max_summary_words)
+        preferences_text = ""
+        if "relevance" in fields and user_preferences:
+            preferences_text = f"\nPreferencias del usuario para la relevancia (peso 0-1): {json.dumps(user_preferences)}\n"
+        
+        # El resumen necesita más contexto que las clasificaciones
+        max_tokens = max(content_token_budget(field) for field in fields)
+        
+        return f"""
+Analiza este artículo de noticias y responde con un único objeto JSON con estas claves:
+{chr(10).join("- " + schemas[field] for field in fields)}
+{preferences_text}
+Artículo:
+{get_token_counter(model).truncate(content, max_tokens)}
+"""
+    
+    def fused_request_body(self, content: str, fields: List[str],
+                           user_preferences: Optional[Dict[str, float]] = None,
+                           max_summary_words: int = 150,
+                           model: Optional[str] = None) -> Dict[str, Any]:
+        """Parámetros de chat.completions de la llamada fused (también para el modo batch offline)"""
+        model = model or self.cost_optimizer.select_optimal_model("comprehensive")
+        return {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": "Eres un experto analista de noticias. Respondes solo con JSON válido."},
+                {"role": "user", "content": self._build_fused_prompt(content, fields, user_preferences, max_summary_words, model)}
+            ],
+            "max_tokens": sum(self.FUSED_TASKS[field][1] for field in fields),
+            "temperature": 0.2,
+            "response_format": {"type": "json_object"}
+        }
+    
+    def fused_results_from_data(self, result_data: Dict[str, Any], fields: List[str],
+                                processing_time: float, tokens_used: int, cost: float, model: str,
+                                user_preferences: Optional[Dict[str, float]] = None) -> Dict[str, AnalysisResult]:
+        """
+        Resultados de los campos de una respuesta fused
+        
+        Los tokens y el costo de la llamada se reparten entre los campos que se
+        pudieron interpretar; los campos ausentes o inválidos no aparecen.
+        """
+        analyzers = self._analyzers()
+        results: Dict[str, AnalysisResult] = {}
+        for field in fields:
+            field_data = result_data.get(field)
+            try:
+                if not isinstance(field_data, dict):
+                    raise ValueError("campo ausente")
+                extra = (user_preferences,) if field == "relevance" else ()
+                results[field] = analyzers[field]._result_from_data(
+                    field_data, processing_time, 0, 0.0, model, *extra
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Campo {field} del análisis fused no válido: {str(e)}")
+        
+        for result in results.values():
+            result.tokens_used = round(tokens_used / len(results))
+            result.cost = cost / len(results)
+        return results
+    
+    async def _analyze_fused_async(self,
+                                   content: str,
+                                   user_preferences: Optional[Dict[str, float]] = None,
+                                   max_summary_words: int = 150,
+                                   known_results: Optional[Dict[str, AnalysisResult]] = None
+                                   ) -> Tuple[SentimentResult, TopicResult, SummaryResult, RelevanceResult]:
+        """
+        Los cuatro análisis con una sola llamada de respuesta JSON estructurada
+        
+        Los análisis ya cacheados (por el modo separate o por uno fused anterior)
+        no se piden. El costo de la llamada se reparte entre los campos obtenidos;
+        cada campo que falte o no se pueda interpretar se resuelve con su llamada
+        especializada, que a su vez cae al análisis local si OpenAI falla.
+        """
+        start_time = time.time()
+        analyzers = self._analyzers()
+        prepared = self.sentiment_analyzer._prepare_content(content)
+        fused_model = self.cost_optimizer.select_optimal_model("comprehensive")
+        variants = {
+            "sentiment": "",
+            "topic": "",
+            "summary": f"max_words={max_summary_words}",
+            "relevance": json.dumps(user_preferences or {}, sort_keys=True),
+        }
+        fused_variants = {field: f"fused={self.FUSED_PROMPT_VERSION};{variant}" for field, variant in variants.items()}
+        
+        # Resultados ya pagados: conocidos, llamada especializada o fused
+        results: Dict[str, AnalysisResult] = dict(known_results or {})
+        for field, (task_type, _) in self.FUSED_TASKS.items():
+            if field in results:
+                continue
+            cache = analyzers[field].cache
+            cached = await cache.get(prepared, field, analyzers[field].cost_optimizer.select_optimal_model(task_type), variants[field])
+            if cached is None:
+                cached = await cache.get(prepared, field, fused_model, fused_variants[field])
+            if cached is not None:
+                results[field] = cached
+        
+        pending = [field for field in self.FUSED_TASKS if field not in results]
+        if pending and self.async_client:
+            results.update(await self._request_fused_async(
+                prepared, pending, user_preferences, max_summary_words, fused_model, fused_variants, start_time
+            ))
+        
+        # Fallback por campo a la llamada especializada
+        fallbacks = self._specialized_calls(content, user_preferences, max_summary_words)
+        missing = [field for field in self.FUSED_TASKS if field not in results]
+        if missing:
+            if self.async_client:
+                logger.warning(f"Análisis fused sin {', '.join(missing)}: usando llamadas especializadas")
+            for field, result in zip(missing, await asyncio.gather(*(fallbacks[field]() for field in missing))):
+                results[field] = result
+        
+        return results["sentiment"], results["topic"], results["summary"], results["relevance"]
+    
+    async def _request_fused_async(self,
+                                   content: str,
+                                   fields: List[str],
+                                   user_preferences: Optional[Dict[str, float]],
+                                   max_summary_words: int,
+                                   model: str,
+                                   cache_variants: Dict[str, str],
+                                   start_time: float) -> Dict[str, AnalysisResult]:
+        """
+        Llamada combinada para los campos indicados
+        
+        Returns:
+            Resultados de los campos que se pudieron interpretar (vacío si la llamada falla)
+        """
+        # Verificar rate limits
+        if not self.rate_limiter.can_make_request():
+            wait_time = self.rate_limiter.get_wait_time()
+            logger.info(f"Rate limit alcanzado en análisis fused, esperando {wait_time:.2f}s")
+            await asyncio.sleep(wait_time)
+        
+        request = self.fused_request_body(content, fields, user_preferences, max_summary_words, model)
+        max_tokens = request["max_tokens"]
+        
+        def make_request():
+            return self.async_client.chat.completions.create(**request)
+        
+        try:
+            response = await self.retry_handler.execute_with_retry(make_request)
+            self.rate_limiter.record_request()
+            result_data = json.loads(response.choices[0].message.content.strip())
+            if not isinstance(result_data, dict):
+                raise ValueError("La respuesta no es un objeto JSON")
+        except Exception as e:
+            logger.error(f"Error en análisis fused: {str(e)}")
+            return {}
+        
+        # Métricas de la llamada, repartidas entre los campos obtenidos
+        input_tokens = count_prompt_tokens(response, request["messages"], model)
+        output_tokens = response.usage.completion_tokens if response.usage else max_tokens
+        cost = self.cost_optimizer.calculate_cost(response.model, input_tokens, output_tokens)
+        results = self.fused_results_from_data(
+            result_data, fields, time.time() - start_time, input_tokens + output_tokens, cost,
+            response.model, user_preferences
+        )
+        analyzers = self._analyzers()
+        for field, result in results.items():
+            await analyzers[field].cache.set(content, field, model, result, cache_variants[field])
+        
+        logger.info(f"Análisis fused completado: {len(results)}/{len(fields)} campos con costo ${cost:.4f}")
+        return results
+    
     def analyze_article(self, 
                       article_id: str,
                       content: str,
                       user_preferences: Optional[Dict[str, float]] = None,
                       max_summary_words: int = 150) -> AIAnalysisResult:
         """Análisis comprehensivo síncrono de un artículo"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(
-                self.analyze_article_async(article_id, content, user_preferences, max_summary_words)
-            )
-        finally:
-            loop.close()
+        return run_analysis(
+            self.analyze_article_async(article_id, content, user_preferences, max_summary_words),
+            self.sentiment_analyzer.cache.shared_cache
+        )
     
     def _calculate_combined_score(self, sentiment: SentimentResult, topic: TopicResult,
                                 summary: SummaryResult, relevance: RelevanceResult) -> float:
@@ -1318,23 +1668,116 @@ class ComprehensiveAnalyzer:
         combined = sum(score * weights[factor] for factor, score in scores.items())
         return max(0.0, min(1.0, combined))
     
+    async def _pack_classifications_async(self, articles: List[Dict[str, Any]]) -> Dict[int, Dict[str, AnalysisResult]]:
+        """
+        Sentimiento y tema de varios artículos por petición
+        
+        Cada petición lleva el titular y la entradilla de hasta AI_PACKING_MAX_ARTICLES
+        artículos y devuelve un elemento JSON por artículo, que se convierte en sus
+        resultados con el _result_from_data del analizador especializado. El costo de
+        cada artículo se reparte entre sus campos. Los resultados se cachean por el
+        contenido completo del artículo; los ya cacheados no se piden.
+        
+        Returns:
+            Resultados por índice del artículo y campo; los artículos sin respuesta no aparecen
+        """
+        analyzers = self._analyzers()
+        model = self.cost_optimizer.select_optimal_model("packed_classification")
+        scheduler = PackingScheduler(self.async_client, model, rate_limiter=self.rate_limiter)
+        variant = f"packed={self.PACKED_PROMPT_VERSION};tokens={scheduler.max_item_tokens}"
+        task_types = {field: self.FUSED_TASKS[field][0] for field in self.PACKED_FIELDS}
+        
+        known: Dict[int, Dict[str, AnalysisResult]] = {}
+        prepared: Dict[int, str] = {}
+        pending: List[Tuple[str, str]] = []
+        for index, article in enumerate(articles):
+            content = self.sentiment_analyzer._prepare_content(article.get('content', ''))
+            if not content:
+                continue
+            prepared[index] = content
+            for field in self.PACKED_FIELDS:
+                cache = analyzers[field].cache
+                cached = await cache.get(content, field, analyzers[field].cost_optimizer.select_optimal_model(task_types[field]))
+                if cached is None:
+                    cached = await cache.get(content, field, model, variant)
+                if cached is not None:
+                    known.setdefault(index, {})[field] = cached
+            if len(known.get(index, {})) < len(self.PACKED_FIELDS):
+                title = article.get('title', '')
+                pending.append((str(index), f"{title}. {content}" if title else content))
+        
+        if not pending:
+            return known
+        
+        schemas = self._field_schemas()
+        answers = await scheduler.run(
+            pending,
+            instructions="Clasifica el sentimiento y el tema de cada uno de estos titulares de noticias.",
+            item_schema=", ".join(schemas[field] for field in self.PACKED_FIELDS),
+            output_tokens_per_item=self.PACKED_OUTPUT_TOKENS
+        )
+        
+        for key, answer in answers.items():
+            index = int(key)
+            results = known.setdefault(index, {})
+            missing = [field for field in self.PACKED_FIELDS if field not in results]
+            cost = self.cost_optimizer.calculate_cost(answer.model, answer.input_tokens, answer.output_tokens)
+            for field in missing:
+                try:
+                    if not isinstance(answer.data.get(field), dict):
+                        raise ValueError("campo ausente")
+                    result = analyzers[field]._result_from_data(
+                        answer.data[field], answer.processing_time,
+                        round((answer.input_tokens + answer.output_tokens) / len(missing)),
+                        cost / len(missing), answer.model
+                    )
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.warning(f"Campo {field} empaquetado no válido para el artículo {index}: {str(e)}")
+                    continue
+                results[field] = result
+                await analyzers[field].cache.set(prepared[index], field, model, result, variant)
+        
+        logger.info(f"Packing de clasificaciones: {scheduler.get_stats()}")
+        return known
+    
     async def batch_analyze_async(self, 
                                 articles: List[Dict[str, Any]], 
                                 max_concurrent: int = 5,
+                                pack_classifications: Optional[bool] = None,
                                 **kwargs) -> Tuple[List[AIAnalysisResult], List[Dict[str, Any]]]:
-        """Análisis en lote de múltiples artículos"""
+        """
+        Análisis en lote de múltiples artículos
+        
+        Args:
+            articles: Artículos con 'id', 'content' y opcionalmente 'title'
+            max_concurrent: Análisis de artículos en paralelo
+            pack_classifications: Resolver sentimiento y tema con peticiones de varios
+                artículos (por defecto AI_PACKING_ENABLED); el resto de análisis y los
+                artículos sin respuesta empaquetada usan sus llamadas por artículo
+        """
+        if pack_classifications is None:
+            pack_classifications = settings.AI_PACKING_ENABLED
+        
+        packed: Dict[int, Dict[str, AnalysisResult]] = {}
+        if pack_classifications and self.async_client and len(articles) > 1:
+            try:
+                packed = await self._pack_classifications_async(articles)
+            except Exception as e:
+                logger.error(f"Error en packing de clasificaciones, usando llamadas por artículo: {str(e)}")
         
         # Crear semaphore para limitar concurrencia
         semaphore = asyncio.Semaphore(max_concurrent)
         
-        async def analyze_with_semaphore(article):
+        async def analyze_with_semaphore(index, article):
             async with semaphore:
                 article_id = article.get('id', 'unknown')
                 content = article.get('content', '')
-                return await self.analyze_article_async(article_id, content, **kwargs)
+                return await self.analyze_article_async(
+                    article_id, content, known_results=packed.get(index), **kwargs
+                )
         
         # Ejecutar análisis en paralelo con límite de concurrencia
-        tasks = [analyze_with_semaphore(article) for article in articles]
+        tasks = [analyze_with_semaphore(index, article) for index, article in enumerate(articles)]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         # Filtrar resultados y errores
@@ -1378,6 +1821,55 @@ def analyze_cost_breakdown(analysis_results: List[AIAnalysisResult]) -> Dict[str
     }
 
 
+async def benchmark_analysis_modes(articles: List[Dict[str, Any]],
+                                   openai_api_key: Optional[str] = None,
+                                   modes: Tuple[str, ...] = ("separate", "fused"),
+                                   **kwargs) -> Dict[str, Dict[str, Any]]:
+    """
+    Compara costo y latencia de los modos de análisis sobre los mismos artículos
+    
+    Cada modo usa analizadores sin caché para pagar todas sus llamadas.
+    
+    Args:
+        articles: Artículos con 'id' y 'content'
+        openai_api_key: API key de OpenAI
+        modes: Modos a comparar
+        
+    Returns:
+        Por modo: costo total y por artículo, tokens, llamadas a OpenAI y latencia media y p95
+    """
+    report = {}
+    for mode in modes:
+        analyzer = ComprehensiveAnalyzer(openai_api_key, analysis_mode=mode, **kwargs)
+        uncached = CacheManager(shared_cache=AIResultCache(enabled=False))
+        for specialized in analyzer._analyzers().values():
+            specialized.cache = uncached
+        
+        results = []
+        for article in articles:
+            results.append(await analyzer.analyze_article_async(article.get('id', 'unknown'), article.get('content', '')))
+        
+        latencies = sorted(result.processing_time for result in results)
+        limiters = [analyzer.rate_limiter] + [specialized.rate_limiter for specialized in analyzer._analyzers().values()]
+        breakdown = analyze_cost_breakdown(results)
+        report[mode] = {
+            "articles": len(results),
+            "total_cost": breakdown["total_cost"],
+            "cost_per_article": breakdown.get("cost_per_article", 0),
+            "total_tokens": sum(
+                analysis.tokens_used
+                for result in results
+                for analysis in (result.sentiment, result.topic, result.summary, result.relevance) if analysis
+            ),
+            "openai_requests": sum(len(limiter.day_requests) for limiter in limiters),
+            "avg_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p95_latency": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+        }
+        logger.info(f"Benchmark modo {mode}: {report[mode]}")
+    
+    return report
+
+
 # Mantener compatibilidad con el AIProcessor legacy
 class AIProcessor(ComprehensiveAnalyzer):
     """Legacy AIProcessor para compatibilidad hacia atrás"""
@@ -1393,19 +1885,39 @@ class AIProcessor(ComprehensiveAnalyzer):
         logger.info("AIProcessor legacy inicializado para compatibilidad")
     
     async def analyze_article_legacy(self, article_id: str, content: str, 
-                                   use_openai: bool = False) -> AIAnalysisResult:
+                                   use_openai: bool = False, mode: Optional[str] = None) -> AIAnalysisResult:
         """Legacy method para compatibilidad"""
         # Para compatibilidad, no usar OpenAI si use_openai=False
         if not use_openai:
-            logger.warning("Legacy AIProcessor: usando solo fallbacks cuando use_openai=False")
-            # Crear resultados simples sin OpenAI
-            return AIAnalysisResult(
-                article_id=article_id,
-                content=content,
-                processing_time=0.1
-            )
+            logger.info("Legacy AIProcessor: análisis local sin OpenAI (use_openai=False)")
+            return await self._analyze_locally_async(article_id, content)
+        
+        return await self.analyze_article_async(article_id, content, mode=mode)
+    
+    async def _analyze_locally_async(self, article_id: str, content: str,
+                                     max_summary_words: int = 150) -> AIAnalysisResult:
+        """Análisis con los fallbacks locales de cada analizador, sin llamadas a OpenAI"""
+        start_time = time.time()
+        result = AIAnalysisResult(article_id=article_id, content=content)
+        
+        result.sentiment = await self.sentiment_analyzer._basic_sentiment_analysis_async(
+            self.sentiment_analyzer._prepare_content(content), start_time
+        )
+        result.topic = await self.topic_classifier._classify_with_rules_async(
+            self.topic_classifier._prepare_content(content), start_time
+        )
+        result.summary = self.summarizer._create_simple_summary(
+            self.summarizer._prepare_content(content), start_time, max_summary_words
+        )
+        result.relevance = self.relevance_scorer._create_simple_relevance_score(
+            self.relevance_scorer._prepare_content(content), start_time
+        )
         
-        return await self.analyze_article_async(article_id, content)
+        result.processing_time = time.time() - start_time
+        result.combined_score = self._calculate_combined_score(
+            result.sentiment, result.topic, result.summary, result.relevance
+        )
+        return result
 
 
 # Celery tasks para procesamiento en background
@@ -1418,7 +1930,7 @@ try:
         """Celery task para análisis asíncrono de artículos"""
         try:
             analyzer = create_ai_processor(openai_api_key)
-            result = asyncio.run(analyzer.analyze_article_async(article_id, content))
+            result = run_analysis(analyzer.analyze_article_async(article_id, content))
             
             return {
                 'status': 'completed',
@@ -1442,7 +1954,7 @@ try:
         
         for article in article_data:
             try:
-                result = asyncio.run(analyzer.analyze_article_async(
+                result = run_analysis(analyzer.analyze_article_async(
                     article['id'], 
                     article['content']
                 ))
@@ -1476,6 +1988,8 @@ __all__ = [
     'AIProcessor',
     'create_ai_processor',
     'analyze_cost_breakdown',
+    'benchmark_analysis_modes',
+    'AnalysisMode',
     'SentimentType',
     'TopicCategory',
     'SentimentLabel',
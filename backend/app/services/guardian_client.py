@@ -14,6 +14,8 @@ from typing import Dict, List, Optional, Any
 from time import time, sleep
 from functools import wraps
 
+from ..core.http_client import HTTPTransport, get_http_transport
+
 
 logger = logging.getLogger(__name__)
 
@@ -104,22 +106,27 @@ class GuardianAPIClient:
         "artanddesign", "tv-and-radio"
     ]
     
-    def __init__(self, api_key: str, requests_session: Optional[requests.Session] = None):
+    def __init__(self, api_key: str, requests_session: Optional[requests.Session] = None,
+                 transport: Optional[HTTPTransport] = None):
         """
         Inicializa el cliente de Guardian API.
         
         Args:
             api_key: API key para Guardian API
             requests_session: Sesión de requests reutilizable (opcional)
+            transport: Transporte HTTP compartido (por defecto el del proceso)
         """
         self.api_key = api_key
-        self.session = requests_session or requests.Session()
+        self.transport = transport or get_http_transport()
+        # Sesión del llamador: es suya y el cliente nunca la cierra
+        self._external_session = requests_session is not None
+        self.session = requests_session or self.transport.requests_session()
         self.rate_limiter = RateLimiter()
         
-        # Headers por defecto
-        self.session.headers.update({
+        # Headers por defecto (por petición: la sesión compartida no lleva credenciales)
+        self.headers = {
             "User-Agent": "AI-News-Aggregator/1.0"
-        })
+        }
     
     def _make_request_sync(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Realiza una petición síncrona."""
@@ -127,7 +134,7 @@ class GuardianAPIClient:
         
         params["api-key"] = self.api_key
         url = f"{self.BASE_URL}/{endpoint}"
-        response = self.session.get(url, params=params)
+        response = self.session.get(url, params=params, headers=self.headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -149,7 +156,7 @@ class GuardianAPIClient:
         params["api-key"] = self.api_key
         url = f"{self.BASE_URL}/{endpoint}"
         
-        async with aiohttp.ClientSession() as session:
+        async with self.transport.session() as session:
             async with session.get(
                 url, 
                 params=params,
@@ -479,8 +486,9 @@ class GuardianAPIClient:
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            self.session.close()
+        # No se cierra ninguna sesión: la del llamador es suya y la compartida
+        # del transporte sigue abierta para otros clientes
+        pass
 
 
 # Funciones de conveniencia
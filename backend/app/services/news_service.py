@@ -13,6 +13,9 @@ from concurrent.futures import ThreadPoolExecutor
 import hashlib
 
 from ..core.config import settings
+from ..core.http_client import HTTPTransport, get_http_transport
+from ..core.response_cache import HTTPResponseCache, get_response_cache
+from .news_watermarks import NewsWatermarkStore, get_watermark_store, parse_published_at
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -37,16 +40,129 @@ class APIKeyError(NewsClientError):
 class NewsClient(ABC):
     """Clase base abstracta para todos los clientes de noticias"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        transport: Optional[HTTPTransport] = None,
+        response_cache: Optional[HTTPResponseCache] = None
+    ):
         self.api_key = api_key
+        self.transport = transport or get_http_transport()  # Conexiones compartidas por proceso
+        self.response_cache = response_cache or get_response_cache()
         self.rate_limit_remaining = 100
         self.rate_limit_reset = datetime.now()
+    
+    async def _get_json(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        GET con caché de respuestas del proveedor
+        
+        Reenvía ETag/Last-Modified guardados y reutiliza el cuerpo almacenado si
+        el proveedor responde 304; sin validadores, la respuesta se sirve desde
+        caché mientras dure NEWS_RESPONSE_CACHE_TTL sin consumir cuota.
+        """
+        import aiohttp
+        
+        provider = self.name.lower()
+        cache = self.response_cache
+        key = cache.make_key(provider, url, params)
+        entry = await cache.lookup(key)
+        
+        if entry is not None and cache.is_fresh(entry):
+            cache.record(provider, 'hits')
+            return entry['data']
+        
+        request_headers = dict(headers or {})
+        request_headers.update(cache.conditional_headers(entry))
+        
+        async with self.transport.session() as session:
+            async with session.get(
+                url,
+                headers=request_headers,
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                
+                if response.status == 304 and entry is not None:
+                    cache.record(provider, 'revalidated')
+                    await cache.refresh(key, entry)
+                    return entry['data']
+                elif response.status == 429:
+                    raise RateLimitError(f"{self.name} rate limit exceeded")
+                elif response.status == 401:
+                    raise APIKeyError(f"{self.name} API key inválida")
+                
+                response.raise_for_status()
+                data = await response.json()
+                
+                cache.record(provider, 'misses')
+                await cache.store(key, data, response.headers)
+                return data
         
     @abstractmethod
-    async def get_latest_news(self, limit: int = 20) -> List[Dict[str, Any]]:
-        """Obtener las últimas noticias"""
+    async def get_latest_news(
+        self,
+        limit: int = 20,
+        page: int = 1,
+        since: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Obtener las últimas noticias
+        
+        Args:
+            limit: Artículos por página
+            page: Página (1 = más recientes)
+            since: Fecha mínima de publicación, si la API admite filtrar por fecha
+        """
         pass
     
+    async def get_latest_news_since(
+        self,
+        watermark: Optional[Dict[str, Any]],
+        limit: int = 20,
+        max_pages: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Obtener solo los artículos publicados desde el watermark
+        
+        Pide páginas de `limit` artículos, de más recientes a más antiguas, hasta
+        encontrar uno ya visto o anterior al watermark. Sin watermark se obtiene
+        solo la primera página, como get_latest_news.
+        
+        Args:
+            watermark: {'published_at', 'seen_ids'} del ciclo anterior
+            limit: Artículos por página
+            max_pages: Máximo de páginas por ciclo (por defecto NEWS_FETCH_MAX_PAGES)
+        """
+        since = parse_published_at(watermark.get('published_at')) if watermark else None
+        if since is None:
+            return await self.get_latest_news(limit)
+        
+        seen_ids = set(watermark.get('seen_ids', []))
+        max_pages = max_pages or settings.NEWS_FETCH_MAX_PAGES
+        
+        new_articles = []
+        for page in range(1, max_pages + 1):
+            articles = await self.get_latest_news(limit, page=page, since=since)
+            
+            reached_watermark = False
+            for article in articles:
+                published_at = parse_published_at(article.get('published_at'))
+                if article.get('url') in seen_ids or (published_at is not None and published_at < since):
+                    reached_watermark = True
+                    continue
+                new_articles.append(article)
+            
+            if reached_watermark or not articles:
+                break
+        
+        logger.info(f"{self.name}: {len(new_articles)} noticias nuevas desde {since.isoformat()}")
+        return new_articles
+    
     @abstractmethod
     async def search_news(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Buscar noticias por query"""
@@ -71,61 +187,57 @@ class NewsClient(ABC):
 class NewsAPIClient(NewsClient):
     """Cliente para NewsAPI.org"""
     
-    def __init__(self, api_key: str):
-        super().__init__(api_key)
+    def __init__(
+        self,
+        api_key: str,
+        transport: Optional[HTTPTransport] = None,
+        response_cache: Optional[HTTPResponseCache] = None
+    ):
+        super().__init__(api_key, transport, response_cache)
         self.base_url = "https://newsapi.org/v2"
         self.name = "NewsAPI"
         
-    async def get_latest_news(self, limit: int = 20) -> List[Dict[str, Any]]:
+    async def get_latest_news(
+        self,
+        limit: int = 20,
+        page: int = 1,
+        since: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
         """Obtener últimas noticias de NewsAPI"""
         try:
-            import aiohttp
-            
             headers = {
                 'X-API-Key': self.api_key,
                 'User-Agent': 'AI-News-Aggregator/1.0'
             }
             
+            # top-headlines no admite filtro de fecha: se pagina hasta el watermark
             params = {
                 'pageSize': min(limit, 100),
+                'page': page,
                 'language': 'en',
                 'sortBy': 'publishedAt'
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/top-headlines",
-                    headers=headers,
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    
-                    if response.status == 429:
-                        raise RateLimitError("NewsAPI rate limit exceeded")
-                    elif response.status == 401:
-                        raise APIKeyError("NewsAPI API key inválida")
-                    
-                    response.raise_for_status()
-                    data = await response.json()
-                    
-                    articles = []
-                    for article in data.get('articles', []):
-                        processed_article = {
-                            'title': article.get('title', ''),
-                            'content': article.get('content', ''),
-                            'url': article.get('url', ''),
-                            'published_at': article.get('publishedAt'),
-                            'source_name': article.get('source', {}).get('name', ''),
-                            'source_id': article.get('source', {}).get('id', ''),
-                            'api_name': 'newsapi',
-                            'author': article.get('author'),
-                            'description': article.get('description'),
-                            'image_url': article.get('urlToImage')
-                        }
-                        articles.append(processed_article)
-                    
-                    logger.info(f"NewsAPI: Obtenidas {len(articles)} noticias")
-                    return articles[:limit]
+            data = await self._get_json(f"{self.base_url}/top-headlines", params, headers)
+            
+            articles = []
+            for article in data.get('articles', []):
+                processed_article = {
+                    'title': article.get('title', ''),
+                    'content': article.get('content', ''),
+                    'url': article.get('url', ''),
+                    'published_at': article.get('publishedAt'),
+                    'source_name': article.get('source', {}).get('name', ''),
+                    'source_id': article.get('source', {}).get('id', ''),
+                    'api_name': 'newsapi',
+                    'author': article.get('author'),
+                    'description': article.get('description'),
+                    'image_url': article.get('urlToImage')
+                }
+                articles.append(processed_article)
+            
+            logger.info(f"NewsAPI: Obtenidas {len(articles)} noticias")
+            return articles[:limit]
                     
         except Exception as e:
             logger.error(f"Error en NewsAPI get_latest_news: {str(e)}")
@@ -149,7 +261,7 @@ class NewsAPIClient(NewsClient):
                 'from': (datetime.now() - timedelta(days=30)).isoformat()
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(
                     f"{self.base_url}/everything",
                     headers=headers,
@@ -222,16 +334,24 @@ class NewsAPIClient(NewsClient):
 class GuardianAPIClient(NewsClient):
     """Cliente para The Guardian API"""
     
-    def __init__(self, api_key: str):
-        super().__init__(api_key)
+    def __init__(
+        self,
+        api_key: str,
+        transport: Optional[HTTPTransport] = None,
+        response_cache: Optional[HTTPResponseCache] = None
+    ):
+        super().__init__(api_key, transport, response_cache)
         self.base_url = "https://content.guardianapis.com"
         self.name = "Guardian"
         
-    async def get_latest_news(self, limit: int = 20) -> List[Dict[str, Any]]:
+    async def get_latest_news(
+        self,
+        limit: int = 20,
+        page: int = 1,
+        since: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
         """Obtener últimas noticias de The Guardian"""
         try:
-            import aiohttp
-            
             headers = {
                 'User-Agent': 'AI-News-Aggregator/1.0'
             }
@@ -239,45 +359,34 @@ class GuardianAPIClient(NewsClient):
             params = {
                 'api-key': self.api_key,
                 'page-size': min(limit, 200),
+                'page': page,
                 'section': 'news',
                 'order-by': 'newest',
                 'show-fields': 'headline,bodyText,byline,thumbnail'
             }
+            if since:
+                params['from-date'] = since.date().isoformat()
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/search",
-                    headers=headers,
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    
-                    if response.status == 429:
-                        raise RateLimitError("Guardian API rate limit exceeded")
-                    elif response.status == 401:
-                        raise APIKeyError("Guardian API key inválida")
-                    
-                    response.raise_for_status()
-                    data = await response.json()
-                    
-                    articles = []
-                    for article in data.get('response', {}).get('results', []):
-                        processed_article = {
-                            'title': article.get('webTitle', ''),
-                            'content': article.get('fields', {}).get('bodyText', ''),
-                            'url': article.get('webUrl', ''),
-                            'published_at': article.get('webPublicationDate'),
-                            'source_name': 'The Guardian',
-                            'source_id': article.get('sectionName', '').lower(),
-                            'api_name': 'guardian',
-                            'author': article.get('fields', {}).get('byline'),
-                            'description': article.get('fields', {}).get('headline'),
-                            'image_url': article.get('fields', {}).get('thumbnail')
-                        }
-                        articles.append(processed_article)
-                    
-                    logger.info(f"Guardian: Obtenidas {len(articles)} noticias")
-                    return articles[:limit]
+            data = await self._get_json(f"{self.base_url}/search", params, headers)
+            
+            articles = []
+            for article in data.get('response', {}).get('results', []):
+                processed_article = {
+                    'title': article.get('webTitle', ''),
+                    'content': article.get('fields', {}).get('bodyText', ''),
+                    'url': article.get('webUrl', ''),
+                    'published_at': article.get('webPublicationDate'),
+                    'source_name': 'The Guardian',
+                    'source_id': article.get('sectionName', '').lower(),
+                    'api_name': 'guardian',
+                    'author': article.get('fields', {}).get('byline'),
+                    'description': article.get('fields', {}).get('headline'),
+                    'image_url': article.get('fields', {}).get('thumbnail')
+                }
+                articles.append(processed_article)
+            
+            logger.info(f"Guardian: Obtenidas {len(articles)} noticias")
+            return articles[:limit]
                     
         except Exception as e:
             logger.error(f"Error en Guardian get_latest_news: {str(e)}")
@@ -300,7 +409,7 @@ class GuardianAPIClient(NewsClient):
                 'show-fields': 'headline,bodyText,byline,thumbnail'
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(
                     f"{self.base_url}/search",
                     headers=headers,
@@ -367,58 +476,55 @@ class GuardianAPIClient(NewsClient):
 class NYTimesAPIClient(NewsClient):
     """Cliente para New York Times API"""
     
-    def __init__(self, api_key: str):
-        super().__init__(api_key)
+    def __init__(
+        self,
+        api_key: str,
+        transport: Optional[HTTPTransport] = None,
+        response_cache: Optional[HTTPResponseCache] = None
+    ):
+        super().__init__(api_key, transport, response_cache)
         self.base_url = "https://api.nytimes.com/svc"
         self.name = "NYTimes"
         
-    async def get_latest_news(self, limit: int = 20) -> List[Dict[str, Any]]:
+    async def get_latest_news(
+        self,
+        limit: int = 20,
+        page: int = 1,
+        since: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
         """Obtener últimas noticias de NY Times"""
         try:
-            import aiohttp
-            
             headers = {
                 'User-Agent': 'AI-News-Aggregator/1.0'
             }
             
+            # Newswire no admite filtro de fecha: se pagina con offset hasta el watermark
             params = {
-                'api-key': self.api_key
+                'api-key': self.api_key,
+                'limit': min(limit, 500),
+                'offset': (page - 1) * min(limit, 500)
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/news/v3/content/all/all.json",
-                    headers=headers,
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    
-                    if response.status == 429:
-                        raise RateLimitError("NYTimes API rate limit exceeded")
-                    elif response.status == 401:
-                        raise APIKeyError("NYTimes API key inválida")
-                    
-                    response.raise_for_status()
-                    data = await response.json()
-                    
-                    articles = []
-                    for article in data.get('results', [])[:limit]:
-                        processed_article = {
-                            'title': article.get('title', ''),
-                            'content': article.get('abstract', ''),
-                            'url': article.get('url', ''),
-                            'published_at': article.get('published_date'),
-                            'source_name': 'New York Times',
-                            'source_id': article.get('section', '').lower(),
-                            'api_name': 'nytimes',
-                            'author': ', '.join(article.get('byline', '').split(', ')[:2]),
-                            'description': article.get('abstract', ''),
-                            'image_url': article.get('multimedia', [{}])[0].get('url') if article.get('multimedia') else None
-                        }
-                        articles.append(processed_article)
-                    
-                    logger.info(f"NYTimes: Obtenidas {len(articles)} noticias")
-                    return articles[:limit]
+            data = await self._get_json(f"{self.base_url}/news/v3/content/all/all.json", params, headers)
+            
+            articles = []
+            for article in data.get('results', [])[:limit]:
+                processed_article = {
+                    'title': article.get('title', ''),
+                    'content': article.get('abstract', ''),
+                    'url': article.get('url', ''),
+                    'published_at': article.get('published_date'),
+                    'source_name': 'New York Times',
+                    'source_id': article.get('section', '').lower(),
+                    'api_name': 'nytimes',
+                    'author': ', '.join(article.get('byline', '').split(', ')[:2]),
+                    'description': article.get('abstract', ''),
+                    'image_url': article.get('multimedia', [{}])[0].get('url') if article.get('multimedia') else None
+                }
+                articles.append(processed_article)
+            
+            logger.info(f"NYTimes: Obtenidas {len(articles)} noticias")
+            return articles[:limit]
                     
         except Exception as e:
             logger.error(f"Error en NYTimes get_latest_news: {str(e)}")
@@ -440,7 +546,7 @@ class NYTimesAPIClient(NewsClient):
                 'sort': 'newest'
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(
                     f"{self.base_url}/search/v2/articlesearch.json",
                     headers=headers,
@@ -568,9 +674,10 @@ class NewsService:
     Implementa el patrón Facade para simplificar la interfaz de acceso a las APIs
     """
     
-    def __init__(self):
+    def __init__(self, watermarks: Optional[NewsWatermarkStore] = None):
         self.factory = NewsClientFactory()
         self.clients: Dict[str, NewsClient] = {}
+        self.watermarks = watermarks or get_watermark_store()
         self._initialize_clients()
         self.executor = ThreadPoolExecutor(max_workers=5)
         
@@ -621,29 +728,12 @@ class NewsService:
                 raise NewsClientError("No hay clientes disponibles para obtener noticias")
             
             # Recopilar noticias de todos los clientes en paralelo
-            tasks = []
-            for client_type in client_types:
-                client = self.clients[client_type]
-                task = asyncio.create_task(
-                    self._safe_client_call(
-                        client.get_latest_news, 
-                        limit // len(client_types) + 1
-                    )
-                )
-                tasks.append((client_type, task))
-            
-            # Esperar resultados
+            results_by_client = await self.fetch_latest_by_client(
+                limit // len(client_types) + 1, client_types
+            )
             all_articles = []
-            for client_type, task in tasks:
-                try:
-                    articles = await task
-                    # Agregar metadata del cliente
-                    for article in articles:
-                        article['client_type'] = client_type
-                    all_articles.extend(articles)
-                except Exception as e:
-                    logger.warning(f"Error obteniendo noticias de {client_type}: {str(e)}")
-                    continue
+            for client_result in results_by_client.values():
+                all_articles.extend(client_result['articles'])
             
             # Aplicar filtros
             if sources:
@@ -674,6 +764,100 @@ class NewsService:
             logger.error(f"Error en get_latest_news: {str(e)}")
             raise NewsClientError(f"Error obteniendo últimas noticias: {str(e)}")
     
+    async def fetch_latest_by_client(
+        self,
+        limit: int = 20,
+        client_types: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        incremental: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Obtener las últimas noticias de todos los clientes a la vez en el mismo event loop
+        
+        Cada proveedor tiene su propio timeout; un proveedor lento o caído no
+        bloquea ni descarta los resultados de los demás.
+        
+        En modo incremental cada proveedor solo devuelve lo publicado desde su
+        watermark. El watermark avanzado se devuelve sin guardar: quien procesa
+        los artículos lo guarda con save_watermarks() cuando el ciclo termina
+        bien, así un ciclo fallido vuelve a pedir los mismos artículos.
+        
+        Args:
+            limit: Número máximo de artículos por cliente (por página en modo incremental)
+            client_types: Tipos de clientes a usar (por defecto todos los inicializados)
+            timeout: Timeout por proveedor en segundos (por defecto NEWS_FETCH_TIMEOUT)
+            incremental: Obtener solo artículos nuevos desde el último ciclo
+            
+        Returns:
+            Dict tipo de cliente -> {'articles', 'error', 'elapsed', 'watermark',
+            'advanced_watermark'} (advanced_watermark: None si no avanzó)
+        """
+        if client_types is None:
+            client_types = list(self.clients.keys())
+        else:
+            client_types = [ct for ct in client_types if ct in self.clients]
+        
+        timeout = timeout or settings.NEWS_FETCH_TIMEOUT
+        
+        async def fetch_one(client_type: str) -> Dict[str, Any]:
+            started = asyncio.get_running_loop().time()
+            watermark = advanced = None
+            try:
+                if incremental:
+                    watermark = await self.watermarks.get(client_type)
+                    articles = await asyncio.wait_for(
+                        self.clients[client_type].get_latest_news_since(watermark, limit), timeout=timeout
+                    )
+                    advanced = self.watermarks.advance(watermark, articles)
+                    if advanced == watermark:
+                        advanced = None
+                    else:
+                        watermark = advanced
+                else:
+                    articles = await asyncio.wait_for(
+                        self.clients[client_type].get_latest_news(limit), timeout=timeout
+                    )
+                error = None
+            except asyncio.TimeoutError:
+                articles, error = [], f"Timeout tras {timeout:.0f}s"
+            except Exception as e:
+                articles, error = [], str(e)
+            
+            if error:
+                logger.warning(f"Error obteniendo noticias de {client_type}: {error}")
+            for article in articles:
+                article['client_type'] = client_type
+            
+            return {
+                'articles': articles,
+                'error': error,
+                'elapsed': asyncio.get_running_loop().time() - started,
+                'watermark': watermark['published_at'] if watermark else None,
+                'advanced_watermark': advanced
+            }
+        
+        results = await asyncio.gather(*(fetch_one(client_type) for client_type in client_types))
+        return dict(zip(client_types, results))
+    
+    async def save_watermarks(self, results_by_client: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Guardar los watermarks avanzados por fetch_latest_by_client
+        
+        Llamar solo cuando los artículos del ciclo ya se procesaron correctamente.
+        
+        Args:
+            results_by_client: Resultado de fetch_latest_by_client
+            
+        Returns:
+            Número de watermarks guardados
+        """
+        saved = 0
+        for client_type, client_result in results_by_client.items():
+            advanced = client_result.get('advanced_watermark')
+            if advanced and await self.watermarks.save(client_type, advanced):
+                saved += 1
+        return saved
+    
     async def search_news(
         self, 
         query: str, 
@@ -847,6 +1031,7 @@ class NewsService:
                 'api_key_configured': bool(client.api_key),
                 'rate_limit_remaining': getattr(client, 'rate_limit_remaining', 'N/A'),
                 'rate_limit_reset': getattr(client, 'rate_limit_reset', 'N/A'),
+                'response_cache': client.response_cache.get_stats(client.get_name().lower()),
                 'available': True
             }
         return status
@@ -0,0 +1,134 @@
+"""
+High-water marks para la obtención incremental de noticias
+
+Guarda por proveedor y consulta la fecha de publicación más reciente ya vista y
+las URLs de los últimos artículos obtenidos, de modo que cada ciclo solo pida a
+las APIs lo publicado desde entonces.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from ..core.config import settings
+from ..core.redis_cache import RedisCacheManager, loop_cache_managers
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "news_watermark"
+
+
+def parse_published_at(value: Any) -> Optional[datetime]:
+    """
+    Convertir la fecha de publicación de un proveedor a datetime UTC
+
+    Acepta ISO 8601 con 'Z', con offset ('-04:00') o sin zona (se asume UTC).
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+class NewsWatermarkStore:
+    """
+    Almacén de watermarks en Redis
+
+    Cada watermark es un dict {'published_at': ISO UTC, 'seen_ids': [urls]}.
+    Las URLs vistas cubren artículos con la misma fecha que el watermark o que
+    un proveedor devuelve de nuevo con fecha anterior.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        max_seen_ids: Optional[int] = None,
+        cache_manager: Optional[RedisCacheManager] = None
+    ):
+        """
+        Args:
+            ttl: Segundos que se conserva un watermark sin actualizar
+            max_seen_ids: Número máximo de URLs recordadas por watermark
+            cache_manager: Cache manager conectado (por defecto el del event loop)
+        """
+        self.ttl = ttl or settings.NEWS_WATERMARK_TTL
+        self.max_seen_ids = max_seen_ids or settings.NEWS_WATERMARK_MAX_SEEN_IDS
+        self._cache_manager = cache_manager
+
+    @staticmethod
+    def make_key(provider: str, query: str = 'latest') -> str:
+        """Clave Redis del watermark de un proveedor y consulta"""
+        return f"{KEY_PREFIX}:{provider}:{query.strip().lower()}"
+
+    async def _get_manager(self) -> Optional[RedisCacheManager]:
+        if self._cache_manager is not None:
+            return self._cache_manager
+        return await loop_cache_managers.get()
+
+    async def get(self, provider: str, query: str = 'latest') -> Optional[Dict[str, Any]]:
+        """Obtener el watermark guardado (None si no hay o Redis no está disponible)"""
+        manager = await self._get_manager()
+        if manager is None:
+            return None
+        watermark = await manager.get(self.make_key(provider, query))
+        return watermark if isinstance(watermark, dict) and watermark.get('published_at') else None
+
+    def advance(
+        self,
+        watermark: Optional[Dict[str, Any]],
+        articles: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Calcular el watermark tras obtener nuevos artículos
+
+        Args:
+            watermark: Watermark anterior
+            articles: Artículos nuevos del ciclo
+
+        Returns:
+            Watermark actualizado (el anterior si no hay artículos con fecha)
+        """
+        latest = parse_published_at(watermark['published_at']) if watermark else None
+        seen_ids = list(watermark.get('seen_ids', [])) if watermark else []
+
+        new_ids = []
+        for article in articles:
+            published_at = parse_published_at(article.get('published_at'))
+            if published_at is None:
+                continue
+            if latest is None or published_at > latest:
+                latest = published_at
+            if article.get('url'):
+                new_ids.append(article['url'])
+
+        if not new_ids:
+            return watermark
+
+        # Las URLs más recientes primero, sin repetir
+        merged_ids = list(dict.fromkeys(new_ids + seen_ids))[:self.max_seen_ids]
+        return {'published_at': latest.isoformat(), 'seen_ids': merged_ids}
+
+    async def save(self, provider: str, watermark: Dict[str, Any], query: str = 'latest') -> bool:
+        """Guardar el watermark de un proveedor y consulta"""
+        manager = await self._get_manager()
+        if manager is None:
+            return False
+        return await manager.set(self.make_key(provider, query), watermark, ttl=self.ttl)
+
+
+# Instancia global del almacén
+watermark_store = NewsWatermarkStore()
+
+
+def get_watermark_store() -> NewsWatermarkStore:
+    """Obtener el almacén de watermarks compartido"""
+    return watermark_store
@@ -14,6 +14,8 @@ from typing import Dict, List, Optional, Any
 from time import time, sleep
 from functools import wraps
 
+from ..core.http_client import HTTPTransport, get_http_transport
+
 
 logger = logging.getLogger(__name__)
 
@@ -96,30 +98,35 @@ class NewsAPIClient:
     
     BASE_URL = "https://newsapi.org/v2"
     
-    def __init__(self, api_key: str, requests_session: Optional[requests.Session] = None):
+    def __init__(self, api_key: str, requests_session: Optional[requests.Session] = None,
+                 transport: Optional[HTTPTransport] = None):
         """
         Inicializa el cliente de NewsAPI.
         
         Args:
             api_key: API key para NewsAPI
             requests_session: Sesión de requests reutilizable (opcional)
+            transport: Transporte HTTP compartido (por defecto el del proceso)
         """
         self.api_key = api_key
-        self.session = requests_session or requests.Session()
+        self.transport = transport or get_http_transport()
+        # Sesión del llamador: es suya y el cliente nunca la cierra
+        self._external_session = requests_session is not None
+        self.session = requests_session or self.transport.requests_session()
         self.rate_limiter = RateLimiter()
         
-        # Headers por defecto
-        self.session.headers.update({
+        # Headers por defecto (por petición: la sesión compartida no lleva credenciales)
+        self.headers = {
             "X-API-Key": self.api_key,
             "User-Agent": "AI-News-Aggregator/1.0"
-        })
+        }
     
     def _make_request_sync(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Realiza una petición síncrona."""
         self.rate_limiter.wait_if_needed()
         
         url = f"{self.BASE_URL}/{endpoint}"
-        response = self.session.get(url, params=params)
+        response = self.session.get(url, params=params, headers=self.headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -137,7 +144,7 @@ class NewsAPIClient:
         
         url = f"{self.BASE_URL}/{endpoint}"
         
-        async with aiohttp.ClientSession() as session:
+        async with self.transport.session() as session:
             async with session.get(
                 url, 
                 params=params,
@@ -359,8 +366,9 @@ class NewsAPIClient:
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            self.session.close()
+        # No se cierra ninguna sesión: la del llamador es suya y la compartida
+        # del transporte sigue abierta para otros clientes
+        pass
 
 
 # Funciones de conveniencia
@@ -7,29 +7,101 @@ import logging
 from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import re
+import time
 import asyncio
+import threading
 from concurrent.futures import ThreadPoolExecutor
 import hashlib
+import json
+import uuid
+from collections import Counter, OrderedDict
 
 from sqlalchemy import (
-    and_, or_, func, text, desc, asc, 
-    String, Text, DateTime, Float
+    inspect, and_, or_, func, text, desc,
+    String, Text, DateTime, Float,
+    case, cast, literal, select, tuple_, union_all
 )
 from sqlalchemy.orm import Session, aliased
 from sqlalchemy.dialects.postgresql import array_agg
 import asyncpg
-from app.db.models import Article, Source, TrendingTopic
+from app.db.models import Article, Source, TrendingTopic, SearchTerm
+from app.utils.duplicate_clustering import collapse_duplicate_groups
+from app.utils.suggestion_index import SuggestionIndex, TYPE_PRIORITY
+from app.utils.semantic_index import get_article_vector_index
+from app.utils.query_log import get_trending_queries
+from app.utils.term_dictionary import get_term_dictionary
+from app.utils.counting import (
+    CountStrategy, count_rows, resolve_count_strategy,
+    add_window_count, split_window_count, window_count_result
+)
+from app.utils.pagination import KeysetCursor, QueryBuilder, null_safe_sort_key, query_fingerprint
 from app.core.config import get_settings
+from app.core.search_cache import get_search_cache
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Configuración de texto de Postgres usada por el trigger de articles.search_vector
+FTS_CONFIG = 'english'
+
+# Normalización de ts_rank_cd: rank / (rank + 1), acotado a [0, 1)
+FTS_RANK_NORMALIZATION = 32
+
+# Longitud mínima para completar con sugerencias por similitud de trigramas
+FUZZY_SUGGESTION_MIN_LENGTH = 3
+
+# Facets: valores máximos por facet y número de tramos de bias_score en [0, 1]
+FACET_VALUES_LIMIT = 20
+BIAS_FACET_BUCKETS = 5
+
 
 class SearchServiceError(Exception):
     """Excepción base para errores del servicio de búsqueda"""
     pass
 
 
+class FacetCache:
+    """Cache en memoria de facets por consulta y filtros normalizados"""
+    
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+    
+    @staticmethod
+    def make_key(query: str, filters: Dict[str, Any]) -> str:
+        """Clave estable: consulta sin mayúsculas ni espacios repetidos y filtros ordenados"""
+        normalized_query = " ".join(query.lower().split())
+        normalized_filters = {
+            name: sorted(value) if isinstance(value, (list, tuple, set)) else value
+            for name, value in filters.items()
+            if value not in (None, "", [], ())
+        }
+        payload = json.dumps([normalized_query, normalized_filters], sort_keys=True, default=str)
+        return hashlib.md5(payload.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Obtener facets si no han caducado"""
+        cached_data = self.cache.get(key)
+        if cached_data is None:
+            return None
+        if time.monotonic() - cached_data["timestamp"] >= self.ttl:
+            del self.cache[key]
+            return None
+        return cached_data["facets"]
+    
+    def set(self, key: str, facets: Dict[str, Any]):
+        """Guardar facets descartando las entradas más antiguas"""
+        self.cache[key] = {"facets": facets, "timestamp": time.monotonic()}
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+    
+    def clear(self):
+        """Limpiar cache"""
+        self.cache.clear()
+
+
 class SearchService:
     """Servicio principal de búsqueda avanzada"""
     
@@ -38,6 +110,13 @@ class SearchService:
         self.semantic_model_available = False
         self.fulltext_index_available = False
         self.executor = ThreadPoolExecutor(max_workers=4)
+        self.suggestion_index = SuggestionIndex()
+        self._suggestion_refresh_lock = threading.Lock()
+        self._suggestion_refresh_scheduled = False
+        self.vector_index = get_article_vector_index()
+        self.facet_cache = FacetCache(settings.SEARCH_FACETS_CACHE_TTL, settings.SEARCH_FACETS_CACHE_MAX_ENTRIES)
+        self.search_cache = get_search_cache()
+        self.term_dictionary = get_term_dictionary()
         
     async def advanced_search(
         self, 
@@ -48,11 +127,17 @@ class SearchService:
         offset: int = 0,
         semantic_search: bool = False,
         include_facets: bool = True,
-        db: Session = None
+        db: Session = None,
+        count_strategy: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Búsqueda avanzada con filtros múltiples y ordenamiento
         
+        Cada página (ids en orden y total) se cachea en Redis bajo la consulta y
+        los filtros normalizados, y se invalida cuando llegan artículos de sus
+        fuentes y días (ver app.core.search_cache).
+        
         Args:
             query: Término de búsqueda
             filters: Diccionario con filtros
@@ -62,81 +147,68 @@ class SearchService:
             semantic_search: Usar búsqueda semántica
             include_facets: Incluir facets para UI
             db: Sesión de base de datos
+            count_strategy: exact, estimated, capped o window (por defecto PAGINATION_COUNT_STRATEGY)
+            cursor: next_cursor de la página anterior (keyset); sustituye a offset
             
         Returns:
             Dict con resultados y metadatos
+            
+        Raises:
+            ValueError: Si el cursor no es válido para esta consulta, orden y filtros
         """
+        # El cursor solo vale para la misma consulta, orden y filtros
+        fingerprint = query_fingerprint(" ".join(query.lower().split()), filters)
+        after = KeysetCursor.decode(cursor, sort, fingerprint) if cursor else None
+        
         try:
             start_time = datetime.now()
-            
-            # Construir query base
-            articles_query = db.query(Article, Source).join(Source)
-            
-            # Aplicar filtros de texto
-            if query.strip():
-                articles_query = self._apply_text_search(articles_query, query, semantic_search)
-            
-            # Aplicar filtros de fecha
-            articles_query = self._apply_date_filters(articles_query, filters)
-            
-            # Aplicar filtros de fuentes
-            articles_query = self._apply_source_filters(articles_query, filters)
-            
-            # Aplicar filtros de sentimiento
-            articles_query = self._apply_sentiment_filters(articles_query, filters)
-            
-            # Aplicar filtros de relevancia
-            articles_query = self._apply_relevance_filters(articles_query, filters)
-            
-            # Aplicar filtros de sesgo
-            articles_query = self._apply_bias_filters(articles_query, filters)
-            
-            # Contar total antes de aplicar límites
-            total_query = articles_query.with_entities(func.count(Article.id))
-            total_count = total_query.scalar() or 0
-            
-            # Aplicar ordenamiento
-            articles_query = self._apply_sorting(articles_query, sort)
-            
-            # Aplicar límites y paginación
-            articles_query = articles_query.offset(offset).limit(limit)
-            
-            # Ejecutar query
-            results = articles_query.all()
-            
-            # Formatear resultados
-            formatted_results = []
-            for article, source in results:
-                formatted_result = {
-                    "id": str(article.id),
-                    "title": article.title,
-                    "content": article.content[:500] + "..." if article.content and len(article.content) > 500 else article.content,
-                    "summary": article.summary,
-                    "url": article.url,
-                    "source": source.name,
-                    "source_id": str(source.id),
-                    "published_at": article.published_at,
-                    "sentiment_score": article.sentiment_score,
-                    "sentiment_label": article.sentiment_label,
-                    "bias_score": article.bias_score,
-                    "topic_tags": article.topic_tags or [],
-                    "relevance_score": article.relevance_score,
-                    "ai_processed_at": article.ai_processed_at,
-                    "processing_status": article.processing_status.value if article.processing_status else None
-                }
-                formatted_results.append(formatted_result)
+            strategy = resolve_count_strategy(count_strategy)
+            if strategy == CountStrategy.WINDOW and after is not None:
+                # Tras el cursor la ventana solo vería las filas restantes
+                strategy = CountStrategy.EXACT
+            
+            # Páginas cacheadas: ids en orden y total, bajo la consulta y filtros normalizados
+            cache_key = self.search_cache.make_key(
+                query, filters, sort=sort, limit=limit, offset=offset, cursor=cursor,
+                semantic=semantic_search, count_strategy=strategy.value
+            )
+            page = await self.search_cache.lookup(cache_key)
+            filtered_query = None
+            
+            if page is not None:
+                formatted_results = await self._hydrate_page(page["ids"], db)
+            else:
+                # Construir query base con texto y filtros
+                filtered_query = self._build_filtered_query(query, filters, semantic_search, db)
+                formatted_results, page = self._execute_search(
+                    filtered_query, query, sort, limit, offset, after, strategy, fingerprint, db
+                )
+                # "Quizás quisiste decir" y términos relacionados del diccionario del corpus
+                # (se cachean con la página: un acierto de caché no toca la base de datos)
+                spelling = self._suggest_spelling(query, db)
+                page["did_you_mean"] = spelling["did_you_mean"]
+                page["related_terms"] = spelling["expansions"]
+                if self.search_cache.enabled:
+                    await self.search_cache.store(cache_key, page, self._search_cache_tags(filters, db))
+                    await self.search_cache.store_documents(formatted_results)
             
             # Obtener facets si se solicitan
             facets = {}
             if include_facets:
-                facets = await self._get_search_facets(query, filters, db)
+                facets = await self._get_search_facets(query, filters, db, filtered_query)
             
             search_time = (datetime.now() - start_time).total_seconds() * 1000
             
             return {
                 "results": formatted_results,
-                "total": total_count,
+                "total": page["total"],
+                "total_is_exact": page["total_is_exact"],
+                "total_display": page["total_display"],
+                "count_strategy": page["count_strategy"],
+                "next_cursor": page["next_cursor"],
                 "facets": facets,
+                "did_you_mean": page.get("did_you_mean"),
+                "related_terms": page.get("related_terms", []),
                 "search_time_ms": search_time,
                 "filters_applied": filters
             }
@@ -145,6 +217,96 @@ class SearchService:
             logger.error(f"Error en búsqueda avanzada: {str(e)}")
             raise SearchServiceError(f"Error en búsqueda: {str(e)}")
     
+    def _execute_search(
+        self,
+        filtered_query,
+        query: str,
+        sort: str,
+        limit: int,
+        offset: int,
+        after: Optional[List[Any]],
+        strategy: CountStrategy,
+        fingerprint: str,
+        db: Session
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Ejecutar la página de búsqueda: resultados formateados y página cacheable (ids, total, cursor)"""
+        count_statement = filtered_query.with_entities(Article.id).statement
+        sort_keys, descending = self._sort_keys(filtered_query, sort, query)
+        articles_query = QueryBuilder.add_keyset_columns(filtered_query, sort_keys)
+        
+        # Contar total antes de aplicar límites (window: en la misma consulta de la página)
+        if strategy == CountStrategy.WINDOW:
+            articles_query = add_window_count(articles_query)
+        else:
+            count = count_rows(db, count_statement, strategy)
+        
+        # Ordenar por (claves, id) y continuar tras el cursor (keyset) o saltar offset filas
+        articles_query = QueryBuilder.apply_keyset(articles_query, sort_keys, Article.id, descending, after)
+        if after is None:
+            articles_query = articles_query.offset(offset)
+        articles_query = articles_query.limit(limit)
+        
+        # Ejecutar query
+        results = articles_query.all()
+        if strategy == CountStrategy.WINDOW:
+            results, window_total = split_window_count(results)
+            count = window_count_result(db, count_statement, window_total, offset)
+        
+        next_cursor = None
+        if results and len(results) == limit:
+            last_article, _, *last_keys = results[-1]
+            next_cursor = KeysetCursor.encode(sort, fingerprint, [*last_keys, last_article.id])
+        
+        # Formatear resultados
+        formatted_results = [self._format_article(article, source) for article, source, *_ in results]
+        
+        page = {
+            "ids": [result["id"] for result in formatted_results],
+            "total": count.total,
+            "total_is_exact": count.is_exact,
+            "total_display": count.display,
+            "count_strategy": count.strategy.value,
+            "next_cursor": next_cursor
+        }
+        return formatted_results, page
+    
+    def _suggest_spelling(self, query: str, db: Session) -> Dict[str, Any]:
+        """Corrección y expansión de la consulta con la instantánea ya compilada del diccionario"""
+        if not query.strip():
+            return {"did_you_mean": None, "corrections": {}, "expansions": []}
+        
+        # La carga incremental va al hilo de fondo con su propia sesión: la
+        # petición no espera a leer artículos ni a compilar el diccionario
+        bind = db.get_bind()
+        self.term_dictionary.schedule_refresh(lambda: Session(bind=bind))
+        return self.term_dictionary.suggest(query)
+    
+    def _search_cache_tags(self, filters: Dict[str, Any], db: Session) -> List[str]:
+        """Etiquetas (fuente, día) de las que depende una página cacheada"""
+        source_ids = None
+        if filters.get('sources'):
+            # Fuentes inexistentes: cualquier fuente nueva con ese nombre invalida la página
+            source_ids = [
+                source_id for source_id, in db.query(Source.id).filter(Source.name.in_(filters['sources'])).all()
+            ] or None
+        return self.search_cache.search_tags(source_ids, filters.get('date_from'), filters.get('date_to'))
+    
+    async def _hydrate_page(self, article_ids: List[str], db: Session) -> List[Dict[str, Any]]:
+        """Documentos de una página cacheada: un MGET y una consulta solo para los que falten"""
+        documents = await self.search_cache.get_documents(article_ids)
+        
+        missing = [article_id for article_id in article_ids if article_id not in documents]
+        if missing:
+            rows = db.query(Article, Source).join(Source).filter(
+                Article.id.in_([uuid.UUID(article_id) for article_id in missing])
+            ).all()
+            loaded = [self._format_article(article, source) for article, source in rows]
+            await self.search_cache.store_documents(loaded)
+            documents.update((document["id"], document) for document in loaded)
+        
+        # Artículos borrados desde que se cacheó la página
+        return [documents[article_id] for article_id in article_ids if article_id in documents]
+    
     async def get_search_suggestions(
         self,
         query: str,
@@ -166,24 +328,28 @@ class SearchService:
             Lista de sugerencias con score
         """
         try:
-            suggestions = []
-            
             # Normalizar query
             normalized_query = query.lower().strip()
             
+            types = ['term']
             if include_sources:
-                # Sugerencias de fuentes
-                source_suggestions = await self._get_source_suggestions(normalized_query, db)
-                suggestions.extend(source_suggestions)
-            
+                types.append('source')
             if include_topics:
-                # Sugerencias de temas populares
-                topic_suggestions = await self._get_topic_suggestions(normalized_query, db)
-                suggestions.extend(topic_suggestions)
-            
-            # Sugerencias de términos comunes
-            term_suggestions = await self._get_term_suggestions(normalized_query, limit // 2, db)
-            suggestions.extend(term_suggestions)
+                types.append('topic')
+            
+            # Prefijos desde el índice en memoria (sin consultar la base de datos);
+            # si está caducado se recarga en segundo plano y se usa el anterior
+            self._schedule_suggestion_refresh(db)
+            suggestions = self.suggestion_index.search(normalized_query, limit, types)
+            
+            # Pocos resultados: completar con similitud de trigramas (errores de tecleo)
+            if len(suggestions) < limit and len(normalized_query) >= FUZZY_SUGGESTION_MIN_LENGTH:
+                seen = {(suggestion['text'], suggestion['type']) for suggestion in suggestions}
+                fuzzy_suggestions = await self._get_fuzzy_suggestions(normalized_query, limit, types, db)
+                suggestions.extend(
+                    suggestion for suggestion in fuzzy_suggestions
+                    if (suggestion['text'], suggestion['type']) not in seen
+                )
             
             # Ordenar por score y limitar
             suggestions.sort(key=lambda x: x['score'], reverse=True)
@@ -204,6 +370,10 @@ class SearchService:
         """
         Obtener búsquedas populares y trending
         
+        Primero las consultas más buscadas del timeframe (registro de consultas
+        agregado en Redis); si no llegan al límite se completan con los
+        trending topics de los artículos. Sin datos la lista queda vacía.
+        
         Args:
             timeframe: Período de tiempo (1h, 6h, 24h, 7d)
             limit: Número máximo de resultados
@@ -226,6 +396,12 @@ class SearchService:
             
             date_from = datetime.utcnow() - timeframe_map[timeframe]
             
+            # Búsquedas reales del timeframe (heavy hitters del registro de consultas)
+            formatted_trending = await get_trending_queries(timeframe, limit, min_count)
+            if len(formatted_trending) >= limit:
+                return formatted_trending
+            seen_queries = {entry["query"] for entry in formatted_trending}
+            
             # Obtener trending topics de la base de datos
             trending_query = db.query(
                 TrendingTopic.topic,
@@ -240,13 +416,14 @@ class SearchService:
                 )
             ).order_by(
                 desc(TrendingTopic.trend_score)
-            ).limit(limit)
+            ).limit(limit - len(formatted_trending))
             
             trending_results = trending_query.all()
             
             # Formatear resultados
-            formatted_trending = []
             for topic, article_count, sources_count, trend_score in trending_results:
+                if topic.lower() in seen_queries:
+                    continue
                 formatted_trending.append({
                     "query": topic,
                     "count": article_count,
@@ -255,17 +432,11 @@ class SearchService:
                     "timeframe": timeframe
                 })
             
-            # Si no hay datos suficientes, generar búsquedas de ejemplo
-            if len(formatted_trending) < 5:
-                example_trending = self._get_example_trending_searches()
-                formatted_trending.extend(example_trending[:limit - len(formatted_trending)])
-            
             return formatted_trending
             
         except Exception as e:
             logger.error(f"Error obteniendo búsquedas trending: {str(e)}")
-            # Devolver búsquedas de ejemplo como fallback
-            return self._get_example_trending_searches()
+            return []
     
     async def get_available_filters(self, db: Session = None) -> Dict[str, List[str]]:
         """
@@ -344,18 +515,51 @@ class SearchService:
             Resultados con scores de similitud
         """
         try:
-            # Por ahora, simular búsqueda semántica
-            # En una implementación real, usaríamos modelos como Sentence-BERT
-            results = await self._simulate_semantic_search(
-                query, context, limit, similarity_threshold, db
-            )
+            query_text = f"{query} {context}" if context else query
+            matches = self.vector_index.search(db, self.vector_index.embed_query(query_text), limit)
             
-            return results
+            return self._hydrate_matches(matches, similarity_threshold, db)
             
         except Exception as e:
             logger.error(f"Error en búsqueda semántica: {str(e)}")
             raise SearchServiceError(f"Error en búsqueda semántica: {str(e)}")
     
+    async def find_similar_articles(
+        self,
+        article_id: str,
+        limit: int = 10,
+        similarity_threshold: float = 0.0,
+        db: Session = None
+    ) -> Dict[str, Any]:
+        """
+        Artículos más parecidos a uno dado según sus embeddings
+        
+        Args:
+            article_id: ID del artículo de referencia
+            limit: Límite de resultados
+            similarity_threshold: Umbral de similitud
+            
+        Returns:
+            Resultados con scores de similitud (None si el artículo no existe)
+        """
+        try:
+            article = db.query(Article).filter(Article.id == article_id).first()
+            if article is None:
+                return None
+            
+            vector = self.vector_index.article_vector(db, article)
+            matches = [
+                (match_id, similarity)
+                for match_id, similarity in self.vector_index.search(db, vector, limit + 1)
+                if str(match_id) != str(article.id)
+            ]
+            
+            return self._hydrate_matches(matches[:limit], similarity_threshold, db)
+            
+        except Exception as e:
+            logger.error(f"Error buscando artículos similares: {str(e)}")
+            raise SearchServiceError(f"Error buscando artículos similares: {str(e)}")
+    
     async def get_search_stats(self, db: Session = None) -> Dict[str, Any]:
         """
         Obtener estadísticas del sistema de búsqueda
@@ -412,6 +616,75 @@ class SearchService:
             logger.error(f"Error obteniendo estadísticas: {str(e)}")
             raise SearchServiceError(f"Error obteniendo estadísticas: {str(e)}")
     
+    def rebuild_search_terms(self, db: Session) -> Dict[str, int]:
+        """
+        Regenerar el vocabulario de sugerencias (tabla search_terms)
+
+        Reúne fuentes (peso: artículos), trending topics (peso: score
+        máximo de la ventana) y los términos más frecuentes de los títulos
+        recientes (peso: artículos que los contienen, vía ts_stat).
+
+        Args:
+            db: Sesión de base de datos (PostgreSQL)
+
+        Returns:
+            Número de términos por tipo
+        """
+        if not self._is_postgres(db):
+            raise SearchServiceError("El vocabulario de sugerencias requiere PostgreSQL")
+
+        days = int(settings.SEARCH_TERMS_WINDOW_DAYS)
+        # ts_stat recibe la consulta como texto; days es un entero validado
+        title_vectors = (
+            "SELECT to_tsvector('simple', title) FROM articles "
+            f"WHERE published_at >= now() - interval '{days} days'"
+        )
+
+        try:
+            db.execute(text("DELETE FROM search_terms"))
+            db.execute(text("""
+                INSERT INTO search_terms (term, term_type, weight, updated_at)
+                SELECT s.name, 'source', count(a.id), now()
+                FROM sources s
+                LEFT JOIN articles a ON a.source_id = s.id
+                GROUP BY s.name
+            """))
+            db.execute(text("""
+                INSERT INTO search_terms (term, term_type, weight, updated_at)
+                SELECT left(topic, 255), 'topic', max(trend_score), now()
+                FROM trending_topics
+                WHERE date_recorded >= now() - make_interval(days => :days)
+                GROUP BY left(topic, 255)
+            """), {"days": days})
+            db.execute(text("""
+                INSERT INTO search_terms (term, term_type, weight, updated_at)
+                SELECT word, 'term', ndoc, now()
+                FROM ts_stat(:title_vectors)
+                WHERE ndoc >= :min_docs
+                  AND length(word) BETWEEN 3 AND 255
+                  AND word !~ '^[0-9]+$'
+                  AND to_tsvector('english', word) <> ''::tsvector
+                ORDER BY ndoc DESC
+                LIMIT :max_terms
+            """), {
+                "title_vectors": title_vectors,
+                "min_docs": settings.SEARCH_TERMS_MIN_DOCS,
+                "max_terms": settings.SEARCH_TERMS_MAX
+            })
+            counts = dict(db.execute(text(
+                "SELECT term_type, count(*) FROM search_terms GROUP BY term_type"
+            )).all())
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error regenerando vocabulario de sugerencias: {str(e)}")
+            raise SearchServiceError(f"Error regenerando vocabulario de sugerencias: {str(e)}")
+
+        # Forzar la recarga del índice en memoria de este proceso
+        self.suggestion_index.built_at = 0.0
+        logger.info(f"Vocabulario de sugerencias regenerado: {counts}")
+        return {term_type: counts.get(term_type, 0) for term_type in TYPE_PRIORITY}
+
     async def health_check(self) -> Dict[str, Any]:
         """
         Health check del servicio de búsqueda
@@ -441,12 +714,83 @@ class SearchService:
     
     # Métodos privados de utilidad
     
+    def _is_postgres(self, db: Session) -> bool:
+        """Si la sesión apunta a PostgreSQL"""
+        try:
+            return db.get_bind().dialect.name == 'postgresql'
+        except Exception:
+            return False
+    
+    def detect_fulltext_index(self, connection) -> bool:
+        """
+        Comprobar si la BD tiene articles.search_vector (migración 006 o create_all)
+        
+        Se ejecuta una vez al arrancar (con una conexión síncrona o vía run_sync);
+        las búsquedas solo leen el resultado.
+        """
+        try:
+            available = (
+                connection.dialect.name == 'postgresql'
+                and 'search_vector' in {column['name'] for column in inspect(connection).get_columns('articles')}
+            )
+        except Exception as e:
+            logger.warning(f"No se pudo comprobar el índice full-text: {str(e)}")
+            available = False
+        
+        self.fulltext_index_available = available
+        logger.info(f"Búsqueda full-text {'disponible' if available else 'no disponible, usando LIKE'}")
+        return available
+    
+    def _uses_fulltext(self, query) -> bool:
+        """Si la búsqueda usa articles.search_vector (detectado al arrancar, solo en Postgres)"""
+        return self.fulltext_index_available and self._is_postgres(query.session)
+    
+    def _fulltext_query(self, search_term: str):
+        """tsquery con sintaxis de buscador: "frase", OR, -excluir"""
+        return func.websearch_to_tsquery(FTS_CONFIG, search_term)
+    
+    def _build_filtered_query(
+        self,
+        query: str,
+        filters: Dict[str, Any],
+        semantic_search: bool,
+        db: Session
+    ):
+        """Query de artículos con búsqueda de texto y todos los filtros aplicados"""
+        articles_query = db.query(Article, Source).join(Source)
+        
+        # Aplicar filtros de texto
+        if query.strip():
+            articles_query = self._apply_text_search(articles_query, query, semantic_search)
+        
+        # Aplicar filtros de fecha
+        articles_query = self._apply_date_filters(articles_query, filters)
+        
+        # Aplicar filtros de fuentes
+        articles_query = self._apply_source_filters(articles_query, filters)
+        
+        # Aplicar filtros de sentimiento
+        articles_query = self._apply_sentiment_filters(articles_query, filters)
+        
+        # Aplicar filtros de relevancia
+        articles_query = self._apply_relevance_filters(articles_query, filters)
+        
+        # Aplicar filtros de sesgo
+        articles_query = self._apply_bias_filters(articles_query, filters)
+        
+        # Colapsar grupos de duplicados
+        return self._apply_duplicate_collapse(articles_query, filters)
+    
     def _apply_text_search(self, query, search_term: str, semantic: bool = False):
         """Aplicar filtros de búsqueda de texto"""
         if not search_term.strip():
             return query
         
-        # Búsqueda simple por términos
+        # Full-text search sobre el tsvector ponderado (índice GIN)
+        if self._uses_fulltext(query):
+            return query.filter(Article.search_vector.op('@@')(self._fulltext_query(search_term)))
+        
+        # Otros motores (SQLite en tests): búsqueda simple por términos
         search_pattern = f"%{search_term.lower()}%"
         
         text_filters = or_(
@@ -503,145 +847,314 @@ class SearchService:
         
         return query
     
-    def _apply_sorting(self, query, sort_field: str):
-        """Aplicar ordenamiento"""
+    def _apply_duplicate_collapse(self, query, filters: Dict[str, Any]):
+        """Dejar un solo artículo por grupo de duplicados"""
+        if filters.get('collapse_duplicates'):
+            query = query.filter(collapse_duplicate_groups(query.with_entities(Article.id)))
+        
+        return query
+    
+    def _sort_keys(self, query, sort_field: str, search_term: str = "") -> Tuple[List[Any], bool]:
+        """Claves de orden sin NULL (keyset) y si el orden es descendente"""
+        if sort_field == "relevance" and search_term.strip() and self._uses_fulltext(query):
+            # Relevancia respecto a la consulta: densidad de coincidencias ponderada por campo
+            text_rank = func.ts_rank_cd(
+                Article.search_vector, self._fulltext_query(search_term), FTS_RANK_NORMALIZATION,
+                type_=Float
+            )
+            return [text_rank, null_safe_sort_key(Article.relevance_score)], True
+        
         sort_map = {
-            "relevance": desc(Article.relevance_score),
-            "date": desc(Article.published_at),
-            "sentiment": desc(Article.sentiment_score),
-            "source": asc(Source.name),
-            "title": asc(Article.title)
+            "relevance": ([null_safe_sort_key(Article.relevance_score)], True),
+            "date": ([null_safe_sort_key(Article.published_at)], True),
+            "sentiment": ([null_safe_sort_key(Article.sentiment_score)], True),
+            "source": ([Source.name], False),
+            "title": ([Article.title], False)
         }
         
-        sort_order = sort_map.get(sort_field, desc(Article.relevance_score))
-        return query.order_by(sort_order)
+        return sort_map.get(sort_field, sort_map["relevance"])
+    
+    def _apply_sorting(self, query, sort_field: str, search_term: str = "", after: Optional[List[Any]] = None):
+        """Aplicar ordenamiento por (claves, id) y, con cursor, continuar tras la última fila"""
+        sort_keys, descending = self._sort_keys(query, sort_field, search_term)
+        return QueryBuilder.apply_keyset(query, sort_keys, Article.id, descending, after)
     
-    async def _get_search_facets(self, query: str, filters: Dict[str, Any], db: Session) -> Dict[str, Any]:
-        """Obtener facets para filtros de UI"""
+    async def _get_search_facets(
+        self,
+        query: str,
+        filters: Dict[str, Any],
+        db: Session,
+        filtered_query=None
+    ) -> Dict[str, Any]:
+        """
+        Obtener facets para filtros de UI
+
+        Fuentes, sentimiento, temas, histograma por día y tramos de sesgo salen
+        de una sola pasada sobre los artículos filtrados y se reutilizan durante
+        SEARCH_FACETS_CACHE_TTL segundos para la misma consulta y filtros.
+        """
+        cache_key = self.facet_cache.make_key(query, filters)
+        cached_facets = self.facet_cache.get(cache_key)
+        if cached_facets is not None:
+            return cached_facets
+
         try:
-            # Por ahora devolver facets vacíos
-            # En una implementación real, calcularíamos facets de los resultados
-            return {}
+            if filtered_query is None:
+                filtered_query = self._build_filtered_query(query, filters, False, db)
+
+            if self._is_postgres(db):
+                counts = self._count_facets_grouped(filtered_query)
+            else:
+                counts = self._count_facets_scan(filtered_query)
+
+            facets = self._format_facets(counts)
+            self.facet_cache.set(cache_key, facets)
+            return facets
         except Exception as e:
             logger.error(f"Error obteniendo facets: {str(e)}")
             return {}
+
+    def _facet_statement(self, filtered_query):
+        """
+        Consulta única de facets (PostgreSQL)
+
+        Una CTE con los artículos filtrados alimenta un GROUPING SETS para las
+        columnas escalares y, por UNION ALL, el conteo de topic_tags desanidados.
+        Devuelve filas (facet, valor, conteo).
+        """
+        rows = filtered_query.with_entities(
+            Source.name.label('source'),
+            Article.sentiment_label.label('sentiment'),
+            func.to_char(func.date_trunc('day', Article.published_at), 'YYYY-MM-DD').label('day'),
+            func.greatest(0, func.least(
+                func.floor(Article.bias_score * BIAS_FACET_BUCKETS), BIAS_FACET_BUCKETS - 1
+            )).label('bias_bucket'),
+            Article.topic_tags.label('topic_tags')
+        ).order_by(None).cte('facet_rows')
+
+        facet_name = case(
+            (func.grouping(rows.c.source) == 0, 'sources'),
+            (func.grouping(rows.c.sentiment) == 0, 'sentiment'),
+            (func.grouping(rows.c.day) == 0, 'dates'),
+            else_='bias'
+        )
+        # En cada grouping set las demás columnas son NULL
+        facet_value = func.coalesce(
+            rows.c.source, rows.c.sentiment, rows.c.day, cast(rows.c.bias_bucket, String)
+        )
+        grouped = select(
+            facet_name.label('facet'), facet_value.label('value'), func.count().label('count')
+        ).group_by(func.grouping_sets(
+            tuple_(rows.c.source), tuple_(rows.c.sentiment), tuple_(rows.c.day), tuple_(rows.c.bias_bucket)
+        ))
+
+        tags = select(func.json_array_elements_text(rows.c.topic_tags).label('tag')).where(
+            func.json_typeof(rows.c.topic_tags) == 'array'
+        ).subquery('facet_tags')
+        topics = select(
+            literal('topics').label('facet'), tags.c.tag.label('value'), func.count().label('count')
+        ).group_by(tags.c.tag)
+
+        return union_all(grouped, topics)
+
+    def _count_facets_grouped(self, filtered_query) -> Dict[str, Counter]:
+        """Conteos de facets en una sola consulta agrupada"""
+        counts = {name: Counter() for name in ('sources', 'sentiment', 'topics', 'dates', 'bias')}
+
+        for facet, value, count in filtered_query.session.execute(self._facet_statement(filtered_query)):
+            if value is None:
+                continue
+            if facet == 'bias':
+                value = int(float(value))
+            counts[facet][value] = count
+
+        return counts
+
+    def _count_facets_scan(self, filtered_query) -> Dict[str, Counter]:
+        """Conteos de facets recorriendo una vez los artículos filtrados (otros motores)"""
+        counts = {name: Counter() for name in ('sources', 'sentiment', 'topics', 'dates', 'bias')}
+        rows = filtered_query.with_entities(
+            Source.name, Article.sentiment_label, Article.published_at, Article.bias_score, Article.topic_tags
+        ).order_by(None)
+
+        for source_name, sentiment, published_at, bias_score, topic_tags in rows.yield_per(1000):
+            counts['sources'][source_name] += 1
+            if sentiment:
+                counts['sentiment'][sentiment] += 1
+            if published_at:
+                counts['dates'][published_at.strftime('%Y-%m-%d')] += 1
+            if bias_score is not None:
+                counts['bias'][min(max(int(bias_score * BIAS_FACET_BUCKETS), 0), BIAS_FACET_BUCKETS - 1)] += 1
+            if isinstance(topic_tags, list):
+                counts['topics'].update(str(tag) for tag in topic_tags)
+
+        return counts
+
+    def _format_facets(self, counts: Dict[str, Counter]) -> Dict[str, List[Dict[str, Any]]]:
+        """Facets en el formato de la UI: listas de {name, count}"""
+        def top_values(counter: Counter) -> List[Dict[str, Any]]:
+            ranked = sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+            return [{"name": name, "count": count} for name, count in ranked[:FACET_VALUES_LIMIT]]
+
+        bucket_width = 1.0 / BIAS_FACET_BUCKETS
+        return {
+            "sources": top_values(counts['sources']),
+            "sentiment": top_values(counts['sentiment']),
+            "topics": top_values(counts['topics']),
+            "date_histogram": [
+                {"name": day, "count": count} for day, count in sorted(counts['dates'].items())
+            ],
+            "bias": [
+                {
+                    "name": f"{bucket * bucket_width:.1f}-{(bucket + 1) * bucket_width:.1f}",
+                    "count": counts['bias'][bucket]
+                }
+                for bucket in sorted(counts['bias'])
+            ]
+        }
     
-    async def _get_source_suggestions(self, query: str, db: Session) -> List[Dict[str, Any]]:
-        """Obtener sugerencias de fuentes"""
+    def _schedule_suggestion_refresh(self, db: Session) -> bool:
+        """
+        Programar en segundo plano la recarga del índice de sugerencias si está desactualizado
+
+        No bloquea: mientras se recarga las sugerencias salen del índice anterior
+        (vacío hasta la primera carga).
+
+        Returns:
+            True si se programó una recarga
+        """
+        if not self.suggestion_index.is_stale(settings.SEARCH_SUGGESTIONS_REFRESH_SECONDS):
+            return False
+        with self._suggestion_refresh_lock:
+            if self._suggestion_refresh_scheduled:
+                return False
+            self._suggestion_refresh_scheduled = True
+
+        bind = db.get_bind()
+        self.executor.submit(self._refresh_suggestion_index, lambda: Session(bind=bind))
+        return True
+
+    def _refresh_suggestion_index(self, session_factory) -> None:
+        """Recarga del índice de sugerencias en el hilo de fondo, con una sesión propia"""
         try:
-            sources_query = db.query(Source.name).filter(
-                and_(
-                    Source.is_active == True,
-                    Source.name.ilike(f"%{query}%")
-                )
-            ).limit(5)
-            
-            suggestions = []
-            for source_name, in sources_query:
-                suggestions.append({
-                    "text": source_name,
-                    "type": "source",
-                    "score": 0.9
-                })
-            
-            return suggestions
+            started = time.perf_counter()
+            db = session_factory()
+            try:
+                self.suggestion_index.build(self._load_suggestion_entries(db))
+            finally:
+                db.close()
+            logger.info(
+                f"Índice de sugerencias cargado: {len(self.suggestion_index)} entradas "
+                f"en {(time.perf_counter() - started) * 1000:.0f}ms"
+            )
         except Exception as e:
-            logger.error(f"Error obteniendo sugerencias de fuentes: {str(e)}")
-            return []
-    
-    async def _get_topic_suggestions(self, query: str, db: Session) -> List[Dict[str, Any]]:
-        """Obtener sugerencias de temas"""
+            # Conservar el índice anterior y no reintentar en cada pulsación
+            self.suggestion_index.built_at = time.time()
+            logger.error(f"Error cargando índice de sugerencias: {str(e)}")
+        finally:
+            with self._suggestion_refresh_lock:
+                self._suggestion_refresh_scheduled = False
+
+    def _load_suggestion_entries(self, db: Session) -> List[Tuple[str, str, float]]:
+        """Leer el vocabulario de sugerencias como tuplas (texto, tipo, peso)"""
         try:
-            # Usar trending topics como sugerencias de temas
-            topics_query = db.query(TrendingTopic.topic).filter(
-                TrendingTopic.topic.ilike(f"%{query}%")
-            ).order_by(desc(TrendingTopic.trend_score)).limit(5)
-            
-            suggestions = []
-            for topic, in topics_query:
-                suggestions.append({
-                    "text": topic,
-                    "type": "topic",
-                    "score": 0.8
-                })
-            
-            return suggestions
+            entries = db.query(SearchTerm.term, SearchTerm.term_type, SearchTerm.weight).all()
+            if entries:
+                return [(term, term_type, weight or 0.0) for term, term_type, weight in entries]
         except Exception as e:
-            logger.error(f"Error obteniendo sugerencias de temas: {str(e)}")
+            db.rollback()
+            logger.warning(f"Tabla search_terms no disponible: {str(e)}")
+
+        # Sin vocabulario generado: fuentes y temas directamente
+        sources = db.query(Source.name, func.count(Article.id)).outerjoin(
+            Article, Article.source_id == Source.id
+        ).group_by(Source.name).all()
+        topics = db.query(TrendingTopic.topic, func.max(TrendingTopic.trend_score)).group_by(
+            TrendingTopic.topic
+        ).all()
+
+        return (
+            [(name, 'source', count or 0) for name, count in sources] +
+            [(topic, 'topic', score or 0.0) for topic, score in topics]
+        )
+
+    async def _get_fuzzy_suggestions(
+        self,
+        query: str,
+        limit: int,
+        types: List[str],
+        db: Session
+    ) -> List[Dict[str, Any]]:
+        """Sugerencias por similitud de trigramas (pg_trgm) para errores de tecleo"""
+        if not self._is_postgres(db):
             return []
-    
-    async def _get_term_suggestions(self, query: str, limit: int, db: Session) -> List[Dict[str, Any]]:
-        """Obtener sugerencias de términos comunes"""
+
         try:
-            # Términos comunes de ejemplo
-            common_terms = [
-                "artificial intelligence", "machine learning", "deep learning",
-                "technology", "innovation", "research", "startup", "AI",
-                "neural networks", "data science", "automation", "robotics"
+            similarity = func.similarity(func.lower(SearchTerm.term), query)
+            rows = db.query(SearchTerm.term, SearchTerm.term_type, similarity).filter(
+                and_(
+                    SearchTerm.term_type.in_(types),
+                    func.lower(SearchTerm.term).op('%')(query)
+                )
+            ).order_by(desc(similarity), desc(SearchTerm.weight)).limit(limit)
+
+            return [
+                {
+                    "text": term,
+                    "type": term_type,
+                    "score": round(TYPE_PRIORITY.get(term_type, 0.5) * float(score), 4)
+                }
+                for term, term_type, score in rows
             ]
-            
-            suggestions = []
-            for term in common_terms:
-                if query in term.lower():
-                    suggestions.append({
-                        "text": term,
-                        "type": "term",
-                        "score": 0.7
-                    })
-            
-            return suggestions[:limit]
         except Exception as e:
-            logger.error(f"Error obteniendo sugerencias de términos: {str(e)}")
+            db.rollback()
+            logger.error(f"Error obteniendo sugerencias por similitud: {str(e)}")
             return []
-    
-    async def _simulate_semantic_search(
-        self, query: str, context: Optional[str], limit: int, 
-        similarity_threshold: float, db: Session
+
+    def _hydrate_matches(
+        self, matches: List[Tuple[Any, float]], similarity_threshold: float, db: Session
     ) -> Dict[str, Any]:
-        """Simular búsqueda semántica (placeholder para implementación real)"""
-        try:
-            # Por ahora ejecutar búsqueda regular como fallback
-            filters = {}
-            if context:
-                # Extraer palabras clave del contexto
-                context_words = context.lower().split()[:5]
-                filters['keywords'] = context_words
-            
-            regular_results = await self.advanced_search(
-                query=query,
-                filters=filters,
-                limit=limit,
-                db=db
-            )
-            
-            # Agregar scores de similitud simulados
-            for i, result in enumerate(regular_results['results']):
-                similarity_score = max(0.3, 1.0 - (i * 0.1))  # Scores decrecientes
-                result['similarity_score'] = similarity_score
-            
-            avg_similarity = sum(r.get('similarity_score', 0) for r in regular_results['results']) / len(regular_results['results'])
-            
-            regular_results['avg_similarity'] = avg_similarity
-            return regular_results
-            
-        except Exception as e:
-            logger.error(f"Error simulando búsqueda semántica: {str(e)}")
+        """Cargar los artículos de (id, similitud) del índice semántico en su orden"""
+        matches = [(article_id, similarity) for article_id, similarity in matches if similarity >= similarity_threshold]
+        if not matches:
             return {"results": [], "total": 0, "avg_similarity": 0.0}
+        
+        rows = db.query(Article, Source).join(Source).filter(
+            Article.id.in_([article_id for article_id, _ in matches])
+        ).all()
+        by_id = {str(article.id): (article, source) for article, source in rows}
+        
+        results = []
+        for article_id, similarity in matches:
+            # Artículos borrados desde la carga del índice
+            if str(article_id) not in by_id:
+                continue
+            result = self._format_article(*by_id[str(article_id)])
+            result['similarity_score'] = round(similarity, 4)
+            results.append(result)
+        
+        avg_similarity = sum(result['similarity_score'] for result in results) / len(results) if results else 0.0
+        return {"results": results, "total": len(results), "avg_similarity": avg_similarity}
     
-    def _get_example_trending_searches(self) -> List[Dict[str, Any]]:
-        """Obtener búsquedas trending de ejemplo"""
-        return [
-            {"query": "artificial intelligence", "count": 45, "trend_score": 0.95, "timeframe": "24h"},
-            {"query": "machine learning", "count": 38, "trend_score": 0.87, "timeframe": "24h"},
-            {"query": "chatgpt", "count": 32, "trend_score": 0.82, "timeframe": "24h"},
-            {"query": "openai", "count": 29, "trend_score": 0.78, "timeframe": "24h"},
-            {"query": "deep learning", "count": 25, "trend_score": 0.73, "timeframe": "24h"},
-            {"query": "neural networks", "count": 22, "trend_score": 0.68, "timeframe": "24h"},
-            {"query": "automation", "count": 19, "trend_score": 0.63, "timeframe": "24h"},
-            {"query": "robotics", "count": 17, "trend_score": 0.59, "timeframe": "24h"},
-            {"query": "data science", "count": 15, "trend_score": 0.54, "timeframe": "24h"},
-            {"query": "computer vision", "count": 13, "trend_score": 0.49, "timeframe": "24h"}
-        ]
+    def _format_article(self, article: Article, source: Source) -> Dict[str, Any]:
+        """Artículo en el formato de los resultados de búsqueda"""
+        return {
+            "id": str(article.id),
+            "title": article.title,
+            "content": article.content[:500] + "..." if article.content and len(article.content) > 500 else article.content,
+            "summary": article.summary,
+            "url": article.url,
+            "source": source.name,
+            "source_id": str(source.id),
+            "published_at": article.published_at,
+            "sentiment_score": article.sentiment_score,
+            "sentiment_label": article.sentiment_label,
+            "bias_score": article.bias_score,
+            "topic_tags": article.topic_tags or [],
+            "relevance_score": article.relevance_score,
+            "ai_processed_at": article.ai_processed_at,
+            "processing_status": article.processing_status.value if article.processing_status else None
+        }
     
     def _get_default_filters(self) -> Dict[str, List[str]]:
         """Obtener filtros por defecto cuando hay errores"""
@@ -1,15 +1,19 @@
 # Tareas de Celery para procesamiento asíncrono
 from .article_tasks import analyze_article_async
-from .batch_tasks import batch_analyze_articles, process_pending_analyses
+from .batch_tasks import batch_analyze_articles, process_pending_analyses, poll_offline_batch
 from .classification_tasks import classify_topics_batch
 from .summary_tasks import generate_summaries_batch
 from .news_tasks import fetch_latest_news
 from .monitoring import clean_old_task_results
 
+# Los workers también confirman artículos: registrar la invalidación del cache de búsqueda
+from app.utils import search_cache_invalidation  # noqa: F401
+
 __all__ = [
     'analyze_article_async',
     'batch_analyze_articles', 
     'process_pending_analyses',
+    'poll_offline_batch',
     'classify_topics_batch',
     'generate_summaries_batch',
     'fetch_latest_news',
@@ -11,6 +11,9 @@ from loguru import logger
 
 from celery_app import celery_app
 from app.core.config import settings
+from app.core.search_cache import get_search_cache
+from app.db.database import task_session_maker
+from app.services.ai_batch import BatchJob, OfflineBatchAnalyzer, apply_batch_results, finish_batch_task
 from app.services.news_service import NewsClientError
 
 
@@ -41,7 +44,8 @@ def batch_analyze_articles(
     articles: List[Dict[str, Any]], 
     analysis_type: str = 'comprehensive',
     batch_size: int = 5,
-    max_workers: int = 3
+    max_workers: int = 3,
+    offline: bool = False
 ) -> Dict[str, Any]:
     """
     Analizar múltiples artículos en lotes usando análisis asíncrono
@@ -51,6 +55,8 @@ def batch_analyze_articles(
         analysis_type: Tipo de análisis a aplicar
         batch_size: Tamaño del lote para procesamiento
         max_workers: Máximo número de workers concurrentes
+        offline: Enviar los artículos a la Batch API del proveedor en lugar de
+            analizarlos ahora; los resultados se aplican a ArticleAnalysis al terminar
         
     Returns:
         Dict con resultados del procesamiento en lote
@@ -68,6 +74,17 @@ def batch_analyze_articles(
                 'processing_time': time.time() - start_time
             }
         
+        if offline:
+            job = submit_offline_batch(articles, analysis_type)
+            return {
+                'status': 'submitted',
+                'total_articles': len(articles),
+                'batch_job': job.to_dict(),
+                'analysis_type': analysis_type,
+                'processing_time': time.time() - start_time,
+                'task_id': self.request.id
+            }
+        
         # Dividir artículos en lotes
         batches = _create_batches(articles, batch_size)
         total_batches = len(batches)
@@ -135,6 +152,139 @@ def batch_analyze_articles(
         }
 
 
+def submit_offline_batch(
+    articles: List[Dict[str, Any]],
+    analysis_type: str = 'comprehensive',
+    analysis_task_id: Optional[str] = None
+) -> BatchJob:
+    """
+    Enviar artículos a la Batch API y programar el seguimiento del lote
+    
+    Args:
+        articles: Artículos con 'id' y 'content'
+        analysis_type: comprehensive, sentiment o basic
+        analysis_task_id: AnalysisTask a cerrar cuando el lote termine
+        
+    Returns:
+        Job del lote enviado
+    """
+    job = OfflineBatchAnalyzer().submit(articles, analysis_type)
+    _schedule_poll(job, analysis_task_id)
+    logger.info(f"📦 Lote offline {job.job_id} enviado con {len(job.article_ids)} artículos")
+    return job
+
+
+@celery_app.task(
+    bind=True,
+    name='app.tasks.batch_tasks.poll_offline_batch',
+    queue='ai_analysis'
+)
+def poll_offline_batch(self, job_data: Dict[str, Any], analysis_task_id: Optional[str] = None,
+                       poll_errors: int = 0) -> Dict[str, Any]:
+    """
+    Consultar un lote offline y aplicar sus resultados cuando termine
+    
+    Mientras el lote siga en curso la tarea se vuelve a programar cada
+    AI_BATCH_POLL_SECONDS; pasado AI_BATCH_MAX_WAIT_SECONDS se da por fallido.
+    Los errores al consultar, descargar o aplicar el lote (red, OpenAI, BD) se
+    reintentan en la siguiente consulta; tras AI_BATCH_MAX_POLL_ERRORS errores
+    seguidos el lote falla, sus artículos quedan failed y la AnalysisTask se cierra.
+    
+    Args:
+        job_data: BatchJob serializado con to_dict
+        analysis_task_id: AnalysisTask a cerrar con el resultado
+        poll_errors: Errores seguidos en consultas anteriores
+        
+    Returns:
+        Dict con el estado del lote y los contadores aplicados
+    """
+    start_time = time.time()
+    analyzer = OfflineBatchAnalyzer()
+    job = BatchJob.from_dict(job_data)
+    
+    try:
+        job = analyzer.poll(job)
+        
+        if job.is_pending:
+            if time.time() - job.submitted_at < settings.AI_BATCH_MAX_WAIT_SECONDS:
+                _schedule_poll(job, analysis_task_id)
+                return {'status': 'pending', 'batch_job': job.to_dict(), 'task_id': self.request.id}
+            job.status = 'expired'
+        
+        if job.status != 'completed':
+            error = f"Lote {job.provider_batch_id} terminado con estado {job.status}"
+            logger.error(f"❌ {error}")
+            _fail_offline_batch(job, analysis_task_id, error)
+            return {'status': 'error', 'error_message': error, 'batch_job': job.to_dict(), 'task_id': self.request.id}
+        
+        results, errors = analyzer.collect(job)
+        
+        def apply(db):
+            stats = apply_batch_results(db, results, errors)
+            if analysis_task_id:
+                finish_batch_task(db, analysis_task_id, job, stats)
+            return stats
+        
+        stats = asyncio.run(_run_with_session(apply))
+        
+    except Exception as e:
+        poll_errors += 1
+        expired = time.time() - job.submitted_at >= settings.AI_BATCH_MAX_WAIT_SECONDS
+        if poll_errors < settings.AI_BATCH_MAX_POLL_ERRORS and not expired:
+            logger.warning(f"⚠️ Error consultando el lote offline {job.job_id} ({poll_errors}), se reintentará: {str(e)}")
+            _schedule_poll(job, analysis_task_id, poll_errors)
+            return {'status': 'retrying', 'error_message': str(e), 'batch_job': job.to_dict(), 'task_id': self.request.id}
+        
+        error = f"Lote {job.provider_batch_id} sin procesar tras {poll_errors} errores: {str(e)}"
+        logger.error(f"❌ {error}")
+        _fail_offline_batch(job, analysis_task_id, error)
+        return {'status': 'error', 'error_message': error, 'batch_job': job.to_dict(), 'task_id': self.request.id}
+    
+    logger.info(f"✅ Lote offline {job.job_id} aplicado: {stats}")
+    
+    return {
+        'status': 'completed',
+        'batch_job': job.to_dict(),
+        'statistics': stats,
+        'errors': errors if len(errors) <= 50 else len(errors),
+        'processing_time': time.time() - start_time,
+        'task_id': self.request.id
+    }
+
+
+def _schedule_poll(job: BatchJob, analysis_task_id: Optional[str], poll_errors: int = 0) -> None:
+    """Programar la siguiente consulta del lote"""
+    poll_offline_batch.apply_async(
+        args=[job.to_dict(), analysis_task_id, poll_errors],
+        countdown=settings.AI_BATCH_POLL_SECONDS
+    )
+
+
+def _fail_offline_batch(job: BatchJob, analysis_task_id: Optional[str], error: str) -> Optional[Dict[str, int]]:
+    """Marcar como fallidos los artículos del lote y cerrar su AnalysisTask"""
+    def fail(db):
+        stats = apply_batch_results(db, {}, {article_id: error for article_id in job.article_ids})
+        if analysis_task_id:
+            finish_batch_task(db, analysis_task_id, job, stats, error)
+        return stats
+    
+    try:
+        return asyncio.run(_run_with_session(fail))
+    except Exception as e:
+        logger.error(f"❌ No se pudo registrar el fallo del lote offline {job.job_id}: {str(e)}")
+        return None
+
+
+async def _run_with_session(func, *args):
+    """Ejecutar una función síncrona de BD con una sesión"""
+    try:
+        async with task_session_maker() as session:
+            return await session.run_sync(func, *args)
+    finally:
+        # Esperar las invalidaciones del cache de búsqueda antes de cerrar el loop
+        await get_search_cache().close()
+
+
 def _create_batches(items: List[Any], batch_size: int) -> List[List[Any]]:
     """Crear lotes de artículos para procesamiento"""
     batches = []
@@ -4,13 +4,24 @@ Maneja la obtención automática de noticias de múltiples fuentes
 """
 
 import time
-from typing import Dict, Any, List, Optional
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
 from celery import Task
 from loguru import logger
 
 from celery_app import celery_app
 from app.core.config import settings
+from app.core.http_client import get_http_transport
+from app.core.redis_cache import loop_cache_managers
+from app.core.response_cache import get_response_cache
+from app.core.search_cache import get_search_cache
+from app.db.database import task_session_maker
 from app.services.news_service import NewsService, NewsClientError
+from app.services.search_service import SearchService
+from app.utils.deduplication import DuplicateDetector
+from app.utils.duplicate_clustering import DuplicateClusterer
+from app.utils.semantic_index import get_article_vector_index
+from app.utils.query_log import get_query_log_aggregator
 
 
 class NewsFetchingTask(Task):
@@ -78,79 +89,18 @@ def fetch_latest_news(
         if not client_types:
             raise NewsClientError("No hay clientes válidos especificados")
         
-        # Obtener noticias de cada fuente
-        all_articles = []
-        fetch_results = {}
-        
-        for client_type in client_types:
-            try:
-                logger.info(f"📡 Obteniendo noticias de {client_type}")
-                
-                # Crear cliente específico
-                client = news_service.factory.create_client(client_type)
-                
-                # Obtener noticias (método async - usar asyncio.run)
-                import asyncio
-                articles = asyncio.run(client.get_latest_news(limit_per_source))
-                
-                # Agregar metadata del cliente
-                for article in articles:
-                    article['fetch_task_id'] = self.request.id
-                    article['client_type'] = client_type
-                    article['fetched_at'] = time.time()
-                
-                all_articles.extend(articles)
-                fetch_results[client_type] = {
-                    'success': True,
-                    'articles_count': len(articles),
-                    'error': None
-                }
-                
-                logger.info(f"✅ {client_type}: {len(articles)} artículos obtenidos")
-                
-            except Exception as e:
-                logger.error(f"❌ Error obteniendo noticias de {client_type}: {str(e)}")
-                fetch_results[client_type] = {
-                    'success': False,
-                    'articles_count': 0,
-                    'error': str(e)
-                }
-                continue
-        
-        # Aplicar filtros si se especificaron
-        filtered_articles = all_articles
-        filters_applied = []
-        
-        if sources:
-            original_count = len(filtered_articles)
-            filtered_articles = [
-                article for article in filtered_articles
-                if any(source.lower() in article.get('source_name', '').lower() 
-                      for source in sources)
-            ]
-            filters_applied.append(f"fuentes: {sources} ({original_count} → {len(filtered_articles)})")
-        
-        if categories:
-            original_count = len(filtered_articles)
-            filtered_articles = [
-                article for article in filtered_articles
-                if any(category.lower() in article.get('source_id', '').lower() 
-                      for category in categories)
-            ]
-            filters_applied.append(f"categorías: {categories} ({original_count} → {len(filtered_articles)})")
-        
-        # Eliminar duplicados por URL
-        seen_urls = set()
-        unique_articles = []
-        duplicates_removed = 0
-        
-        for article in filtered_articles:
-            url = article.get('url', '')
-            if url and url not in seen_urls:
-                seen_urls.add(url)
-                unique_articles.append(article)
-            else:
-                duplicates_removed += 1
+        # Obtener, filtrar y deduplicar en un único event loop: los proveedores se
+        # consultan a la vez, así que el ciclo dura lo que el más lento
+        cycle = asyncio.run(_run_fetch_cycle(
+            news_service, client_types, limit_per_source, sources, categories, self.request.id
+        ))
+        all_articles = cycle['all_articles']
+        filtered_articles = cycle['filtered_articles']
+        unique_articles = cycle['unique_articles']
+        duplicates = cycle['duplicates']
+        fetch_results = cycle['fetch_results']
+        filters_applied = cycle['filters_applied']
+        duplicates_removed = len(filtered_articles) - len(unique_articles)
         
         # Ordenar por fecha de publicación (más recientes primero)
         unique_articles.sort(
@@ -172,9 +122,13 @@ def fetch_latest_news(
                 'after_filters': len(filtered_articles),
                 'after_dedup': len(unique_articles),
                 'duplicates_removed': duplicates_removed,
+                'duplicates_by_type': _count_duplicate_types(duplicates),
                 'sources_used': client_types,
                 'processing_time': processing_time,
-                'avg_time_per_source': processing_time / len(client_types) if client_types else 0
+                'avg_time_per_source': processing_time / len(client_types) if client_types else 0,
+                'slowest_source_time': max(
+                    (fetch_result['elapsed'] for fetch_result in fetch_results.values()), default=0
+                )
             },
             'metadata': {
                 'task_id': self.request.id,
@@ -226,6 +180,123 @@ def fetch_latest_news(
         }
 
 
+async def _run_fetch_cycle(
+    news_service: NewsService,
+    client_types: List[str],
+    limit_per_source: int,
+    sources: Optional[List[str]],
+    categories: Optional[List[str]],
+    task_id: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Ciclo completo de obtención: proveedores en paralelo, filtros y deduplicación
+    
+    Los proveedores que fallan o agotan su timeout se reportan en fetch_results
+    sin descartar los artículos de los demás. Los watermarks avanzados se
+    guardan al final, cuando el ciclo ya deduplicó los artículos: si algo falla
+    antes, el siguiente ciclo vuelve a obtenerlos.
+    """
+    try:
+        # Solo lo publicado desde el watermark de cada proveedor
+        results_by_client = await news_service.fetch_latest_by_client(
+            limit_per_source, client_types, incremental=settings.NEWS_INCREMENTAL_FETCH
+        )
+        
+        all_articles = []
+        fetch_results = {}
+        fetched_at = time.time()
+        for client_type, client_result in results_by_client.items():
+            articles = client_result['articles']
+            
+            # Agregar metadata del cliente
+            for article in articles:
+                article['fetch_task_id'] = task_id
+                article['fetched_at'] = fetched_at
+            
+            all_articles.extend(articles)
+            fetch_results[client_type] = {
+                'success': client_result['error'] is None,
+                'articles_count': len(articles),
+                'error': client_result['error'],
+                'elapsed': client_result['elapsed'],
+                'response_cache': get_response_cache().get_stats(client_type),
+                'watermark': client_result['watermark']
+            }
+            
+            if client_result['error'] is None:
+                logger.info(f"✅ {client_type}: {len(articles)} artículos obtenidos en {client_result['elapsed']:.2f}s")
+            else:
+                logger.error(f"❌ Error obteniendo noticias de {client_type}: {client_result['error']}")
+        
+        # Aplicar filtros si se especificaron
+        filtered_articles = all_articles
+        filters_applied = []
+        
+        if sources:
+            original_count = len(filtered_articles)
+            filtered_articles = [
+                article for article in filtered_articles
+                if any(source.lower() in article.get('source_name', '').lower() 
+                      for source in sources)
+            ]
+            filters_applied.append(f"fuentes: {sources} ({original_count} → {len(filtered_articles)})")
+        
+        if categories:
+            original_count = len(filtered_articles)
+            filtered_articles = [
+                article for article in filtered_articles
+                if any(category.lower() in article.get('source_id', '').lower() 
+                      for category in categories)
+            ]
+            filters_applied.append(f"categorías: {categories} ({original_count} → {len(filtered_articles)})")
+        
+        # Eliminar duplicados del lote completo (URL normalizada, hash de contenido,
+        # título similar) y contra los artículos ya almacenados, en una sola pasada
+        articles_with_url = [article for article in filtered_articles if article.get('url')]
+        unique_articles, duplicates = await _deduplicate_batch(articles_with_url)
+        
+        await news_service.save_watermarks(results_by_client)
+        
+        return {
+            'all_articles': all_articles,
+            'filtered_articles': filtered_articles,
+            'unique_articles': unique_articles,
+            'duplicates': duplicates,
+            'fetch_results': fetch_results,
+            'filters_applied': filters_applied
+        }
+    finally:
+        # El event loop termina con el ciclo: cerrar sus conexiones agrupadas
+        # (después de deduplicar y guardar los watermarks, que usan Redis)
+        await get_http_transport().close()
+        await get_response_cache().close()
+
+
+async def _deduplicate_batch(articles: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Deduplicar un lote de artículos obtenidos con DuplicateDetector.split_unique_batch
+    
+    Usa una sesión de BD para comparar contra la ventana almacenada; si la BD no
+    está disponible, deduplica solo dentro del lote.
+    """
+    detector = DuplicateDetector()
+    
+    try:
+        async with task_session_maker() as session:
+            return await session.run_sync(detector.split_unique_batch, articles)
+    except Exception as e:
+        logger.warning(f"⚠️ Deduplicación contra BD no disponible, solo dentro del lote: {str(e)}")
+        return detector.split_unique_batch(None, articles)
+
+
+def _count_duplicate_types(duplicates: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Contar duplicados eliminados por tipo de coincidencia"""
+    counts: Dict[str, int] = {}
+    for duplicate in duplicates:
+        counts[duplicate['duplicate_type']] = counts.get(duplicate['duplicate_type'], 0) + 1
+    return counts
+
+
 @celery_app.task(
     bind=True,
     name='app.tasks.news_tasks.search_news_task',
@@ -430,4 +501,239 @@ def schedule_continuous_fetch(
             'status': 'error',
             'error_message': str(e),
             'scheduled_at': time.time()
-        }
\ No newline at end of file
+        }
+
+
+@celery_app.task(
+    bind=True,
+    name='app.tasks.news_tasks.cluster_duplicate_articles',
+    base=NewsFetchingTask,
+    queue='maintenance'
+)
+def cluster_duplicate_articles(self, minutes: int = 30, batch_size: int = 200) -> Dict[str, Any]:
+    """
+    Agrupar artículos recientes con sus duplicados (duplicate_group_id)
+    
+    Args:
+        minutes: Antigüedad máxima de los artículos a revisar (solapa con la
+                 ejecución anterior; reagrupar es idempotente)
+        batch_size: Artículos por lote
+        
+    Returns:
+        Dict con estadísticas de la agrupación
+    """
+    start_time = time.time()
+    clusterer = DuplicateClusterer()
+    
+    async def run_with_session():
+        try:
+            async with task_session_maker() as session:
+                return await session.run_sync(clusterer.cluster_recent, minutes, batch_size)
+        finally:
+            # Esperar las invalidaciones del cache de búsqueda antes de cerrar el loop
+            await get_search_cache().close()
+    
+    try:
+        stats = asyncio.run(run_with_session())
+        logger.info(f"🔗 Grupos de duplicados actualizados: {stats}")
+        
+        return {
+            'status': 'success',
+            'statistics': stats,
+            'processing_time': time.time() - start_time,
+            'task_id': self.request.id
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error agrupando duplicados: {str(e)}")
+        
+        return {
+            'status': 'error',
+            'error_message': str(e),
+            'processing_time': time.time() - start_time,
+            'task_id': self.request.id
+        }
+
+
+@celery_app.task(
+    bind=True,
+    name='app.tasks.news_tasks.prune_lsh_index',
+    base=NewsFetchingTask,
+    queue='maintenance'
+)
+def prune_lsh_index(self) -> Dict[str, Any]:
+    """
+    Eliminar las claves LSH (article_lsh_bands) anteriores a la ventana de deduplicación
+    
+    Returns:
+        Dict con el número de claves eliminadas
+    """
+    start_time = time.time()
+    detector = DuplicateDetector()
+    
+    async def run_with_session():
+        async with task_session_maker() as session:
+            return await session.run_sync(detector.prune_lsh_index)
+    
+    try:
+        deleted = asyncio.run(run_with_session())
+        logger.info(f"🧹 Índice LSH podado: {deleted} claves eliminadas")
+        
+        return {
+            'status': 'success',
+            'deleted_keys': deleted,
+            'processing_time': time.time() - start_time,
+            'task_id': self.request.id
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error podando índice LSH: {str(e)}")
+        
+        return {
+            'status': 'error',
+            'error_message': str(e),
+            'processing_time': time.time() - start_time,
+            'task_id': self.request.id
+        }
+
+
+@celery_app.task(
+    bind=True,
+    name='app.tasks.news_tasks.refresh_search_terms',
+    base=NewsFetchingTask,
+    queue='maintenance'
+)
+def refresh_search_terms(self) -> Dict[str, Any]:
+    """
+    Regenerar el vocabulario de autocompletado (tabla search_terms)
+    
+    Returns:
+        Dict con el número de términos por tipo
+    """
+    start_time = time.time()
+    search_service = SearchService()
+    
+    async def run_with_session():
+        try:
+            async with task_session_maker() as session:
+                return await session.run_sync(search_service.rebuild_search_terms)
+        finally:
+            # Esperar las invalidaciones del cache de búsqueda antes de cerrar el loop
+            await get_search_cache().close()
+    
+    try:
+        counts = asyncio.run(run_with_session())
+        logger.info(f"🔤 Vocabulario de sugerencias regenerado: {counts}")
+        
+        return {
+            'status': 'success',
+            'terms': counts,
+            'processing_time': time.time() - start_time,
+            'task_id': self.request.id
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error regenerando vocabulario de sugerencias: {str(e)}")
+        
+        return {
+            'status': 'error',
+            'error_message': str(e),
+            'processing_time': time.time() - start_time,
+            'task_id': self.request.id
+        }
+
+
+@celery_app.task(
+    bind=True,
+    name='app.tasks.news_tasks.backfill_article_embeddings',
+    base=NewsFetchingTask,
+    queue='maintenance'
+)
+def backfill_article_embeddings(self) -> Dict[str, Any]:
+    """
+    Calcular los vectores semánticos de los artículos que no los tienen
+    (tras aplicar la migración o cambiar SEMANTIC_EMBEDDING_BACKEND)
+    
+    Returns:
+        Dict con el número de artículos indexados
+    """
+    start_time = time.time()
+    vector_index = get_article_vector_index()
+    
+    async def run_with_session():
+        try:
+            async with task_session_maker() as session:
+                return await session.run_sync(vector_index.backfill)
+        finally:
+            # Esperar las invalidaciones del cache de búsqueda antes de cerrar el loop
+            await get_search_cache().close()
+    
+    try:
+        indexed = asyncio.run(run_with_session())
+        logger.info(f"🧭 Vectores semánticos calculados: {indexed} artículos")
+        
+        return {
+            'status': 'success',
+            'indexed_articles': indexed,
+            'processing_time': time.time() - start_time,
+            'task_id': self.request.id
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error calculando vectores semánticos: {str(e)}")
+        
+        return {
+            'status': 'error',
+            'error_message': str(e),
+            'processing_time': time.time() - start_time,
+            'task_id': self.request.id
+        }
+
+
+@celery_app.task(
+    bind=True,
+    name='app.tasks.news_tasks.aggregate_search_queries',
+    base=NewsFetchingTask,
+    queue='maintenance'
+)
+def aggregate_search_queries(self) -> Dict[str, Any]:
+    """
+    Agregar las consultas de búsqueda registradas en el stream de Redis
+    (sketches por hora y top de búsquedas por timeframe para /search/trending)
+    
+    Returns:
+        Dict con las consultas procesadas
+    """
+    start_time = time.time()
+    aggregator = get_query_log_aggregator()
+    
+    async def run_aggregation():
+        try:
+            return await aggregator.aggregate()
+        finally:
+            # El event loop termina con la tarea: esperar las invalidaciones del
+            # cache de búsqueda y cerrar su conexión de Redis
+            await get_search_cache().close()
+            await loop_cache_managers.close()
+    
+    try:
+        stats = asyncio.run(run_aggregation())
+        logger.info(f"📈 Consultas de búsqueda agregadas: {stats}")
+        
+        return {
+            'status': stats.get('status', 'success'),
+            'processed_queries': stats.get('processed', 0),
+            'buckets': stats.get('buckets', 0),
+            'processing_time': time.time() - start_time,
+            'task_id': self.request.id
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error agregando consultas de búsqueda: {str(e)}")
+        
+        return {
+            'status': 'error',
+            'error_message': str(e),
+            'processing_time': time.time() - start_time,
+            'task_id': self.request.id
+        }
@@ -11,6 +11,7 @@ from sqlalchemy import and_, desc, func, text
 
 from app.db.models import Article, Source, TrendingTopic, UserPreference
 from app.tasks.monitoring import monitor_task
+from app.utils.query_log import get_query_summary
 
 logger = logging.getLogger(__name__)
 
@@ -257,6 +258,9 @@ async def get_search_analytics(db: Session) -> Dict[str, Any]:
     """
     Obtener analytics de búsquedas para análisis de tendencias
     
+    Combina los trending topics de los artículos con las búsquedas más
+    frecuentes de cada timeframe (ver app.utils.query_log).
+    
     Args:
         db: Sesión de base de datos
         
@@ -293,6 +297,11 @@ async def get_search_analytics(db: Session) -> Dict[str, Any]:
             ]
             
             analytics[f'top_topics_{timeframe}'] = top_topics
+            
+            # Búsquedas más frecuentes y volumen (registro de consultas agregado)
+            summary = await get_query_summary(timeframe)
+            analytics[f'top_searches_{timeframe}'] = summary.get('queries', [])[:10]
+            analytics[f'search_volume_{timeframe}'] = summary.get('total', 0)
         
         # Analytics por categoría
         category_stats = db.query(
@@ -48,8 +48,26 @@ class DeduplicationConfig:
     CONTENT_ANALYSIS = {
         'extract_sentences': 5,       # Número de oraciones para análisis
         'min_sentence_length': 3,     # Palabras mínimas por oración
-        'hash_algorithm': 'md5',      # Algoritmo para hash de contenido
+        'hash_algorithm': 'sha256',   # Algoritmo para hash de contenido
         'feature_similarity_threshold': 0.6,
+        'similarity_workers': 1,      # Hilos de rapidfuzz.cdist (-1 = todos los núcleos)
+    }
+    
+    # Configuración del índice MinHash/LSH para búsqueda de candidatos
+    LSH_INDEX = {
+        'enabled': True,
+        'num_perm': 128,              # Número de permutaciones MinHash
+        'bands': 32,                  # Bandas LSH (num_perm / bands filas por banda)
+        'shingle_size': 5,            # Tamaño de shingles de caracteres
+        'content_sentences': 3,       # Oraciones iniciales del contenido a indexar
+        'seed': 1,                    # Semilla fija: firmas estables entre reinicios
+        'simhash_max_distance': 3,    # Distancia de Hamming máxima (bandas = k + 1)
+        'simhash_shingle_words': 3,   # Palabras por shingle de SimHash
+    }
+    
+    # Cache en memoria de títulos limpios y características de contenido
+    FEATURE_CACHE = {
+        'max_items': 50000,           # Entradas LRU (título y contenido por separado)
     }
     
     @classmethod
@@ -66,6 +84,8 @@ class DeduplicationConfig:
             'temporal': cls.TEMPORAL_CONFIG,
             'fuzzy_matching': cls.FUZZY_MATCHING,
             'content_analysis': cls.CONTENT_ANALYSIS,
+            'lsh_index': cls.LSH_INDEX,
+            'feature_cache': cls.FEATURE_CACHE,
         }
 
 
@@ -0,0 +1,167 @@
+"""
+Estrategias de conteo para listados paginados
+Sobre conjuntos filtrados grandes el COUNT(*) exacto cuesta más que la página:
+- exact: COUNT(*) sobre la consulta filtrada
+- estimated: filas estimadas por el planificador de PostgreSQL (EXPLAIN, que
+  parte de pg_class.reltuples y las estadísticas de columnas)
+- capped: cuenta como mucho `cap` filas y responde "10,000+"
+- window: count(*) OVER() en la misma consulta de la página
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Etiqueta de la columna count(*) OVER() añadida a la consulta de la página
+TOTAL_COUNT_LABEL = "total_count"
+
+
+class CountStrategy(str, Enum):
+    """Forma de calcular el total de un listado"""
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    CAPPED = "capped"
+    WINDOW = "window"
+
+
+@dataclass
+class CountResult:
+    """Total de un listado y cómo se obtuvo"""
+    total: int
+    strategy: CountStrategy
+    is_exact: bool = True
+
+    @property
+    def display(self) -> str:
+        """Total para mostrar: "1,234", "10,000+" o "~1,234" """
+        if self.is_exact:
+            return f"{self.total:,}"
+        if self.strategy == CountStrategy.CAPPED:
+            return f"{self.total:,}+"
+        return f"~{self.total:,}"
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) de una consulta, con sus parámetros enlazados"""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def resolve_count_strategy(value: Optional[str]) -> CountStrategy:
+    """
+    Estrategia pedida o la configurada por defecto
+
+    Raises:
+        ValueError: Si la estrategia no existe
+    """
+    return CountStrategy(value or settings.PAGINATION_COUNT_STRATEGY)
+
+
+def estimate_rows(session: Session, statement: Select) -> Optional[int]:
+    """Filas estimadas por el planificador, o None si no hay estimación (otros motores)"""
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+
+    try:
+        plan = session.execute(_Explain(statement.order_by(None))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning(f"No se pudo estimar el número de filas: {e}")
+        return None
+
+
+def count_rows(
+    session: Session,
+    statement: Select,
+    strategy: CountStrategy = CountStrategy.EXACT,
+    cap: Optional[int] = None
+) -> CountResult:
+    """
+    Contar las filas de una consulta filtrada
+
+    Args:
+        session: Sesión síncrona (con AsyncSession, vía run_sync)
+        statement: Consulta filtrada, idealmente solo con la clave primaria
+        strategy: Estrategia de conteo; WINDOW cuenta aquí de forma exacta
+        cap: Máximo de filas contadas con CAPPED (PAGINATION_COUNT_CAP por defecto)
+
+    Returns:
+        CountResult con el total y la estrategia aplicada
+    """
+    statement = statement.order_by(None)
+
+    if strategy == CountStrategy.ESTIMATED:
+        estimate = estimate_rows(session, statement)
+        if estimate is not None:
+            return CountResult(estimate, CountStrategy.ESTIMATED, is_exact=False)
+        # Sin planificador: el tope acota el coste igual que la estimación
+        strategy = CountStrategy.CAPPED
+
+    if strategy == CountStrategy.CAPPED:
+        cap = cap or settings.PAGINATION_COUNT_CAP
+        counted = session.execute(
+            select(func.count()).select_from(statement.limit(cap + 1).subquery())
+        ).scalar() or 0
+        return CountResult(min(counted, cap), CountStrategy.CAPPED, is_exact=counted <= cap)
+
+    total = session.execute(select(func.count()).select_from(statement.subquery())).scalar() or 0
+    return CountResult(total, strategy)
+
+
+def add_window_count(query):
+    """Añadir count(*) OVER() a la consulta de la página (Select o Query)"""
+    return query.add_columns(func.count().over().label(TOTAL_COUNT_LABEL))
+
+
+def split_window_count(rows: Sequence[Any]) -> Tuple[List[Tuple[Any, ...]], Optional[int]]:
+    """
+    Separar la columna count(*) OVER() de las filas de la página
+
+    Returns:
+        (filas sin la columna de conteo, total o None si la página está vacía)
+    """
+    if not rows:
+        return [], None
+    return [tuple(row)[:-1] for row in rows], rows[0][-1]
+
+
+def window_count_result(
+    session: Session,
+    statement: Select,
+    total: Optional[int],
+    offset: int
+) -> CountResult:
+    """
+    Total de una página contada con count(*) OVER()
+
+    Una página vacía no trae la columna de conteo: con offset 0 el total es 0 y
+    más allá del final se cuenta aparte.
+    """
+    if total is not None:
+        return CountResult(total, CountStrategy.WINDOW)
+    if not offset:
+        return CountResult(0, CountStrategy.WINDOW)
+    return count_rows(session, statement, CountStrategy.WINDOW)
@@ -4,38 +4,139 @@ Implementa algoritmos para detectar artículos duplicados por:
 - Similaridad del título (fuzzy matching)
 - URL
 - Contenido
+Los candidatos por título y contenido se obtienen del índice MinHash/LSH
+persistente (lsh_index) y solo estos pasan por la comparación fuzzy exacta.
+Las copias casi idénticas del contenido se detectan por huella SimHash
+(distancia de Hamming <= k) sin re-extraer características.
 """
 
 import re
 import hashlib
-from typing import List, Dict, Optional, Tuple, Set
+import threading
+from collections import defaultdict, OrderedDict
+from typing import Any, Callable, List, Dict, Optional, Tuple, Set
 from datetime import datetime, timedelta
 from urllib.parse import urlparse, urljoin
 from difflib import SequenceMatcher
 
+import numpy as np
 from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz as rapid_fuzz, process as rapid_process
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func
+from sqlalchemy import and_, or_, desc, func, event
 from loguru import logger
 
 from ..db.models import Article, Source
+from .config import DeduplicationConfig
+from .lsh_index import (
+    ArticleLSHIndex, TITLE_FIELD, CONTENT_FIELD,
+    to_signed64, to_unsigned64, hamming_distance
+)
+
+
+# Stopwords básicas y patrones de limpieza (compilados una sola vez)
+_STOPWORDS = frozenset({
+    'el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'es', 'se', 'no', 'te', 'lo',
+    'le', 'da', 'su', 'por', 'son', 'con', 'para', 'al', 'del', 'los', 'las', 'the',
+    'of', 'and', 'a', 'in', 'to', 'is', 'it', 'you', 'that', 'he', 'was', 'for', 'on',
+    'are', 'as', 'with', 'his', 'they', 'i', 'at', 'be', 'this', 'have', 'from'
+})
+_SPECIAL_CHARS_PATTERN = re.compile(r'[^\w\s]')
+_SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]+')
+
+
+class ComparisonFeatureCache:
+    """
+    LRU acotada en memoria con los títulos limpios y las características de
+    contenido de artículos almacenados, indexada por (id, updated_at) para que
+    una edición del artículo invalide su entrada
+    """
+    
+    def __init__(self, max_items: int = 50000):
+        """
+        Inicializar la cache
+        
+        Args:
+            max_items: Número máximo de entradas (título y contenido cuentan por separado)
+        """
+        self.max_items = max_items
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_or_compute(self, kind: str, article: Article, compute: Callable[[], Any]) -> Any:
+        """Devuelve el valor cacheado del artículo o lo calcula y lo guarda"""
+        key = (kind, article.id, article.updated_at)
+        
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+        
+        value = compute()
+        
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        
+        return value
+    
+    def clear(self) -> None:
+        """Vacía la cache y reinicia las estadísticas"""
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de uso de la cache"""
+        total = self.hits + self.misses
+        return {
+            'items': len(self._items),
+            'max_items': self.max_items,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+
+# Cache compartida por todos los detectores del proceso
+feature_cache = ComparisonFeatureCache(max_items=DeduplicationConfig.FEATURE_CACHE['max_items'])
 
 
 class DuplicateDetector:
     """Detector inteligente de artículos duplicados"""
     
-    def __init__(self, similarity_threshold: float = 0.85, max_age_days: int = 7):
+    def __init__(self, similarity_threshold: float = 0.85, max_age_days: int = 7,
+                 use_lsh_index: Optional[bool] = None,
+                 cache: Optional[ComparisonFeatureCache] = None):
         """
         Inicializar el detector de duplicados
         
         Args:
             similarity_threshold: Umbral de similaridad (0.0 a 1.0)
             max_age_days: Días máximo a considerar para deduplicación
+            use_lsh_index: Usar el índice MinHash/LSH para obtener candidatos
+                           (por defecto según DeduplicationConfig.LSH_INDEX)
+            cache: Cache de títulos limpios y características (por defecto la
+                   compartida del proceso)
         """
         self.similarity_threshold = similarity_threshold
         self.max_age_days = max_age_days
         self.min_title_length = 10
         
+        if use_lsh_index is None:
+            use_lsh_index = DeduplicationConfig.LSH_INDEX['enabled']
+        self.lsh_index = ArticleLSHIndex() if use_lsh_index else None
+        self.content_index_sentences = DeduplicationConfig.LSH_INDEX['content_sentences']
+        self.feature_cache = cache if cache is not None else feature_cache
+        self.similarity_workers = DeduplicationConfig.CONTENT_ANALYSIS['similarity_workers']
+        
     def detect_duplicates(self, db: Session, new_article: Dict) -> List[Dict]:
         """
         Detecta artículos duplicados en la base de datos
@@ -73,6 +174,222 @@ class DuplicateDetector:
             logger.error(f"Error detectando duplicados: {str(e)}")
             return []
     
+    def detect_duplicates_batch(self, db: Optional[Session], articles: List[Dict]) -> List[List[Dict]]:
+        """
+        Detecta duplicados de un lote completo de artículos en una sola pasada
+        
+        Primero agrupa los duplicados dentro del lote (URL normalizada, content_hash
+        y título similar) y después consulta la ventana almacenada una única vez
+        para todo el lote.
+        
+        Args:
+            db: Sesión de base de datos (None para deduplicar solo dentro del lote)
+            articles: Lista de diccionarios con datos de artículos nuevos
+            
+        Returns:
+            Lista alineada con `articles` con los duplicados de cada artículo, en el
+            formato de detect_duplicates. Los duplicados dentro del lote llevan
+            'batch_index' (posición del artículo representativo) y 'article' es su dict.
+        """
+        results = [[] for _ in articles]
+        if not articles:
+            return results
+        
+        batch_keys = [self._batch_article_keys(article) for article in articles]
+        self._cluster_batch(articles, batch_keys, results)
+        
+        if db is not None:
+            try:
+                self._match_batch_against_store(db, batch_keys, results)
+            except Exception as e:
+                logger.error(f"Error consultando duplicados almacenados del lote: {str(e)}")
+        
+        results = [self._deduplicate_results(duplicates) for duplicates in results]
+        
+        duplicated = sum(1 for duplicates in results if duplicates)
+        logger.info(f"Lote de {len(articles)} artículos: {duplicated} con duplicados")
+        return results
+    
+    def split_unique_batch(self, db: Optional[Session], 
+                           articles: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Separa un lote en artículos únicos y duplicados (mismo criterio que is_duplicate)
+        
+        Returns:
+            Tupla (unique_articles, duplicates) donde cada duplicado es
+            {'article': dict, 'reason': str, 'duplicate_type': str}
+        """
+        unique_articles = []
+        duplicates = []
+        
+        for article, article_duplicates in zip(articles, self.detect_duplicates_batch(db, articles)):
+            is_duplicate, reason = self._evaluate_duplicates(article_duplicates)
+            if is_duplicate:
+                duplicates.append({
+                    'article': article,
+                    'reason': reason,
+                    'duplicate_type': article_duplicates[0]['duplicate_type']
+                })
+            else:
+                unique_articles.append(article)
+        
+        return unique_articles, duplicates
+    
+    def _batch_article_keys(self, article: Dict) -> Dict:
+        """Calcula una vez las claves de comparación de un artículo del lote"""
+        url = article.get('url') or ''
+        title = article.get('title') or ''
+        content = article.get('content') or ''
+        
+        content_hash = self._generate_content_hash(content) if content.strip() else article.get('content_hash')
+        
+        clean_title = ''
+        title_keys = []
+        if len(title.strip()) >= self.min_title_length:
+            clean_title = self._clean_text_for_comparison(title)
+            if self.lsh_index:
+                title_keys = self.lsh_index.band_keys(clean_title, TITLE_FIELD)
+        
+        return {
+            'url': url,
+            'normalized_url': self._normalize_url(url),
+            'content_hash': content_hash,
+            'clean_title': clean_title,
+            'title_keys': title_keys,
+        }
+    
+    def _cluster_batch(self, articles: List[Dict], batch_keys: List[Dict], 
+                       results: List[List[Dict]]) -> None:
+        """Agrupa duplicados dentro del lote; el primero de cada grupo es el representativo"""
+        representative = list(range(len(articles)))
+        url_owner: Dict[str, int] = {}
+        hash_owner: Dict[str, int] = {}
+        band_members: Dict[str, List[int]] = defaultdict(list)
+        titled: List[int] = []
+        
+        for i, keys in enumerate(batch_keys):
+            matches = []
+            
+            if keys['normalized_url'] and keys['normalized_url'] in url_owner:
+                matches.append((url_owner[keys['normalized_url']], 'batch_url', 1.0, 'URL idéntica en el lote'))
+            
+            if keys['content_hash'] and keys['content_hash'] in hash_owner:
+                matches.append((hash_owner[keys['content_hash']], 'batch_content_hash', 1.0,
+                                'Contenido idéntico en el lote'))
+            
+            if keys['clean_title']:
+                if self.lsh_index:
+                    candidates = {j for key in keys['title_keys'] for j in band_members.get(key, ())}
+                else:
+                    candidates = titled
+                for j in candidates:
+                    score = self._title_similarity(keys['clean_title'], batch_keys[j]['clean_title'])
+                    if score >= self.similarity_threshold:
+                        matches.append((j, 'batch_title', score, f'Título similar en el lote ({score:.2f})'))
+            
+            if matches:
+                best = max(matches, key=lambda match: match[2])
+                representative[i] = representative[best[0]]
+            
+            for j, duplicate_type, score, reason in matches:
+                owner = representative[j]
+                results[i].append({
+                    'article': articles[owner],
+                    'batch_index': owner,
+                    'duplicate_type': duplicate_type,
+                    'similarity_score': score,
+                    'match_reason': reason
+                })
+            
+            # Registrar claves apuntando al representativo del grupo
+            owner = representative[i]
+            if keys['normalized_url']:
+                url_owner.setdefault(keys['normalized_url'], owner)
+            if keys['content_hash']:
+                hash_owner.setdefault(keys['content_hash'], owner)
+            if keys['clean_title']:
+                titled.append(i)
+                for key in keys['title_keys']:
+                    band_members[key].append(i)
+    
+    def _match_batch_against_store(self, db: Session, batch_keys: List[Dict], 
+                                   results: List[List[Dict]]) -> None:
+        """Compara todo el lote contra la ventana almacenada con una consulta de artículos"""
+        window_start = self._window_start()
+        
+        urls = {value for keys in batch_keys for value in (keys['url'], keys['normalized_url']) if value}
+        hashes = {keys['content_hash'] for keys in batch_keys if keys['content_hash']}
+        
+        conditions = []
+        ids_by_band: Dict[str, Set] = {}
+        if self.lsh_index:
+            all_title_keys = [key for keys in batch_keys for key in keys['title_keys']]
+            ids_by_band = self.lsh_index.query_many(db, all_title_keys, window_start)
+            candidate_ids = set().union(*ids_by_band.values()) if ids_by_band else set()
+            if candidate_ids:
+                conditions.append(Article.id.in_(candidate_ids))
+        elif any(keys['clean_title'] for keys in batch_keys):
+            conditions.append(Article.title.isnot(None))
+        if urls:
+            conditions.append(Article.url.in_(urls))
+        if hashes:
+            conditions.append(Article.content_hash.in_(hashes))
+        
+        if not conditions:
+            return
+        
+        stored_articles = db.query(Article).filter(
+            and_(Article.created_at >= window_start, or_(*conditions))
+        ).all()
+        
+        by_url = defaultdict(list)
+        by_hash = defaultdict(list)
+        by_id = {}
+        for article in stored_articles:
+            by_url[self._normalize_url(article.url)].append(article)
+            if article.content_hash:
+                by_hash[article.content_hash].append(article)
+            by_id[article.id] = article
+        
+        for i, keys in enumerate(batch_keys):
+            url_matches = by_url.get(keys['normalized_url'], []) if keys['normalized_url'] else []
+            for article in url_matches:
+                results[i].append({
+                    'article': article,
+                    'duplicate_type': 'url_exact',
+                    'similarity_score': 1.0,
+                    'match_reason': 'URL idéntica'
+                })
+            
+            hash_matches = by_hash.get(keys['content_hash'], []) if keys['content_hash'] else []
+            for article in hash_matches:
+                results[i].append({
+                    'article': article,
+                    'duplicate_type': 'content_hash',
+                    'similarity_score': 1.0,
+                    'match_reason': 'Hash de contenido idéntico'
+                })
+            
+            if not keys['clean_title']:
+                continue
+            if self.lsh_index:
+                candidate_ids = {aid for key in keys['title_keys'] for aid in ids_by_band.get(key, ())}
+            else:
+                candidate_ids = by_id.keys()
+            
+            for article_id in candidate_ids:
+                article = by_id.get(article_id)
+                if article is None or not article.title:
+                    continue
+                score = self._title_similarity(keys['clean_title'], self._article_clean_title(article))
+                if score >= self.similarity_threshold:
+                    results[i].append({
+                        'article': article,
+                        'duplicate_type': 'title_similar',
+                        'similarity_score': score,
+                        'match_reason': f'Título similar ({score:.2f})'
+                    })
+    
     def _find_url_duplicates(self, db: Session, url: str) -> List[Dict]:
         """Encuentra duplicados por URL exacta"""
         if not url:
@@ -100,30 +417,30 @@ class DuplicateDetector:
         if not title or len(title.strip()) < self.min_title_length:
             return []
             
-        # Buscar artículos recientes
-        recent_articles = db.query(Article).filter(
-            and_(
-                Article.created_at >= datetime.utcnow() - timedelta(days=self.max_age_days),
-                Article.title.isnot(None)
+        clean_title = self._clean_text_for_comparison(title)
+        
+        # Candidatos: colisiones LSH o, sin índice, todos los artículos recientes
+        recent_filter = and_(
+            Article.created_at >= self._window_start(),
+            Article.title.isnot(None)
+        )
+        if self.lsh_index:
+            candidate_ids = self.lsh_index.query(
+                db, self.lsh_index.band_keys(clean_title, TITLE_FIELD), self._window_start()
             )
-        ).all()
+            if not candidate_ids:
+                return []
+            recent_filter = and_(recent_filter, Article.id.in_(candidate_ids))
+        
+        recent_articles = db.query(Article).filter(recent_filter).all()
         
         title_duplicates = []
-        clean_title = self._clean_text_for_comparison(title)
         
         for article in recent_articles:
             if not article.title:
                 continue
                 
-            article_clean_title = self._clean_text_for_comparison(article.title)
-            
-            # Usar múltiples algoritmos de fuzzy matching
-            ratio_score = fuzz.ratio(clean_title, article_clean_title) / 100.0
-            partial_score = fuzz.partial_ratio(clean_title, article_clean_title) / 100.0
-            token_sort_score = fuzz.token_sort_ratio(clean_title, article_clean_title) / 100.0
-            
-            # Usar el mejor score
-            max_score = max(ratio_score, partial_score, token_sort_score)
+            max_score = self._title_similarity(clean_title, self._article_clean_title(article))
             
             if max_score >= self.similarity_threshold:
                 title_duplicates.append({
@@ -142,33 +459,46 @@ class DuplicateDetector:
             
         # Extraer características del contenido (primeras oraciones)
         content_features = self._extract_content_features(content)
-        if len(content_features) < 10:
+        if not self._has_enough_features(content_features):
             return []
             
         # Buscar artículos con contenido sustancial
-        recent_articles = db.query(Article).filter(
-            and_(
-                Article.created_at >= datetime.utcnow() - timedelta(days=self.max_age_days),
-                func.length(Article.content) >= 100  # Solo artículos con contenido sustancial
-            )
-        ).all()
-        
+        recent_filter = and_(
+            Article.created_at >= self._window_start(),
+            func.length(Article.content) >= 100  # Solo artículos con contenido sustancial
+        )
         content_duplicates = []
-        new_article_hash = self._generate_content_hash(content_features)
-        
+        if self.lsh_index:
+            # Copias casi idénticas: SimHash sin comparar texto almacenado
+            content_duplicates = self._find_simhash_duplicates(db, self._content_simhash(content))
+            matched_ids = {duplicate['article'].id for duplicate in content_duplicates}
+            
+            candidate_ids = self.lsh_index.query(
+                db, self._content_band_keys(content_features), self._window_start()
+            ) - matched_ids
+            if not candidate_ids:
+                return content_duplicates
+            recent_filter = and_(recent_filter, Article.id.in_(candidate_ids))
+        
+        recent_articles = db.query(Article).filter(recent_filter).all()
+        
+        candidates = []
+        candidate_features = []
         for article in recent_articles:
             if not article.content or len(article.content.strip()) < 100:
                 continue
                 
-            article_features = self._extract_content_features(article.content)
-            if len(article_features) < 10:
+            article_features = self._article_content_features(article)
+            if not self._has_enough_features(article_features):
                 continue
-                
-            article_hash = self._generate_content_hash(article_features)
-            
-            # Comparar características del contenido
-            similarity = self._calculate_content_similarity(content_features, article_features)
             
+            candidates.append(article)
+            candidate_features.append(article_features)
+        
+        # Comparar características del contenido con todos los candidatos a la vez
+        similarities = self._calculate_content_similarities(content_features, candidate_features)
+        
+        for article, similarity in zip(candidates, similarities):
             if similarity >= 0.7:  # Umbral más bajo para contenido
                 content_duplicates.append({
                     'article': article,
@@ -179,6 +509,149 @@ class DuplicateDetector:
         
         return content_duplicates
     
+    def _find_simhash_duplicates(self, db: Session, fingerprint: Optional[int]) -> List[Dict]:
+        """Encuentra artículos cuya huella SimHash está a distancia de Hamming <= k"""
+        candidate_ids = self.lsh_index.query(
+            db, self.lsh_index.simhash_band_keys(fingerprint), self._window_start()
+        )
+        if not candidate_ids:
+            return []
+        
+        candidates = db.query(Article).filter(
+            and_(Article.id.in_(candidate_ids), Article.simhash.isnot(None))
+        ).all()
+        
+        duplicates = []
+        for article in candidates:
+            distance = hamming_distance(fingerprint, to_unsigned64(article.simhash))
+            if distance <= self.lsh_index.simhash_max_distance:
+                similarity = 1.0 - distance / 64.0
+                duplicates.append({
+                    'article': article,
+                    'duplicate_type': 'content_simhash',
+                    'similarity_score': similarity,
+                    'match_reason': f'Contenido casi idéntico (SimHash, distancia {distance})'
+                })
+        
+        return duplicates
+    
+    def _content_simhash(self, content: str) -> Optional[int]:
+        """Huella SimHash (sin signo) del contenido limpio"""
+        if not content or not self.lsh_index:
+            return None
+        return self.lsh_index.simhasher.fingerprint(self._clean_text_for_comparison(content).split())
+    
+    def _title_similarity(self, clean_title1: str, clean_title2: str) -> float:
+        """Similitud entre títulos limpios: mejor score de varios algoritmos fuzzy"""
+        ratio_score = fuzz.ratio(clean_title1, clean_title2) / 100.0
+        partial_score = fuzz.partial_ratio(clean_title1, clean_title2) / 100.0
+        token_sort_score = fuzz.token_sort_ratio(clean_title1, clean_title2) / 100.0
+        
+        return max(ratio_score, partial_score, token_sort_score)
+    
+    def _window_start(self) -> datetime:
+        """Fecha mínima de creación de artículos a considerar"""
+        return datetime.utcnow() - timedelta(days=self.max_age_days)
+    
+    def _has_enough_features(self, features: List[str]) -> bool:
+        """Verifica que las características sumen al menos 10 palabras clave"""
+        return sum(len(feature.split()) for feature in features) >= 10
+    
+    def _content_band_keys(self, features: List[str]) -> List[str]:
+        """Claves LSH de las primeras oraciones del contenido"""
+        return self.lsh_index.band_keys(
+            ' '.join(features[:self.content_index_sentences]), CONTENT_FIELD
+        )
+    
+    def index_article(self, db, article: Article) -> int:
+        """
+        Agrega un artículo guardado al índice MinHash/LSH
+        
+        Args:
+            db: Sesión o conexión de base de datos
+            article: Artículo ya persistido (con id asignado)
+            
+        Returns:
+            Número de claves de banda insertadas
+        """
+        if not self.lsh_index or article.id is None:
+            return 0
+        
+        # Calculadas una vez al guardar; quedan en la cache para comparaciones futuras
+        band_keys = []
+        if article.title and len(article.title.strip()) >= self.min_title_length:
+            band_keys.extend(self.lsh_index.band_keys(self._article_clean_title(article), TITLE_FIELD))
+        
+        if article.content and len(article.content.strip()) >= 100:
+            features = self._article_content_features(article)
+            if self._has_enough_features(features):
+                band_keys.extend(self._content_band_keys(features))
+                
+                if article.simhash is None:
+                    article.simhash = self._signed_simhash(article.content)
+                if article.simhash is not None:
+                    band_keys.extend(self.lsh_index.simhash_band_keys(to_unsigned64(article.simhash)))
+        
+        return self.lsh_index.add(db, article.id, band_keys, article.created_at)
+    
+    def _signed_simhash(self, content: str) -> Optional[int]:
+        """Huella SimHash en el rango de la columna BIGINT"""
+        fingerprint = self._content_simhash(content)
+        return to_signed64(fingerprint) if fingerprint is not None else None
+    
+    def rebuild_lsh_index(self, db: Session, batch_size: int = 500) -> int:
+        """
+        Reconstruye el índice LSH para la ventana de deduplicación actual
+        (necesario tras aplicar la migración o cambiar los parámetros LSH)
+        
+        Returns:
+            Número de artículos indexados
+        """
+        if not self.lsh_index:
+            return 0
+        
+        try:
+            window_start = self._window_start()
+            self.lsh_index.clear(db)
+            
+            indexed = 0
+            articles = db.query(Article).filter(
+                Article.created_at >= window_start
+            ).yield_per(batch_size)
+            
+            for article in articles:
+                self.index_article(db, article)
+                indexed += 1
+            
+            db.commit()
+            logger.info(f"Índice LSH reconstruido: {indexed} artículos indexados")
+            return indexed
+            
+        except Exception as e:
+            logger.error(f"Error reconstruyendo índice LSH: {str(e)}")
+            db.rollback()
+            raise
+    
+    def prune_lsh_index(self, db: Session) -> int:
+        """
+        Elimina las claves LSH de artículos fuera de la ventana de deduplicación
+        (las consultas ya no las leen; tarea periódica prune_lsh_index)
+        
+        Returns:
+            Número de claves eliminadas
+        """
+        if not self.lsh_index:
+            return 0
+        
+        try:
+            deleted = self.lsh_index.prune(db, self._window_start())
+            db.commit()
+            return deleted
+        except Exception as e:
+            logger.error(f"Error podando índice LSH: {str(e)}")
+            db.rollback()
+            raise
+    
     def _deduplicate_results(self, duplicates: List[Dict]) -> List[Dict]:
         """Elimina duplicados de los resultados de detección"""
         seen_article_ids = set()
@@ -188,33 +661,39 @@ class DuplicateDetector:
         duplicates.sort(key=lambda x: x['similarity_score'], reverse=True)
         
         for duplicate in duplicates:
-            article_id = duplicate['article'].id
+            if 'batch_index' in duplicate:
+                article_id = ('batch', duplicate['batch_index'])
+            else:
+                article_id = duplicate['article'].id
             if article_id not in seen_article_ids:
                 seen_article_ids.add(article_id)
                 final_duplicates.append(duplicate)
         
         return final_duplicates
     
+    def _article_clean_title(self, article: Article) -> str:
+        """Título limpio de un artículo almacenado (cacheado por id y updated_at)"""
+        return self.feature_cache.get_or_compute(
+            'title', article, lambda: self._clean_text_for_comparison(article.title)
+        )
+    
+    def _article_content_features(self, article: Article) -> List[str]:
+        """Características de contenido de un artículo almacenado (cacheadas)"""
+        return self.feature_cache.get_or_compute(
+            'content', article, lambda: self._extract_content_features(article.content)
+        )
+    
     def _clean_text_for_comparison(self, text: str) -> str:
         """Limpia texto para comparación fuzzy"""
         if not text:
             return ""
             
-        # Convertir a minúsculas
-        text = text.lower()
-        
-        # Remover caracteres especiales y normalizar espacios
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
+        # Convertir a minúsculas y remover caracteres especiales
+        # (split() normaliza los espacios)
+        words = _SPECIAL_CHARS_PATTERN.sub(' ', text.lower()).split()
         
         # Remover palabras muy comunes (stopwords básicas)
-        stopwords = {'el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'es', 'se', 'no', 'te', 'lo', 
-                    'le', 'da', 'su', 'por', 'son', 'con', 'para', 'al', 'del', 'los', 'las', 'the', 
-                    'of', 'and', 'a', 'in', 'to', 'is', 'it', 'you', 'that', 'he', 'was', 'for', 'on',
-                    'are', 'as', 'with', 'his', 'they', 'i', 'at', 'be', 'this', 'have', 'from'}
-        
-        words = text.split()
-        words = [word for word in words if word not in stopwords and len(word) > 2]
+        words = [word for word in words if word not in _STOPWORDS and len(word) > 2]
         
         return ' '.join(words)
     
@@ -224,7 +703,7 @@ class DuplicateDetector:
             return []
             
         # Tomar las primeras oraciones como características
-        sentences = re.split(r'[.!?]+', content.strip())
+        sentences = _SENTENCE_SPLIT_PATTERN.split(content.strip(), maxsplit=5)
         features = []
         
         for sentence in sentences[:5]:  # Primeras 5 oraciones
@@ -235,29 +714,55 @@ class DuplicateDetector:
         
         return features
     
-    def _generate_content_hash(self, features: List[str]) -> str:
-        """Genera hash de características del contenido"""
-        # Concatenar características y generar hash
-        features_text = '|'.join(sorted(features))
-        return hashlib.md5(features_text.encode()).hexdigest()
+    def _generate_content_hash(self, content: str) -> str:
+        """Genera el hash SHA-256 del contenido (formato de Article.content_hash)"""
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
     
     def _calculate_content_similarity(self, features1: List[str], features2: List[str]) -> float:
         """Calcula similitud entre características de contenido"""
-        if not features1 or not features2:
-            return 0.0
-            
-        # Comparar oraciones usando fuzzy matching
-        similarities = []
+        return self._calculate_content_similarities(features1, [features2])[0]
+    
+    def _calculate_content_similarities(self, features: List[str],
+                                        candidates_features: List[List[str]]) -> List[float]:
+        """
+        Calcula la similitud de contenido contra varios candidatos en una sola pasada
         
-        for f1 in features1:
-            best_similarity = 0.0
-            for f2 in features2:
-                similarity = fuzz.ratio(f1, f2) / 100.0
-                best_similarity = max(best_similarity, similarity)
-            similarities.append(best_similarity)
+        Para cada oración nueva se toma la mejor coincidencia (fuzz.ratio) entre las
+        oraciones de cada candidato y se promedia, igual que la comparación por pares.
         
-        # Retornar promedio de similitudes
-        return sum(similarities) / len(similarities) if similarities else 0.0
+        Args:
+            features: Características del artículo nuevo
+            candidates_features: Características de cada candidato
+            
+        Returns:
+            Similitud (0.0-1.0) de cada candidato, en el mismo orden
+        """
+        if not features:
+            return [0.0] * len(candidates_features)
+        
+        # Aplanar las oraciones de todos los candidatos en las columnas de una matriz
+        flat_features = []
+        offsets = []
+        for candidate_features in candidates_features:
+            if candidate_features:
+                offsets.append(len(flat_features))
+                flat_features.extend(candidate_features)
+        
+        if not flat_features:
+            return [0.0] * len(candidates_features)
+        
+        # Matriz oraciones nuevas x oraciones candidatas; redondeada a enteros
+        # como fuzzywuzzy (mismo ratio de Levenshtein)
+        scores = np.rint(rapid_process.cdist(
+            features, flat_features, scorer=rapid_fuzz.ratio,
+            dtype=np.float64, workers=self.similarity_workers
+        )) / 100.0
+        
+        # Mejor coincidencia por candidato y promedio sobre las oraciones nuevas
+        best = np.maximum.reduceat(scores, offsets, axis=1)
+        averages = iter(best.mean(axis=0).tolist())
+        
+        return [next(averages) if candidate_features else 0.0 for candidate_features in candidates_features]
     
     def _normalize_url(self, url: str) -> str:
         """Normaliza URL para comparación más precisa"""
@@ -287,8 +792,10 @@ class DuplicateDetector:
         Returns:
             Tupla (is_duplicate, reason)
         """
-        duplicates = self.detect_duplicates(db, new_article)
-        
+        return self._evaluate_duplicates(self.detect_duplicates(db, new_article))
+    
+    def _evaluate_duplicates(self, duplicates: List[Dict]) -> Tuple[bool, Optional[str]]:
+        """Decide si una lista de duplicados detectados confirma el duplicado"""
         if not duplicates:
             return False, None
             
@@ -404,4 +911,35 @@ class DuplicateDetector:
         if any(pattern in title.lower() for pattern in generic_patterns):
             score -= 0.5
         
-        return max(0.0, min(1.0, score))
\ No newline at end of file
+        return max(0.0, min(1.0, score))
+
+
+# Detector usado por el listener de indexación (creado bajo demanda)
+_index_detector: Optional[DuplicateDetector] = None
+
+
+def _get_index_detector() -> DuplicateDetector:
+    """Detector compartido por los listeners de indexación"""
+    global _index_detector
+    
+    if _index_detector is None:
+        _index_detector = DuplicateDetector()
+    return _index_detector
+
+
+@event.listens_for(Article, 'before_insert')
+def _fingerprint_inserted_article(mapper, connection, target: Article) -> None:
+    """Calcula la huella SimHash antes de insertar el artículo"""
+    if not DeduplicationConfig.LSH_INDEX['enabled'] or target.simhash is not None:
+        return
+    if target.content and len(target.content.strip()) >= 100:
+        target.simhash = _get_index_detector()._signed_simhash(target.content)
+
+
+@event.listens_for(Article, 'after_insert')
+def _index_inserted_article(mapper, connection, target: Article) -> None:
+    """Indexa en LSH cada artículo insertado (sesiones síncronas y asíncronas)"""
+    if not DeduplicationConfig.LSH_INDEX['enabled']:
+        return
+    
+    _get_index_detector().index_article(connection, target)
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Agrupación incremental de artículos duplicados
+Mantiene grupos transitivos de duplicados en articles.duplicate_group_id:
+- Union-find persistente: el grupo de un artículo es el ID de su artículo canónico
+  (los artículos sin duplicados conservan duplicate_group_id = NULL)
+- Artículo canónico elegido por calidad del título
+- Reasignación de grupos en bloque (una sola sentencia UPDATE)
+- Colapso de grupos en listados y búsquedas con DISTINCT ON indexado
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+from sqlalchemy import bindparam, desc, func, update
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from ..db.models import Article
+from .deduplication import DuplicateDetector
+
+
+def duplicate_group_key():
+    """Clave de grupo: duplicate_group_id o el propio ID en artículos sin grupo"""
+    return func.coalesce(Article.duplicate_group_id, Article.id)
+
+
+def collapse_duplicate_groups(id_query):
+    """
+    Condición que deja un único artículo por grupo de duplicados
+
+    Args:
+        id_query: select() o Query que devuelve Article.id con los filtros aplicados
+
+    Returns:
+        Condición Article.id IN (SELECT DISTINCT ON (grupo) ...) priorizando el
+        artículo canónico; si no pasa los filtros se usa otro miembro del grupo
+    """
+    group_key = duplicate_group_key()
+    representatives = id_query.distinct(group_key).order_by(None).order_by(
+        group_key, desc(Article.id == group_key)
+    )
+    return Article.id.in_(getattr(representatives, 'statement', representatives))
+
+
+class UnionFind:
+    """Union-find en memoria con compresión de caminos y unión por rango"""
+
+    def __init__(self):
+        self.parent: Dict[Hashable, Hashable] = {}
+        self.rank: Dict[Hashable, int] = {}
+
+    def add(self, item: Hashable) -> None:
+        """Registra un elemento como conjunto unitario"""
+        if item not in self.parent:
+            self.parent[item] = item
+            self.rank[item] = 0
+
+    def find(self, item: Hashable) -> Hashable:
+        """Raíz del conjunto del elemento"""
+        self.add(item)
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, item1: Hashable, item2: Hashable) -> Hashable:
+        """Une los conjuntos de ambos elementos y devuelve la nueva raíz"""
+        root1, root2 = self.find(item1), self.find(item2)
+        if root1 == root2:
+            return root1
+        if self.rank[root1] < self.rank[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        if self.rank[root1] == self.rank[root2]:
+            self.rank[root1] += 1
+        return root1
+
+    def groups(self) -> List[List[Hashable]]:
+        """Conjuntos con sus elementos"""
+        members: Dict[Hashable, List[Hashable]] = {}
+        for item in self.parent:
+            members.setdefault(self.find(item), []).append(item)
+        return list(members.values())
+
+
+class DuplicateClusterer:
+    """Asigna grupos transitivos de duplicados a artículos almacenados"""
+
+    def __init__(self, detector: Optional[DuplicateDetector] = None):
+        """
+        Inicializar el agrupador
+
+        Args:
+            detector: Detector usado para encontrar pares de duplicados
+        """
+        self.detector = detector or DuplicateDetector()
+
+    def cluster_articles(self, db: Session, articles: Iterable[Article]) -> Dict[str, int]:
+        """
+        Agrupa artículos recién guardados con sus duplicados almacenados
+
+        Los grupos existentes de cualquier artículo implicado se fusionan, de
+        modo que los duplicados transitivos (A~B, B~C) quedan en un solo grupo.
+
+        Args:
+            db: Sesión de base de datos
+            articles: Artículos ya persistidos a agrupar
+
+        Returns:
+            Estadísticas: artículos revisados, grupos afectados y artículos reasignados
+        """
+        union_find = UnionFind()
+        members: Dict[Any, Article] = {}
+        checked = 0
+
+        for article in articles:
+            checked += 1
+            members[article.id] = article
+            union_find.add(article.id)
+
+            duplicates = self.detector.detect_duplicates(db, {
+                'title': article.title,
+                'content': article.content,
+                'url': article.url
+            })
+            for duplicate in duplicates:
+                other = duplicate['article']
+                if other.id == article.id:
+                    continue
+                members[other.id] = other
+                union_find.union(article.id, other.id)
+
+        # Incorporar a los miembros actuales de los grupos ya existentes
+        group_ids = {article.duplicate_group_id for article in members.values() if article.duplicate_group_id}
+        if group_ids:
+            for article in db.query(Article).filter(Article.duplicate_group_id.in_(group_ids)).all():
+                members.setdefault(article.id, article)
+                union_find.union(article.id, article.duplicate_group_id)
+
+        assignments = []
+        groups_changed = 0
+        for group in union_find.groups():
+            group_articles = [members[item] for item in group if item in members]
+            if len(group_articles) < 2:
+                continue
+
+            canonical = self.select_canonical(group_articles)
+            changed = [
+                {'article_id': article.id, 'group_id': canonical.id}
+                for article in group_articles
+                if article.duplicate_group_id != canonical.id
+            ]
+            if changed:
+                groups_changed += 1
+                assignments.extend(changed)
+
+        self._apply_assignments(db, assignments)
+
+        stats = {
+            'articles_checked': checked,
+            'groups_changed': groups_changed,
+            'articles_reassigned': len(assignments)
+        }
+        logger.info(f"Agrupación de duplicados: {stats}")
+        return stats
+
+    def cluster_recent(self, db: Session, minutes: int = 30, batch_size: int = 200) -> Dict[str, int]:
+        """
+        Agrupa los artículos creados en los últimos minutos
+
+        Args:
+            db: Sesión de base de datos
+            minutes: Antigüedad máxima de los artículos a revisar
+            batch_size: Artículos por lote (un commit por lote)
+
+        Returns:
+            Estadísticas acumuladas de cluster_articles
+        """
+        since = datetime.utcnow() - timedelta(minutes=minutes)
+        article_ids = [
+            row[0] for row in db.query(Article.id).filter(
+                Article.created_at >= since
+            ).order_by(Article.created_at).all()
+        ]
+
+        totals = {'articles_checked': 0, 'groups_changed': 0, 'articles_reassigned': 0}
+        for start in range(0, len(article_ids), batch_size):
+            batch = db.query(Article).filter(Article.id.in_(article_ids[start:start + batch_size])).all()
+            for key, value in self.cluster_articles(db, batch).items():
+                totals[key] += value
+
+        return totals
+
+    def select_canonical(self, articles: List[Article]) -> Article:
+        """Artículo canónico: mejor título; en empate, el publicado primero"""
+        ordered = sorted(articles, key=lambda article: (
+            article.published_at or article.created_at or datetime.max,
+            str(article.id)
+        ))
+        return max(ordered, key=lambda article: self.detector._calculate_title_quality(article.title))
+
+    def _apply_assignments(self, db: Session, assignments: List[Dict]) -> None:
+        """Reasigna grupos con un único UPDATE ejecutado en bloque"""
+        if not assignments:
+            return
+
+        table = Article.__table__
+        statement = update(table).where(
+            table.c.id == bindparam('article_id')
+        ).values(
+            duplicate_group_id=bindparam('group_id'),
+            # Cambiar de grupo no modifica el artículo (ni invalida su cache de características)
+            updated_at=table.c.updated_at
+        )
+
+        try:
+            db.execute(statement, assignments)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error actualizando grupos de duplicados: {str(e)}")
+            db.rollback()
+            raise
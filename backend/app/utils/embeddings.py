@@ -0,0 +1,175 @@
+"""
+Backends de embeddings para búsqueda semántica
+Convierten texto en vectores densos normalizados (similitud coseno = producto escalar):
+- hashing: TF sublineal sobre unigramas y bigramas con hashing, proyectado con una
+  proyección aleatoria fija; sin modelo ni entrenamiento (tests y entornos offline)
+- transformer: modelo local de sentence-transformers en CPU vía transformers/torch
+  (mean pooling), cargado bajo demanda
+"""
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional, Sequence
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.random_projection import SparseRandomProjection
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+# Características del espacio con hashing antes de proyectar
+HASHING_FEATURES = 2 ** 18
+
+# Caracteres de cada artículo usados para su embedding
+ARTICLE_TEXT_MAX_CHARS = 2000
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Normalizar cada fila a norma L2 unitaria (las filas nulas quedan a cero)"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def article_text(title: Optional[str], summary: Optional[str], content: Optional[str]) -> str:
+    """Texto de un artículo para su embedding: título, resumen e inicio del contenido"""
+    text = ' '.join(part for part in (title, summary, content) if part)
+    return text[:ARTICLE_TEXT_MAX_CHARS]
+
+
+class EmbeddingBackend(ABC):
+    """Interfaz de los backends de embeddings"""
+
+    # Identificador guardado con cada vector: vectores de otro modelo no se comparan
+    name: str = ''
+    dim: int = 0
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Calcular los embeddings de un lote de textos
+
+        Returns:
+            Matriz (len(texts), dim) float32 con filas de norma 1
+        """
+        pass
+
+    def embed_one(self, text: str) -> np.ndarray:
+        """Embedding de un único texto"""
+        return self.embed([text])[0]
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeddings sin modelo: hashing de n-gramas y proyección aleatoria fija
+
+    Ambos pasos son deterministas (sin ajuste sobre el corpus), así que los
+    vectores guardados siguen siendo comparables entre procesos y reinicios.
+    """
+
+    def __init__(self, dim: int = 384, seed: int = 42):
+        """
+        Args:
+            dim: Dimensión de los vectores proyectados
+            seed: Semilla de la proyección (fija para el índice persistido)
+        """
+        self.dim = dim
+        self.name = f"hashing-{dim}-{seed}"
+        self._vectorizer = HashingVectorizer(
+            n_features=HASHING_FEATURES,
+            ngram_range=(1, 2),
+            stop_words='english',
+            alternate_sign=True,
+            norm=None
+        )
+        # La proyección solo depende de la forma de la entrada y de la semilla
+        self._projection = SparseRandomProjection(n_components=dim, dense_output=True, random_state=seed)
+        self._projection.fit(np.zeros((1, HASHING_FEATURES), dtype=np.float32))
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        counts = self._vectorizer.transform([text or '' for text in texts])
+        # TF sublineal conservando el signo del hashing
+        counts.data = np.sign(counts.data) * np.log1p(np.abs(counts.data))
+        return normalize_rows(np.asarray(self._projection.transform(counts), dtype=np.float32))
+
+
+class TransformerEmbeddingBackend(EmbeddingBackend):
+    """Modelo local de sentence-transformers ejecutado en CPU (mean pooling)"""
+
+    def __init__(self, model_name: str, batch_size: int = 32, max_length: int = 256):
+        """
+        Args:
+            model_name: Modelo de Hugging Face (ej. sentence-transformers/all-MiniLM-L6-v2)
+            batch_size: Textos por pasada del modelo
+            max_length: Tokens máximos por texto
+        """
+        if not TRANSFORMERS_AVAILABLE:
+            raise RuntimeError("transformers/torch no están instalados")
+
+        self.name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self._model = AutoModel.from_pretrained(model_name)
+        self._model.eval()
+        self.dim = self._model.config.hidden_size
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = [text or '' for text in texts[start:start + self.batch_size]]
+            encoded = self._tokenizer(
+                batch, padding=True, truncation=True,
+                max_length=self.max_length, return_tensors='pt'
+            )
+            with torch.no_grad():
+                hidden = self._model(**encoded).last_hidden_state
+            mask = encoded['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            batches.append(pooled.cpu().numpy())
+
+        if not batches:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return normalize_rows(np.vstack(batches))
+
+
+_backend: Optional[EmbeddingBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_embedding_backend() -> EmbeddingBackend:
+    """
+    Backend configurado en SEMANTIC_EMBEDDING_BACKEND (compartido por el proceso)
+
+    Si el modelo local no puede cargarse se usa el backend de hashing.
+    """
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _create_backend()
+    return _backend
+
+
+def _create_backend() -> EmbeddingBackend:
+    """Crear el backend configurado"""
+    if settings.SEMANTIC_EMBEDDING_BACKEND == 'transformer':
+        try:
+            backend = TransformerEmbeddingBackend(settings.SEMANTIC_EMBEDDING_MODEL)
+            logger.info(f"Embeddings con modelo local {backend.name} ({backend.dim} dimensiones)")
+            return backend
+        except Exception as e:
+            logger.warning(f"Modelo de embeddings no disponible, usando hashing: {str(e)}")
+
+    return HashingEmbeddingBackend(dim=settings.SEMANTIC_EMBEDDING_DIM)
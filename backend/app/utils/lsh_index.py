@@ -0,0 +1,290 @@
+"""
+Índice MinHash/LSH persistente para detección de artículos casi duplicados
+Permite obtener candidatos a duplicado sin recorrer toda la ventana temporal:
+- Firmas MinHash sobre shingles de caracteres
+- Huellas SimHash de 64 bits con bandas para distancia de Hamming
+- Bandas LSH persistidas en la tabla article_lsh_bands
+- Consulta de candidatos por colisión de bandas (consulta indexada)
+"""
+
+import zlib
+import hashlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from ..db.models import ArticleLSHBand
+from .config import DeduplicationConfig
+
+
+# Primo de Mersenne 2^31 - 1: a * h < 2^63 para h de 32 bits, sin overflow en uint64
+_MERSENNE_PRIME = (1 << 31) - 1
+
+_UINT64_MASK = (1 << 64) - 1
+
+# Prefijos de campo en las claves de banda
+TITLE_FIELD = 't'
+CONTENT_FIELD = 'c'
+SIMHASH_FIELD = 's'
+
+
+def to_signed64(value: int) -> int:
+    """Convierte una huella sin signo de 64 bits al rango de BIGINT"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def to_unsigned64(value: int) -> int:
+    """Convierte un BIGINT almacenado a huella sin signo de 64 bits"""
+    return value & _UINT64_MASK
+
+
+def hamming_distance(fingerprint1: int, fingerprint2: int) -> int:
+    """Distancia de Hamming entre dos huellas de 64 bits"""
+    return bin((fingerprint1 ^ fingerprint2) & _UINT64_MASK).count('1')
+
+
+class MinHasher:
+    """Calcula firmas MinHash deterministas sobre shingles de caracteres"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        """
+        Inicializar el generador de firmas
+
+        Args:
+            num_perm: Número de permutaciones (longitud de la firma)
+            shingle_size: Longitud en caracteres de cada shingle
+            seed: Semilla de las permutaciones (debe ser fija para que el índice
+                  persistido siga siendo válido tras reiniciar los workers)
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        """Genera el conjunto de shingles de caracteres del texto"""
+        text = ' '.join(text.split()) if text else ''
+        if not text:
+            return set()
+        if len(text) <= self.shingle_size:
+            return {text}
+        return {text[i:i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Calcula la firma MinHash del texto (None si no hay shingles)"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+
+        # crc32 es estable entre procesos (a diferencia de hash())
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+
+class SimHasher:
+    """Calcula huellas SimHash de 64 bits sobre shingles de palabras"""
+
+    def __init__(self, shingle_words: int = 3):
+        """
+        Inicializar el generador de huellas
+
+        Args:
+            shingle_words: Palabras por shingle (ponderados por frecuencia)
+        """
+        self.shingle_words = shingle_words
+        self._bit_positions = np.arange(64, dtype=np.uint64)
+
+    def fingerprint(self, tokens: List[str]) -> Optional[int]:
+        """Calcula la huella sin signo de una lista de palabras (None si está vacía)"""
+        if not tokens:
+            return None
+
+        size = self.shingle_words
+        counts = Counter(
+            ' '.join(tokens[i:i + size]) for i in range(max(1, len(tokens) - size + 1))
+        )
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+             for shingle in counts),
+            dtype=np.uint64,
+            count=len(counts)
+        )
+        weights = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+
+        bits = ((hashes[:, None] >> self._bit_positions) & np.uint64(1)).astype(np.int64)
+        votes = (weights[:, None] * (2 * bits - 1)).sum(axis=0)
+
+        return sum(1 << int(position) for position in np.flatnonzero(votes > 0))
+
+
+class ArticleLSHIndex:
+    """Índice LSH persistente sobre firmas MinHash de artículos"""
+
+    def __init__(self, num_perm: Optional[int] = None, bands: Optional[int] = None,
+                 shingle_size: Optional[int] = None, seed: Optional[int] = None):
+        """
+        Inicializar el índice (por defecto usa DeduplicationConfig.LSH_INDEX)
+
+        Args:
+            num_perm: Número de permutaciones MinHash
+            bands: Número de bandas LSH; num_perm debe ser divisible entre bands
+            shingle_size: Longitud de shingles de caracteres
+            seed: Semilla de las permutaciones
+        """
+        config = DeduplicationConfig.LSH_INDEX
+        num_perm = num_perm or config['num_perm']
+        self.bands = bands or config['bands']
+
+        if num_perm % self.bands != 0:
+            raise ValueError(f"num_perm ({num_perm}) debe ser divisible entre bands ({self.bands})")
+
+        self.rows = num_perm // self.bands
+        self.hasher = MinHasher(
+            num_perm=num_perm,
+            shingle_size=shingle_size or config['shingle_size'],
+            seed=seed if seed is not None else config['seed']
+        )
+
+        # Principio del palomar: huellas a distancia <= k coinciden en al menos
+        # una de k + 1 bandas disjuntas
+        self.simhash_max_distance = config['simhash_max_distance']
+        self.simhasher = SimHasher(shingle_words=config['simhash_shingle_words'])
+        simhash_bands = self.simhash_max_distance + 1
+        bounds = [round(64 * band / simhash_bands) for band in range(simhash_bands + 1)]
+        self._simhash_bands = list(zip(bounds[:-1], bounds[1:]))
+
+    def band_keys(self, text: str, field: str) -> List[str]:
+        """
+        Calcula las claves de banda LSH de un texto ya normalizado
+
+        Args:
+            text: Texto limpio (título o primeras oraciones)
+            field: Prefijo del campo (TITLE_FIELD o CONTENT_FIELD)
+
+        Returns:
+            Lista de claves '<campo><banda><hash>'
+        """
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return []
+
+        keys = []
+        for band, rows in enumerate(signature.reshape(self.bands, self.rows)):
+            digest = hashlib.blake2b(rows.tobytes(), digest_size=8).hexdigest()
+            keys.append(f"{field}{band:02d}{digest}")
+        return keys
+
+    def simhash_band_keys(self, fingerprint: Optional[int]) -> List[str]:
+        """
+        Calcula las claves de banda de una huella SimHash sin signo
+
+        Returns:
+            Lista de claves 's<banda><bits en hex>'
+        """
+        if fingerprint is None:
+            return []
+
+        keys = []
+        for band, (start, end) in enumerate(self._simhash_bands):
+            value = (fingerprint >> start) & ((1 << (end - start)) - 1)
+            keys.append(f"{SIMHASH_FIELD}{band:02d}{value:x}")
+        return keys
+
+    def add(self, db, article_id, band_keys: Iterable[str],
+            created_at: Optional[datetime] = None) -> int:
+        """
+        Persiste las claves de banda de un artículo
+
+        Args:
+            db: Sesión o conexión SQLAlchemy (admite la conexión de un evento de flush)
+            article_id: ID del artículo
+            band_keys: Claves calculadas con band_keys()
+            created_at: Fecha de creación del artículo (para la ventana temporal)
+
+        Returns:
+            Número de claves insertadas
+        """
+        created_at = created_at or datetime.utcnow()
+        rows = [
+            {'article_id': article_id, 'band_key': key, 'created_at': created_at}
+            for key in dict.fromkeys(band_keys)
+        ]
+        if rows:
+            db.execute(ArticleLSHBand.__table__.insert(), rows)
+        return len(rows)
+
+    def query(self, db: Session, band_keys: List[str], since: datetime) -> Set:
+        """
+        Obtiene los IDs de artículos que colisionan en al menos una banda
+
+        Args:
+            db: Sesión de base de datos
+            band_keys: Claves del artículo a comparar
+            since: Fecha mínima de creación de los candidatos
+
+        Returns:
+            Conjunto de IDs de artículos candidatos
+        """
+        if not band_keys:
+            return set()
+
+        rows = db.query(ArticleLSHBand.article_id).filter(
+            and_(
+                ArticleLSHBand.band_key.in_(band_keys),
+                ArticleLSHBand.created_at >= since
+            )
+        ).distinct().all()
+
+        return {row[0] for row in rows}
+
+    def query_many(self, db: Session, band_keys: List[str], since: datetime) -> Dict[str, Set]:
+        """
+        Consulta en bloque las colisiones de muchas claves (lotes de artículos)
+
+        Returns:
+            Diccionario clave de banda -> IDs de artículos que la comparten
+        """
+        if not band_keys:
+            return {}
+
+        rows = db.query(ArticleLSHBand.band_key, ArticleLSHBand.article_id).filter(
+            and_(
+                ArticleLSHBand.band_key.in_(set(band_keys)),
+                ArticleLSHBand.created_at >= since
+            )
+        ).all()
+
+        ids_by_band: Dict[str, Set] = {}
+        for band_key, article_id in rows:
+            ids_by_band.setdefault(band_key, set()).add(article_id)
+        return ids_by_band
+
+    def remove(self, db: Session, article_id) -> int:
+        """Elimina las claves de banda de un artículo"""
+        return db.query(ArticleLSHBand).filter(
+            ArticleLSHBand.article_id == article_id
+        ).delete(synchronize_session=False)
+
+    def clear(self, db: Session) -> int:
+        """Elimina todas las claves del índice"""
+        return db.query(ArticleLSHBand).delete(synchronize_session=False)
+
+    def prune(self, db: Session, before: datetime) -> int:
+        """Elimina claves de artículos fuera de la ventana de deduplicación"""
+        deleted = db.query(ArticleLSHBand).filter(
+            ArticleLSHBand.created_at < before
+        ).delete(synchronize_session=False)
+        logger.info(f"Índice LSH: {deleted} claves eliminadas anteriores a {before.isoformat()}")
+        return deleted
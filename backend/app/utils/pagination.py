@@ -7,28 +7,46 @@ Este módulo implementa un sistema universal de paginación y filtrado que inclu
 - Validación automática de parámetros
 - Sorting multi-campo
 - Cursors para paginación eficiente
+- Paginación keyset (seek method) sobre (claves de orden, id) con cursores opacos
+- Estrategias de conteo del total (exacto, estimado, con tope o en la misma consulta)
 - Middleware para extracción automática de parámetros de query
 """
 
 import base64
+import hashlib
 import json
 import logging
 import math
+import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import (
-    Any, Dict, List, Optional, Tuple, Type, Union, Callable, Set
+    Any, Dict, List, Optional, Sequence, Tuple, Type, Union, Callable, Set
 )
 from urllib.parse import parse_qs, urlencode
 
 from fastapi import Request, HTTPException
-from sqlalchemy import Column, String, DateTime, Float, Integer
+from sqlalchemy import Column, String, DateTime, Float, Integer, literal, literal_column, tuple_
 from sqlalchemy.orm import Query
 from sqlalchemy.sql import func
 
+from .counting import (
+    CountStrategy, count_rows, resolve_count_strategy,
+    add_window_count, split_window_count, window_count_result
+)
+
 logger = logging.getLogger(__name__)
 
+# Sustitutos de NULL en claves keyset: una comparación de filas con NULL no
+# devuelve filas, así que las columnas anulables se ordenan por COALESCE
+# (las mismas expresiones que los índices compuestos de articles)
+KEYSET_NULL_DATETIME = literal_column("'1970-01-01 00:00:00'", DateTime)
+KEYSET_NULL_SCORE = literal_column("-2")
+
+# Prefijo de las claves de orden añadidas a la consulta de la página
+KEYSET_KEY_LABEL = "keyset_key"
+
 
 class SortOrder(str, Enum):
     """Orden de clasificación"""
@@ -87,6 +105,9 @@ class PaginationResult:
     prev_cursor: Optional[str] = None
     filters_applied: Dict[str, Any] = field(default_factory=dict)
     sort_applied: List[SortField] = field(default_factory=list)
+    total_is_exact: bool = True
+    total_display: Optional[str] = None
+    count_strategy: CountStrategy = CountStrategy.EXACT
 
 
 class ModelFilterConfig:
@@ -169,6 +190,81 @@ class CursorManager:
             return {}
 
 
+class KeysetCursor:
+    """
+    Cursor opaco para paginación keyset
+    
+    Guarda el orden y la huella de los filtros con los que se generó, junto
+    con las claves de orden y el id de la última fila servida.
+    """
+    
+    @staticmethod
+    def _encode_value(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return {'dt': value.isoformat()}
+        if isinstance(value, uuid.UUID):
+            return {'uuid': str(value)}
+        return value
+    
+    @staticmethod
+    def _decode_value(value: Any) -> Any:
+        if isinstance(value, dict):
+            if 'dt' in value:
+                return datetime.fromisoformat(value['dt'])
+            if 'uuid' in value:
+                return uuid.UUID(value['uuid'])
+        return value
+    
+    @classmethod
+    def encode(cls, sort: str, fingerprint: str, values: Sequence[Any]) -> str:
+        """Codificar la posición tras la última fila (claves de orden + id)"""
+        payload = json.dumps(
+            {'s': sort, 'f': fingerprint, 'k': [cls._encode_value(value) for value in values]},
+            separators=(',', ':')
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+    
+    @classmethod
+    def decode(cls, cursor: str, sort: str, fingerprint: str) -> List[Any]:
+        """
+        Decodificar un cursor generado para el mismo orden y filtros
+        
+        Raises:
+            ValueError: Si el cursor no es válido o es de otra consulta
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            values = [cls._decode_value(value) for value in payload['k']]
+        except Exception as e:
+            raise ValueError("Cursor inválido") from e
+        
+        if payload.get('s') != sort or payload.get('f') != fingerprint:
+            raise ValueError("El cursor no corresponde a este orden o filtros")
+        
+        return values
+
+
+def query_fingerprint(*parts: Any) -> str:
+    """Huella estable de los filtros de una consulta para validar cursores"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def null_safe_sort_key(column):
+    """Clave de orden sin NULL para keyset (COALESCE en columnas anulables)"""
+    expression = getattr(column, 'expression', column)
+    if not getattr(expression, 'nullable', True):
+        return column
+    
+    column_type = getattr(expression, 'type', None)
+    if isinstance(column_type, DateTime):
+        return func.coalesce(column, KEYSET_NULL_DATETIME)
+    if isinstance(column_type, (Float, Integer)):
+        return func.coalesce(column, KEYSET_NULL_SCORE)
+    return column
+
+
 class PaginationParams:
     """Parámetros de paginación y filtrado"""
     
@@ -203,6 +299,9 @@ class PaginationParams:
         # Paginación por cursor
         self.cursor = query_params.get('cursor')
         
+        # Estrategia de conteo del total
+        self.count = query_params.get('count')
+        
         # Ordenamiento
         sort_param = query_params.get('sort', '')
         self.sort = self._parse_sort_param(sort_param)
@@ -332,6 +431,13 @@ class PaginationParams:
                 detail=f"Page size no puede exceder {self.max_page_size}"
             )
         
+        # Validar estrategia de conteo
+        try:
+            self.count_strategy = resolve_count_strategy(self.count)
+        except ValueError:
+            allowed = ", ".join(strategy.value for strategy in CountStrategy)
+            raise HTTPException(status_code=400, detail=f"Count debe ser uno de: {allowed}")
+        
         # Validar filtros
         self._validate_filters()
         
@@ -548,6 +654,48 @@ class QueryBuilder:
             return CursorManager.encode_cursor(cursor_data)
         
         return None
+    
+    @staticmethod
+    def add_keyset_columns(query, sort_keys: Sequence[Any]):
+        """Añadir las claves de orden a la consulta para construir el siguiente cursor"""
+        return query.add_columns(*[
+            key.label(f"{KEYSET_KEY_LABEL}_{position}") for position, key in enumerate(sort_keys)
+        ])
+    
+    @staticmethod
+    def apply_keyset(
+        query,
+        sort_keys: Sequence[Any],
+        id_column,
+        descending: bool,
+        after: Optional[Sequence[Any]] = None
+    ):
+        """
+        Ordenar por (claves..., id) y continuar tras la posición del cursor
+        
+        Todas las claves van en la misma dirección, así que la condición es una
+        comparación de filas que avanza por un índice compuesto sin OFFSET: la
+        página 500 cuesta lo mismo que la primera.
+        
+        Args:
+            query: Query o Select
+            sort_keys: Claves de orden sin NULL (ver null_safe_sort_key)
+            id_column: Desempate único
+            descending: Dirección común de todas las claves
+            after: Claves e id de la última fila servida (KeysetCursor.decode)
+        """
+        columns = [*sort_keys, id_column]
+        
+        if after is not None:
+            if len(after) != len(columns):
+                raise ValueError("Cursor inválido")
+            row = tuple_(*columns)
+            bound = tuple_(*[
+                literal(value, getattr(column, 'type', None)) for column, value in zip(columns, after)
+            ])
+            query = query.filter(row < bound if descending else row > bound)
+        
+        return query.order_by(*[column.desc() if descending else column.asc() for column in columns])
 
 
 class PaginationService:
@@ -579,8 +727,14 @@ class PaginationService:
         if pagination_params.search:
             query = self.query_builder.apply_text_search(query, model, pagination_params.search)
         
-        # Contar total antes de paginar
-        total = query.count()
+        # Contar total antes de paginar (window: en la misma consulta de la página;
+        # con cursor la consulta ya no ve las filas anteriores y se cuenta aparte)
+        strategy = pagination_params.count_strategy
+        if strategy == CountStrategy.WINDOW and pagination_params.cursor:
+            strategy = CountStrategy.EXACT
+        count_statement = query.statement
+        if strategy != CountStrategy.WINDOW:
+            count = count_rows(query.session, count_statement, strategy)
         
         # Aplicar paginación por cursor si está disponible
         if pagination_params.cursor:
@@ -598,7 +752,13 @@ class PaginationService:
             query = query.offset(pagination_params.offset).limit(pagination_params.limit)
         
         # Ejecutar consulta
-        items = query.all()
+        if strategy == CountStrategy.WINDOW:
+            rows, window_total = split_window_count(add_window_count(query).all())
+            items = [item for item, in rows]
+            count = window_count_result(query.session, count_statement, window_total, pagination_params.offset)
+        else:
+            items = query.all()
+        total = count.total
         
         # Calcular metadatos de paginación
         page = pagination_params.page
@@ -671,7 +831,10 @@ class PaginationService:
             next_cursor=next_cursor,
             prev_cursor=prev_cursor,
             filters_applied={**pagination_params.filters, **(additional_filters or {})},
-            sort_applied=pagination_params.sort
+            sort_applied=pagination_params.sort,
+            total_is_exact=count.is_exact,
+            total_display=count.display,
+            count_strategy=count.strategy
         )
     
     def create_query_builder_url(
@@ -743,6 +906,9 @@ def paginate_response(pagination_result: PaginationResult) -> Dict[str, Any]:
         'data': pagination_result.items,
         'pagination': {
             'total': pagination_result.total,
+            'total_is_exact': pagination_result.total_is_exact,
+            'total_display': pagination_result.total_display,
+            'count_strategy': pagination_result.count_strategy.value,
             'page': pagination_result.page,
             'page_size': pagination_result.page_size,
             'total_pages': pagination_result.total_pages,
@@ -0,0 +1,334 @@
+"""
+Registro de consultas de búsqueda y agregación de búsquedas trending
+- QueryLog: cada búsqueda se añade a un buffer circular en memoria que se vuelca
+  en bloque (un pipeline de XADD) al stream de Redis, sin escribir en la base de
+  datos durante la petición
+- QueryLogAggregator: tarea periódica que lee el stream y mantiene, por hora, un
+  Count-Min sketch con sus heavy hitters; de ahí salen los resúmenes por
+  timeframe (1h, 6h, 24h, 7d) que leen /search/trending y las analytics
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from redis.exceptions import RedisError, ConnectionError, TimeoutError
+
+from ..core.config import settings
+from ..core.redis_cache import RedisCacheManager, loop_cache_managers
+from ..core.search_cache import SearchResultCache
+from .sketches import HeavyHitters
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "search_queries"
+CURSOR_KEY = "search_queries:last_id"
+LOCK_KEY = "search_queries:aggregating"
+BUCKET_PREFIX = "search_queries:bucket"
+TOP_PREFIX = "search_queries:top"
+TRENDING_PREFIX = "search_queries:trending"
+
+# Ventanas en horas; cada hora tiene su propio sketch. Un timeframe de N horas
+# suma la hora en curso (parcial) y las N anteriores
+TIMEFRAME_HOURS = {"1h": 1, "6h": 6, "24h": 24, "7d": 168}
+BUCKET_SECONDS = 3600
+BUCKET_TTL = (TIMEFRAME_HOURS["7d"] + 2) * BUCKET_SECONDS
+
+# Consultas más largas no son "búsquedas populares"
+MAX_QUERY_LENGTH = 200
+
+# Entradas del stream leídas por llamada a XREAD
+READ_BATCH_SIZE = 5000
+
+
+def bucket_of(timestamp: float) -> int:
+    """Hora (segundos epoch redondeados) de un instante"""
+    return int(timestamp // BUCKET_SECONDS) * BUCKET_SECONDS
+
+
+class QueryLog:
+    """
+    Buffer de consultas de búsqueda del proceso
+
+    record() solo añade a un deque acotado (si se llena se pierden las más
+    antiguas) y, cada QUERY_LOG_FLUSH_SIZE consultas o QUERY_LOG_FLUSH_SECONDS,
+    programa un volcado en segundo plano al stream de Redis.
+    """
+
+    def __init__(
+        self,
+        buffer_size: Optional[int] = None,
+        flush_size: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        cache_manager: Optional[RedisCacheManager] = None
+    ):
+        self.flush_size = flush_size or settings.QUERY_LOG_FLUSH_SIZE
+        self.flush_seconds = flush_seconds or settings.QUERY_LOG_FLUSH_SECONDS
+        self.enabled = settings.QUERY_LOG_ENABLED if enabled is None else enabled
+        self._buffer: Deque[Tuple[str, float]] = deque(maxlen=buffer_size or settings.QUERY_LOG_BUFFER_SIZE)
+        self._cache_manager = cache_manager
+        self._last_flush = time.monotonic()
+        self._flushing: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def _get_manager(self) -> Optional[RedisCacheManager]:
+        """Conexión de Redis del event loop actual, o None si Redis no está disponible"""
+        if self._cache_manager is not None:
+            return self._cache_manager
+        return await loop_cache_managers.get()
+
+    def record(self, query: str, timestamp: Optional[float] = None) -> bool:
+        """
+        Registrar una búsqueda (sin E/S: solo memoria)
+
+        Args:
+            query: Texto buscado; se normaliza como la clave del cache de resultados
+            timestamp: Instante de la búsqueda (por defecto ahora)
+
+        Returns:
+            True si la consulta se registró
+        """
+        if not self.enabled:
+            return False
+        normalized = SearchResultCache.normalize_query(query)
+        if not normalized or len(normalized) > MAX_QUERY_LENGTH:
+            return False
+
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append((normalized, timestamp or time.time()))
+
+        due = len(self._buffer) >= self.flush_size or time.monotonic() - self._last_flush >= self.flush_seconds
+        if due and (self._flushing is None or self._flushing.done()):
+            try:
+                self._flushing = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                pass  # Sin event loop: se vuelca en la próxima búsqueda o con flush()
+        return True
+
+    async def flush(self) -> int:
+        """
+        Volcar el buffer al stream de Redis en un solo pipeline
+
+        Returns:
+            Número de consultas escritas
+        """
+        self._last_flush = time.monotonic()
+        entries = []
+        while self._buffer:
+            entries.append(self._buffer.popleft())
+        if not entries:
+            return 0
+
+        manager = await self._get_manager()
+        if manager is None:
+            self.dropped += len(entries)
+            return 0
+
+        try:
+            pipeline = manager.redis.pipeline(transaction=False)
+            for query, timestamp in entries:
+                pipeline.xadd(
+                    STREAM_KEY, {'q': query, 'ts': f"{timestamp:.3f}"},
+                    maxlen=settings.QUERY_LOG_STREAM_MAXLEN, approximate=True
+                )
+            await pipeline.execute()
+            return len(entries)
+        except (RedisError, ConnectionError, TimeoutError) as e:
+            self.dropped += len(entries)
+            logger.warning(f"No se pudieron volcar {len(entries)} consultas al stream: {e}")
+            return 0
+
+    async def close(self) -> None:
+        """Volcar lo pendiente (cierre de la aplicación)"""
+        if self._flushing is not None and not self._flushing.done():
+            await asyncio.gather(self._flushing, return_exceptions=True)
+        await self.flush()
+
+
+class QueryLogAggregator:
+    """
+    Agregación del stream de consultas en sketches por hora
+
+    Cada ejecución lee las entradas nuevas desde el último id procesado, las
+    suma al HeavyHitters de su hora (guardado en Redis con su Count-Min), recorta
+    el stream y recalcula el top de cada timeframe sumando los candidatos de
+    sus horas. La memoria es constante: un sketch de tamaño fijo por hora
+    durante 7 días, sin importar cuántas consultas distintas haya.
+    """
+
+    def __init__(
+        self,
+        top_k: Optional[int] = None,
+        width: Optional[int] = None,
+        depth: Optional[int] = None,
+        cache_manager: Optional[RedisCacheManager] = None
+    ):
+        self.top_k = top_k or settings.QUERY_LOG_TOP_K
+        self.width = width or settings.QUERY_LOG_SKETCH_WIDTH
+        self.depth = depth or settings.QUERY_LOG_SKETCH_DEPTH
+        self._cache_manager = cache_manager
+
+    async def _get_manager(self) -> Optional[RedisCacheManager]:
+        """Conexión de Redis del event loop actual, o None si Redis no está disponible"""
+        if self._cache_manager is not None:
+            return self._cache_manager
+        return await loop_cache_managers.get()
+
+    async def aggregate(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Procesar las consultas nuevas del stream y recalcular los timeframes
+
+        Returns:
+            Dict con las consultas procesadas y las horas actualizadas
+        """
+        manager = await self._get_manager()
+        if manager is None:
+            return {'processed': 0, 'buckets': 0, 'status': 'redis_unavailable'}
+
+        redis = manager.redis
+        # Una sola agregación a la vez: el cursor y los sketches no admiten escritores concurrentes
+        if not await redis.set(LOCK_KEY, '1', nx=True, ex=300):
+            return {'processed': 0, 'buckets': 0, 'status': 'locked'}
+
+        try:
+            last_id = await redis.get(CURSOR_KEY) or '0-0'
+            buckets: Dict[int, HeavyHitters] = {}
+            processed = 0
+
+            while True:
+                response = await redis.xread({STREAM_KEY: last_id}, count=READ_BATCH_SIZE)
+                entries = response[0][1] if response else []
+                if not entries:
+                    break
+
+                for entry_id, fields in entries:
+                    bucket = bucket_of(float(fields.get('ts', 0)))
+                    if bucket not in buckets:
+                        buckets[bucket] = await self._load_bucket(manager, bucket)
+                    buckets[bucket].add(fields['q'])
+                last_id = entries[-1][0]
+                processed += len(entries)
+
+                if len(entries) < READ_BATCH_SIZE:
+                    break
+
+            if processed:
+                await self._save_buckets(manager, buckets)
+                await redis.set(CURSOR_KEY, last_id)
+                # Lo procesado ya está en los sketches
+                await redis.xtrim(STREAM_KEY, minid=last_id, approximate=False)
+
+            await self._summarize(manager, now or time.time())
+            if processed:
+                logger.info(f"Consultas agregadas: {processed} en {len(buckets)} horas")
+            return {'processed': processed, 'buckets': len(buckets), 'status': 'success'}
+
+        finally:
+            await redis.delete(LOCK_KEY)
+
+    async def _load_bucket(self, manager: RedisCacheManager, bucket: int) -> HeavyHitters:
+        """Sketch guardado de una hora, o uno vacío"""
+        data = await manager.get(f"{BUCKET_PREFIX}:{bucket}")
+        if isinstance(data, dict) and data.get('k') == self.top_k:
+            return HeavyHitters.from_dict(data)
+        return HeavyHitters(self.top_k, self.width, self.depth)
+
+    async def _save_buckets(self, manager: RedisCacheManager, buckets: Dict[int, HeavyHitters]) -> None:
+        """Guardar los sketches (para continuar la hora) y sus candidatos (para los resúmenes)"""
+        items = {}
+        for bucket, heavy_hitters in buckets.items():
+            items[f"{BUCKET_PREFIX}:{bucket}"] = (heavy_hitters.to_dict(), BUCKET_TTL)
+            items[f"{TOP_PREFIX}:{bucket}"] = (
+                {'total': heavy_hitters.total, 'top': heavy_hitters.candidates}, BUCKET_TTL
+            )
+        await manager.batch_set(items)
+
+    async def _summarize(self, manager: RedisCacheManager, now: float) -> None:
+        """Top de consultas de cada timeframe a partir de los candidatos de sus horas"""
+        current = bucket_of(now)
+        hours = [current - offset * BUCKET_SECONDS for offset in range(TIMEFRAME_HOURS["7d"] + 1)]
+        tops = await manager.batch_get([f"{TOP_PREFIX}:{bucket}" for bucket in hours])
+
+        summaries = {}
+        for timeframe, span in TIMEFRAME_HOURS.items():
+            counts: Dict[str, int] = {}
+            total = 0
+            for bucket in hours[:span + 1]:
+                data = tops.get(f"{TOP_PREFIX}:{bucket}")
+                if not data:
+                    continue
+                total += data.get('total', 0)
+                for query, count in data.get('top', {}).items():
+                    counts[query] = counts.get(query, 0) + count
+
+            ranked = sorted(counts.items(), key=lambda entry: (-entry[1], entry[0]))[:self.top_k]
+            summaries[f"{TRENDING_PREFIX}:{timeframe}"] = ({
+                'timeframe': timeframe,
+                'total': total,
+                'queries': [{'query': query, 'count': count} for query, count in ranked],
+                'updated_at': datetime.fromtimestamp(now, tz=timezone.utc).isoformat()
+            }, BUCKET_TTL)
+
+        await manager.batch_set(summaries)
+
+
+async def get_trending_queries(
+    timeframe: str,
+    limit: int = 20,
+    min_count: int = 1,
+    cache_manager: Optional[RedisCacheManager] = None
+) -> List[Dict[str, Any]]:
+    """
+    Búsquedas más frecuentes de un timeframe según la última agregación
+
+    Returns:
+        Lista de {query, count, trend_score, timeframe}; trend_score es la
+        frecuencia relativa a la consulta más buscada del timeframe
+    """
+    summary = await get_query_summary(timeframe, cache_manager)
+    queries = [entry for entry in summary.get('queries', []) if entry['count'] >= min_count][:limit]
+    if not queries:
+        return []
+
+    top_count = queries[0]['count']
+    return [
+        {
+            'query': entry['query'],
+            'count': entry['count'],
+            'trend_score': round(entry['count'] / top_count, 3),
+            'timeframe': timeframe
+        }
+        for entry in queries
+    ]
+
+
+async def get_query_summary(timeframe: str, cache_manager: Optional[RedisCacheManager] = None) -> Dict[str, Any]:
+    """Resumen agregado (total y top de consultas) de un timeframe; vacío si no hay datos"""
+    manager = cache_manager or await loop_cache_managers.get()
+    if manager is None:
+        return {}
+    summary = await manager.get(f"{TRENDING_PREFIX}:{timeframe}")
+    return summary if isinstance(summary, dict) else {}
+
+
+# Buffer y agregador del proceso
+query_log = QueryLog()
+query_log_aggregator = QueryLogAggregator()
+
+
+def get_query_log() -> QueryLog:
+    """Buffer de consultas compartido por los endpoints de búsqueda"""
+    return query_log
+
+
+def get_query_log_aggregator() -> QueryLogAggregator:
+    """Agregador usado por la tarea periódica"""
+    return query_log_aggregator
@@ -0,0 +1,93 @@
+"""
+Invalidación del cache de resultados de búsqueda
+Los listeners de sesión recogen la fuente y el día de publicación de cada artículo
+insertado, modificado o borrado y, al confirmar la transacción, descartan solo las
+páginas cacheadas de esas etiquetas (y los documentos de los artículos modificados)
+"""
+
+import logging
+from typing import Any, Iterable, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..core.search_cache import SearchResultCache, get_search_cache
+from ..db.models import Article
+
+logger = logging.getLogger(__name__)
+
+# Claves en Session.info para acumular etiquetas entre flushes de una transacción
+TAGS_INFO_KEY = 'search_cache_tags'
+ARTICLES_INFO_KEY = 'search_cache_articles'
+
+
+def _attribute_values(article: Article, name: str) -> Iterable[Any]:
+    """Valor actual y, si cambió en este flush, el anterior"""
+    history = inspect(article).attrs[name].history
+    values = list(history.added or ()) + list(history.deleted or ())
+    return values or [getattr(article, name)]
+
+
+def collect_article_tags(article: Article, previous: bool = False) -> Set[str]:
+    """
+    Etiquetas afectadas por un artículo
+
+    Args:
+        article: Artículo insertado, modificado o borrado
+        previous: Incluir también la fuente y la fecha anteriores a la modificación
+
+    Returns:
+        Etiquetas de SearchResultCache.article_tags
+    """
+    if not previous:
+        return set(SearchResultCache.article_tags(article.source_id, article.published_at))
+
+    tags = set()
+    for source_id in _attribute_values(article, 'source_id'):
+        for published_at in _attribute_values(article, 'published_at'):
+            tags.update(SearchResultCache.article_tags(source_id, published_at))
+    return tags
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_search_cache_tags(session: Session, flush_context) -> None:
+    """Acumula las etiquetas de los artículos del flush hasta el commit"""
+    if not get_search_cache().enabled:
+        return
+
+    tags = session.info.setdefault(TAGS_INFO_KEY, set())
+    article_ids = session.info.setdefault(ARTICLES_INFO_KEY, set())
+
+    for article in session.new:
+        if isinstance(article, Article):
+            tags.update(collect_article_tags(article))
+
+    for article in session.dirty:
+        if isinstance(article, Article) and session.is_modified(article, include_collections=False):
+            tags.update(collect_article_tags(article, previous=True))
+            article_ids.add(str(article.id))
+
+    for article in session.deleted:
+        if isinstance(article, Article):
+            tags.update(collect_article_tags(article))
+            article_ids.add(str(article.id))
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_search_cache(session: Session) -> None:
+    """Descarta en segundo plano las páginas de las etiquetas confirmadas"""
+    tags = session.info.pop(TAGS_INFO_KEY, None)
+    article_ids = session.info.pop(ARTICLES_INFO_KEY, None)
+    if not tags and not article_ids:
+        return
+
+    if not get_search_cache().schedule_invalidation(tags or (), article_ids or ()):
+        # Sin event loop (scripts síncronos): las páginas caducan por TTL
+        logger.debug(f"Cache de búsqueda sin invalidar ({len(tags or ())} etiquetas): sin event loop")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_search_cache_tags(session: Session) -> None:
+    """Los cambios revertidos no invalidan nada"""
+    session.info.pop(TAGS_INFO_KEY, None)
+    session.info.pop(ARTICLES_INFO_KEY, None)
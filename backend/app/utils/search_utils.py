@@ -5,52 +5,66 @@ Incluye funciones para tokenización, análisis de texto y búsqueda semántica
 
 import re
 import logging
-from typing import List, Dict, Any, Set, Tuple, Optional
+from typing import List, Dict, Any, Hashable, Set, Tuple, Optional
 from datetime import datetime
+from collections import Counter, OrderedDict
 import math
 import hashlib
 
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .embeddings import article_text as embedding_article_text, get_embedding_backend
+from .term_dictionary import get_term_dictionary
+
 logger = logging.getLogger(__name__)
 
 
+# Palabras comunes a ignorar
+STOPWORDS = {
+    'english': {
+        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 
+        'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 
+        'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 
+        'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 
+        'her', 'us', 'them', 'my', 'your', 'his', 'its', 'our', 'their', 'what', 'which', 
+        'who', 'when', 'where', 'why', 'how', 'not', 'no', 'yes', 'all', 'any', 'some', 
+        'many', 'much', 'few', 'little', 'more', 'most', 'other', 'another', 'such', 'only'
+    },
+    'spanish': {
+        'el', 'la', 'los', 'las', 'un', 'una', 'unos', 'unas', 'y', 'o', 'pero', 'en', 
+        'con', 'de', 'del', 'para', 'por', 'sin', 'sobre', 'es', 'son', 'está', 'están', 
+        'era', 'eran', 'ser', 'sido', 'tener', 'tiene', 'tenía', 'había', 'hacer', 'hace', 
+        'hizo', 'podría', 'debe', 'deben', 'puede', 'pueden', 'este', 'esta', 'estos', 
+        'estas', 'ese', 'esa', 'esos', 'esas', 'aquel', 'aquella', 'aquellos', 'aquellas'
+    }
+}
+
+# Patrones compilados una vez por proceso (compartidos por todas las instancias)
+URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+EMAIL_PATTERN = re.compile(r'\S+@\S+')
+HASHTAG_PATTERN = re.compile(r'#\w+')
+MENTION_PATTERN = re.compile(r'@\w+')
+SPECIAL_CHARS_PATTERN = re.compile(r'[^\w\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+DATE_PATTERNS = [
+    re.compile(r'\d{4}-\d{2}-\d{2}'),  # YYYY-MM-DD
+    re.compile(r'\d{2}/\d{2}/\d{4}'),  # MM/DD/YYYY
+    re.compile(r'\d{1,2}\s+\w+\s+\d{4}'),  # DD Month YYYY
+]
+
+
 class TextProcessor:
     """Procesador de texto para búsqueda avanzada"""
     
     def __init__(self):
-        # Palabras comunes a ignorar
-        self.stopwords = {
-            'english': {
-                'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 
-                'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 
-                'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 
-                'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 
-                'her', 'us', 'them', 'my', 'your', 'his', 'its', 'our', 'their', 'what', 'which', 
-                'who', 'when', 'where', 'why', 'how', 'not', 'no', 'yes', 'all', 'any', 'some', 
-                'many', 'much', 'few', 'little', 'more', 'most', 'other', 'another', 'such', 'only'
-            },
-            'spanish': {
-                'el', 'la', 'los', 'las', 'un', 'una', 'unos', 'unas', 'y', 'o', 'pero', 'en', 
-                'con', 'de', 'del', 'para', 'por', 'sin', 'sobre', 'es', 'son', 'está', 'están', 
-                'era', 'eran', 'ser', 'sido', 'tener', 'tiene', 'tenía', 'había', 'hacer', 'hace', 
-                'hizo', 'podría', 'debe', 'deben', 'puede', 'pueden', 'este', 'esta', 'estos', 
-                'estas', 'ese', 'esa', 'esos', 'esas', 'aquel', 'aquella', 'aquellos', 'aquellas'
-            }
-        }
-        
-        # Patrones de URLs y emails
-        self.url_pattern = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
-        self.email_pattern = re.compile(r'\S+@\S+')
-        
-        # Patrones de hashtags y menciones
-        self.hashtag_pattern = re.compile(r'#\w+')
-        self.mention_pattern = re.compile(r'@\w+')
-        
-        # Patrones de fechas
-        self.date_patterns = [
-            r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-            r'\d{2}/\d{2}/\d{4}',  # MM/DD/YYYY
-            r'\d{1,2}\s+\w+\s+\d{4}',  # DD Month YYYY
-        ]
+        # Referencias a las constantes del módulo: crear instancias no recompila nada
+        self.stopwords = STOPWORDS
+        self.url_pattern = URL_PATTERN
+        self.email_pattern = EMAIL_PATTERN
+        self.hashtag_pattern = HASHTAG_PATTERN
+        self.mention_pattern = MENTION_PATTERN
+        self.date_patterns = DATE_PATTERNS
     
     def preprocess_text(self, text: str, language: str = 'english') -> str:
         """
@@ -80,10 +94,10 @@ class TextProcessor:
         text = self.mention_pattern.sub('', text)
         
         # Remover caracteres especiales pero mantener espacios
-        text = re.sub(r'[^\w\s]', ' ', text)
+        text = SPECIAL_CHARS_PATTERN.sub(' ', text)
         
         # Normalizar espacios
-        text = re.sub(r'\s+', ' ', text)
+        text = WHITESPACE_PATTERN.sub(' ', text)
         
         return text.strip()
     
@@ -133,7 +147,6 @@ class TextProcessor:
         tokens = self.tokenize(text, remove_stopwords=True, language=language)
         
         # Contar frecuencia
-        from collections import Counter
         token_freq = Counter(tokens)
         
         # Obtener top keywords
@@ -165,21 +178,14 @@ class TextProcessor:
     def _cosine_similarity(self, text1: str, text2: str) -> float:
         """Similitud coseno usando TF-IDF simple"""
         try:
-            from collections import Counter
-            
-            # Tokenizar
-            tokens1 = self.tokenize(text1)
-            tokens2 = self.tokenize(text2)
-            
-            # Crear vectores de frecuencia
-            all_tokens = set(tokens1 + tokens2)
-            vector1 = [tokens1.count(token) for token in all_tokens]
-            vector2 = [tokens2.count(token) for token in all_tokens]
+            # Vectores de frecuencia de tokens
+            counts1 = Counter(self.tokenize(text1))
+            counts2 = Counter(self.tokenize(text2))
             
             # Calcular coseno
-            dot_product = sum(a * b for a, b in zip(vector1, vector2))
-            norm1 = math.sqrt(sum(a * a for a in vector1))
-            norm2 = math.sqrt(sum(a * a for a in vector2))
+            dot_product = sum(count * counts2[token] for token, count in counts1.items() if token in counts2)
+            norm1 = math.sqrt(sum(count * count for count in counts1.values()))
+            norm2 = math.sqrt(sum(count * count for count in counts2.values()))
             
             if norm1 == 0 or norm2 == 0:
                 return 0.0
@@ -261,7 +267,7 @@ class TextProcessor:
         try:
             # Detectar fechas
             for pattern in self.date_patterns:
-                dates = re.findall(pattern, text)
+                dates = pattern.findall(text)
                 entities['dates'].extend(dates)
             
             # Detectar organizaciones (palabras con mayúsculas)
@@ -306,6 +312,100 @@ class TextProcessor:
             return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
 
+class RerankEngine:
+    """
+    Similitud coseno TF entre una consulta y documentos con vectores en caché
+
+    Cada documento se tokeniza una sola vez por (id, versión); las puntuaciones
+    de todos los candidatos salen de un único producto matriz dispersa-vector.
+    """
+    
+    def __init__(self, processor: TextProcessor, max_documents: int = 20000, max_vocabulary: int = 500000):
+        """
+        Args:
+            processor: Procesador de texto compartido
+            max_documents: Vectores de documentos en caché (LRU)
+            max_vocabulary: Tokens distintos antes de vaciar la caché
+        """
+        self.processor = processor
+        self.max_documents = max_documents
+        self.max_vocabulary = max_vocabulary
+        self._vocabulary: Dict[str, int] = {}
+        # clave de documento -> (columnas de sus tokens, pesos TF normalizados)
+        self._documents: "OrderedDict[Hashable, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+    
+    @staticmethod
+    def document_text(doc: Dict[str, Any]) -> str:
+        """Título, contenido y resumen del documento"""
+        return f"{doc.get('title', '')} {doc.get('content', '')} {doc.get('summary', '')}"
+    
+    def document_key(self, doc: Dict[str, Any]) -> Hashable:
+        """Clave de caché: id y versión del artículo, o hash del texto si no tiene id"""
+        if doc.get('id') is not None:
+            version = doc.get('updated_at') or doc.get('ai_processed_at') or ''
+            return (str(doc['id']), str(version))
+        return hashlib.blake2b(self.document_text(doc).encode('utf-8'), digest_size=16).digest()
+    
+    def score(self, query: str, documents: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Similitud coseno de la consulta con cada documento
+        
+        Returns:
+            Array con un score en [0, 1] por documento, en el mismo orden
+        """
+        if len(self._vocabulary) > self.max_vocabulary:
+            self.clear()
+        
+        rows = [self._document_vector(doc) for doc in documents]
+        query_counts = Counter(self.processor.tokenize(query))
+        indptr = np.cumsum([0] + [len(columns) for columns, _ in rows])
+        if not query_counts or not indptr[-1]:
+            return np.zeros(len(documents), dtype=np.float32)
+        
+        matrix = csr_matrix(
+            (np.concatenate([weights for _, weights in rows]), np.concatenate([columns for columns, _ in rows]), indptr),
+            shape=(len(rows), len(self._vocabulary))
+        )
+        
+        # Los tokens que no aparecen en ningún documento solo cuentan en la norma
+        query_vector = np.zeros(len(self._vocabulary), dtype=np.float32)
+        for token, count in query_counts.items():
+            column = self._vocabulary.get(token)
+            if column is not None:
+                query_vector[column] = count
+        query_norm = math.sqrt(sum(count * count for count in query_counts.values()))
+        
+        return matrix @ query_vector / query_norm
+    
+    def clear(self):
+        """Vaciar vocabulario y vectores en caché"""
+        self._vocabulary.clear()
+        self._documents.clear()
+    
+    def _document_vector(self, doc: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vector TF normalizado del documento (tokenizado solo si no está en caché)"""
+        key = self.document_key(doc)
+        vector = self._documents.get(key)
+        if vector is not None:
+            self._documents.move_to_end(key)
+            return vector
+        
+        counts = Counter(self.processor.tokenize(self.document_text(doc)))
+        columns = np.fromiter(
+            (self._vocabulary.setdefault(token, len(self._vocabulary)) for token in counts),
+            dtype=np.int64, count=len(counts)
+        )
+        weights = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        if len(weights):
+            weights /= np.linalg.norm(weights)
+        
+        vector = (columns, weights)
+        self._documents[key] = vector
+        if len(self._documents) > self.max_documents:
+            self._documents.popitem(last=False)
+        return vector
+
+
 class SemanticSearchHelper:
     """Helper para búsqueda semántica con IA"""
     
@@ -331,6 +431,9 @@ class SemanticSearchHelper:
         """
         Expandir query con sinónimos para búsqueda semántica
         
+        Además de los sinónimos y siglas conocidos, usa el diccionario de
+        términos del corpus: corrección ortográfica y términos relacionados.
+        
         Args:
             query: Consulta original
             
@@ -370,7 +473,15 @@ class SemanticSearchHelper:
                         if expansion not in expanded_queries:
                             expanded_queries.append(expansion)
             
-            return list(set(expanded_queries))  # Eliminar duplicados
+            # Diccionario del corpus: consulta corregida y términos que co-aparecen con la consulta
+            spelling = get_term_dictionary().suggest(query)
+            base_query = spelling['did_you_mean'] or query_lower
+            if spelling['did_you_mean']:
+                expanded_queries.append(spelling['did_you_mean'])
+            for term in spelling['expansions']:
+                expanded_queries.append(f"{base_query} {term}")
+            
+            return list(dict.fromkeys(expanded_queries))  # Eliminar duplicados (la original primero)
             
         except Exception as e:
             logger.error(f"Error expandiendo query: {str(e)}")
@@ -388,21 +499,12 @@ class SemanticSearchHelper:
             Documentos reordenados con scores de similitud
         """
         try:
-            # Por ahora usar similitud simple basada en tokens
-            # En implementación real usaríamos embeddings precomputados
-            
-            processed_query = TextProcessor().preprocess_text(query)
-            
-            for doc in documents:
-                # Combinar título, contenido y summary
-                doc_text = f"{doc.get('title', '')} {doc.get('content', '')} {doc.get('summary', '')}"
-                processed_doc = TextProcessor().preprocess_text(doc_text)
-                
-                # Calcular similitud
-                similarity = TextProcessor().calculate_text_similarity(processed_query, processed_doc, 'cosine')
-                
+            # Similitud coseno de tokens, con los vectores de documentos en caché
+            similarities = rerank_engine.score(query, documents)
+            
+            for doc, similarity in zip(documents, similarities.tolist()):
                 # Combinar con score de relevancia existente
-                existing_score = doc.get('relevance_score', 0.0)
+                existing_score = doc.get('relevance_score') or 0.0
                 doc['semantic_score'] = similarity
                 doc['combined_score'] = (existing_score * 0.6) + (similarity * 0.4)
             
@@ -428,24 +530,20 @@ class SemanticSearchHelper:
             Artículos ordenados por similitud
         """
         try:
-            similarities = []
-            
-            for article in articles:
-                # Combinar campos de texto del artículo
-                article_combined = f"{article.get('title', '')} {article.get('content', '')}"
-                
-                # Calcular similitud
-                similarity = TextProcessor().calculate_text_similarity(article_text, article_combined, 'cosine')
-                
-                similarities.append({
-                    'article': article,
-                    'similarity': similarity
-                })
+            if not articles:
+                return []
             
-            # Ordenar por similitud
-            similarities.sort(key=lambda x: x['similarity'], reverse=True)
+            # Un único lote de embeddings y un producto matriz-vector para todos los candidatos
+            vectors = get_embedding_backend().embed([article_text] + [
+                embedding_article_text(article.get('title'), article.get('summary'), article.get('content'))
+                for article in articles
+            ])
+            scores = vectors[1:] @ vectors[0]
             
-            return similarities[:limit]
+            return [
+                {'article': articles[i], 'similarity': float(scores[i])}
+                for i in np.argsort(-scores, kind='stable')[:limit]
+            ]
             
         except Exception as e:
             logger.error(f"Error encontrando artículos similares: {str(e)}")
@@ -454,6 +552,7 @@ class SemanticSearchHelper:
 
 # Instancias globales
 text_processor = TextProcessor()
+rerank_engine = RerankEngine(text_processor)
 semantic_helper = SemanticSearchHelper()
 
 
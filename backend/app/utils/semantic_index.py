@@ -0,0 +1,329 @@
+"""
+Índice semántico de artículos
+Vectores por artículo (tabla article_embeddings) y búsqueda de vecinos más cercanos:
+- Embedding de cada artículo insertado (listener after_insert, como el índice LSH)
+- hnsw: índice HNSW en memoria (hnswlib si está instalado) con carga incremental
+  de los vectores nuevos en un hilo de fondo, nunca en la búsqueda
+- pgvector: columna embedding_vector con índice HNSW en PostgreSQL, si la extensión existe
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.models import Article, ArticleEmbedding
+from .embeddings import EmbeddingBackend, article_text, get_embedding_backend
+from .vector_index import VectorIndex, create_vector_index
+
+logger = logging.getLogger(__name__)
+
+PGVECTOR_BACKEND = 'pgvector'
+
+
+def vector_to_bytes(vector: np.ndarray) -> bytes:
+    """Serializar un vector para la columna embedding"""
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def vector_from_bytes(data: bytes) -> np.ndarray:
+    """Leer un vector de la columna embedding"""
+    return np.frombuffer(data, dtype=np.float32)
+
+
+def pgvector_literal(vector: np.ndarray) -> str:
+    """Vector en el formato de texto de pgvector: '[0.1,0.2,...]'"""
+    return '[' + ','.join(f"{value:.6g}" for value in np.asarray(vector, dtype=np.float32)) + ']'
+
+
+class ArticleVectorIndex:
+    """
+    Vectores de artículos y su índice de vecinos más cercanos
+
+    Con el backend hnsw cada proceso mantiene su propio índice en memoria. Las
+    búsquedas solo leen el índice ya cargado: si está caducado programan en el
+    hilo de fondo la carga de los vectores guardados desde la última (incluidos
+    los de otros procesos) y su enlazado. Los que se insertan en este proceso se
+    añaden al momento.
+    """
+
+    def __init__(self, backend: Optional[EmbeddingBackend] = None, index_backend: Optional[str] = None):
+        """
+        Args:
+            backend: Backend de embeddings (por defecto el configurado)
+            index_backend: 'hnsw' o 'pgvector' (por defecto SEMANTIC_INDEX_BACKEND)
+        """
+        self._backend = backend
+        self.index_backend = index_backend or settings.SEMANTIC_INDEX_BACKEND
+        self._hnsw: Optional[VectorIndex] = None
+        self._watermark: Optional[datetime] = None
+        self._refresh_lock = threading.Lock()
+        self._schedule_lock = threading.Lock()
+        self._refresh_scheduled = False
+        self._loader = ThreadPoolExecutor(max_workers=1)
+
+    @property
+    def backend(self) -> EmbeddingBackend:
+        """Backend de embeddings (el configurado se carga en el primer uso)"""
+        if self._backend is None:
+            self._backend = get_embedding_backend()
+        return self._backend
+
+    @property
+    def hnsw(self) -> VectorIndex:
+        """Índice HNSW en memoria"""
+        if self._hnsw is None:
+            self._hnsw = create_vector_index(self.backend.dim)
+        return self._hnsw
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Vector de una consulta"""
+        return self.backend.embed_one(query)
+
+    def embed_articles(self, articles: List[Article]) -> np.ndarray:
+        """Vectores de un lote de artículos"""
+        return self.backend.embed([
+            article_text(article.title, article.summary, article.content) for article in articles
+        ])
+
+    def index_article(self, db, article: Article) -> bool:
+        """
+        Guardar el vector de un artículo recién insertado
+
+        Args:
+            db: Sesión o conexión SQLAlchemy (admite la conexión de un evento de flush)
+            article: Artículo ya persistido (con id asignado)
+
+        Returns:
+            True si se guardó el vector
+        """
+        if article.id is None:
+            return False
+
+        vector = self.embed_articles([article])[0]
+        self._store(db, [article.id], vector[None, :])
+
+        # Índice ya cargado: el artículo se puede encontrar sin esperar a la próxima carga
+        if self.index_backend != PGVECTOR_BACKEND and self._hnsw is not None and self._hnsw.built_at:
+            self._hnsw.add(article.id, vector)
+        return True
+
+    def _store(self, db, article_ids: List, vectors: np.ndarray) -> None:
+        """Insertar las filas de article_embeddings (y la columna de pgvector)"""
+        now = datetime.utcnow()
+        db.execute(ArticleEmbedding.__table__.insert(), [
+            {
+                'article_id': article_id,
+                'model': self.backend.name,
+                'dim': self.backend.dim,
+                'embedding': vector_to_bytes(vector),
+                'indexed_at': now
+            }
+            for article_id, vector in zip(article_ids, vectors)
+        ])
+
+        if self.index_backend == PGVECTOR_BACKEND:
+            db.execute(
+                text(
+                    "UPDATE article_embeddings SET embedding_vector = CAST(:vector AS vector) "
+                    "WHERE article_id = :article_id"
+                ),
+                [
+                    {'article_id': article_id, 'vector': pgvector_literal(vector)}
+                    for article_id, vector in zip(article_ids, vectors)
+                ]
+            )
+
+    def refresh(self, db: Session) -> int:
+        """
+        Cargar en el índice HNSW los vectores guardados desde la última carga
+
+        La primera carga lee los SEMANTIC_INDEX_MAX_ARTICLES más recientes. Con
+        el índice de Python puro los vectores cargados quedan pendientes (búsqueda
+        exacta) hasta link_pending(). Se ejecuta en el hilo de fondo programado
+        por schedule_refresh().
+
+        Returns:
+            Número de vectores nuevos en el índice
+        """
+        if not self.hnsw.is_stale(settings.SEMANTIC_INDEX_REFRESH_SECONDS):
+            return 0
+        if not self._refresh_lock.acquire(blocking=False):
+            # Otra petición está cargando: se busca con lo que ya hay
+            return 0
+
+        try:
+            started = time.time()
+            query = db.query(
+                ArticleEmbedding.article_id, ArticleEmbedding.embedding, ArticleEmbedding.indexed_at
+            ).filter(ArticleEmbedding.model == self.backend.name)
+
+            if self._watermark is None:
+                rows = query.order_by(ArticleEmbedding.indexed_at.desc()).limit(
+                    settings.SEMANTIC_INDEX_MAX_ARTICLES
+                ).all()[::-1]
+            else:
+                # Solape de un intervalo: filas confirmadas tarde con indexed_at anterior
+                overlap = timedelta(seconds=settings.SEMANTIC_INDEX_REFRESH_SECONDS)
+                rows = query.filter(
+                    ArticleEmbedding.indexed_at > self._watermark - overlap
+                ).order_by(ArticleEmbedding.indexed_at).all()
+
+            added = 0
+            if rows:
+                added = self.hnsw.add_many(
+                    [article_id for article_id, _, _ in rows],
+                    np.vstack([vector_from_bytes(embedding) for _, embedding, _ in rows])
+                )
+                self._watermark = max(self._watermark or rows[-1][2], rows[-1][2])
+
+            self.hnsw.built_at = started
+            if added:
+                logger.info(f"Índice semántico: {added} vectores nuevos ({len(self.hnsw)} en total)")
+            return added
+
+        except Exception as e:
+            db.rollback()
+            # Conservar el índice actual y no reintentar en cada búsqueda
+            self.hnsw.built_at = time.time()
+            logger.error(f"Error cargando índice semántico: {str(e)}")
+            return 0
+        finally:
+            self._refresh_lock.release()
+
+    def schedule_refresh(self, session_factory: Callable[[], Session]) -> bool:
+        """
+        Programar en el hilo de fondo la carga y el enlazado si el índice está caducado
+
+        No bloquea: mientras tanto las búsquedas usan el índice ya cargado (vacío
+        hasta la primera carga).
+
+        Args:
+            session_factory: Crea la sesión de la carga, usada y cerrada en el hilo de fondo
+
+        Returns:
+            True si se programó una carga
+        """
+        if not self.hnsw.is_stale(settings.SEMANTIC_INDEX_REFRESH_SECONDS):
+            return False
+        with self._schedule_lock:
+            if self._refresh_scheduled:
+                return False
+            self._refresh_scheduled = True
+
+        self._loader.submit(self._refresh_in_background, session_factory)
+        return True
+
+    def _refresh_in_background(self, session_factory: Callable[[], Session]) -> int:
+        """Carga y enlazado en el hilo de fondo, con una sesión propia"""
+        try:
+            db = session_factory()
+            try:
+                added = self.refresh(db)
+            finally:
+                db.close()
+            self.hnsw.link_pending()
+            return added
+        except Exception as e:
+            logger.error(f"Error en la carga en segundo plano del índice semántico: {str(e)}")
+            return 0
+        finally:
+            with self._schedule_lock:
+                self._refresh_scheduled = False
+
+    def search(self, db: Session, vector: np.ndarray, k: int) -> List[Tuple[object, float]]:
+        """
+        Artículos más similares a un vector
+
+        Args:
+            db: Sesión de base de datos
+            vector: Vector de consulta de norma 1
+            k: Número de resultados
+
+        Returns:
+            Lista (id de artículo, similitud coseno) de mayor a menor similitud
+        """
+        if self.index_backend == PGVECTOR_BACKEND:
+            rows = db.execute(
+                text(
+                    "SELECT article_id, 1 - (embedding_vector <=> CAST(:vector AS vector)) AS similarity "
+                    "FROM article_embeddings "
+                    "WHERE model = :model AND embedding_vector IS NOT NULL "
+                    "ORDER BY embedding_vector <=> CAST(:vector AS vector) "
+                    "LIMIT :k"
+                ),
+                {'vector': pgvector_literal(vector), 'model': self.backend.name, 'k': k}
+            ).all()
+            return [(article_id, float(similarity)) for article_id, similarity in rows]
+
+        bind = db.get_bind()
+        self.schedule_refresh(lambda: Session(bind=bind))
+        return self.hnsw.search(vector, k)
+
+    def article_vector(self, db: Session, article: Article) -> np.ndarray:
+        """Vector guardado de un artículo, o calculado si aún no tiene"""
+        embedding = db.query(ArticleEmbedding.embedding).filter(
+            ArticleEmbedding.article_id == article.id,
+            ArticleEmbedding.model == self.backend.name
+        ).scalar()
+        if embedding is not None:
+            return vector_from_bytes(embedding)
+        return self.embed_articles([article])[0]
+
+    def backfill(self, db: Session, batch_size: int = 200) -> int:
+        """
+        Calcular los vectores de los artículos sin vector del modelo actual
+        (tras aplicar la migración o cambiar de backend de embeddings)
+
+        Returns:
+            Número de artículos indexados
+        """
+        indexed = 0
+        while True:
+            current = db.query(ArticleEmbedding.article_id).filter(
+                ArticleEmbedding.model == self.backend.name
+            )
+            articles = db.query(Article).filter(~Article.id.in_(current)).limit(batch_size).all()
+            if not articles:
+                break
+
+            ids = [article.id for article in articles]
+            # Vectores de otro modelo: se sustituyen
+            db.query(ArticleEmbedding).filter(
+                ArticleEmbedding.article_id.in_(ids)
+            ).delete(synchronize_session=False)
+            self._store(db, ids, self.embed_articles(articles))
+            db.commit()
+            indexed += len(articles)
+
+        logger.info(f"Índice semántico: {indexed} artículos con vector nuevo ({self.backend.name})")
+        return indexed
+
+
+# Índice compartido por el proceso (creado bajo demanda)
+_article_vector_index: Optional[ArticleVectorIndex] = None
+
+
+def get_article_vector_index() -> ArticleVectorIndex:
+    """Índice semántico compartido por el listener de inserción y SearchService"""
+    global _article_vector_index
+
+    if _article_vector_index is None:
+        _article_vector_index = ArticleVectorIndex()
+    return _article_vector_index
+
+
+@event.listens_for(Article, 'after_insert')
+def _embed_inserted_article(mapper, connection, target: Article) -> None:
+    """Guarda el vector de cada artículo insertado (sesiones síncronas y asíncronas)"""
+    if not settings.SEMANTIC_SEARCH_ENABLED:
+        return
+
+    get_article_vector_index().index_article(connection, target)
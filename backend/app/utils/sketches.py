@@ -0,0 +1,123 @@
+"""
+Estructuras probabilísticas de memoria constante para contar consultas
+- CountMinSketch: frecuencia aproximada de cualquier elemento (nunca la subestima)
+- HeavyHitters: los k elementos más frecuentes, estimados con un Count-Min
+"""
+
+import base64
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch de `depth` filas por `width` contadores
+
+    Cada elemento suma en una columna por fila (doble hashing sobre un único
+    blake2b) y su frecuencia estimada es el mínimo de esas columnas: el error es
+    como mucho total * e / width con probabilidad 1 - exp(-depth).
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4, seed: int = 0):
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self._rows = np.arange(depth)
+        self._key = seed.to_bytes(8, 'little')
+
+    def _columns(self, item: str) -> np.ndarray:
+        """Columna de cada fila para un elemento"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16, key=self._key).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return np.array([(first + row * second) % self.width for row in range(self.depth)])
+
+    def add(self, item: str, count: int = 1) -> int:
+        """Sumar `count` apariciones y devolver la nueva estimación del elemento"""
+        columns = self._columns(item)
+        self.table[self._rows, columns] += count
+        self.total += count
+        return int(self.table[self._rows, columns].min())
+
+    def estimate(self, item: str) -> int:
+        """Frecuencia estimada de un elemento"""
+        return int(self.table[self._rows, self._columns(item)].min())
+
+    def merge(self, other: "CountMinSketch") -> None:
+        """Sumar otro sketch con las mismas dimensiones y semilla"""
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("Solo se pueden combinar sketches con las mismas dimensiones y semilla")
+        self.table += other.table
+        self.total += other.total
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializar para guardar en Redis (JSON)"""
+        return {
+            'width': self.width,
+            'depth': self.depth,
+            'seed': self.seed,
+            'total': self.total,
+            'table': base64.b64encode(self.table.astype('<u4').tobytes()).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CountMinSketch":
+        """Reconstruir un sketch serializado con to_dict"""
+        sketch = cls(data['width'], data['depth'], data.get('seed', 0))
+        table = np.frombuffer(base64.b64decode(data['table']), dtype='<u4')
+        sketch.table = table.reshape(sketch.depth, sketch.width).astype(np.int64)
+        sketch.total = int(data.get('total', 0))
+        return sketch
+
+
+class HeavyHitters:
+    """
+    Top-k aproximado sobre un Count-Min sketch
+
+    Guarda como mucho k candidatos con su estimación; un elemento nuevo entra
+    si su estimación supera a la del candidato más bajo, que sale. La memoria
+    no depende del número de elementos distintos.
+    """
+
+    def __init__(self, k: int = 100, width: int = 2048, depth: int = 4, sketch: Optional[CountMinSketch] = None):
+        self.k = k
+        self.sketch = sketch or CountMinSketch(width, depth)
+        self.candidates: Dict[str, int] = {}
+
+    @property
+    def total(self) -> int:
+        """Apariciones contadas"""
+        return self.sketch.total
+
+    def add(self, item: str, count: int = 1) -> None:
+        """Contar un elemento y actualizar los candidatos"""
+        estimate = self.sketch.add(item, count)
+
+        if item in self.candidates or len(self.candidates) < self.k:
+            self.candidates[item] = estimate
+            return
+
+        weakest = min(self.candidates, key=self.candidates.get)
+        if estimate > self.candidates[weakest]:
+            del self.candidates[weakest]
+            self.candidates[item] = estimate
+
+    def top(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Candidatos de mayor a menor estimación"""
+        ranked = sorted(self.candidates.items(), key=lambda entry: (-entry[1], entry[0]))
+        return ranked[:limit] if limit is not None else ranked
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializar para guardar en Redis (JSON)"""
+        return {'k': self.k, 'sketch': self.sketch.to_dict(), 'candidates': self.candidates}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HeavyHitters":
+        """Reconstruir una estructura serializada con to_dict"""
+        heavy_hitters = cls(data['k'], sketch=CountMinSketch.from_dict(data['sketch']))
+        heavy_hitters.candidates = {item: int(count) for item, count in data.get('candidates', {}).items()}
+        return heavy_hitters
@@ -0,0 +1,187 @@
+"""
+Índice en memoria para autocompletado de búsquedas
+Responde cada pulsación de teclado sin consultar la base de datos:
+- Array ordenado de claves (texto normalizado desde cada inicio de palabra)
+- Búsqueda de prefijos con bisect, O(log n + coincidencias)
+- Top-k precalculado para prefijos cortos, donde el rango de coincidencias es enorme
+- Reconstrucción completa y sustitución atómica al refrescar
+"""
+
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Prioridad de cada tipo de sugerencia (misma escala que las sugerencias previas)
+TYPE_PRIORITY = {
+    'source': 0.9,
+    'topic': 0.8,
+    'term': 0.7,
+}
+
+# Bonus si el prefijo coincide con el inicio del texto y no de una palabra interior
+LEADING_MATCH_BONUS = 0.05
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_suggestion_text(text: str) -> str:
+    """Minúsculas, sin acentos y con espacios colapsados"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _WHITESPACE.sub(' ', stripped.casefold()).strip()
+
+
+class SuggestionIndex:
+    """
+    Índice de prefijos sobre fuentes, temas y vocabulario de artículos
+
+    Cada entrada se indexa desde el inicio de cada una de sus palabras, de modo
+    que "learn" sugiere tanto "learning" como "machine learning".
+    """
+
+    def __init__(
+        self,
+        entries: Optional[Iterable[Tuple[str, str, float]]] = None,
+        short_prefix_length: int = 2,
+        top_k: int = 20
+    ):
+        """
+        Args:
+            entries: Tuplas (texto, tipo, peso) iniciales
+            short_prefix_length: Longitud hasta la que se precalcula el top-k
+            top_k: Sugerencias precalculadas por prefijo corto
+        """
+        self.short_prefix_length = short_prefix_length
+        self.top_k = top_k
+        self.built_at = 0.0
+        # (claves, ids de entrada por clave, offset por clave, entradas, top-k por prefijo corto)
+        self._state: Tuple[List[str], List[int], List[int], List[Dict[str, Any]], Dict[str, List[Tuple[float, int]]]] = (
+            [], [], [], [], {}
+        )
+        if entries is not None:
+            self.build(entries)
+
+    def __len__(self) -> int:
+        return len(self._state[3])
+
+    def is_stale(self, max_age_seconds: float) -> bool:
+        """Si el índice nunca se construyó o es más antiguo que max_age_seconds"""
+        return not self.built_at or time.time() - self.built_at > max_age_seconds
+
+    def build(self, entries: Iterable[Tuple[str, str, float]]) -> None:
+        """
+        Reconstruir el índice
+
+        Args:
+            entries: Tuplas (texto, tipo, peso); el peso se normaliza por tipo
+        """
+        unique: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        for text, suggestion_type, weight in entries:
+            normalized = normalize_suggestion_text(text)
+            if not normalized:
+                continue
+            key = (normalized, suggestion_type)
+            if key not in unique or weight > unique[key][1]:
+                unique[key] = (text.strip(), float(weight or 0.0))
+
+        max_weight: Dict[str, float] = {}
+        for (_, suggestion_type), (_, weight) in unique.items():
+            max_weight[suggestion_type] = max(max_weight.get(suggestion_type, 0.0), weight)
+
+        records = []
+        for (normalized, suggestion_type), (text, weight) in unique.items():
+            relative_weight = weight / max_weight[suggestion_type] if max_weight[suggestion_type] > 0 else 0.0
+            score = TYPE_PRIORITY.get(suggestion_type, 0.5) * (0.7 + 0.3 * relative_weight)
+            records.append({
+                'text': text,
+                'type': suggestion_type,
+                'normalized': normalized,
+                'base_score': score
+            })
+
+        postings = []
+        for entry_id, record in enumerate(records):
+            normalized = record['normalized']
+            for match in re.finditer(r"\S+", normalized):
+                postings.append((normalized[match.start():], entry_id, match.start()))
+        postings.sort()
+
+        keys = [key for key, _, _ in postings]
+        entry_ids = [entry_id for _, entry_id, _ in postings]
+        offsets = [offset for _, _, offset in postings]
+
+        # Top-k de los prefijos cortos: su rango en el array ordenado puede abarcar
+        # miles de claves, así que se resuelven con una consulta a dict
+        top_by_prefix: Dict[str, Dict[int, float]] = {}
+        for key, entry_id, offset in postings:
+            score = self._match_score(records[entry_id], offset)
+            for length in range(1, min(self.short_prefix_length, len(key)) + 1):
+                best = top_by_prefix.setdefault(key[:length], {})
+                if score > best.get(entry_id, -1.0):
+                    best[entry_id] = score
+        top_lists = {
+            prefix: sorted(((score, entry_id) for entry_id, score in scores.items()), reverse=True)[:self.top_k]
+            for prefix, scores in top_by_prefix.items()
+        }
+
+        self._state = (keys, entry_ids, offsets, records, top_lists)
+        self.built_at = time.time()
+
+    @staticmethod
+    def _match_score(record: Dict[str, Any], offset: int) -> float:
+        return record['base_score'] + (LEADING_MATCH_BONUS if offset == 0 else 0.0)
+
+    def search(
+        self,
+        prefix: str,
+        limit: int = 10,
+        types: Optional[Sequence[str]] = None,
+        max_scan: int = 2000
+    ) -> List[Dict[str, Any]]:
+        """
+        Sugerencias que empiezan por el prefijo (al inicio de cualquier palabra)
+
+        Args:
+            prefix: Texto tecleado
+            limit: Número máximo de sugerencias
+            types: Tipos permitidos (todos si None)
+            max_scan: Máximo de claves revisadas en el rango del prefijo
+
+        Returns:
+            Lista de {'text', 'type', 'score'} ordenada por score
+        """
+        normalized = normalize_suggestion_text(prefix)
+        if not normalized or limit <= 0:
+            return []
+
+        keys, entry_ids, offsets, records, top_lists = self._state
+        allowed = set(types) if types is not None else None
+
+        if len(normalized) <= self.short_prefix_length and normalized in top_lists:
+            candidates = [
+                (score, entry_id) for score, entry_id in top_lists[normalized]
+                if allowed is None or records[entry_id]['type'] in allowed
+            ]
+            if len(candidates) >= limit or len(top_lists[normalized]) < self.top_k:
+                return [self._format(records[entry_id], score) for score, entry_id in candidates[:limit]]
+
+        best: Dict[int, float] = {}
+        position = bisect_left(keys, normalized)
+        end = min(len(keys), position + max_scan)
+        while position < end and keys[position].startswith(normalized):
+            entry_id = entry_ids[position]
+            record = records[entry_id]
+            if allowed is None or record['type'] in allowed:
+                score = self._match_score(record, offsets[position])
+                if score > best.get(entry_id, -1.0):
+                    best[entry_id] = score
+            position += 1
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1], records[item[0]]['normalized']))
+        return [self._format(records[entry_id], score) for entry_id, score in ranked[:limit]]
+
+    @staticmethod
+    def _format(record: Dict[str, Any], score: float) -> Dict[str, Any]:
+        return {'text': record['text'], 'type': record['type'], 'score': round(score, 4)}
@@ -0,0 +1,491 @@
+"""
+Diccionario de términos del corpus para corrección ortográfica y expansión de consultas
+- Vocabulario y frecuencias de documento de los títulos y topic_tags de los artículos
+- "Quizás quisiste decir": índice de borrados estilo SymSpell (distancia de edición)
+- Expansiones: términos que más co-aparecen con los de la consulta (coseno de co-ocurrencia)
+- Carga incremental (solo artículos nuevos) y compilación en segundo plano a arrays
+  de numpy; las consultas leen una instantánea inmutable sin bloquear
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix, diags
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.models import Article
+from .suggestion_index import normalize_suggestion_text
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9]+")
+MIN_TERM_LENGTH = 3
+MAX_TERM_LENGTH = 32
+
+# Solo los primeros caracteres de cada término generan borrados (SymSpell con prefijo)
+PREFIX_LENGTH = 7
+
+# Términos de un artículo que cuentan para la co-ocurrencia (acota los pares por artículo)
+MAX_TERMS_PER_DOCUMENT = 24
+
+# Vecinos guardados por término y artículos mínimos en común para considerarlos relacionados
+NEIGHBOURS_PER_TERM = 8
+MIN_COOCCURRENCE = 2
+
+# Palabras cortas: una sola edición para no "corregir" a otra palabra válida
+SHORT_WORD_LENGTH = 5
+
+
+def tokenize_terms(text: str) -> List[str]:
+    """Términos únicos de un texto, en orden, sin acentos, números ni stopwords"""
+    seen: Dict[str, None] = {}
+    for token in TOKEN_PATTERN.findall(normalize_suggestion_text(text)):
+        if MIN_TERM_LENGTH <= len(token) <= MAX_TERM_LENGTH and token not in ENGLISH_STOP_WORDS:
+            seen.setdefault(token, None)
+    return list(seen)
+
+
+def edit_distance(source: str, target: str, max_distance: int) -> int:
+    """
+    Distancia Damerau-Levenshtein (transposiciones adyacentes) con corte
+
+    Returns:
+        La distancia, o max_distance + 1 si la supera
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+
+    previous_previous: List[int] = []
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        row_min = current[0]
+        for j in range(1, len(target) + 1):
+            cost = 0 if source[i - 1] == target[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and source[i - 1] == target[j - 2]
+                    and source[i - 2] == target[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+
+    return min(previous[-1], max_distance + 1)
+
+
+def _delete_hash(delete: str) -> int:
+    """Hash de 32 bits de un borrado (las colisiones se descartan al verificar la distancia)"""
+    return hash(delete) & 0xFFFFFFFF
+
+
+def prefix_deletes(word: str, max_distance: int) -> Set[str]:
+    """Variantes del prefijo de una palabra con hasta max_distance caracteres borrados"""
+    prefix = word[:PREFIX_LENGTH]
+    deletes = {prefix}
+    frontier = {prefix}
+    for _ in range(max_distance):
+        frontier = {
+            candidate[:index] + candidate[index + 1:]
+            for candidate in frontier if len(candidate) > 1
+            for index in range(len(candidate))
+        }
+        deletes |= frontier
+    return deletes
+
+
+class CompiledTermDictionary:
+    """
+    Instantánea inmutable del diccionario en arrays de numpy
+
+    - terms: términos ordenados (búsqueda binaria) y su frecuencia de documento
+    - delete_hashes / delete_terms: hash de cada borrado y término que lo genera,
+      ordenados por hash (candidatos de corrección con searchsorted)
+    - neighbour_ptr / neighbour_ids / neighbour_scores: vecinos de co-ocurrencia en CSR
+
+    Los hashes de borrados usan hash() de Python (32 bits): la instantánea solo
+    es válida en el proceso que la compiló.
+    """
+
+    def __init__(
+        self,
+        terms: Sequence[str],
+        frequencies: Sequence[int],
+        cooccurrence: Optional[csr_matrix] = None,
+        max_distance: int = 2
+    ):
+        """
+        Args:
+            terms: Términos del diccionario (cualquier orden, sin repetidos)
+            frequencies: Artículos que contienen cada término
+            cooccurrence: Matriz simétrica términos x términos de artículos en común
+            max_distance: Distancia máxima de las correcciones
+        """
+        self.max_distance = max_distance
+        unsorted = np.asarray(list(terms) or [''], dtype=str)[:len(terms)]
+        order = np.argsort(unsorted, kind='stable')
+        self.terms = unsorted[order]
+        self.frequencies = np.asarray(frequencies, dtype=np.int32)[order]
+
+        hashes: List[int] = []
+        owners: List[int] = []
+        for term_id, term in enumerate(self.terms.tolist()):
+            for delete in prefix_deletes(term, max_distance):
+                hashes.append(_delete_hash(delete))
+                owners.append(term_id)
+        hash_array = np.asarray(hashes, dtype=np.uint32)
+        by_hash = np.argsort(hash_array, kind='stable')
+        self.delete_hashes = hash_array[by_hash]
+        self.delete_terms = np.asarray(owners, dtype=np.int32)[by_hash]
+
+        self._build_neighbours(cooccurrence[order][:, order] if cooccurrence is not None and len(order) else None)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _build_neighbours(self, cooccurrence: Optional[csr_matrix]) -> None:
+        """Top NEIGHBOURS_PER_TERM vecinos por coseno de co-ocurrencia"""
+        size = len(self.terms)
+        pointers = [0]
+        neighbour_ids: List[np.ndarray] = []
+        neighbour_scores: List[np.ndarray] = []
+
+        if cooccurrence is not None and cooccurrence.nnz:
+            counts = cooccurrence.tocsr().astype(np.float32)
+            counts.data[counts.data < MIN_COOCCURRENCE] = 0
+            counts.setdiag(0)
+            counts.eliminate_zeros()
+            inverse_norms = diags(1.0 / np.sqrt(np.maximum(self.frequencies, 1)).astype(np.float32))
+            scores = (inverse_norms @ counts @ inverse_norms).tocsr()
+            scores.sort_indices()
+
+            for row in range(size):
+                start, end = scores.indptr[row], scores.indptr[row + 1]
+                row_scores = scores.data[start:end]
+                top = np.argsort(-row_scores, kind='stable')[:NEIGHBOURS_PER_TERM]
+                neighbour_ids.append(scores.indices[start:end][top].astype(np.int32))
+                neighbour_scores.append(row_scores[top])
+                pointers.append(pointers[-1] + len(top))
+        else:
+            pointers.extend([0] * size)
+
+        self.neighbour_ptr = np.asarray(pointers, dtype=np.int64)
+        self.neighbour_ids = np.concatenate(neighbour_ids) if neighbour_ids else np.array([], dtype=np.int32)
+        self.neighbour_scores = np.concatenate(neighbour_scores) if neighbour_scores else np.array([], dtype=np.float32)
+
+    def term_id(self, term: str) -> Optional[int]:
+        """Posición de un término, o None si no está en el diccionario"""
+        position = int(np.searchsorted(self.terms, term))
+        if position < len(self.terms) and self.terms[position] == term:
+            return position
+        return None
+
+    def correct(self, word: str) -> Optional[str]:
+        """
+        Término del diccionario más cercano a una palabra desconocida
+
+        Menor distancia de edición y, a igual distancia, el más frecuente.
+
+        Returns:
+            El término corregido, o None si no hay ninguno a distancia permitida
+        """
+        if not len(self.delete_hashes):
+            return None
+        max_distance = 1 if len(word) <= SHORT_WORD_LENGTH else self.max_distance
+
+        hashes = np.fromiter(
+            (_delete_hash(delete) for delete in prefix_deletes(word, max_distance)), dtype=np.uint32
+        )
+        starts = np.searchsorted(self.delete_hashes, hashes, side='left')
+        ends = np.searchsorted(self.delete_hashes, hashes, side='right')
+        candidates = {
+            int(term_id)
+            for start, end in zip(starts, ends) if end > start
+            for term_id in self.delete_terms[start:end]
+        }
+
+        best: Optional[Tuple[int, int, str]] = None
+        for term_id in candidates:
+            term = str(self.terms[term_id])
+            distance = edit_distance(word, term, max_distance)
+            if distance > max_distance:
+                continue
+            rank = (distance, -int(self.frequencies[term_id]), term)
+            if best is None or rank < best:
+                best = rank
+        return best[2] if best else None
+
+    def neighbours(self, term_id: int) -> List[Tuple[str, float]]:
+        """Términos relacionados con su score, de mayor a menor"""
+        start, end = self.neighbour_ptr[term_id], self.neighbour_ptr[term_id + 1]
+        return [
+            (str(self.terms[neighbour]), float(score))
+            for neighbour, score in zip(self.neighbour_ids[start:end], self.neighbour_scores[start:end])
+        ]
+
+
+class TermDictionary:
+    """
+    Diccionario de términos del corpus, cargado de forma incremental
+
+    refresh() suma al vocabulario y a la matriz de co-ocurrencia los artículos
+    creados desde la última carga y compila una instantánea nueva en un hilo de
+    fondo; suggest() y expand() trabajan solo con la instantánea vigente. Las
+    peticiones no cargan: schedule_refresh() programa la carga en el hilo de
+    fondo con su propia sesión.
+    """
+
+    def __init__(
+        self,
+        max_terms: Optional[int] = None,
+        max_vocabulary: int = 200000,
+        min_documents: Optional[int] = None,
+        max_distance: Optional[int] = None
+    ):
+        """
+        Args:
+            max_terms: Términos más frecuentes compilados (por defecto TERM_DICTIONARY_MAX_TERMS)
+            max_vocabulary: Términos distintos contados; los posteriores se ignoran
+            min_documents: Artículos mínimos con el término (por defecto SEARCH_TERMS_MIN_DOCS)
+            max_distance: Distancia máxima de corrección (por defecto TERM_DICTIONARY_MAX_EDIT_DISTANCE)
+        """
+        self.max_terms = max_terms or settings.TERM_DICTIONARY_MAX_TERMS
+        self.max_vocabulary = max_vocabulary
+        self.min_documents = min_documents or settings.SEARCH_TERMS_MIN_DOCS
+        self.max_distance = max_distance or settings.TERM_DICTIONARY_MAX_EDIT_DISTANCE
+        self.built_at = 0.0
+
+        self._vocabulary: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._document_counts = np.zeros(max_vocabulary, dtype=np.int32)
+        self._cooccurrence = csr_matrix((max_vocabulary, max_vocabulary), dtype=np.int32)
+        self._watermark: Optional[datetime] = None
+        self._snapshot = CompiledTermDictionary([], [], max_distance=self.max_distance)
+        self._refresh_lock = threading.Lock()
+        self._schedule_lock = threading.Lock()
+        self._refresh_scheduled = False
+        self._compiler = ThreadPoolExecutor(max_workers=1)
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def is_stale(self, max_age_seconds: float) -> bool:
+        """Si el diccionario nunca se cargó o es más antiguo que max_age_seconds"""
+        return not self.built_at or time.time() - self.built_at > max_age_seconds
+
+    def add_documents(self, documents: Iterable[Sequence[str]]) -> int:
+        """
+        Contar los términos de un lote de documentos (listas de términos)
+
+        Returns:
+            Documentos añadidos
+        """
+        rows: List[int] = []
+        columns: List[int] = []
+        added = 0
+        for terms in documents:
+            term_ids = []
+            for term in terms:
+                term_id = self._vocabulary.get(term)
+                if term_id is None:
+                    if len(self._terms) >= self.max_vocabulary:
+                        continue
+                    term_id = self._vocabulary[term] = len(self._terms)
+                    self._terms.append(term)
+                term_ids.append(term_id)
+            if not term_ids:
+                continue
+
+            self._document_counts[term_ids] += 1
+            related = term_ids[:MAX_TERMS_PER_DOCUMENT]
+            for position, first in enumerate(related):
+                for second in related[position + 1:]:
+                    rows.extend((first, second))
+                    columns.extend((second, first))
+            added += 1
+
+        if rows:
+            batch = coo_matrix(
+                (np.ones(len(rows), dtype=np.int32), (rows, columns)),
+                shape=self._cooccurrence.shape
+            ).tocsr()
+            self._cooccurrence = self._cooccurrence + batch
+        return added
+
+    def compile(self) -> CompiledTermDictionary:
+        """Compilar y publicar la instantánea con los términos más frecuentes"""
+        # Copias: la siguiente carga puede sumar documentos mientras se compila
+        terms = self._terms[:]
+        counts = self._document_counts[:len(terms)].copy()
+        cooccurrence = self._cooccurrence
+        eligible = np.flatnonzero(counts >= self.min_documents)
+        selected = eligible[np.argsort(-counts[eligible], kind='stable')][:self.max_terms]
+
+        snapshot = CompiledTermDictionary(
+            [terms[term_id] for term_id in selected],
+            counts[selected],
+            cooccurrence[selected][:, selected],
+            self.max_distance
+        )
+        self._snapshot = snapshot
+        return snapshot
+
+    def refresh(self, db: Session, background: bool = True) -> int:
+        """
+        Añadir los artículos creados desde la última carga
+
+        La primera carga lee los TERM_DICTIONARY_MAX_ARTICLES más recientes.
+
+        Args:
+            db: Sesión de base de datos
+            background: Compilar la instantánea en el hilo de fondo
+
+        Returns:
+            Número de artículos nuevos
+        """
+        if not self.is_stale(settings.TERM_DICTIONARY_REFRESH_SECONDS):
+            return 0
+        if not self._refresh_lock.acquire(blocking=False):
+            # Otra petición está cargando: se usa la instantánea actual
+            return 0
+
+        try:
+            started = time.time()
+            query = db.query(Article.title, Article.topic_tags, Article.created_at).filter(
+                Article.created_at.isnot(None)
+            )
+            if self._watermark is None:
+                rows = query.order_by(Article.created_at.desc()).limit(
+                    settings.TERM_DICTIONARY_MAX_ARTICLES
+                ).all()[::-1]
+            else:
+                rows = query.filter(Article.created_at > self._watermark).order_by(Article.created_at).all()
+
+            added = self.add_documents(
+                tokenize_terms(" ".join([title or ""] + [str(tag) for tag in (topic_tags or [])]))
+                for title, topic_tags, _ in rows
+            )
+            if rows:
+                self._watermark = rows[-1][2]
+                if background:
+                    self._compiler.submit(self.compile)
+                else:
+                    self.compile()
+
+            self.built_at = started
+            if added:
+                logger.info(f"Diccionario de términos: {added} artículos nuevos ({len(self._terms)} términos contados)")
+            return added
+
+        except Exception as e:
+            db.rollback()
+            # Conservar la instantánea actual y no reintentar en cada búsqueda
+            self.built_at = time.time()
+            logger.error(f"Error cargando diccionario de términos: {str(e)}")
+            return 0
+        finally:
+            self._refresh_lock.release()
+
+    def schedule_refresh(self, session_factory: Callable[[], Session]) -> bool:
+        """
+        Programar en el hilo de fondo la carga incremental si el diccionario está caducado
+
+        No bloquea: mientras carga y compila, suggest() usa la instantánea anterior
+        (vacía hasta la primera carga).
+
+        Args:
+            session_factory: Crea la sesión de la carga, usada y cerrada en el hilo de fondo
+
+        Returns:
+            True si se programó una carga
+        """
+        if not self.is_stale(settings.TERM_DICTIONARY_REFRESH_SECONDS):
+            return False
+        with self._schedule_lock:
+            if self._refresh_scheduled:
+                return False
+            self._refresh_scheduled = True
+
+        self._compiler.submit(self._refresh_in_background, session_factory)
+        return True
+
+    def _refresh_in_background(self, session_factory: Callable[[], Session]) -> int:
+        """Carga y compilación en el hilo de fondo, con una sesión propia"""
+        try:
+            db = session_factory()
+            try:
+                return self.refresh(db, background=False)
+            finally:
+                db.close()
+        except Exception as e:
+            logger.error(f"Error en la carga en segundo plano del diccionario de términos: {str(e)}")
+            return 0
+        finally:
+            with self._schedule_lock:
+                self._refresh_scheduled = False
+
+    def suggest(self, query: str, max_expansions: int = 5) -> Dict[str, object]:
+        """
+        Corrección y expansión de una consulta
+
+        Args:
+            query: Texto de la consulta
+            max_expansions: Términos relacionados devueltos
+
+        Returns:
+            Dict con did_you_mean (consulta corregida o None), corrections
+            (palabra -> término) y expansions (términos relacionados)
+        """
+        snapshot = self._snapshot
+        normalized = normalize_suggestion_text(query)
+        corrections: Dict[str, str] = {}
+        term_ids: List[int] = []
+
+        for word in tokenize_terms(normalized):
+            term_id = snapshot.term_id(word)
+            if term_id is None:
+                correction = snapshot.correct(word)
+                if correction is None:
+                    continue
+                corrections[word] = correction
+                term_id = snapshot.term_id(correction)
+            term_ids.append(term_id)
+
+        query_terms = {str(snapshot.terms[term_id]) for term_id in term_ids}
+        related: Dict[str, float] = {}
+        for term_id in term_ids:
+            for term, score in snapshot.neighbours(term_id):
+                if term not in query_terms:
+                    related[term] = related.get(term, 0.0) + score
+
+        did_you_mean = None
+        if corrections:
+            did_you_mean = TOKEN_PATTERN.sub(lambda match: corrections.get(match.group(0), match.group(0)), normalized)
+
+        return {
+            'did_you_mean': did_you_mean,
+            'corrections': corrections,
+            'expansions': [term for term, _ in sorted(related.items(), key=lambda item: (-item[1], item[0]))][:max_expansions]
+        }
+
+
+# Diccionario compartido por el proceso (creado bajo demanda)
+_term_dictionary: Optional[TermDictionary] = None
+
+
+def get_term_dictionary() -> TermDictionary:
+    """Diccionario de términos compartido por SearchService y SemanticSearchHelper"""
+    global _term_dictionary
+
+    if _term_dictionary is None:
+        _term_dictionary = TermDictionary()
+    return _term_dictionary
@@ -0,0 +1,261 @@
+"""
+Conteo de tokens y recorte de contenido para las llamadas al LLM
+Cuenta con el tokenizer BPE local del modelo (tiktoken) en lugar de estimar por
+caracteres, para que el recorte del artículo y el costo calculado coincidan con
+lo que factura la API:
+- encoder cargado una vez por proceso y compartido por los modelos de la misma codificación;
+  warm_encoding() lo carga en un hilo al arrancar y mientras tanto se estima por caracteres
+- recorte en límite de frase hasta el presupuesto de tokens de cada tipo de análisis
+- codificación memoizada por hash del contenido (LRU acotada): repetir un análisis
+  sobre el mismo artículo no vuelve a tokenizarlo
+Sin tiktoken instalado se usa la estimación de 4 caracteres por token.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Codificación de los modelos de chat que tiktoken no reconoce por nombre
+DEFAULT_ENCODING = "cl100k_base"
+
+# Nombre del contador sin tiktoken
+HEURISTIC_ENCODING = "heuristic"
+
+# Caracteres por token de la estimación sin tiktoken
+CHARS_PER_TOKEN = 4
+
+# Tokens fijos de cada mensaje de chat (rol y delimitadores) y del inicio de la respuesta
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+# Segundos antes de reintentar la carga de un encoder que falló
+ENCODING_RETRY_SECONDS = 300
+
+# Presupuesto de tokens del contenido para tipos de análisis sin entrada en settings
+DEFAULT_CONTENT_TOKENS = 500
+
+# Fin de frase: puntuación final (y comillas o paréntesis de cierre) seguida de espacio
+SENTENCE_END_PATTERN = re.compile(r'[.!?…]+["\'»”)\]]*(?=\s)')
+
+
+_encodings: Dict[Optional[str], Any] = {}
+_encoding_failures: Dict[Optional[str], float] = {}
+_encodings_lock = threading.Lock()
+
+
+def _load_encoding(model: Optional[str]) -> Any:
+    """Cargar el encoder de tiktoken del modelo (puede descargar el fichero BPE)"""
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            logger.info(f"Modelo {model} sin codificación conocida, usando {DEFAULT_ENCODING}")
+    return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+
+def get_encoding(model: Optional[str] = None) -> Optional[Any]:
+    """
+    Encoder BPE del modelo, cargado una vez por proceso
+
+    Solo se guardan los encoders cargados: tras un fallo (p. ej. sin red para
+    descargar el fichero BPE) se reintenta pasados ENCODING_RETRY_SECONDS. Si
+    otro hilo está cargando no se espera: se devuelve None y se estima por
+    caracteres hasta que termine.
+
+    Returns:
+        Encoding de tiktoken, o None sin tiktoken o si aún no está cargado
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    encoding = _encodings.get(model)
+    if encoding is not None:
+        return encoding
+    failed_at = _encoding_failures.get(model)
+    if failed_at is not None and time.time() - failed_at < ENCODING_RETRY_SECONDS:
+        return None
+    if not _encodings_lock.acquire(blocking=False):
+        return None
+
+    try:
+        encoding = _encodings.get(model)
+        if encoding is None:
+            encoding = _encodings[model] = _load_encoding(model)
+            _encoding_failures.pop(model, None)
+        return encoding
+    except Exception as e:
+        # La primera carga descarga el fichero BPE si no está en la caché local
+        _encoding_failures[model] = time.time()
+        logger.warning(f"No se pudo cargar el tokenizer de tiktoken, usando estimación por caracteres: {str(e)}")
+        return None
+    finally:
+        _encodings_lock.release()
+
+
+def warm_encoding(model: Optional[str] = None) -> threading.Thread:
+    """Cargar el encoder del modelo en un hilo de fondo, fuera del event loop"""
+    thread = threading.Thread(target=get_encoding, args=(model,), name="tokenizer-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def sentence_ends(text: str) -> List[int]:
+    """Posiciones (en caracteres) donde termina cada frase del texto, incluida la última"""
+    ends = [match.end() for match in SENTENCE_END_PATTERN.finditer(text)]
+    return [end for end in ends if end < len(text)] + [len(text)]
+
+
+class TokenCounter:
+    """
+    Contador de tokens de una codificación con memoria por hash del contenido
+
+    Para cada texto se guarda su número de tokens y los tokens acumulados al final
+    de cada frase; con eso se cuentan y se recortan textos ya vistos sin volver a
+    codificarlos.
+    """
+
+    def __init__(self, encoding: Optional[Any] = None, cache_size: Optional[int] = None):
+        """
+        Args:
+            encoding: Encoding de tiktoken (None: estimación por caracteres)
+            cache_size: Textos memoizados como máximo (por defecto de settings)
+        """
+        self.encoding = encoding
+        self.name = encoding.name if encoding is not None else HEURISTIC_ENCODING
+        self.cache_size = cache_size or settings.AI_TOKENIZER_CACHE_SIZE
+        self._layouts: "OrderedDict[str, Tuple[int, Tuple[Tuple[int, int], ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @property
+    def exact(self) -> bool:
+        """True si cuenta con el tokenizer real del modelo"""
+        return self.encoding is not None
+
+    def _token_offsets(self, text: str) -> List[int]:
+        """Posición (en caracteres) donde empieza cada token del texto"""
+        if self.encoding is None:
+            return list(range(0, len(text), CHARS_PER_TOKEN))
+        tokens = self.encoding.encode_ordinary(text)
+        _, offsets = self.encoding.decode_with_offsets(tokens)
+        return offsets
+
+    def _layout(self, text: str) -> Tuple[int, Tuple[Tuple[int, int], ...]]:
+        """Tokens del texto y (fin de frase, tokens hasta ahí) de cada frase, memoizados"""
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            layout = self._layouts.get(key)
+            if layout is not None:
+                self._layouts.move_to_end(key)
+                self.stats["hits"] += 1
+                return layout
+
+        offsets = self._token_offsets(text)
+        layout = (len(offsets), tuple((end, bisect_left(offsets, end)) for end in sentence_ends(text)))
+
+        with self._lock:
+            self.stats["misses"] += 1
+            self._layouts[key] = layout
+            while len(self._layouts) > self.cache_size:
+                self._layouts.popitem(last=False)
+        return layout
+
+    def count(self, text: str) -> int:
+        """Número de tokens del texto"""
+        if not text:
+            return 0
+        return self._layout(text)[0]
+
+    def count_messages(self, messages: Sequence[Dict[str, str]]) -> int:
+        """Tokens de entrada de una llamada de chat: los mensajes con su rol y delimitadores"""
+        return sum(
+            TOKENS_PER_MESSAGE + self.count(message.get("role", "")) + self.count(message.get("content") or "")
+            for message in messages
+        ) + TOKENS_PER_REPLY
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Recorta el texto a max_tokens en el último final de frase que quepa
+
+        Si ni la primera frase cabe, se corta en el último límite de palabra
+        antes del token max_tokens.
+        """
+        if not text or max_tokens <= 0:
+            return ""
+        total, sentences = self._layout(text)
+        if total <= max_tokens:
+            return text
+
+        cut = 0
+        for end, tokens in sentences:
+            if tokens > max_tokens:
+                break
+            cut = end
+        if cut:
+            return text[:cut].rstrip()
+
+        offsets = self._token_offsets(text)
+        limit = offsets[max_tokens] if max_tokens < len(offsets) else len(text)
+        word_end = text.rfind(' ', 0, limit + 1)
+        return text[:word_end if word_end > 0 else limit].rstrip()
+
+    def clear(self):
+        """Vacía la memoria de textos codificados"""
+        with self._lock:
+            self._layouts.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Aciertos de la memoria y textos guardados"""
+        with self._lock:
+            return {**self.stats, "size": len(self._layouts), "encoding": self.name}
+
+
+_counters: Dict[str, TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def get_token_counter(model: Optional[str] = None) -> TokenCounter:
+    """Contador compartido de la codificación del modelo (uno por codificación y proceso)"""
+    encoding = get_encoding(model)
+    name = encoding.name if encoding is not None else HEURISTIC_ENCODING
+    with _counters_lock:
+        if name not in _counters:
+            _counters[name] = TokenCounter(encoding)
+        return _counters[name]
+
+
+def content_token_budget(analysis_type: str) -> int:
+    """Tokens del artículo que se envían para el tipo de análisis"""
+    return settings.AI_CONTENT_TOKEN_BUDGETS.get(analysis_type, DEFAULT_CONTENT_TOKENS)
+
+
+def truncate_for_analysis(text: str, analysis_type: str, model: Optional[str] = None) -> str:
+    """Contenido recortado en límite de frase al presupuesto de tokens del tipo de análisis"""
+    return get_token_counter(model).truncate(text, content_token_budget(analysis_type))
+
+
+def count_prompt_tokens(response: Any, messages: Sequence[Dict[str, str]], model: Optional[str] = None) -> int:
+    """
+    Tokens de entrada de una llamada para calcular su costo
+
+    Los facturados por la API (usage.prompt_tokens) si la respuesta los trae;
+    si no, los contados con el tokenizer del modelo.
+    """
+    prompt_tokens = getattr(getattr(response, "usage", None), "prompt_tokens", None)
+    if isinstance(prompt_tokens, int) and not isinstance(prompt_tokens, bool):
+        return prompt_tokens
+    return get_token_counter(model).count_messages(messages)
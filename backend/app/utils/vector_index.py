@@ -0,0 +1,417 @@
+"""
+Índice HNSW en memoria para búsqueda aproximada de vecinos más cercanos
+Grafo jerárquico navegable (Malkov & Yashunin) sobre vectores normalizados:
+- Similitud coseno como producto escalar (los vectores llegan con norma 1)
+- Inserción incremental: cada vector se enlaza a sus M vecinos por nivel
+- Búsqueda voraz desde el nivel superior y búsqueda en haz (ef) en el nivel 0
+- Cargas en bloque: los vectores quedan pendientes (búsqueda exacta) hasta
+  que link_pending() los enlaza, normalmente en segundo plano
+Con hnswlib instalado se usa su implementación en C++ (create_vector_index),
+que enlaza con hilos nativos sin retener el GIL; HNSWIndex queda como
+alternativa en Python puro.
+"""
+
+import heapq
+import math
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+# Por debajo de este tamaño un producto matriz-vector exacto es más rápido que el grafo
+EXACT_SEARCH_MAX_SIZE = 2000
+
+# Vectores por llamada a hnswlib: las búsquedas esperan como mucho un lote
+HNSWLIB_ADD_BATCH_SIZE = 1000
+
+
+class HNSWIndex:
+    """
+    Índice de vecinos aproximados con claves arbitrarias (ej. ids de artículo)
+
+    Los nodos se enlazan en orden de inserción: los primeros `linked` forman el
+    grafo y el resto están pendientes. Las búsquedas combinan el grafo con un
+    recorrido exacto de los pendientes, así que nunca esperan al enlazado.
+    Las escrituras se serializan con un lock; las búsquedas no bloquean.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        m: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 64,
+        seed: int = 42
+    ):
+        """
+        Args:
+            dim: Dimensión de los vectores
+            m: Vecinos por nodo en los niveles superiores (2 * m en el nivel 0)
+            ef_construction: Tamaño del haz al insertar
+            ef_search: Tamaño mínimo del haz al buscar
+            seed: Semilla del sorteo de niveles
+        """
+        self.dim = dim
+        self.m = m
+        self.m0 = 2 * m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.built_at = 0.0
+
+        self._level_mult = 1 / math.log(m)
+        self._rng = np.random.RandomState(seed)
+        self._vectors = np.zeros((1024, dim), dtype=np.float32)
+        self._keys: List[Hashable] = []
+        self._nodes: Dict[Hashable, int] = {}
+        # _links[nodo][nivel] -> vecinos del nodo en ese nivel (vacío si está pendiente)
+        self._links: List[List[List[int]]] = []
+        self._linked = 0
+        self._entry_point: Optional[int] = None
+        self._max_level = -1
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._nodes
+
+    @property
+    def pending(self) -> int:
+        """Vectores insertados que aún no forman parte del grafo"""
+        return len(self._keys) - self._linked
+
+    def is_stale(self, max_age_seconds: float) -> bool:
+        """Si el índice nunca se cargó o es más antiguo que max_age_seconds"""
+        return not self.built_at or time.time() - self.built_at > max_age_seconds
+
+    def add(self, key: Hashable, vector: np.ndarray) -> None:
+        """
+        Insertar un vector y enlazarlo (si hay una carga pendiente, queda en cola)
+
+        Args:
+            key: Clave devuelta por search(); si ya existe se sustituye su vector
+            vector: Vector de norma 1 y dimensión dim
+        """
+        self.add_many([key], np.asarray(vector, dtype=np.float32).reshape(1, self.dim))
+        if self.pending == 1:
+            self.link_pending()
+
+    def add_many(self, keys: Sequence[Hashable], vectors: np.ndarray) -> int:
+        """
+        Insertar un lote de vectores sin enlazarlos (quedan pendientes)
+
+        Returns:
+            Número de claves nuevas
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+
+        with self._lock:
+            new_keys, new_vectors = [], []
+            for key, vector in zip(keys, vectors):
+                node = self._nodes.get(key)
+                if node is not None:
+                    self._vectors[node] = vector
+                else:
+                    new_keys.append(key)
+                    new_vectors.append(vector)
+
+            start, end = len(self._keys), len(self._keys) + len(new_keys)
+            if end > len(self._vectors):
+                grown = np.zeros((max(end, 2 * len(self._vectors)), self.dim), dtype=np.float32)
+                grown[:start] = self._vectors[:start]
+                self._vectors = grown
+            if new_vectors:
+                self._vectors[start:end] = np.vstack(new_vectors)
+
+            for node, key in enumerate(new_keys, start):
+                self._links.append([])
+                self._nodes[key] = node
+            # Las claves se publican al final: search() solo ve vectores ya escritos
+            self._keys.extend(new_keys)
+            return len(new_keys)
+
+    def link_pending(self, max_nodes: Optional[int] = None) -> int:
+        """
+        Enlazar en el grafo los vectores pendientes, en orden de inserción
+
+        Toma el lock por nodo, de modo que las inserciones no esperan a la carga.
+
+        Args:
+            max_nodes: Máximo de nodos a enlazar en esta llamada (todos por defecto)
+
+        Returns:
+            Número de nodos enlazados
+        """
+        linked = 0
+        while self.pending and (max_nodes is None or linked < max_nodes):
+            with self._lock:
+                if not self.pending:
+                    break
+                self._link(self._linked)
+                self._linked += 1
+            linked += 1
+        return linked
+
+    def search(self, vector: np.ndarray, k: int, ef: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        """
+        Vecinos más similares a un vector
+
+        Args:
+            vector: Vector de consulta de norma 1
+            k: Número de resultados
+            ef: Tamaño del haz (mayor = más exacto y más lento)
+
+        Returns:
+            Lista (clave, similitud coseno) ordenada de mayor a menor similitud
+        """
+        size, linked = len(self._keys), self._linked
+        if not size or k <= 0:
+            return []
+
+        query = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        matches: List[Tuple[float, int]] = []
+
+        # Grafo pequeño: también se recorre de forma exacta
+        exact_from = linked if linked > EXACT_SEARCH_MAX_SIZE else 0
+        if exact_from:
+            entry = self._entry_point
+            for level in range(self._max_level, 0, -1):
+                entry = self._search_layer(query, [entry], 1, level)[0][1]
+            matches = [
+                (similarity, node)
+                for similarity, node in self._search_layer(query, [entry], max(ef or self.ef_search, k), 0)
+                if node < linked
+            ]
+
+        if size > exact_from:
+            similarities = self._vectors[exact_from:size] @ query
+            top = np.argsort(-similarities)[:k]
+            matches.extend((float(similarities[i]), exact_from + int(i)) for i in top)
+
+        matches.sort(reverse=True)
+        return [(self._keys[node], similarity) for similarity, node in matches[:k]]
+
+    def _link(self, node: int) -> None:
+        """Enlazar un nodo con sus vecinos en cada nivel de su nivel sorteado hacia abajo"""
+        level = int(-math.log(1.0 - self._rng.random_sample()) * self._level_mult)
+        self._links[node] = [[] for _ in range(level + 1)]
+        vector = self._vectors[node]
+
+        if self._entry_point is not None:
+            entry = self._entry_point
+            for current in range(self._max_level, level, -1):
+                entry = self._search_layer(vector, [entry], 1, current)[0][1]
+
+            entries = [entry]
+            for current in range(min(level, self._max_level), -1, -1):
+                candidates = self._search_layer(vector, entries, self.ef_construction, current)
+                max_links = self.m0 if current == 0 else self.m
+                neighbours = self._select_neighbours(candidates, max_links)
+                self._links[node][current] = neighbours
+
+                for neighbour in neighbours:
+                    links = self._links[neighbour][current]
+                    links.append(node)
+                    if len(links) > max_links:
+                        self._links[neighbour][current] = self._prune(neighbour, links, max_links)
+
+                entries = [candidate for _, candidate in candidates]
+
+        if level > self._max_level:
+            self._entry_point, self._max_level = node, level
+
+    def _select_neighbours(self, candidates: List[Tuple[float, int]], limit: int) -> List[int]:
+        """
+        Heurística de selección de vecinos de HNSW
+
+        Un candidato se descarta si está más cerca de un vecino ya elegido que del
+        nodo: así se conservan enlaces hacia otras regiones y el grafo no se parte
+        en grupos aislados. Los huecos se completan con los descartados más similares.
+        """
+        if len(candidates) <= limit:
+            return [candidate for _, candidate in candidates]
+
+        nodes = [candidate for _, candidate in candidates]
+        similarities = np.array([similarity for similarity, _ in candidates], dtype=np.float32)
+        pairwise = self._vectors[nodes] @ self._vectors[nodes].T
+        # Similitud de cada candidato con el vecino elegido más cercano
+        closest = np.full(len(nodes), -np.inf, dtype=np.float32)
+        selected: List[int] = []
+        for position in range(len(nodes)):
+            if closest[position] <= similarities[position]:
+                selected.append(position)
+                if len(selected) == limit:
+                    break
+                np.maximum(closest, pairwise[position], out=closest)
+
+        if len(selected) < limit:
+            chosen = set(selected)
+            selected.extend(
+                [position for position in range(len(nodes)) if position not in chosen][:limit - len(selected)]
+            )
+        return [nodes[position] for position in selected]
+
+    def _prune(self, node: int, links: List[int], limit: int) -> List[int]:
+        """Reducir los enlaces de un nodo a `limit` con la heurística de selección"""
+        similarities = (self._vectors[links] @ self._vectors[node]).tolist()
+        return self._select_neighbours(sorted(zip(similarities, links), reverse=True), limit)
+
+    def _search_layer(self, query: np.ndarray, entries: List[int], ef: int, level: int) -> List[Tuple[float, int]]:
+        """
+        Búsqueda en haz dentro de un nivel
+
+        Returns:
+            Lista (similitud, nodo) de los ef nodos más similares, de mayor a menor
+        """
+        visited = set(entries)
+        entry_similarities = self._vectors[entries] @ query
+        # candidates: max-heap por similitud (negada); results: min-heap de tamaño ef
+        candidates = [(-float(s), node) for s, node in zip(entry_similarities, entries)]
+        results = [(float(s), node) for s, node in zip(entry_similarities, entries)]
+        heapq.heapify(candidates)
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            negative_similarity, node = heapq.heappop(candidates)
+            if -negative_similarity < results[0][0] and len(results) >= ef:
+                break
+
+            links = self._links[node]
+            neighbours = [n for n in links[level] if n not in visited] if level < len(links) else []
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+
+            for similarity, neighbour in zip((self._vectors[neighbours] @ query).tolist(), neighbours):
+                if len(results) < ef or similarity > results[0][0]:
+                    heapq.heappush(candidates, (-similarity, neighbour))
+                    heapq.heappush(results, (similarity, neighbour))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+
+class HnswlibIndex:
+    """
+    Índice HNSW de hnswlib con la interfaz de HNSWIndex
+
+    add_many() enlaza cada lote en C++ con varios hilos y sin el GIL, así que
+    no quedan vectores pendientes. hnswlib usa etiquetas enteras: la etiqueta
+    de cada clave es su posición de inserción. Las escrituras y las búsquedas
+    se serializan con un lock (resize_index no admite búsquedas concurrentes).
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        m: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 64,
+        seed: int = 42,
+        capacity: int = 1024
+    ):
+        """
+        Args:
+            dim: Dimensión de los vectores
+            m: Vecinos por nodo (2 * m en el nivel 0)
+            ef_construction: Tamaño del haz al insertar
+            ef_search: Tamaño mínimo del haz al buscar
+            seed: Semilla del sorteo de niveles
+            capacity: Vectores reservados inicialmente (se duplica al llenarse)
+        """
+        self.dim = dim
+        self.ef_search = ef_search
+        self.built_at = 0.0
+
+        self._index = hnswlib.Index(space='ip', dim=dim)
+        self._index.init_index(max_elements=capacity, ef_construction=ef_construction, M=m, random_seed=seed)
+        self._keys: List[Hashable] = []
+        self._nodes: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._nodes
+
+    @property
+    def pending(self) -> int:
+        """Siempre 0: hnswlib enlaza al insertar"""
+        return 0
+
+    def is_stale(self, max_age_seconds: float) -> bool:
+        """Si el índice nunca se cargó o es más antiguo que max_age_seconds"""
+        return not self.built_at or time.time() - self.built_at > max_age_seconds
+
+    def add(self, key: Hashable, vector: np.ndarray) -> None:
+        """Insertar y enlazar un vector (si la clave ya existe se sustituye su vector)"""
+        self.add_many([key], np.asarray(vector, dtype=np.float32).reshape(1, self.dim))
+
+    def add_many(self, keys: Sequence[Hashable], vectors: np.ndarray) -> int:
+        """
+        Insertar y enlazar un lote de vectores, por lotes de HNSWLIB_ADD_BATCH_SIZE
+
+        Returns:
+            Número de claves nuevas
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        added = 0
+        for start in range(0, len(vectors), HNSWLIB_ADD_BATCH_SIZE):
+            batch_keys = keys[start:start + HNSWLIB_ADD_BATCH_SIZE]
+            with self._lock:
+                labels = []
+                for key in batch_keys:
+                    node = self._nodes.get(key)
+                    if node is None:
+                        node = self._nodes[key] = len(self._keys)
+                        self._keys.append(key)
+                        added += 1
+                    labels.append(node)
+
+                capacity = self._index.get_max_elements()
+                if len(self._keys) > capacity:
+                    self._index.resize_index(max(len(self._keys), 2 * capacity))
+                self._index.add_items(vectors[start:start + len(batch_keys)], np.asarray(labels, dtype=np.int64))
+        return added
+
+    def link_pending(self, max_nodes: Optional[int] = None) -> int:
+        """Sin efecto: no hay vectores pendientes"""
+        return 0
+
+    def search(self, vector: np.ndarray, k: int, ef: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        """
+        Vecinos más similares a un vector
+
+        Returns:
+            Lista (clave, similitud coseno) ordenada de mayor a menor similitud
+        """
+        with self._lock:
+            k = min(k, len(self._keys))
+            if k <= 0:
+                return []
+            self._index.set_ef(max(ef or self.ef_search, k))
+            labels, distances = self._index.knn_query(np.asarray(vector, dtype=np.float32).reshape(1, self.dim), k=k)
+            # Espacio ip de hnswlib: distancia = 1 - producto escalar
+            return [(self._keys[int(label)], 1.0 - float(distance)) for label, distance in zip(labels[0], distances[0])]
+
+
+VectorIndex = Union[HNSWIndex, HnswlibIndex]
+
+
+def create_vector_index(dim: int) -> VectorIndex:
+    """Índice HNSW de hnswlib si está instalado; si no, el de Python puro"""
+    if HNSWLIB_AVAILABLE:
+        return HnswlibIndex(dim)
+    return HNSWIndex(dim)
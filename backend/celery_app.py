@@ -33,6 +33,7 @@ celery_app.conf.update(
     task_routes={
         'app.tasks.article_tasks.analyze_article_async': {'queue': 'ai_analysis'},
         'app.tasks.batch_tasks.batch_analyze_articles': {'queue': 'ai_analysis'},
+        'app.tasks.batch_tasks.poll_offline_batch': {'queue': 'ai_analysis'},
         'app.tasks.classification_tasks.classify_topics_batch': {'queue': 'ai_classification'},
         'app.tasks.summary_tasks.generate_summaries_batch': {'queue': 'ai_summaries'},
     },
@@ -83,6 +84,26 @@ celery_app.conf.beat_schedule = {
         'schedule': 600.0,  # cada 10 minutos
         'options': {'queue': 'ai_analysis'}
     },
+    'cluster-duplicate-articles': {
+        'task': 'app.tasks.news_tasks.cluster_duplicate_articles',
+        'schedule': 600.0,  # cada 10 minutos (revisa los últimos 30)
+        'options': {'queue': 'maintenance'}
+    },
+    'prune-lsh-index': {
+        'task': 'app.tasks.news_tasks.prune_lsh_index',
+        'schedule': 3600.0,  # cada hora (claves fuera de la ventana de deduplicación)
+        'options': {'queue': 'maintenance'}
+    },
+    'refresh-search-terms': {
+        'task': 'app.tasks.news_tasks.refresh_search_terms',
+        'schedule': 1800.0,  # cada 30 minutos
+        'options': {'queue': 'maintenance'}
+    },
+    'aggregate-search-queries': {
+        'task': 'app.tasks.news_tasks.aggregate_search_queries',
+        'schedule': 60.0,  # cada minuto (trending searches)
+        'options': {'queue': 'maintenance'}
+    },
     'clean-old-results': {
         'task': 'app.tasks.monitoring.clean_old_task_results',
         'schedule': 3600.0,  # cada hora
@@ -0,0 +1,28 @@
+-- Migration: Create article_lsh_bands table
+-- Description: Índice MinHash/LSH persistente para búsqueda de candidatos duplicados
+-- Date: 2026-10-16
+
+-- =====================================================
+-- LSH band keys table
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS article_lsh_bands (
+    article_id UUID NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    band_key VARCHAR(32) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (article_id, band_key)
+);
+
+-- Candidate lookup: band_key IN (...) AND created_at >= window start
+CREATE INDEX IF NOT EXISTS idx_article_lsh_bands_key_created ON article_lsh_bands(band_key, created_at);
+
+-- After applying, backfill the current window with
+-- DuplicateDetector().rebuild_lsh_index(db)
+
+-- =====================================================
+-- ROLLBACK SCRIPT
+-- =====================================================
+-- To rollback these changes, run:
+
+-- DROP INDEX IF EXISTS idx_article_lsh_bands_key_created;
+-- DROP TABLE IF EXISTS article_lsh_bands;
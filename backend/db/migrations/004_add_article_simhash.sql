@@ -0,0 +1,24 @@
+-- Migration: Add SimHash fingerprint to articles
+-- Description: Huella SimHash de 64 bits del contenido; sus bandas (k + 1) se
+--              guardan en article_lsh_bands con el prefijo 's' para buscar
+--              artículos a distancia de Hamming <= k con una consulta indexada
+-- Date: 2026-10-16
+
+-- =====================================================
+-- Updates to Article Table
+-- =====================================================
+
+-- Add simhash field (unsigned 64-bit fingerprint stored as signed BIGINT)
+ALTER TABLE articles
+ADD COLUMN IF NOT EXISTS simhash BIGINT;
+
+-- After applying, backfill fingerprints and band keys for the current window with
+-- DuplicateDetector().rebuild_lsh_index(db)
+
+-- =====================================================
+-- ROLLBACK SCRIPT
+-- =====================================================
+-- To rollback these changes, run:
+
+-- DELETE FROM article_lsh_bands WHERE band_key LIKE 's%';
+-- ALTER TABLE articles DROP COLUMN IF EXISTS simhash;
@@ -0,0 +1,23 @@
+-- Migration: Index duplicate groups for collapsed listings
+-- Description: duplicate_group_id guarda el ID del artículo canónico del grupo
+--              (NULL en artículos sin duplicados). Los listados colapsan cada
+--              grupo con DISTINCT ON (COALESCE(duplicate_group_id, id))
+-- Date: 2026-10-16
+
+-- =====================================================
+-- Indexes for Article Table
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_articles_duplicate_group_key
+ON articles ((COALESCE(duplicate_group_id, id)), id);
+
+-- After applying, group the articles of the current window with
+-- DuplicateClusterer().cluster_recent(db, minutes=7 * 24 * 60)
+
+-- =====================================================
+-- ROLLBACK SCRIPT
+-- =====================================================
+-- To rollback these changes, run:
+
+-- DROP INDEX IF EXISTS idx_articles_duplicate_group_key;
+-- UPDATE articles SET duplicate_group_id = NULL;
@@ -0,0 +1,66 @@
+-- Migration: Add weighted full-text search vector to articles
+-- Description: search_vector combina título (peso A), resumen (B) y contenido (C);
+--              lo mantiene un trigger y lo indexa GIN. SearchService lo consulta
+--              con websearch_to_tsquery y ordena por ts_rank_cd
+-- Date: 2026-10-16
+
+-- =====================================================
+-- Updates to Article Table
+-- =====================================================
+
+ALTER TABLE articles
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+
+-- =====================================================
+-- Trigger
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION articles_search_vector_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.content, '')), 'C');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_articles_search_vector ON articles;
+CREATE TRIGGER update_articles_search_vector
+BEFORE INSERT OR UPDATE OF title, summary, content ON articles
+FOR EACH ROW EXECUTE FUNCTION articles_search_vector_update();
+
+-- Backfill existing rows (the trigger fires on the title update)
+UPDATE articles SET title = title WHERE search_vector IS NULL;
+
+-- =====================================================
+-- Indexes for Article Table
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_articles_search_vector
+ON articles USING gin(search_vector);
+
+-- The per-column expression indexes were never used by the LIKE search and
+-- are superseded by idx_articles_search_vector
+DROP INDEX IF EXISTS idx_articles_title_search;
+DROP INDEX IF EXISTS idx_articles_content_search;
+DROP INDEX IF EXISTS idx_articles_title_fts;
+DROP INDEX IF EXISTS idx_articles_content_fts;
+DROP INDEX IF EXISTS idx_articles_summary_fts;
+
+ANALYZE articles;
+
+-- Measure with: python scripts/benchmark_search.py --articles 1000000
+
+-- =====================================================
+-- ROLLBACK SCRIPT
+-- =====================================================
+-- To rollback these changes, run:
+
+-- DROP INDEX IF EXISTS idx_articles_search_vector;
+-- DROP TRIGGER IF EXISTS update_articles_search_vector ON articles;
+-- DROP FUNCTION IF EXISTS articles_search_vector_update();
+-- ALTER TABLE articles DROP COLUMN IF EXISTS search_vector;
+-- CREATE INDEX idx_articles_title_search ON articles USING gin(to_tsvector('english', title));
+-- CREATE INDEX idx_articles_content_search ON articles USING gin(to_tsvector('english', content));
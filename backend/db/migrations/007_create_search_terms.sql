@@ -0,0 +1,37 @@
+-- Migration: Create search suggestion vocabulary
+-- Description: search_terms reúne nombres de fuentes, trending topics y los
+--              términos frecuentes de los títulos. SearchService lo carga en un
+--              índice de prefijos en memoria y usa pg_trgm para las sugerencias
+--              con errores de tecleo
+-- Date: 2026-10-16
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- =====================================================
+-- Search Terms Table
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS search_terms (
+    term VARCHAR(255) NOT NULL,
+    term_type VARCHAR(20) NOT NULL,
+    weight FLOAT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (term, term_type)
+);
+
+-- =====================================================
+-- Indexes
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_search_terms_trgm
+ON search_terms USING gin (lower(term) gin_trgm_ops);
+
+-- After applying, fill the vocabulary with
+-- SearchService().rebuild_search_terms(db)  (Celery: refresh_search_terms)
+
+-- =====================================================
+-- ROLLBACK SCRIPT
+-- =====================================================
+-- To rollback these changes, run:
+
+-- DROP TABLE IF EXISTS search_terms;
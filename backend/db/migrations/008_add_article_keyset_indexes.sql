@@ -0,0 +1,37 @@
+-- Migration: Composite indexes for keyset pagination
+-- Description: /articles y /search paginan por (clave de orden, id) con cursores;
+--              las columnas anulables se ordenan por COALESCE para que la
+--              comparación de filas nunca vea NULL. Cada índice recorre una
+--              página sin OFFSET en ambas direcciones (ASC y DESC)
+-- Date: 2026-10-16
+
+-- =====================================================
+-- Indexes for Article Table
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_articles_keyset_published_at
+ON articles ((COALESCE(published_at, '1970-01-01 00:00:00')), id);
+
+CREATE INDEX IF NOT EXISTS idx_articles_keyset_created_at
+ON articles ((COALESCE(created_at, '1970-01-01 00:00:00')), id);
+
+CREATE INDEX IF NOT EXISTS idx_articles_keyset_relevance
+ON articles ((COALESCE(relevance_score, -2)), id);
+
+CREATE INDEX IF NOT EXISTS idx_articles_keyset_sentiment
+ON articles ((COALESCE(sentiment_score, -2)), id);
+
+-- title and source sorts page by (title, id) / (sources.name, id) without a
+-- dedicated index; relevance with a text query ranks with ts_rank_cd
+
+ANALYZE articles;
+
+-- =====================================================
+-- ROLLBACK SCRIPT
+-- =====================================================
+-- To rollback these changes, run:
+
+-- DROP INDEX IF EXISTS idx_articles_keyset_published_at;
+-- DROP INDEX IF EXISTS idx_articles_keyset_created_at;
+-- DROP INDEX IF EXISTS idx_articles_keyset_relevance;
+-- DROP INDEX IF EXISTS idx_articles_keyset_sentiment;
@@ -0,0 +1,52 @@
+-- Migration: Create article_embeddings table
+-- Description: Vectores por artículo para búsqueda semántica. SearchService los
+--              carga de forma incremental en un índice HNSW en memoria; si la
+--              extensión pgvector está disponible se añade además una columna
+--              vector con índice HNSW (SEMANTIC_INDEX_BACKEND=pgvector)
+-- Date: 2026-10-16
+
+-- =====================================================
+-- Article embeddings table
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS article_embeddings (
+    article_id UUID PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+    model VARCHAR(100) NOT NULL,
+    dim INTEGER NOT NULL,
+    embedding BYTEA NOT NULL,
+    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Incremental load: model = :model AND indexed_at > :watermark
+CREATE INDEX IF NOT EXISTS idx_article_embeddings_model_indexed ON article_embeddings(model, indexed_at);
+
+-- =====================================================
+-- Optional pgvector column (skipped when the extension is not installed)
+-- =====================================================
+-- The dimension must match SEMANTIC_EMBEDDING_DIM / the transformer model (384
+-- for the default hashing backend and all-MiniLM-L6-v2)
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'vector') THEN
+        CREATE EXTENSION IF NOT EXISTS vector;
+        ALTER TABLE article_embeddings ADD COLUMN IF NOT EXISTS embedding_vector vector(384);
+        CREATE INDEX IF NOT EXISTS idx_article_embeddings_vector_hnsw
+        ON article_embeddings USING hnsw (embedding_vector vector_cosine_ops);
+    ELSE
+        RAISE NOTICE 'pgvector not available: semantic search uses the in-process HNSW index';
+    END IF;
+END
+$$;
+
+-- After applying, embed the existing articles with
+-- get_article_vector_index().backfill(db)  (Celery: backfill_article_embeddings)
+
+-- =====================================================
+-- ROLLBACK SCRIPT
+-- =====================================================
+-- To rollback these changes, run:
+
+-- DROP INDEX IF EXISTS idx_article_embeddings_vector_hnsw;
+-- DROP INDEX IF EXISTS idx_article_embeddings_model_indexed;
+-- DROP TABLE IF EXISTS article_embeddings;
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latencia de búsqueda para el sistema de búsqueda avanzada
+Genera artículos sintéticos en Postgres y mide p50/p95/p99 de advanced_search
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from typing import Dict, List
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.services.search_service import SearchService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BENCHMARK_SOURCE = "Search Benchmark"
+BENCHMARK_URL_PREFIX = "https://benchmark.local/"
+
+VOCABULARY = [
+    "artificial", "intelligence", "machine", "learning", "neural", "network", "model",
+    "quantum", "computing", "robotics", "automation", "startup", "funding", "research",
+    "healthcare", "diagnosis", "climate", "energy", "battery", "semiconductor", "chip",
+    "regulation", "privacy", "security", "breach", "cloud", "data", "science", "vision",
+    "language", "translation", "open", "source", "benchmark", "reasoning", "agent",
+    "election", "market", "stocks", "inflation", "policy", "europe", "china", "launch",
+    "satellite", "space", "vaccine", "genome", "protein", "university", "students"
+]
+
+QUERIES = [
+    "artificial intelligence", "machine learning healthcare", "\"quantum computing\"",
+    "robotics -startup", "climate energy battery", "semiconductor OR chip",
+    "privacy breach", "language model reasoning", "space satellite launch",
+    "protein genome research", "market inflation policy", "open source agent"
+]
+
+
+class SearchBenchmark:
+    """Benchmark de advanced_search sobre una tabla de artículos sintética"""
+
+    def __init__(self, db_url: str = None):
+        # Conexión síncrona, como SearchService
+        self.db_url = (db_url or settings.DATABASE_URL).replace("+asyncpg", "")
+        self.engine = create_engine(self.db_url)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.search_service = SearchService()
+        with self.engine.connect() as conn:
+            self.search_service.detect_fulltext_index(conn)
+
+    def populate(self, total_articles: int, batch_size: int = 100000):
+        """Insertar artículos sintéticos hasta tener total_articles de benchmark"""
+        with self.engine.begin() as conn:
+            source_id = conn.execute(text(
+                "INSERT INTO sources (id, name, url, api_name) "
+                "VALUES (gen_random_uuid(), :name, :url, 'benchmark') "
+                "ON CONFLICT (name) DO UPDATE SET url = EXCLUDED.url RETURNING id"
+            ), {"name": BENCHMARK_SOURCE, "url": BENCHMARK_URL_PREFIX}).scalar()
+            existing = conn.execute(
+                text("SELECT count(*) FROM articles WHERE source_id = :source_id"),
+                {"source_id": source_id}
+            ).scalar()
+
+        logger.info(f"Artículos de benchmark existentes: {existing}")
+
+        # El trigger de search_vector se ejecuta en cada INSERT
+        while existing < total_articles:
+            batch = min(batch_size, total_articles - existing)
+            started = time.perf_counter()
+            with self.engine.begin() as conn:
+                conn.execute(text("""
+                    INSERT INTO articles (
+                        id, title, summary, content, url, published_at, source_id,
+                        created_at, updated_at, relevance_score, sentiment_score,
+                        sentiment_label, bias_score, processing_status
+                    )
+                    SELECT
+                        gen_random_uuid(),
+                        array_to_string(ARRAY(
+                            SELECT (:words)[1 + floor(random() * :word_count)::int]
+                            FROM generate_series(1, 8) WHERE g > 0), ' '),
+                        array_to_string(ARRAY(
+                            SELECT (:words)[1 + floor(random() * :word_count)::int]
+                            FROM generate_series(1, 25) WHERE g > 0), ' '),
+                        array_to_string(ARRAY(
+                            SELECT (:words)[1 + floor(random() * :word_count)::int]
+                            FROM generate_series(1, 150) WHERE g > 0), ' '),
+                        :url_prefix || g,
+                        now() - random() * interval '365 days',
+                        :source_id,
+                        now(), now(),
+                        random(), random() * 2 - 1,
+                        (ARRAY['positive', 'negative', 'neutral'])[1 + floor(random() * 3)::int],
+                        random(),
+                        'completed'
+                    FROM generate_series(:start, :stop) AS g
+                """), {
+                    "words": VOCABULARY,
+                    "word_count": len(VOCABULARY),
+                    "url_prefix": BENCHMARK_URL_PREFIX,
+                    "source_id": source_id,
+                    "start": existing + 1,
+                    "stop": existing + batch
+                })
+            existing += batch
+            logger.info(f"  {existing}/{total_articles} artículos ({time.perf_counter() - started:.1f}s por lote)")
+
+        with self.engine.begin() as conn:
+            conn.execute(text("ANALYZE articles"))
+
+    def run(self, iterations: int = 5, sort: str = "relevance", limit: int = 20) -> Dict[str, float]:
+        """Ejecutar cada consulta `iterations` veces y calcular percentiles en ms"""
+        latencies: List[float] = []
+        db = self.SessionLocal()
+
+        try:
+            for query in QUERIES:  # Calentamiento de caché de páginas
+                asyncio.run(self._search(db, query, sort, limit))
+
+            for _ in range(iterations):
+                for query in QUERIES:
+                    started = time.perf_counter()
+                    asyncio.run(self._search(db, query, sort, limit))
+                    latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            "requests": len(latencies),
+            "p50_ms": percentiles[49],
+            "p95_ms": percentiles[94],
+            "p99_ms": percentiles[98],
+            "max_ms": max(latencies)
+        }
+
+    async def _search(self, db, query: str, sort: str, limit: int):
+        return await self.search_service.advanced_search(
+            query=query, filters={}, sort=sort, limit=limit, include_facets=False, db=db
+        )
+
+    def clear(self):
+        """Eliminar los artículos y la fuente de benchmark"""
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "DELETE FROM articles WHERE source_id IN (SELECT id FROM sources WHERE name = :name)"
+            ), {"name": BENCHMARK_SOURCE})
+            conn.execute(text("DELETE FROM sources WHERE name = :name"), {"name": BENCHMARK_SOURCE})
+
+
+def main():
+    """Función principal para ejecutar desde línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de latencia de búsqueda")
+    parser.add_argument("--articles", type=int, default=1000000, help="Artículos sintéticos en la tabla")
+    parser.add_argument("--iterations", type=int, default=5, help="Repeticiones de cada consulta")
+    parser.add_argument("--sort", default="relevance", help="Orden: relevance, date, sentiment, source")
+    parser.add_argument("--skip-populate", action="store_true", help="Usar los artículos ya generados")
+    parser.add_argument("--clear", action="store_true", help="Eliminar los datos de benchmark y salir")
+    parser.add_argument("--db-url", help="URL de base de datos personalizada")
+
+    args = parser.parse_args()
+
+    benchmark = SearchBenchmark(args.db_url)
+
+    if args.clear:
+        benchmark.clear()
+        print("Datos de benchmark eliminados")
+        return
+
+    if not args.skip_populate:
+        benchmark.populate(args.articles)
+
+    results = benchmark.run(iterations=args.iterations, sort=args.sort)
+
+    print(f"\nadvanced_search sobre {args.articles:,} artículos (sort={args.sort}):")
+    for name, value in results.items():
+        print(f"  {name}: {value:.1f}" if isinstance(value, float) else f"  {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
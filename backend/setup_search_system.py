@@ -126,10 +126,8 @@ class SearchSystemSetup:
             from sqlalchemy import text
             
             indexes = [
-                # Full-text search indexes
-                "CREATE INDEX IF NOT EXISTS idx_articles_title_fts ON articles USING gin(to_tsvector('english', title))",
-                "CREATE INDEX IF NOT EXISTS idx_articles_content_fts ON articles USING gin(to_tsvector('english', content))",
-                "CREATE INDEX IF NOT EXISTS idx_articles_summary_fts ON articles USING gin(to_tsvector('english', summary))",
+                # Full-text search index (columna y trigger: db/migrations/006_add_article_search_vector.sql)
+                "CREATE INDEX IF NOT EXISTS idx_articles_search_vector ON articles USING gin(search_vector)",
                 
                 # Performance indexes
                 "CREATE INDEX IF NOT EXISTS idx_articles_published_at_desc ON articles(published_at DESC)",
@@ -0,0 +1,238 @@
+"""
+Unit tests for the offline batch-API analysis mode
+"""
+
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from app.db.models import AnalysisTask, AnalysisTaskStatus, Article, ArticleAnalysis
+from app.services.ai_batch import (
+    BATCH_ENDPOINT, BatchJob, LocalBatchProvider, OfflineBatchAnalyzer, OpenAIBatchProvider, apply_batch_results
+)
+from app.services.ai_processor import CostOptimizer, SentimentType, TopicCategory
+from app.tasks import batch_tasks
+
+
+FUSED_ANSWER = {
+    "sentiment": {"sentiment": "positive", "score": 0.7, "emotions": ["optimism"]},
+    "topic": {"primary_topic": "technology", "probability": 0.9, "secondary_topics": [], "keywords": ["chips"]},
+    "summary": {"summary": "Chipmakers rally.", "key_points": ["Rally"], "word_count": 2},
+    "relevance": {"relevance_score": 0.8, "importance_score": 0.7, "trending_score": 0.6, "relevance_factors": {}},
+}
+
+ARTICLES = [
+    {"id": "a1", "title": "Chipmakers rally", "content": "Chipmakers rally on record revenue. " * 5},
+    {"id": "a2", "title": "Rates", "content": "Central bank holds rates steady. " * 5},
+]
+
+
+def _responder(answer=FUSED_ANSWER, fail_on=None):
+    """Chat completion body answering every batch request (optionally failing one article)"""
+    def respond(body):
+        if fail_on and fail_on in body["messages"][1]["content"]:
+            raise RuntimeError("model overloaded")
+        return {
+            "model": body["model"],
+            "choices": [{"message": {"content": json.dumps(answer)}}],
+            "usage": {"prompt_tokens": 1000, "completion_tokens": 400, "total_tokens": 1400}
+        }
+    return respond
+
+
+class FakeQuery:
+    """Query returning the rows of one model"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        return list(self.rows)
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeSession:
+    """Session recording added rows and commits"""
+
+    def __init__(self, rows_by_model):
+        self.rows_by_model = rows_by_model
+        self.added = []
+        self.commits = 0
+
+    def query(self, model):
+        return FakeQuery(self.rows_by_model.get(model, []))
+
+    def add(self, row):
+        self.added.append(row)
+
+    def commit(self):
+        self.commits += 1
+
+
+class TestOfflineBatchAnalyzer:
+    """Test suite for OfflineBatchAnalyzer with the local file-based provider"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.responder = _responder()
+
+    def _analyzer(self, tmp_path, responder=None):
+        provider = LocalBatchProvider(directory=str(tmp_path), responder=responder or self.responder)
+        return OfflineBatchAnalyzer(provider=provider, job_dir=str(tmp_path))
+
+    def test_job_file_has_one_fused_request_per_article(self, tmp_path):
+        """Each article becomes one JSONL line keyed by its id; duplicates and empty articles are skipped"""
+        analyzer = self._analyzer(tmp_path)
+
+        job = analyzer.submit(ARTICLES + [ARTICLES[0], {"id": "a3", "content": ""}])
+
+        lines = [json.loads(line) for line in open(job.input_file)]
+        assert [line["custom_id"] for line in lines] == ["a1", "a2"]
+        assert lines[0]["url"] == BATCH_ENDPOINT
+        assert lines[0]["body"]["response_format"] == {"type": "json_object"}
+        assert '"summary"' in lines[0]["body"]["messages"][1]["content"]
+        assert job.article_ids == ["a1", "a2"]
+        assert BatchJob.from_dict(json.loads(json.dumps(job.to_dict()))) == job
+
+    def test_completed_batch_is_parsed_into_results_at_batch_price(self, tmp_path):
+        """Every field comes back as a typed result and the cost is half the synchronous price"""
+        analyzer = self._analyzer(tmp_path)
+        job = analyzer.poll(analyzer.submit(ARTICLES))
+
+        results, errors = analyzer.collect(job)
+
+        assert job.status == "completed" and not job.is_pending
+        assert errors == {}
+        assert results["a1"]["sentiment"].sentiment == SentimentType.POSITIVE
+        assert results["a2"]["topic"].primary_topic == TopicCategory.TECHNOLOGY
+        full_price = CostOptimizer.calculate_cost(job.model, 1000, 400)
+        assert sum(result.cost for result in results["a1"].values()) == pytest.approx(full_price / 2)
+
+    def test_failed_requests_are_reported_per_article(self, tmp_path):
+        """A request the provider could not answer leaves its article in errors"""
+        analyzer = self._analyzer(tmp_path, _responder(fail_on="Central bank"))
+        job = analyzer.poll(analyzer.submit(ARTICLES))
+
+        results, errors = analyzer.collect(job)
+
+        assert list(results) == ["a1"]
+        assert errors == {"a2": "model overloaded"}
+        assert job.request_counts == {"total": 2, "completed": 1, "failed": 1}
+
+    def test_sentiment_only_jobs_request_a_single_field(self, tmp_path):
+        """analysis_type=sentiment asks the fused prompt for the sentiment field only"""
+        analyzer = self._analyzer(tmp_path)
+
+        job = analyzer.poll(analyzer.submit(ARTICLES, analysis_type="sentiment"))
+        results, _ = analyzer.collect(job)
+
+        assert job.fields == ["sentiment"]
+        assert set(results["a1"]) == {"sentiment"}
+
+
+class TestOpenAIBatchProvider:
+    """Test suite for the OpenAI Batch API provider"""
+
+    def test_submit_uploads_the_file_and_creates_the_batch(self, tmp_path):
+        """The JSONL is uploaded with purpose=batch and the batch targets chat completions"""
+        client = Mock()
+        client.files.create.return_value = SimpleNamespace(id="file-1")
+        client.batches.create.return_value = SimpleNamespace(id="batch-1")
+        client.batches.retrieve.return_value = SimpleNamespace(
+            status="in_progress", output_file_id=None,
+            request_counts=SimpleNamespace(total=2, completed=1, failed=0)
+        )
+        input_path = tmp_path / "job.jsonl"
+        input_path.write_text("{}\n")
+        provider = OpenAIBatchProvider(client=client)
+
+        assert provider.submit(input_path) == "batch-1"
+        assert client.files.create.call_args.kwargs["purpose"] == "batch"
+        assert client.batches.create.call_args.kwargs["input_file_id"] == "file-1"
+        assert client.batches.create.call_args.kwargs["endpoint"] == BATCH_ENDPOINT
+        assert provider.status("batch-1") == ("in_progress", None, {"total": 2, "completed": 1, "failed": 0})
+
+
+class TestApplyBatchResults:
+    """Test suite for bulk-applying batch results"""
+
+    def test_rows_are_upserted_and_articles_updated_in_one_commit(self, tmp_path):
+        """Existing analyses are updated, new ones added and failed articles marked"""
+        analyzer = OfflineBatchAnalyzer(
+            provider=LocalBatchProvider(directory=str(tmp_path), responder=_responder(fail_on="Central bank")),
+            job_dir=str(tmp_path)
+        )
+        results, errors = analyzer.collect(analyzer.poll(analyzer.submit(ARTICLES)))
+        articles = [SimpleNamespace(id="a1", processing_status="pending"), SimpleNamespace(id="a2", processing_status="pending")]
+        existing = SimpleNamespace(article_id="a1", analysis_type="sentiment", analysis_data={}, model_used=None)
+        db = FakeSession({Article: articles, ArticleAnalysis: [existing]})
+
+        stats = apply_batch_results(db, results, errors)
+
+        assert stats == {"created": 3, "updated": 1, "completed": 1, "failed": 1}
+        assert db.commits == 1
+        assert existing.analysis_data["sentiment"] == "positive"
+        assert sorted(row.analysis_type for row in db.added) == ["relevance", "summary", "topics"]
+        assert articles[0].sentiment_label == "positive" and articles[0].summary == "Chipmakers rally."
+        assert articles[0].processing_status == "completed"
+        assert articles[1].processing_status == "failed"
+
+
+class TestPollOfflineBatch:
+    """Test suite for the poll_offline_batch Celery task"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.job = BatchJob(
+            job_id="job-1", provider="local", provider_batch_id="batch-1", input_file="/tmp/job-1.jsonl",
+            model="gpt-3.5-turbo", fields=["sentiment"], article_ids=["a1", "a2"], submitted_at=time.time()
+        )
+        self.articles = [SimpleNamespace(id="a1", processing_status="processing"),
+                         SimpleNamespace(id="a2", processing_status="processing")]
+        self.task = SimpleNamespace(id="task-1", status=AnalysisTaskStatus.RUNNING, started_at=None)
+        self.db = FakeSession({Article: self.articles, AnalysisTask: [self.task]})
+
+    def _patch(self, monkeypatch, poll_error):
+        analyzer = Mock()
+        analyzer.poll.side_effect = poll_error
+        monkeypatch.setattr(batch_tasks, "OfflineBatchAnalyzer", lambda: analyzer)
+        schedule = Mock()
+        monkeypatch.setattr(batch_tasks.poll_offline_batch, "apply_async", schedule)
+
+        async def run_with_session(func, *args):
+            return func(self.db, *args)
+
+        monkeypatch.setattr(batch_tasks, "_run_with_session", run_with_session)
+        return schedule
+
+    def test_transient_error_schedules_another_poll(self, monkeypatch):
+        """A provider error re-schedules the poll with the error count instead of ending the chain"""
+        schedule = self._patch(monkeypatch, ConnectionError("connection reset"))
+
+        outcome = batch_tasks.poll_offline_batch(self.job.to_dict(), "task-1")
+
+        assert outcome["status"] == "retrying"
+        assert schedule.call_args.kwargs["args"][2] == 1
+        assert all(article.processing_status == "processing" for article in self.articles)
+
+    def test_repeated_errors_fail_the_articles_and_close_the_task(self, monkeypatch):
+        """After AI_BATCH_MAX_POLL_ERRORS the articles are failed and the AnalysisTask is closed"""
+        schedule = self._patch(monkeypatch, ConnectionError("connection reset"))
+
+        outcome = batch_tasks.poll_offline_batch(
+            self.job.to_dict(), "task-1", batch_tasks.settings.AI_BATCH_MAX_POLL_ERRORS - 1
+        )
+
+        assert outcome["status"] == "error"
+        schedule.assert_not_called()
+        assert all(article.processing_status == "failed" for article in self.articles)
+        assert self.task.status == AnalysisTaskStatus.FAILED
+        assert "connection reset" in self.task.error_message
@@ -0,0 +1,220 @@
+"""
+Unit tests for the shared two-tier AI result cache
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.core.ai_cache import STATS_KEY, AIResultCache
+from app.services.ai_processor import (
+    CacheManager, CostOptimizer, SentimentAnalyzer, TopicCategory, TopicResult,
+    result_from_payload, result_to_payload, run_analysis
+)
+
+
+class FakePipeline:
+    """Buffered commands of a FakeRedis pipeline"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """In-memory subset of the redis.asyncio client (strings and hashes)"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        return True
+
+    async def hincrby(self, key, field, amount):
+        counters = self.data.setdefault(key, {})
+        counters[field] = str(int(counters.get(field, 0)) + amount)
+
+    async def hincrbyfloat(self, key, field, amount):
+        counters = self.data.setdefault(key, {})
+        counters[field] = str(float(counters.get(field, 0.0)) + amount)
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+
+class FakeCacheManager:
+    """In-memory stand-in for a connected RedisCacheManager"""
+
+    def __init__(self):
+        self.redis = FakeRedis()
+
+
+def _response(content, model="gpt-3.5-turbo"):
+    """Chat completion with the given message content"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(completion_tokens=20),
+        model=model
+    )
+
+
+class TestAIResultCache:
+    """Test suite for AIResultCache"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.manager = FakeCacheManager()
+
+    def _cache(self, **kwargs):
+        kwargs.setdefault("enabled", True)
+        return AIResultCache(ttl=600, local_ttl=600, cache_manager=self.manager, **kwargs)
+
+    def test_key_depends_on_model_prompt_version_and_variant(self):
+        """Changing any part of the request changes the key; equal requests share it"""
+        key = AIResultCache.make_key("text", "summary", "gpt-4", "1", "max_words=150")
+
+        assert key == AIResultCache.make_key("text", "summary", "gpt-4", "1", "max_words=150")
+        assert key != AIResultCache.make_key("text", "summary", "gpt-3.5-turbo", "1", "max_words=150")
+        assert key != AIResultCache.make_key("text", "summary", "gpt-4", "2", "max_words=150")
+        assert key != AIResultCache.make_key("text", "summary", "gpt-4", "1", "max_words=50")
+
+    def test_local_tier_evicts_least_recently_used(self):
+        """The in-process LRU stays within its entry and byte limits"""
+        cache = self._cache(max_entries=2, max_bytes=10_000)
+
+        async def scenario():
+            await cache.set("a", {"v": 1})
+            await cache.set("b", {"v": 2})
+            cache._get_local("a")
+            await cache.set("c", {"v": 3})
+
+        asyncio.run(scenario())
+
+        assert list(cache._local) == ["a", "c"]
+        assert cache.get_stats()["evictions"] == 1
+
+        small = self._cache(max_entries=100, max_bytes=60)
+        asyncio.run(small.set("big", {"text": "x" * 100}))
+        assert small.get_stats()["local_entries"] == 0
+
+    def test_result_paid_by_one_process_is_reused_by_another(self):
+        """A second process hits Redis, promotes the entry locally and reports the dollars saved"""
+        api, worker = self._cache(), self._cache()
+
+        async def scenario():
+            await api.set("key", {"label": "positive"}, cost=0.002)
+            shared = await worker.get("key")
+            local = await worker.get("key")
+            missing = await worker.get("other")
+            return shared, local, missing, await worker.get_fleet_stats()
+
+        shared, local, missing, fleet = asyncio.run(scenario())
+
+        assert shared["result"] == local["result"] == {"label": "positive"}
+        assert missing is None
+        stats = worker.get_stats()
+        assert (stats["shared_hits"], stats["local_hits"], stats["misses"]) == (1, 1, 1)
+        assert stats["saved_usd"] == 0.004
+        assert fleet == {"hits": 2, "misses": 1, "hit_ratio": 2 / 3, "saved_usd": 0.004}
+        assert STATS_KEY in self.manager.redis.data
+
+    def test_disabled_cache_never_stores(self):
+        """A disabled cache misses without touching Redis"""
+        cache = self._cache(enabled=False)
+
+        assert asyncio.run(cache.set("key", {"v": 1})) is False
+        assert asyncio.run(cache.get("key")) is None
+        assert self.manager.redis.data == {}
+
+
+class TestAnalyzerCache:
+    """Test suite for the analyzers on top of the shared cache"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.manager = FakeCacheManager()
+
+    def _analyzer(self, model="gpt-3.5-turbo"):
+        analyzer = SentimentAnalyzer()
+        analyzer.cache = CacheManager(
+            prompt_version=SentimentAnalyzer.PROMPT_VERSION,
+            shared_cache=AIResultCache(enabled=True, cache_manager=self.manager)
+        )
+        analyzer.async_client = Mock()
+        analyzer.async_client.chat.completions.create.return_value = _response(
+            json.dumps({"sentiment": "positive", "score": 0.8, "emotions": ["optimism"]}), model=model
+        )
+        return analyzer
+
+    def test_same_story_is_sent_to_openai_once_across_instances(self):
+        """Another analyzer instance (e.g. a Celery worker) reuses the result from Redis"""
+        api, worker = self._analyzer(), self._analyzer()
+
+        first = asyncio.run(api.analyze_sentiment_async("<p>Markets  rally on strong earnings</p>"))
+        second = asyncio.run(worker.analyze_sentiment_async("Markets rally on strong earnings"))
+
+        assert api.async_client.chat.completions.create.call_count == 1
+        worker.async_client.chat.completions.create.assert_not_called()
+        assert second.sentiment == first.sentiment and second.sentiment_score == 0.8
+        assert second.timestamp == first.timestamp
+
+    def test_dated_model_snapshot_is_priced(self):
+        """Responses name dated snapshots; their cost is stored and counted as saved on a hit"""
+        assert CostOptimizer.calculate_cost("gpt-3.5-turbo-0125", 1_000_000, 0) == CostOptimizer.PRICING["gpt-3.5-turbo"]["input"]
+        assert CostOptimizer.calculate_cost("gpt-4-2024-05-13", 0, 1_000_000) == CostOptimizer.PRICING["gpt-4"]["output"]
+        assert CostOptimizer.calculate_cost("gpt-4-turbo", 1_000_000, 0) == 0.0
+
+        analyzer = self._analyzer(model="gpt-3.5-turbo-0125")
+        first = asyncio.run(analyzer.analyze_sentiment_async("Markets rally on strong earnings"))
+        asyncio.run(analyzer.analyze_sentiment_async("Markets rally on strong earnings"))
+
+        assert first.cost > 0
+        assert analyzer.cache.shared_cache.get_stats()["saved_usd"] == round(first.cost, 6)
+
+    def test_sync_analysis_closes_the_cache_of_its_loop(self):
+        """The sync wrapper reports the pending counters before its event loop ends"""
+        analyzer = self._analyzer()
+
+        analyzer.analyze_sentiment("Markets rally on strong earnings")
+
+        assert self.manager.redis.data[STATS_KEY] == {"misses": "1"}
+        assert analyzer.cache.shared_cache._unreported["misses"] == 0
+
+    def test_run_analysis_closes_the_loop_connection(self):
+        """Celery tasks close the per-loop Redis connection of the default cache"""
+        managers = Mock(get=AsyncMock(return_value=None), close=AsyncMock())
+
+        async def analysis():
+            return "done"
+
+        with patch('app.core.ai_cache.loop_cache_managers', managers):
+            assert run_analysis(analysis(), AIResultCache(enabled=True)) == "done"
+
+        managers.close.assert_awaited_once()
+
+    def test_topic_result_round_trips_through_json(self):
+        """Enums, tuples and datetimes survive serialization"""
+        result = TopicResult(
+            timestamp=datetime(2026, 10, 16, 9), confidence=0.9, processing_time=0.5, tokens_used=300,
+            cost=0.001, model="gpt-3.5-turbo", primary_topic=TopicCategory.TECHNOLOGY, topic_probability=0.9,
+            secondary_topics=[(TopicCategory.ECONOMY, 0.3)], topic_keywords=["chips"]
+        )
+
+        restored = result_from_payload(json.loads(json.dumps(result_to_payload(result))))
+
+        assert restored == result
@@ -0,0 +1,211 @@
+"""
+Unit tests for packing several articles into one LLM request
+"""
+
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from app.core.ai_cache import AIResultCache
+from app.services.ai_packing import PackingScheduler
+from app.services.ai_pipeline import AIAnalysisPipeline, AnalysisType, ProcessingConfig
+from app.services.ai_processor import CacheManager, ComprehensiveAnalyzer, SentimentType, TopicCategory
+
+
+PACKED_ITEM = {
+    "sentiment": {"sentiment": "negative", "score": -0.6, "emotions": ["concern"]},
+    "topic": {"primary_topic": "economy", "probability": 0.8, "secondary_topics": [], "keywords": ["rates"]},
+    "sentiment_score": -0.6,
+    "sentiment_label": "negative",
+    "topics": ["interest rates", "inflation"],
+}
+
+
+def _response(payload, prompt_tokens=None, completion_tokens=100):
+    """Chat completion whose message is the JSON payload"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(payload)))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+        model="gpt-3.5-turbo"
+    )
+
+
+def _packed_create(skip_texts=()):
+    """create() answering every "[id] text" line of a packed prompt, except those containing skip_texts"""
+    def create(**request):
+        prompt = request["messages"][1]["content"]
+        if "Artículos:" not in prompt:
+            return _response({"summary": "Per article summary.", "key_points": [], "word_count": 3,
+                              "relevance_score": 0.5, "importance_score": 0.5, "trending_score": 0.5,
+                              "relevance_factors": {}})
+        lines = re.findall(r"^\[(\d+)\] (.*)$", prompt, re.MULTILINE)
+        return _response({"results": [
+            dict(PACKED_ITEM, id=item_id) for item_id, text in lines
+            if not any(skip in text for skip in skip_texts)
+        ]})
+    return create
+
+
+class TestPackingScheduler:
+    """Test suite for PackingScheduler"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.client = Mock()
+        self.client.chat.completions.create.side_effect = _packed_create()
+
+    def _scheduler(self, **kwargs):
+        kwargs.setdefault("token_budget", 1000)
+        kwargs.setdefault("max_items", 20)
+        kwargs.setdefault("max_item_tokens", 100)
+        kwargs.setdefault("max_output_tokens", 2000)
+        return PackingScheduler(self.client, "gpt-3.5-turbo", **kwargs)
+
+    def _run(self, scheduler, items):
+        return asyncio.run(scheduler.run(items, "Clasifica estas noticias.", '"label": string', 50))
+
+    def test_plan_respects_token_budget_item_count_and_output_limit(self):
+        """Articles are packed in order until the input budget, max_items or the output budget is reached"""
+        assert self._scheduler(token_budget=300).plan([100] * 5, 50, 10) == [[0, 1], [2, 3], [4]]
+        assert self._scheduler(max_items=2).plan([10] * 5, 50, 10) == [[0, 1], [2, 3], [4]]
+        assert self._scheduler(max_output_tokens=100).plan([10] * 5, 50, 40) == [[0, 1], [2, 3], [4]]
+        assert self._scheduler().plan([5000], 50, 10) == [[0]]
+
+    def test_one_request_is_fanned_out_to_caller_keys(self):
+        """Short ids in the prompt map back to the caller keys and the tokens are split among the articles"""
+        items = [(f"article-{index}", f"Headline number {index}") for index in range(5)]
+
+        answers = self._run(self._scheduler(), items)
+
+        assert self.client.chat.completions.create.call_count == 1
+        request = self.client.chat.completions.create.call_args.kwargs
+        assert request["response_format"] == {"type": "json_object"}
+        assert request["max_tokens"] == 250
+        assert set(answers) == {key for key, _ in items}
+        assert answers["article-3"].data["sentiment_label"] == "negative"
+        assert all(answer.output_tokens == 20 for answer in answers.values())
+
+    def test_long_articles_are_cut_to_headline_and_lead(self):
+        """Only max_item_tokens of each article reach the prompt, cut at a whole word"""
+        scheduler = self._scheduler(max_item_tokens=10)
+        self._run(scheduler, [("a", "word " * 500)])
+
+        prompt = self.client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        sent = re.search(r"^\[1\] (.*)$", prompt, re.MULTILINE).group(1)
+        assert set(sent.split(" ")) == {"word"}
+        assert 1 <= scheduler.token_counter.count(sent) <= 10
+
+    def test_missing_articles_are_repacked_once(self):
+        """Articles omitted by the model are requested again; the ones still missing are left to the caller"""
+        self.client.chat.completions.create.side_effect = _packed_create(skip_texts=("Second",))
+        scheduler = self._scheduler()
+
+        answers = self._run(scheduler, [("a", "First"), ("b", "Second"), ("c", "Third")])
+
+        assert set(answers) == {"a", "c"}
+        assert self.client.chat.completions.create.call_count == 2
+        assert scheduler.get_stats()["retried"] == 1
+        assert scheduler.get_stats()["missing"] == 1
+
+    def test_truncated_response_splits_the_pack(self):
+        """A response cut at max_tokens is requested again in two halves instead of being discarded"""
+        answer = _packed_create()
+
+        def create(**request):
+            if len(re.findall(r"^\[\d+\] ", request["messages"][1]["content"], re.MULTILINE)) > 2:
+                return SimpleNamespace(
+                    choices=[SimpleNamespace(message=SimpleNamespace(content='{"results": [{"id": "1", "sent'),
+                                             finish_reason="length")],
+                    usage=SimpleNamespace(prompt_tokens=None, completion_tokens=250),
+                    model="gpt-3.5-turbo"
+                )
+            return answer(**request)
+
+        self.client.chat.completions.create.side_effect = create
+        scheduler = self._scheduler()
+        items = [(key, f"Headline {key}") for key in "abcde"]
+
+        answers = self._run(scheduler, items)
+
+        assert set(answers) == set("abcde")
+        assert scheduler.get_stats()["split"] == 2
+        assert scheduler.get_stats()["retried"] == 0
+
+
+class TestComprehensiveAnalyzerPacking:
+    """Test suite for batch_analyze_async with packed classifications"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.analyzer = ComprehensiveAnalyzer()
+        cache = CacheManager(shared_cache=AIResultCache(enabled=False))
+        for specialized in self.analyzer._analyzers().values():
+            specialized.cache = cache
+            specialized.async_client = Mock()
+            specialized.async_client.chat.completions.create.side_effect = _packed_create()
+        self.analyzer.async_client = Mock()
+        self.analyzer.async_client.chat.completions.create.side_effect = _packed_create()
+        self.articles = [
+            {"id": f"a{index}", "title": f"Central bank raises rates {index}", "content": f"Rates story {index}. " * 20}
+            for index in range(4)
+        ]
+
+    def test_sentiment_and_topic_come_from_one_packed_request(self):
+        """Four articles need one packed request instead of eight classification requests"""
+        results, errors = asyncio.run(self.analyzer.batch_analyze_async(self.articles))
+
+        assert errors == []
+        assert self.analyzer.async_client.chat.completions.create.call_count == 1
+        self.analyzer.sentiment_analyzer.async_client.chat.completions.create.assert_not_called()
+        self.analyzer.topic_classifier.async_client.chat.completions.create.assert_not_called()
+        assert self.analyzer.summarizer.async_client.chat.completions.create.call_count == 4
+        assert [result.article_id for result in results] == ["a0", "a1", "a2", "a3"]
+        assert all(result.sentiment.sentiment == SentimentType.NEGATIVE for result in results)
+        assert all(result.topic.primary_topic == TopicCategory.ECONOMY for result in results)
+        assert results[0].sentiment.cost == results[0].topic.cost > 0
+
+    def test_articles_without_packed_answer_use_specialized_calls(self):
+        """An article the model keeps omitting is classified with its own requests"""
+        self.analyzer.async_client.chat.completions.create.side_effect = _packed_create(skip_texts=("rates 1",))
+
+        results, _ = asyncio.run(self.analyzer.batch_analyze_async(self.articles))
+
+        assert self.analyzer.sentiment_analyzer.async_client.chat.completions.create.call_count == 1
+        assert self.analyzer.topic_classifier.async_client.chat.completions.create.call_count == 1
+        assert results[0].sentiment.sentiment_score == -0.6
+
+    def test_packing_can_be_disabled_per_call(self):
+        """pack_classifications=False keeps one classification request per article"""
+        asyncio.run(self.analyzer.batch_analyze_async(self.articles, pack_classifications=False))
+
+        self.analyzer.async_client.chat.completions.create.assert_not_called()
+        assert self.analyzer.sentiment_analyzer.async_client.chat.completions.create.call_count == 4
+
+
+class TestPipelinePacking:
+    """Test suite for AIAnalysisPipeline with packed sentiment and topics"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.pipeline = AIAnalysisPipeline(ProcessingConfig(packing_token_budget=4000, packing_max_articles=10))
+        self.pipeline.openai_client = Mock()
+        self.pipeline.openai_client.chat.completions.create = AsyncMock(side_effect=_packed_create())
+        self.articles = [
+            {"id": f"article-{index}", "title": f"Headline {index}", "content": f"Story body {index}. " * 30}
+            for index in range(3)
+        ]
+
+    def test_packed_results_keep_the_article_id(self):
+        """Sentiment and topics of the batch come from one request and map back to each article"""
+        results = asyncio.run(self.pipeline.analyze_articles(self.articles))
+
+        # 1 packed request + summary, relevance and bias per article
+        assert self.pipeline.openai_client.chat.completions.create.await_count == 1 + 3 * 3
+        sentiments = [result for result in results if result.analysis_type == AnalysisType.SENTIMENT]
+        topics = [result for result in results if result.analysis_type == AnalysisType.TOPICS]
+        assert sorted(result.article_id for result in sentiments) == ["article-0", "article-1", "article-2"]
+        assert sentiments[0].result == {"sentiment_score": -0.6, "sentiment_label": "negative"}
+        assert topics[0].result["topics"] == ["interest rates", "inflation"]
+        assert topics[0].result["extraction_method"] == "ai_packed"
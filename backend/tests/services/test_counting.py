@@ -0,0 +1,100 @@
+"""
+Unit tests for listing count strategies
+"""
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.utils.counting import (
+    CountResult, CountStrategy, _Explain, add_window_count, count_rows,
+    resolve_count_strategy, split_window_count, window_count_result
+)
+
+metadata = MetaData()
+items = Table(
+    "items", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("kind", String(10))
+)
+
+
+@pytest.fixture
+def session():
+    """SQLite session with 30 rows, 25 of kind 'news'"""
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(insert(items), [
+            {"id": i, "kind": "news" if i <= 25 else "blog"} for i in range(1, 31)
+        ])
+        yield session
+
+
+NEWS = select(items.c.id).where(items.c.kind == "news")
+
+
+class TestCountStrategies:
+    """Test suite for count_rows and the window helpers"""
+
+    def test_exact(self, session):
+        """Exact counts every filtered row"""
+        count = count_rows(session, NEWS.order_by(items.c.id), CountStrategy.EXACT)
+
+        assert (count.total, count.is_exact, count.display) == (25, True, "25")
+
+    def test_capped_stops_at_cap(self, session):
+        """Capped counts at most cap rows and flags the total as a lower bound"""
+        count = count_rows(session, NEWS, CountStrategy.CAPPED, cap=10)
+
+        assert (count.total, count.is_exact, count.display) == (10, False, "10+")
+
+    def test_capped_below_cap_is_exact(self, session):
+        """Sets smaller than the cap get their exact size"""
+        count = count_rows(session, NEWS, CountStrategy.CAPPED, cap=100)
+
+        assert (count.total, count.is_exact) == (25, True)
+
+    def test_estimated_falls_back_to_capped_without_postgres(self, session):
+        """Without a planner estimate the count is capped instead of exact"""
+        count = count_rows(session, NEWS, CountStrategy.ESTIMATED, cap=10)
+
+        assert count.strategy == CountStrategy.CAPPED
+        assert count.total == 10
+
+    def test_estimate_display(self):
+        """Estimated totals are shown as approximate"""
+        assert CountResult(12345, CountStrategy.ESTIMATED, is_exact=False).display == "~12,345"
+
+    def test_window_count_in_page_query(self, session):
+        """count(*) OVER() returns the page and the total in one query"""
+        page = add_window_count(select(items.c.id, items.c.kind).where(items.c.kind == "news"))
+        rows, total = split_window_count(session.execute(page.order_by(items.c.id).limit(5)).all())
+
+        assert total == 25
+        assert rows[0] == (1, "news")
+        assert window_count_result(session, NEWS, total, 0).total == 25
+
+    def test_window_empty_page_past_end_counts_separately(self, session):
+        """A page beyond the end has no count column, so the total is counted apart"""
+        page = add_window_count(NEWS).order_by(items.c.id).offset(100)
+        rows, total = split_window_count(session.execute(page).all())
+
+        assert rows == [] and total is None
+        count = window_count_result(session, NEWS, total, 100)
+        assert (count.total, count.strategy) == (25, CountStrategy.WINDOW)
+
+    def test_explain_keeps_bound_parameters(self):
+        """The planner estimate runs EXPLAIN over the parameterized query"""
+        sql = str(_Explain(NEWS).compile(dialect=postgresql.dialect()))
+
+        assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT items.id")
+        assert "%(kind_1)s" in sql
+
+    def test_resolve_strategy(self):
+        """None uses the configured default and unknown names are rejected"""
+        assert resolve_count_strategy("capped") == CountStrategy.CAPPED
+        assert resolve_count_strategy(None) == CountStrategy.EXACT
+        with pytest.raises(ValueError):
+            resolve_count_strategy("sample")
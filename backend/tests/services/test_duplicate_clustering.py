@@ -0,0 +1,114 @@
+"""
+Unit tests for union-find duplicate clustering
+"""
+
+import uuid
+from datetime import datetime
+from unittest.mock import Mock
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import Article
+from app.utils.duplicate_clustering import (
+    UnionFind, DuplicateClusterer, collapse_duplicate_groups
+)
+
+
+def _article(title, group_id=None, published_at=None):
+    return Mock(
+        id=uuid.uuid4(),
+        title=title,
+        content="",
+        url=f"https://example.com/{uuid.uuid4().hex}",
+        duplicate_group_id=group_id,
+        published_at=published_at or datetime(2024, 1, 1),
+        created_at=None,
+    )
+
+
+class TestUnionFind:
+    """Test suite for the in-memory union-find"""
+
+    def test_transitive_groups(self):
+        """A~B and B~C end up in one set"""
+        union_find = UnionFind()
+        union_find.union("a", "b")
+        union_find.union("b", "c")
+        union_find.add("d")
+
+        groups = sorted(sorted(group) for group in union_find.groups())
+
+        assert groups == [["a", "b", "c"], ["d"]]
+        assert union_find.find("a") == union_find.find("c")
+
+
+class TestDuplicateClusterer:
+    """Test suite for DuplicateClusterer"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.detector = Mock()
+        self.detector._calculate_title_quality.side_effect = lambda title: len(title) / 100.0
+        self.clusterer = DuplicateClusterer(detector=self.detector)
+
+    def _assignments(self, db):
+        statement, rows = db.execute.call_args[0]
+        return {row["article_id"]: row["group_id"] for row in rows}
+
+    def test_new_duplicates_join_canonical_group(self):
+        """Best-titled article becomes the group id for every member"""
+        new = _article("OpenAI announces GPT model")
+        stored = _article("OpenAI announces new GPT model for enterprise developers")
+        self.detector.detect_duplicates.return_value = [{"article": stored}]
+        db = Mock()
+
+        stats = self.clusterer.cluster_articles(db, [new])
+
+        assert self._assignments(db) == {new.id: stored.id, stored.id: stored.id}
+        assert stats["groups_changed"] == 1
+        assert stats["articles_reassigned"] == 2
+        db.commit.assert_called_once()
+
+    def test_existing_group_members_are_merged(self):
+        """Members of an existing group follow a new, better canonical"""
+        canonical = _article("Short title")
+        canonical.duplicate_group_id = canonical.id
+        member = _article("Short title copy", group_id=canonical.id)
+        new = _article("A much longer and more descriptive headline about the story")
+        self.detector.detect_duplicates.return_value = [{"article": canonical}]
+        db = Mock()
+        db.query.return_value.filter.return_value.all.return_value = [canonical, member]
+
+        self.clusterer.cluster_articles(db, [new])
+
+        assert self._assignments(db) == {new.id: new.id, canonical.id: new.id, member.id: new.id}
+
+    def test_singletons_are_not_updated(self):
+        """Articles without duplicates keep duplicate_group_id NULL"""
+        self.detector.detect_duplicates.return_value = []
+        db = Mock()
+
+        stats = self.clusterer.cluster_articles(db, [_article("Unique story")])
+
+        assert stats["articles_reassigned"] == 0
+        db.execute.assert_not_called()
+
+    def test_canonical_tie_prefers_earliest(self):
+        """Equal title quality keeps the first published article"""
+        first = _article("Same quality", published_at=datetime(2024, 1, 1))
+        second = _article("Same quality", published_at=datetime(2024, 1, 2))
+
+        assert self.clusterer.select_canonical([second, first]) is first
+
+
+class TestCollapseDuplicateGroups:
+    """Test suite for the DISTINCT ON collapse condition"""
+
+    def test_distinct_on_group_key(self):
+        """One representative per group, canonical first"""
+        condition = collapse_duplicate_groups(select(Article.id).where(Article.sentiment_label == "positive"))
+        sql = str(select(Article.id).where(condition).compile(dialect=postgresql.dialect()))
+
+        assert "DISTINCT ON (coalesce(articles.duplicate_group_id, articles.id))" in sql
+        assert "articles.id = coalesce(articles.duplicate_group_id, articles.id) DESC" in sql
@@ -0,0 +1,197 @@
+"""
+Unit tests for DuplicateDetector batch deduplication, feature cache and content similarity
+"""
+
+import hashlib
+import uuid
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from app.utils.deduplication import DuplicateDetector, ComparisonFeatureCache
+
+
+class TestDetectDuplicatesBatch:
+    """Test suite for detect_duplicates_batch / split_unique_batch"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.detector = DuplicateDetector(similarity_threshold=0.85, use_lsh_index=True)
+        self.batch = [
+            {
+                "title": "OpenAI announces new GPT model for developers",
+                "content": "OpenAI released a new model today.",
+                "url": "https://example.com/openai-gpt?utm_source=twitter",
+            },
+            {
+                "title": "Completely unrelated football championship result",
+                "content": "The final ended in penalties.",
+                "url": "https://sports.example.com/final",
+            },
+            {
+                "title": "OpenAI announces new GPT model for developers!",
+                "content": "Wire copy with different body.",
+                "url": "https://mirror.example.com/story-123",
+            },
+            {
+                "title": "Some other title that is long enough",
+                "content": "OpenAI released a new model today.",
+                "url": "https://other.example.com/copy",
+            },
+            {
+                "title": "Yet another distinct headline about markets",
+                "content": "Stocks rallied on Friday.",
+                "url": "https://EXAMPLE.com/openai-gpt/",
+            },
+        ]
+
+    def test_intra_batch_clustering(self):
+        """Later copies point to the first article of their group"""
+        results = self.detector.detect_duplicates_batch(None, self.batch)
+
+        assert results[0] == []
+        assert results[1] == []
+        assert results[2][0]["duplicate_type"] == "batch_title"
+        assert results[2][0]["batch_index"] == 0
+        assert results[3][0]["duplicate_type"] == "batch_content_hash"
+        assert results[3][0]["batch_index"] == 0
+        assert results[4][0]["duplicate_type"] == "batch_url"
+        assert results[4][0]["batch_index"] == 0
+
+    def test_split_unique_batch(self):
+        """Only first-seen articles survive"""
+        unique, duplicates = self.detector.split_unique_batch(None, self.batch)
+
+        assert unique == [self.batch[0], self.batch[1]]
+        assert len(duplicates) == 3
+        assert {d["duplicate_type"] for d in duplicates} == {"batch_title", "batch_content_hash", "batch_url"}
+
+    def test_batch_without_index_matches_same_groups(self):
+        """The pairwise fallback finds the same clusters"""
+        detector = DuplicateDetector(similarity_threshold=0.85, use_lsh_index=False)
+        unique, _ = detector.split_unique_batch(None, self.batch)
+
+        assert unique == [self.batch[0], self.batch[1]]
+
+    def test_single_store_lookup(self):
+        """Stored articles are matched with one band lookup and one article query"""
+        stored = Mock(
+            id=uuid.uuid4(),
+            title="Completely unrelated football championship result",
+            url="https://sports.example.com/final",
+            content_hash=hashlib.sha256("The final ended in penalties.".encode("utf-8")).hexdigest(),
+            created_at=datetime.utcnow(),
+        )
+        db = Mock()
+        db.query.return_value.filter.return_value.all.side_effect = [
+            [],        # colisiones de bandas LSH
+            [stored],  # artículos almacenados (URL / hash / candidatos)
+        ]
+
+        results = self.detector.detect_duplicates_batch(db, self.batch)
+
+        assert db.query.return_value.filter.return_value.all.call_count == 2
+        # URL y hash apuntan al mismo artículo: se reporta una sola vez
+        assert len(results[1]) == 1
+        assert results[1][0]["article"] is stored
+        assert results[1][0]["duplicate_type"] in {"url_exact", "content_hash"}
+
+    def test_store_errors_keep_batch_results(self):
+        """A failing store lookup still returns intra-batch duplicates"""
+        db = Mock()
+        db.query.side_effect = RuntimeError("db down")
+
+        results = self.detector.detect_duplicates_batch(db, self.batch)
+
+        assert results[4][0]["duplicate_type"] == "batch_url"
+
+    def test_empty_batch(self):
+        """Empty batches return empty results"""
+        assert self.detector.detect_duplicates_batch(None, []) == []
+        assert self.detector.split_unique_batch(None, []) == ([], [])
+
+
+class TestComparisonFeatureCache:
+    """Test suite for the cleaned-title / content-feature cache"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.cache = ComparisonFeatureCache(max_items=2)
+        self.detector = DuplicateDetector(use_lsh_index=True, cache=self.cache)
+        self.article = Mock(
+            id=uuid.uuid4(),
+            title="OpenAI announces new GPT model for developers",
+            updated_at=datetime(2024, 1, 1),
+        )
+
+    def test_stored_title_is_cleaned_once(self):
+        """Repeated comparisons reuse the cleaned title"""
+        first = self.detector._article_clean_title(self.article)
+        second = self.detector._article_clean_title(self.article)
+
+        assert first == second == "openai announces new gpt model developers"
+        assert self.cache.get_stats()["hits"] == 1
+        assert self.cache.get_stats()["misses"] == 1
+
+    def test_update_invalidates_entry(self):
+        """A new updated_at recomputes the features"""
+        self.detector._article_clean_title(self.article)
+        self.article.title = "Completely different headline about markets"
+        self.article.updated_at = datetime(2024, 1, 2)
+
+        assert self.detector._article_clean_title(self.article) == "completely different headline about markets"
+
+    def test_least_recently_used_is_evicted(self):
+        """The cache never grows past max_items"""
+        compute = Mock(return_value="value")
+        articles = [Mock(id=uuid.uuid4(), updated_at=None) for _ in range(3)]
+
+        for article in articles:
+            self.cache.get_or_compute("title", article, compute)
+        self.cache.get_or_compute("title", articles[0], compute)
+
+        assert self.cache.get_stats()["items"] == 2
+        assert compute.call_count == 4
+
+
+class TestContentSimilarityMatrix:
+    """Test suite for the batched content-similarity computation"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.detector = DuplicateDetector(use_lsh_index=False)
+        self.features = [
+            "openai announced new gpt model developers monday",
+            "model improves reasoning across many benchmark tasks",
+            "pricing lower than previous generations models",
+        ]
+
+    def _pairwise(self, features1, features2):
+        """Reference implementation: best fuzz.ratio per sentence, averaged"""
+        from fuzzywuzzy import fuzz
+
+        best = [max(fuzz.ratio(f1, f2) / 100.0 for f2 in features2) for f1 in features1]
+        return sum(best) / len(best)
+
+    def test_matches_pairwise_scores(self):
+        """The matrix pass returns the same per-candidate average"""
+        candidates = [
+            list(self.features),
+            ["openai announces gpt model for developers", "benchmarks show better reasoning"],
+            ["football championship final ends in penalties", "fans celebrate in the streets"],
+        ]
+
+        scores = self.detector._calculate_content_similarities(self.features, candidates)
+
+        assert scores[0] == 1.0
+        for score, candidate in zip(scores, candidates):
+            assert score == pytest.approx(self._pairwise(self.features, candidate))
+
+    def test_empty_candidates_score_zero(self):
+        """Candidates without features keep their position with score 0"""
+        scores = self.detector._calculate_content_similarities(self.features, [[], list(self.features), []])
+
+        assert scores == [0.0, 1.0, 0.0]
+        assert self.detector._calculate_content_similarities([], [self.features]) == [0.0]
+        assert self.detector._calculate_content_similarity(self.features, []) == 0.0
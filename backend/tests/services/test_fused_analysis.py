@@ -0,0 +1,184 @@
+"""
+Unit tests for the fused (single call) comprehensive analysis mode
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from app.core.ai_cache import AIResultCache
+from app.services.ai_processor import (
+    AIProcessor, CacheManager, ComprehensiveAnalyzer, SentimentType, TopicCategory, benchmark_analysis_modes
+)
+
+
+ARTICLE = "Chipmakers rally as Nvidia reports record data center revenue. " * 5
+
+FUSED_ANSWER = {
+    "sentiment": {"sentiment": "positive", "score": 0.7, "emotions": ["optimism"]},
+    "topic": {"primary_topic": "technology", "probability": 0.9, "secondary_topics": [["economy", 0.4]], "keywords": ["nvidia"]},
+    "summary": {"summary": "Nvidia reports record revenue.", "key_points": ["Record revenue"], "word_count": 4},
+    "relevance": {"relevance_score": 0.8, "importance_score": 0.7, "trending_score": 0.6, "relevance_factors": {"financial_impact": 0.9}},
+}
+
+SPECIALIZED_ANSWERS = {
+    "Analiza el sentimiento": FUSED_ANSWER["sentiment"] | {"score": 0.5},
+    "Clasifica el tema": FUSED_ANSWER["topic"],
+    "Genera un resumen": {"summary": "Specialized summary of the story.", "key_points": [], "word_count": 5},
+    "Evalúa la relevancia": FUSED_ANSWER["relevance"],
+}
+
+
+class FakePipeline:
+    """Buffered commands of a FakeRedis pipeline"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """In-memory subset of the redis.asyncio client (strings; stats counters are ignored)"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def hincrby(self, key, field, amount):
+        pass
+
+    async def hincrbyfloat(self, key, field, amount):
+        pass
+
+
+def _response(payload, completion_tokens=200):
+    """Chat completion whose message is the JSON payload"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(payload)))],
+        usage=SimpleNamespace(completion_tokens=completion_tokens),
+        model="gpt-3.5-turbo"
+    )
+
+
+def _client(fused_answer=FUSED_ANSWER):
+    """Mock OpenAI client answering fused and specialized prompts"""
+    def create(**request):
+        prompt = request["messages"][1]["content"]
+        for marker, answer in SPECIALIZED_ANSWERS.items():
+            if marker in prompt:
+                return _response(answer)
+        return _response(fused_answer, completion_tokens=600)
+
+    client = Mock()
+    client.chat.completions.create.side_effect = create
+    return client
+
+
+class TestFusedAnalysis:
+    """Test suite for ComprehensiveAnalyzer in fused mode"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.analyzer = ComprehensiveAnalyzer(analysis_mode="fused")
+        cache = CacheManager(shared_cache=AIResultCache(enabled=True, cache_manager=SimpleNamespace(redis=FakeRedis())))
+        for specialized in self.analyzer._analyzers().values():
+            specialized.cache = cache
+        self.analyzer.async_client = _client()
+
+    def _analyze(self, **kwargs):
+        return asyncio.run(self.analyzer.analyze_article_async("a1", ARTICLE, **kwargs))
+
+    def test_one_call_fills_all_four_results(self):
+        """The four analyses come from a single structured call whose cost is split among them"""
+        result = self._analyze()
+
+        assert self.analyzer.async_client.chat.completions.create.call_count == 1
+        request = self.analyzer.async_client.chat.completions.create.call_args.kwargs
+        assert request["response_format"] == {"type": "json_object"}
+        assert result.sentiment.sentiment == SentimentType.POSITIVE
+        assert result.topic.secondary_topics == [(TopicCategory.ECONOMY, 0.4)]
+        assert result.summary.summary == "Nvidia reports record revenue."
+        assert result.relevance.relevance_score == 0.8
+        assert len({analysis.cost for analysis in (result.sentiment, result.topic, result.summary, result.relevance)}) == 1
+
+    def test_unparseable_field_falls_back_to_specialized_call(self):
+        """Only the broken field is requested again with its specialized prompt"""
+        self.analyzer.async_client = _client(dict(FUSED_ANSWER, summary={"summary": ""}))
+        self.analyzer.summarizer.async_client = _client()
+
+        result = self._analyze()
+
+        assert self.analyzer.summarizer.async_client.chat.completions.create.call_count == 1
+        assert result.summary.summary == "Specialized summary of the story."
+        assert result.sentiment.sentiment_score == 0.7
+
+    def test_cached_fields_are_not_requested_again(self):
+        """A second fused analysis is served from the cache without calling OpenAI"""
+        self._analyze()
+        again = self._analyze()
+
+        assert self.analyzer.async_client.chat.completions.create.call_count == 1
+        assert again.topic.primary_topic == TopicCategory.TECHNOLOGY
+
+    def test_mode_is_selectable_per_request(self):
+        """mode="separate" uses the four specialized calls even on a fused analyzer"""
+        for specialized in self.analyzer._analyzers().values():
+            specialized.async_client = _client()
+
+        result = self._analyze(mode="separate")
+
+        self.analyzer.async_client.chat.completions.create.assert_not_called()
+        assert result.sentiment.sentiment_score == 0.5
+
+    def test_benchmark_reports_requests_and_cost_per_mode(self):
+        """The fused mode needs one request per article instead of four"""
+        articles = [{"id": str(index), "content": f"{ARTICLE} {index}"} for index in range(3)]
+
+        with patch('app.services.ai_processor.AsyncOpenAI', side_effect=lambda api_key: _client()), \
+                patch('app.services.ai_processor.OpenAI'):
+            report = asyncio.run(benchmark_analysis_modes(articles, openai_api_key="sk-test"))
+
+        assert report["separate"]["openai_requests"] == 12
+        assert report["fused"]["openai_requests"] == 3
+        assert report["fused"]["total_tokens"] < report["separate"]["total_tokens"]
+        assert report["fused"]["articles"] == 3
+
+
+class TestLegacyAnalysis:
+    """Test suite for AIProcessor.analyze_article_legacy"""
+
+    def test_without_openai_uses_local_analysis(self):
+        """use_openai=False fills the four results locally and never calls OpenAI"""
+        processor = AIProcessor()
+        processor.async_client = _client()
+
+        result = asyncio.run(processor.analyze_article_legacy("a1", ARTICLE, use_openai=False))
+
+        processor.async_client.chat.completions.create.assert_not_called()
+        assert result.sentiment is not None and result.topic is not None
+        assert result.summary.model == "simple-fallback"
+        assert result.relevance is not None
+        assert 0.0 <= result.combined_score <= 1.0
+
+    def test_missing_openai_package_disables_the_client(self):
+        """An API key without the openai package leaves the fused client unset"""
+        with patch('app.services.ai_processor.AsyncOpenAI', None), patch('app.services.ai_processor.OpenAI', None):
+            analyzer = ComprehensiveAnalyzer(openai_api_key="sk-test")
+
+        assert analyzer.async_client is None
+        assert analyzer.sentiment_analyzer.async_client is None
@@ -0,0 +1,103 @@
+"""
+Unit tests for the shared pooled HTTP transport
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+from app.core.http_client import HTTPTransport
+from app.services.newsapi_client import NewsAPIClient
+from app.services.news_service import GuardianAPIClient
+
+
+class TestHTTPTransport:
+    """Test suite for HTTPTransport"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.transport = HTTPTransport(
+            max_connections=20, max_connections_per_host=5, max_concurrency=2
+        )
+
+    def test_session_is_reused_within_a_loop(self):
+        """Requests in the same loop share one pooled session"""
+        async def borrow_twice():
+            async with self.transport.session() as first:
+                pass
+            async with self.transport.session() as second:
+                pass
+            connector = first.connector
+            await self.transport.close()
+            return first, second, connector
+
+        first, second, connector = asyncio.run(borrow_twice())
+
+        assert first is second
+        assert connector.limit == 20
+        assert connector.limit_per_host == 5
+
+    def test_sessions_of_closed_loops_are_released(self):
+        """Each asyncio.run cycle gets its own session and closes it"""
+        async def borrow():
+            async with self.transport.session() as session:
+                pass
+            await self.transport.close()
+            return session
+
+        first = asyncio.run(borrow())
+        second = asyncio.run(borrow())
+
+        assert first is not second
+        assert first.closed and second.closed
+        assert self.transport._sessions == {}
+
+    def test_global_concurrency_limit(self):
+        """No more than max_concurrency requests are in flight"""
+        in_flight = 0
+        peak = 0
+
+        async def request():
+            nonlocal in_flight, peak
+            async with self.transport.session():
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        async def run():
+            await asyncio.gather(*(request() for _ in range(6)))
+            await self.transport.close()
+
+        asyncio.run(run())
+
+        assert peak == 2
+
+    def test_clients_share_transport_without_leaking_credentials(self):
+        """Injected clients reuse the pooled requests session; API keys stay per request"""
+        client = NewsAPIClient("secret-key", transport=self.transport)
+        other = NewsAPIClient("other-key", transport=self.transport)
+
+        assert client.session is other.session is self.transport.requests_session()
+        assert "X-API-Key" not in client.session.headers
+        assert client.headers["X-API-Key"] == "secret-key"
+
+        with client:
+            pass
+        assert self.transport.requests_session() is client.session
+
+    def test_caller_session_is_not_closed(self):
+        """A session passed in by the caller stays open after the client is used"""
+        session = Mock()
+        client = NewsAPIClient("secret-key", requests_session=session, transport=self.transport)
+
+        with client:
+            pass
+
+        assert client._external_session
+        session.close.assert_not_called()
+
+    def test_news_service_clients_use_injected_transport(self):
+        """Facade clients accept the shared transport"""
+        client = GuardianAPIClient("key", transport=self.transport)
+
+        assert client.transport is self.transport
@@ -0,0 +1,100 @@
+"""
+Unit tests for keyset (seek method) pagination
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, Table, create_engine, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.models import Article, Source
+from app.services.search_service import SearchService
+from app.utils.pagination import KeysetCursor, QueryBuilder, null_safe_sort_key, query_fingerprint
+
+metadata = MetaData()
+rows = Table(
+    "rows", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("published_at", DateTime),
+    Column("score", Float)
+)
+
+START = datetime(2026, 10, 1)
+
+
+@pytest.fixture
+def session():
+    """SQLite session with ties and NULL sort values"""
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(insert(rows), [
+            {
+                "id": i,
+                "published_at": None if i % 7 == 0 else START + timedelta(hours=i // 3),
+                "score": None if i % 5 == 0 else float(i % 4)
+            }
+            for i in range(1, 48)
+        ])
+        yield session
+
+
+def _walk(session, column, descending, page_size=10):
+    """Read every page following the keyset cursors"""
+    key = null_safe_sort_key(column)
+    seen, after = [], None
+    while True:
+        page_query = QueryBuilder.add_keyset_columns(select(rows.c.id), [key])
+        page_query = QueryBuilder.apply_keyset(page_query, [key], rows.c.id, descending, after)
+        page = session.execute(page_query.limit(page_size)).all()
+        seen.extend(row_id for row_id, _ in page)
+        if len(page) < page_size:
+            return seen
+        cursor = KeysetCursor.encode("sort", "fp", [page[-1][1], page[-1][0]])
+        after = KeysetCursor.decode(cursor, "sort", "fp")
+
+
+class TestKeysetPagination:
+    """Test suite for keyset cursors"""
+
+    @pytest.mark.parametrize("column_name", ["published_at", "score"])
+    @pytest.mark.parametrize("descending", [True, False])
+    def test_pages_cover_every_row_once_in_order(self, session, column_name, descending):
+        """Walking the cursors returns the full ordering, NULLs and ties included"""
+        column = rows.c[column_name]
+        key = null_safe_sort_key(column)
+        expected = QueryBuilder.apply_keyset(select(rows.c.id), [key], rows.c.id, descending)
+
+        assert _walk(session, column, descending) == session.execute(expected).scalars().all()
+
+    def test_cursor_round_trips_typed_values(self):
+        """Datetimes survive encoding so they compare as timestamps"""
+        values = [START, 0.25, "abc"]
+
+        assert KeysetCursor.decode(KeysetCursor.encode("date", "fp", values), "date", "fp") == values
+
+    def test_cursor_rejects_other_sort_or_filters(self):
+        """A cursor is only valid for the sort and filters that produced it"""
+        cursor = KeysetCursor.encode("date", query_fingerprint("ai", {"sources": ["Wired"]}), [START, 1])
+
+        with pytest.raises(ValueError):
+            KeysetCursor.decode(cursor, "relevance", query_fingerprint("ai", {"sources": ["Wired"]}))
+        with pytest.raises(ValueError):
+            KeysetCursor.decode(cursor, "date", query_fingerprint("ai", {}))
+        with pytest.raises(ValueError):
+            KeysetCursor.decode("not-a-cursor", "date", "fp")
+
+    def test_search_seeks_instead_of_offset(self):
+        """advanced_search pages continue with a row comparison on (key, id)"""
+        query = Session().query(Article, Source).join(Source)
+        sql = str(
+            SearchService()._apply_sorting(query, "date", "", [START, 1])
+            .statement.compile(dialect=postgresql.dialect())
+        )
+
+        assert "(coalesce(articles.published_at" in sql
+        assert ", articles.id) < (" in sql
+        assert sql.rstrip().endswith("articles.id DESC")
+        assert "OFFSET" not in sql
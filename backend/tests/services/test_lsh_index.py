@@ -0,0 +1,242 @@
+"""
+Unit tests for the MinHash/LSH near-duplicate index
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.utils.lsh_index import (
+    MinHasher, ArticleLSHIndex, TITLE_FIELD, CONTENT_FIELD, SIMHASH_FIELD,
+    to_signed64, to_unsigned64, hamming_distance
+)
+from app.utils.deduplication import DuplicateDetector
+
+
+class TestMinHasher:
+    """Test suite for MinHash signatures"""
+
+    def test_signature_is_deterministic(self):
+        """Signatures must be stable across instances (and worker restarts)"""
+        text = "openai announces new model for developers"
+        first = MinHasher(num_perm=64, seed=1).signature(text)
+        second = MinHasher(num_perm=64, seed=1).signature(text)
+
+        assert first is not None
+        assert len(first) == 64
+        assert (first == second).all()
+
+    def test_empty_text_has_no_signature(self):
+        """Empty text yields no signature"""
+        assert MinHasher().signature("") is None
+        assert MinHasher().signature("   ") is None
+
+    def test_short_text_single_shingle(self):
+        """Texts shorter than the shingle size become a single shingle"""
+        assert MinHasher(shingle_size=5).shingles("ai") == {"ai"}
+
+
+class TestArticleLSHIndex:
+    """Test suite for LSH band keys and candidate lookup"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.index = ArticleLSHIndex(num_perm=128, bands=32, shingle_size=5, seed=1)
+
+    def test_invalid_band_configuration(self):
+        """num_perm must be divisible by the number of bands"""
+        with pytest.raises(ValueError):
+            ArticleLSHIndex(num_perm=100, bands=32)
+
+    def test_band_keys_format(self):
+        """Band keys embed field prefix and band number"""
+        keys = self.index.band_keys("google releases gemini update", TITLE_FIELD)
+
+        assert len(keys) == 32
+        assert all(key.startswith(TITLE_FIELD) for key in keys)
+        assert keys[5][1:3] == "05"
+        assert all(len(key) <= 32 for key in keys)
+
+    def test_near_duplicates_collide(self):
+        """Near-duplicate titles share at least one band"""
+        first = set(self.index.band_keys("openai announces gpt model for enterprise customers", TITLE_FIELD))
+        second = set(self.index.band_keys("openai announces new gpt model for enterprise customers", TITLE_FIELD))
+
+        assert first & second
+
+    def test_unrelated_texts_do_not_collide(self):
+        """Unrelated titles share no band"""
+        first = set(self.index.band_keys("openai announces gpt model for enterprise customers", TITLE_FIELD))
+        second = set(self.index.band_keys("football championship final ends in penalty shootout", TITLE_FIELD))
+
+        assert not first & second
+
+    def test_fields_do_not_collide(self):
+        """Title and content keys live in separate namespaces"""
+        text = "same normalized text in both fields"
+        title_keys = set(self.index.band_keys(text, TITLE_FIELD))
+        content_keys = set(self.index.band_keys(text, CONTENT_FIELD))
+
+        assert not title_keys & content_keys
+
+    def test_add_deduplicates_keys(self):
+        """Repeated keys are inserted once"""
+        db = Mock()
+        article_id = uuid.uuid4()
+
+        inserted = self.index.add(db, article_id, ["t00abc", "t00abc", "t01def"], datetime.utcnow())
+
+        assert inserted == 2
+        rows = db.execute.call_args[0][1]
+        assert [row["band_key"] for row in rows] == ["t00abc", "t01def"]
+
+    def test_query_without_keys_skips_database(self):
+        """No keys means no query"""
+        db = Mock()
+
+        assert self.index.query(db, [], datetime.utcnow()) == set()
+        db.query.assert_not_called()
+
+
+class TestDuplicateDetectorWithIndex:
+    """Test suite for DuplicateDetector candidate selection through the index"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.detector = DuplicateDetector(similarity_threshold=0.85, use_lsh_index=True)
+
+    def test_no_candidates_skips_fuzzy_scan(self):
+        """Without band collisions the stored window is never loaded"""
+        db = Mock()
+        db.query.return_value.filter.return_value.distinct.return_value.all.return_value = []
+
+        result = self.detector._find_title_duplicates(db, "OpenAI announces new GPT model")
+
+        assert result == []
+        db.query.return_value.filter.return_value.all.assert_not_called()
+
+    def test_candidates_get_exact_fuzzy_check(self):
+        """Index candidates are verified with the fuzzy matcher"""
+        candidate = Mock(id=uuid.uuid4(), title="OpenAI announces new GPT model")
+        db = Mock()
+        db.query.return_value.filter.return_value.distinct.return_value.all.return_value = [(candidate.id,)]
+        db.query.return_value.filter.return_value.all.return_value = [candidate]
+
+        result = self.detector._find_title_duplicates(db, "OpenAI announces new GPT model!")
+
+        assert len(result) == 1
+        assert result[0]["article"] is candidate
+        assert result[0]["duplicate_type"] == "title_similar"
+
+    def test_prune_deletes_keys_older_than_the_window(self):
+        """Band keys created before the deduplication window are deleted, recent ones kept"""
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            # Same table with portable types (the model's UUID column is PostgreSQL-only)
+            connection.execute(text(
+                "CREATE TABLE article_lsh_bands (article_id VARCHAR, band_key VARCHAR, created_at DATETIME)"
+            ))
+            connection.execute(text("INSERT INTO article_lsh_bands VALUES (:article_id, :band_key, :created_at)"), [
+                {"article_id": "old", "band_key": "t00old",
+                 "created_at": datetime.utcnow() - timedelta(days=self.detector.max_age_days + 1)},
+                {"article_id": "recent", "band_key": "t00new", "created_at": datetime.utcnow()},
+            ])
+
+        with Session(engine) as db:
+            assert self.detector.prune_lsh_index(db) == 1
+            assert db.execute(text("SELECT article_id FROM article_lsh_bands")).scalars().all() == ["recent"]
+
+    def test_index_article_writes_title_and_content_keys(self):
+        """Saved articles are indexed by title and leading sentences"""
+        db = Mock()
+        article = Mock(
+            id=uuid.uuid4(),
+            title="OpenAI announces new GPT model for developers",
+            content=(
+                "OpenAI announced a new GPT model for developers on Monday. "
+                "The model improves reasoning across many benchmark tasks. "
+                "Pricing will be lower than previous generations of models."
+            ),
+            created_at=datetime.utcnow(),
+            simhash=None
+        )
+
+        inserted = self.detector.index_article(db, article)
+
+        rows = db.execute.call_args[0][1]
+        fields = {row["band_key"][0] for row in rows}
+        assert inserted == len(rows)
+        assert fields == {TITLE_FIELD, CONTENT_FIELD, SIMHASH_FIELD}
+        assert article.simhash is not None
+
+    def test_index_disabled(self):
+        """Detector without index keeps the full-window scan"""
+        detector = DuplicateDetector(use_lsh_index=False)
+
+        assert detector.lsh_index is None
+        assert detector.index_article(Mock(), Mock(id=uuid.uuid4())) == 0
+
+
+class TestSimHash:
+    """Test suite for SimHash fingerprints and Hamming-distance bands"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.index = ArticleLSHIndex()
+        self.base_words = (
+            "the central bank raised interest rates by a quarter point on wednesday "
+            "citing persistent inflation in services and a tight labour market while "
+            "officials signalled that further increases remain possible if price "
+            "pressures fail to ease over the coming months according to the statement "
+            "released after the two day policy meeting in the capital"
+        ).split()
+
+    def test_signed_roundtrip(self):
+        """Fingerprints survive BIGINT storage"""
+        for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+            assert to_unsigned64(to_signed64(value)) == value
+            assert -(1 << 63) <= to_signed64(value) < (1 << 63)
+
+    def test_small_edit_keeps_fingerprint_close(self):
+        """Reworded copies stay within a few bits"""
+        edited = list(self.base_words)
+        edited[10] = "wednesday's"
+
+        first = self.index.simhasher.fingerprint(self.base_words)
+        second = self.index.simhasher.fingerprint(edited)
+        unrelated = self.index.simhasher.fingerprint(
+            "football club confirms signing of young striker on five year contract".split()
+        )
+
+        assert hamming_distance(first, second) < hamming_distance(first, unrelated)
+
+    def test_bands_follow_pigeonhole_principle(self):
+        """Fingerprints within distance k share at least one band"""
+        fingerprint = self.index.simhasher.fingerprint(self.base_words)
+        k = self.index.simhash_max_distance
+        flipped = fingerprint ^ (1 << 0) ^ (1 << 20) ^ (1 << 40)
+
+        assert hamming_distance(fingerprint, flipped) <= k
+        assert set(self.index.simhash_band_keys(fingerprint)) & set(self.index.simhash_band_keys(flipped))
+        assert len(self.index.simhash_band_keys(fingerprint)) == k + 1
+        assert self.index.simhash_band_keys(None) == []
+
+    def test_simhash_duplicates_filtered_by_distance(self):
+        """Band candidates are verified against the stored fingerprint"""
+        detector = DuplicateDetector(use_lsh_index=True)
+        fingerprint = self.index.simhasher.fingerprint(self.base_words)
+        close = Mock(id=uuid.uuid4(), simhash=to_signed64(fingerprint ^ 0b101))
+        far = Mock(id=uuid.uuid4(), simhash=to_signed64(fingerprint ^ 0xFFFF))
+        db = Mock()
+        db.query.return_value.filter.return_value.distinct.return_value.all.return_value = [(close.id,), (far.id,)]
+        db.query.return_value.filter.return_value.all.return_value = [close, far]
+
+        duplicates = detector._find_simhash_duplicates(db, fingerprint)
+
+        assert [d["article"] for d in duplicates] == [close]
+        assert duplicates[0]["duplicate_type"] == "content_simhash"
+        assert duplicates[0]["similarity_score"] == 1.0 - 2 / 64.0
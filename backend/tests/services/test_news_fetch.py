@@ -0,0 +1,70 @@
+"""
+Unit tests for concurrent multi-provider fetching in NewsService
+"""
+
+import asyncio
+import time
+from unittest.mock import Mock
+
+from app.services.news_service import NewsService
+
+
+def _client(delay, articles=None, error=None):
+    """Fake news client whose get_latest_news takes `delay` seconds"""
+    async def get_latest_news(limit):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return [dict(article) for article in (articles or [])]
+
+    client = Mock()
+    client.get_latest_news = get_latest_news
+    return client
+
+
+class TestFetchLatestByClient:
+    """Test suite for NewsService.fetch_latest_by_client"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.service = NewsService()
+        self.service.clients = {}
+
+    def test_providers_are_fetched_concurrently(self):
+        """Wall time follows the slowest provider, not the sum"""
+        self.service.clients = {
+            'newsapi': _client(0.2, [{'title': 'a'}]),
+            'guardian': _client(0.2, [{'title': 'b'}]),
+            'nytimes': _client(0.2, [{'title': 'c'}]),
+        }
+
+        started = time.perf_counter()
+        results = asyncio.run(self.service.fetch_latest_by_client(limit=5, timeout=5))
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.5
+        assert [results[name]['articles'][0]['client_type'] for name in results] == ['newsapi', 'guardian', 'nytimes']
+
+    def test_timeouts_and_errors_keep_partial_results(self):
+        """A slow or failing provider does not drop the others"""
+        self.service.clients = {
+            'newsapi': _client(0.0, [{'title': 'a'}]),
+            'guardian': _client(2.0, [{'title': 'b'}]),
+            'nytimes': _client(0.0, error=RuntimeError('boom')),
+        }
+
+        results = asyncio.run(self.service.fetch_latest_by_client(limit=5, timeout=0.1))
+
+        assert len(results['newsapi']['articles']) == 1
+        assert results['newsapi']['error'] is None
+        assert results['guardian']['articles'] == []
+        assert 'Timeout' in results['guardian']['error']
+        assert results['nytimes']['error'] == 'boom'
+
+    def test_unknown_client_types_are_ignored(self):
+        """Only initialized clients are queried"""
+        self.service.clients = {'newsapi': _client(0.0, [{'title': 'a'}])}
+
+        results = asyncio.run(self.service.fetch_latest_by_client(client_types=['newsapi', 'bing']))
+
+        assert list(results) == ['newsapi']
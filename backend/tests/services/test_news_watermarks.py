@@ -0,0 +1,167 @@
+"""
+Unit tests for incremental news fetching with per-provider watermarks
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.services.news_service import NewsClient, NewsService
+from app.services.news_watermarks import NewsWatermarkStore, parse_published_at
+from app.tasks import news_tasks
+
+
+class FakeCacheManager:
+    """In-memory stand-in for a connected RedisCacheManager"""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl=None, nx=False, xx=False):
+        self.store[key] = value
+        return True
+
+
+class PagedClient(NewsClient):
+    """Client over a fixed newest-first feed that records requested pages"""
+
+    def __init__(self, feed):
+        super().__init__('key', transport=object(), response_cache=object())
+        self.name = 'Paged'
+        self.feed = feed
+        self.pages = []
+
+    async def get_latest_news(self, limit=20, page=1, since=None):
+        self.pages.append(page)
+        start = (page - 1) * limit
+        return [dict(article) for article in self.feed[start:start + limit]]
+
+    async def search_news(self, query, limit=20):
+        return []
+
+    def get_sources(self):
+        return []
+
+    def get_categories(self):
+        return []
+
+    def get_name(self):
+        return self.name
+
+
+def _feed(count, newest_hour=23):
+    """Newest-first articles published one hour apart"""
+    return [
+        {'url': f'https://example.com/{newest_hour - i}',
+         'published_at': f'2024-01-01T{newest_hour - i:02d}:00:00Z'}
+        for i in range(count)
+    ]
+
+
+class TestNewsWatermarks:
+    """Test suite for watermarks and get_latest_news_since"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.manager = FakeCacheManager()
+        self.store = NewsWatermarkStore(ttl=3600, max_seen_ids=3, cache_manager=self.manager)
+
+    def test_parse_published_at_normalizes_to_utc(self):
+        """Provider formats with Z, offsets or no zone compare correctly"""
+        assert parse_published_at('2024-01-01T12:00:00Z') == datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+        assert parse_published_at('2024-01-01T08:00:00-04:00') == datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+        assert parse_published_at('2024-01-01T12:00:00') == datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+        assert parse_published_at('yesterday') is None
+        assert parse_published_at(None) is None
+
+    def test_advance_keeps_latest_date_and_recent_ids(self):
+        """The watermark moves forward and remembers a bounded set of URLs"""
+        first = self.store.advance(None, _feed(2, newest_hour=10))
+        second = self.store.advance(first, _feed(2, newest_hour=12))
+
+        assert second['published_at'] == '2024-01-01T12:00:00+00:00'
+        assert second['seen_ids'] == ['https://example.com/12', 'https://example.com/11', 'https://example.com/10']
+        assert self.store.advance(second, [{'url': 'x', 'published_at': None}]) is second
+
+    def test_without_watermark_only_first_page_is_fetched(self):
+        """The first cycle behaves like a plain latest-news fetch"""
+        client = PagedClient(_feed(10))
+
+        articles = asyncio.run(client.get_latest_news_since(None, limit=3))
+
+        assert client.pages == [1]
+        assert len(articles) == 3
+
+    def test_pages_forward_until_watermark(self):
+        """Only articles newer than the watermark are returned"""
+        client = PagedClient(_feed(20))
+        watermark = {'published_at': '2024-01-01T16:00:00+00:00', 'seen_ids': ['https://example.com/16']}
+
+        articles = asyncio.run(client.get_latest_news_since(watermark, limit=3, max_pages=10))
+
+        assert [article['url'] for article in articles] == [f'https://example.com/{hour}' for hour in range(23, 16, -1)]
+        assert client.pages == [1, 2, 3]
+
+    def test_unseen_articles_at_watermark_time_are_kept(self):
+        """Articles sharing the watermark timestamp are filtered by URL only"""
+        feed = [
+            {'url': 'https://example.com/b', 'published_at': '2024-01-01T16:00:00Z'},
+            {'url': 'https://example.com/a', 'published_at': '2024-01-01T16:00:00Z'},
+        ]
+        client = PagedClient(feed)
+        watermark = {'published_at': '2024-01-01T16:00:00+00:00', 'seen_ids': ['https://example.com/a']}
+
+        articles = asyncio.run(client.get_latest_news_since(watermark, limit=5))
+
+        assert [article['url'] for article in articles] == ['https://example.com/b']
+
+    def test_incremental_fetch_persists_watermarks(self):
+        """A second cycle fetches nothing once the first cycle saved its watermarks"""
+        service = NewsService(watermarks=self.store)
+        service.clients = {'paged': PagedClient(_feed(5))}
+
+        first = asyncio.run(service.fetch_latest_by_client(limit=5, incremental=True))
+        assert asyncio.run(service.save_watermarks(first)) == 1
+        second = asyncio.run(service.fetch_latest_by_client(limit=5, incremental=True))
+
+        assert len(first['paged']['articles']) == 5
+        assert first['paged']['watermark'] == '2024-01-01T23:00:00+00:00'
+        assert second['paged']['articles'] == []
+        assert second['paged']['watermark'] == '2024-01-01T23:00:00+00:00'
+        assert second['paged']['advanced_watermark'] is None
+        assert self.store.make_key('paged') in self.manager.store
+
+    def test_fetch_does_not_save_watermarks(self):
+        """Without save_watermarks (failed cycle) the next fetch returns the same articles"""
+        service = NewsService(watermarks=self.store)
+        service.clients = {'paged': PagedClient(_feed(5))}
+
+        first = asyncio.run(service.fetch_latest_by_client(limit=5, incremental=True))
+        second = asyncio.run(service.fetch_latest_by_client(limit=5, incremental=True))
+
+        assert self.manager.store == {}
+        assert len(second['paged']['articles']) == len(first['paged']['articles']) == 5
+
+    def test_fetch_cycle_saves_watermarks_before_closing_connections(self):
+        """Dedup and the watermark save run before the loop's Redis and HTTP connections close"""
+        service = NewsService(watermarks=self.store)
+        service.clients = {'paged': PagedClient(_feed(3))}
+        calls = []
+        service.save_watermarks = AsyncMock(side_effect=lambda results: calls.append('save'))
+        transport = Mock(close=AsyncMock(side_effect=lambda: calls.append('close_http')))
+        response_cache = Mock(close=AsyncMock(side_effect=lambda: calls.append('close_redis')))
+
+        async def deduplicate(articles):
+            calls.append('dedup')
+            return articles, []
+
+        with patch.object(news_tasks, 'get_http_transport', return_value=transport), \
+                patch.object(news_tasks, 'get_response_cache', return_value=response_cache), \
+                patch.object(news_tasks, '_deduplicate_batch', side_effect=deduplicate):
+            cycle = asyncio.run(news_tasks._run_fetch_cycle(service, ['paged'], 5, None, None, 'task-1'))
+
+        assert len(cycle['unique_articles']) == 3
+        assert calls == ['dedup', 'save', 'close_http', 'close_redis']
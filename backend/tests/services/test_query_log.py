@@ -0,0 +1,208 @@
+"""
+Unit tests for the search query log and trending search aggregation
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+
+from app.services.search_service import SearchService
+from app.utils.query_log import (
+    STREAM_KEY, QueryLog, QueryLogAggregator, bucket_of, get_trending_queries
+)
+from app.utils.sketches import CountMinSketch, HeavyHitters
+
+
+NOW = 1792144800.0  # 2026-10-16 10:00 UTC
+
+
+class FakePipeline:
+    """Buffered commands of a FakeRedis pipeline"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        self.redis.pipelines += 1
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """In-memory subset of the redis.asyncio client (strings and one stream)"""
+
+    def __init__(self):
+        self.data = {}
+        self.stream = []
+        self.pipelines = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def xadd(self, name, fields, maxlen=None, approximate=True):
+        entry_id = f"{len(self.stream) + 1}-0"
+        self.stream.append((entry_id, dict(fields)))
+        return entry_id
+
+    async def xread(self, streams, count=None):
+        last = int(streams[STREAM_KEY].split("-")[0])
+        entries = [entry for entry in self.stream if int(entry[0].split("-")[0]) > last][:count]
+        return [[STREAM_KEY, entries]] if entries else []
+
+    async def xtrim(self, name, minid=None, approximate=True):
+        keep = int(minid.split("-")[0])
+        self.stream = [entry for entry in self.stream if int(entry[0].split("-")[0]) >= keep]
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+class FakeCacheManager:
+    """In-memory stand-in for a connected RedisCacheManager"""
+
+    def __init__(self):
+        self.redis = FakeRedis()
+
+    async def get(self, key):
+        value = self.redis.data.get(key)
+        return json.loads(value) if isinstance(value, str) else value
+
+    async def batch_get(self, keys):
+        return {key: json.loads(self.redis.data[key]) for key in keys if key in self.redis.data}
+
+    async def batch_set(self, items):
+        for key, (value, ttl) in items.items():
+            self.redis.data[key] = json.dumps(value)
+        return len(items)
+
+
+class TestSketches:
+    """Test suite for CountMinSketch and HeavyHitters"""
+
+    def test_count_min_never_underestimates(self):
+        """Estimates are upper bounds within the sketch error"""
+        rng = np.random.RandomState(0)
+        sketch = CountMinSketch(width=256, depth=4)
+        counts = {}
+        for item in rng.zipf(1.5, 5000):
+            item = f"query {item % 2000}"
+            counts[item] = counts.get(item, 0) + 1
+            sketch.add(item)
+
+        errors = [sketch.estimate(item) - count for item, count in counts.items()]
+        assert min(errors) >= 0
+        assert np.mean(errors) <= 5000 * np.e / 256
+
+    def test_serialized_sketch_round_trips_and_merges(self):
+        """to_dict/from_dict keeps the counters and sketches can be added"""
+        first, second = CountMinSketch(width=64, depth=3), CountMinSketch(width=64, depth=3)
+        first.add("ai", 3)
+        second.add("ai", 2)
+
+        restored = CountMinSketch.from_dict(json.loads(json.dumps(first.to_dict())))
+        restored.merge(second)
+
+        assert restored.estimate("ai") == 5 and restored.total == 5
+
+    def test_heavy_hitters_keep_the_most_frequent(self):
+        """Frequent items displace rare candidates once the top is full"""
+        heavy_hitters = HeavyHitters(k=3, width=512, depth=4)
+        for item in [f"rare {index}" for index in range(20)]:
+            heavy_hitters.add(item)
+        for item, count in [("openai", 30), ("nvidia", 20), ("election", 10)]:
+            heavy_hitters.add(item, count)
+
+        assert [item for item, _ in heavy_hitters.top()] == ["openai", "nvidia", "election"]
+
+
+class TestQueryLog:
+    """Test suite for the query buffer and the aggregator"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.manager = FakeCacheManager()
+        self.query_log = QueryLog(buffer_size=100, flush_size=50, flush_seconds=3600, enabled=True, cache_manager=self.manager)
+        self.aggregator = QueryLogAggregator(top_k=10, width=256, depth=4, cache_manager=self.manager)
+
+    def test_record_buffers_without_io(self):
+        """Queries are normalized in memory and written in one pipeline on flush"""
+        assert self.query_log.record("  OpenAI   GPT ", NOW)
+        assert not self.query_log.record("   ", NOW)
+        assert self.manager.redis.stream == []
+
+        assert asyncio.run(self.query_log.flush()) == 1
+        assert self.manager.redis.stream[0][1]["q"] == "openai gpt"
+        assert self.manager.redis.pipelines == 1
+
+    def test_full_buffer_drops_oldest(self):
+        """The ring buffer keeps constant memory when Redis falls behind"""
+        query_log = QueryLog(buffer_size=3, flush_size=100, flush_seconds=3600, enabled=True, cache_manager=self.manager)
+        for index in range(5):
+            query_log.record(f"query {index}", NOW)
+
+        assert len(query_log) == 3 and query_log.dropped == 2
+
+    def test_aggregation_builds_trending_per_timeframe(self):
+        """Hourly sketches add up to the 1h and 24h tops; processed entries are not counted twice"""
+        for query, count, timestamp in [
+            ("openai", 5, NOW - 60), ("nvidia", 3, NOW - 60), ("election", 8, NOW - 3 * 3600)
+        ]:
+            for _ in range(count):
+                self.query_log.record(query, timestamp)
+
+        async def scenario():
+            await self.query_log.flush()
+            first = await self.aggregator.aggregate(now=NOW)
+            second = await self.aggregator.aggregate(now=NOW)
+            return (
+                first, second,
+                await get_trending_queries("1h", cache_manager=self.manager),
+                await get_trending_queries("24h", limit=2, cache_manager=self.manager)
+            )
+
+        first, second, last_hour, last_day = asyncio.run(scenario())
+
+        assert first["processed"] == 16 and first["buckets"] == 2
+        assert second["processed"] == 0
+        assert [(entry["query"], entry["count"]) for entry in last_hour] == [("openai", 5), ("nvidia", 3)]
+        assert last_hour[1]["trend_score"] == 0.6
+        assert [entry["query"] for entry in last_day] == ["election", "openai"]
+        assert len(self.manager.redis.stream) == 1
+        assert bucket_of(NOW - 60) != bucket_of(NOW - 3 * 3600)
+
+    def test_trending_searches_prefer_recorded_queries(self):
+        """get_trending_searches returns real queries before article topics"""
+        recorded = [{"query": "openai", "count": 9, "trend_score": 1.0, "timeframe": "24h"}]
+        db = Mock()
+        db.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = [
+            ("OpenAI", 4, 2, 0.8), ("chips", 3, 2, 0.5)
+        ]
+
+        with patch('app.services.search_service.get_trending_queries', AsyncMock(return_value=recorded)):
+            trending = asyncio.run(SearchService().get_trending_searches("24h", limit=2, db=db))
+
+        assert [entry["query"] for entry in trending] == ["openai", "chips"]
+
+    def test_trending_searches_are_empty_without_data(self):
+        """No recorded queries or topics (or an error) gives an empty list, not examples"""
+        db = Mock()
+        db.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = []
+
+        with patch('app.services.search_service.get_trending_queries', AsyncMock(return_value=[])):
+            assert asyncio.run(SearchService().get_trending_searches("24h", db=db)) == []
+            db.query.side_effect = RuntimeError("database down")
+            assert asyncio.run(SearchService().get_trending_searches("24h", db=db)) == []
@@ -0,0 +1,138 @@
+"""
+Unit tests for the upstream HTTP response cache
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.core.response_cache import HTTPResponseCache
+from app.services.news_service import GuardianAPIClient
+
+
+class FakeCacheManager:
+    """In-memory stand-in for a connected RedisCacheManager"""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl=None, nx=False, xx=False):
+        self.store[key] = value
+        return True
+
+
+class FakeResponse:
+    """Minimal aiohttp response"""
+
+    def __init__(self, status, payload=None, headers=None):
+        self.status = status
+        self.payload = payload
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return self.payload
+
+
+class FakeTransport:
+    """Transport that replays queued responses and records request headers"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    @asynccontextmanager
+    async def session(self):
+        yield self
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+PAYLOAD = {'response': {'results': [{'webTitle': 'Headline', 'webUrl': 'https://example.com/a'}]}}
+
+
+class TestHTTPResponseCache:
+    """Test suite for HTTPResponseCache"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.manager = FakeCacheManager()
+        self.cache = HTTPResponseCache(ttl=300, max_age=3600, enabled=True, cache_manager=self.manager)
+
+    def _client(self, responses):
+        transport = FakeTransport(responses)
+        return GuardianAPIClient("secret-key", transport=transport, response_cache=self.cache), transport
+
+    def test_key_ignores_credentials_and_param_order(self):
+        """The request signature does not depend on the API key"""
+        first = self.cache.make_key('guardian', 'https://x/search', {'api-key': 'a', 'q': 'ai', 'page': 1})
+        second = self.cache.make_key('guardian', 'https://x/search', {'page': 1, 'q': 'ai', 'api-key': 'b'})
+
+        assert first == second
+        assert 'secret' not in first
+        assert first != self.cache.make_key('guardian', 'https://x/search', {'q': 'ml'})
+
+    def test_validators_are_replayed_and_304_reuses_body(self):
+        """A stored ETag is sent back and a 304 serves the cached body"""
+        client, transport = self._client([
+            FakeResponse(200, PAYLOAD, {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}),
+            FakeResponse(304),
+        ])
+
+        first = asyncio.run(client.get_latest_news(limit=5))
+        second = asyncio.run(client.get_latest_news(limit=5))
+
+        assert first == second
+        assert 'If-None-Match' not in transport.requests[0]
+        assert transport.requests[1]['If-None-Match'] == '"v1"'
+        assert transport.requests[1]['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+        assert self.cache.get_stats('guardian')['revalidated'] == 1
+        assert self.cache.get_stats('guardian')['misses'] == 1
+
+    def test_responses_without_validators_are_fresh_for_ttl(self):
+        """Without validators the cached body is served without a request"""
+        client, transport = self._client([FakeResponse(200, PAYLOAD)])
+
+        asyncio.run(client.get_latest_news(limit=5))
+        articles = asyncio.run(client.get_latest_news(limit=5))
+
+        assert len(transport.requests) == 1
+        assert articles[0]['title'] == 'Headline'
+        stats = self.cache.get_stats('guardian')
+        assert stats['hits'] == 1
+        assert stats['hit_rate'] == 0.5
+
+    def test_expired_responses_are_fetched_again(self):
+        """Past the TTL the provider is queried again"""
+        client, transport = self._client([FakeResponse(200, PAYLOAD), FakeResponse(200, PAYLOAD)])
+
+        asyncio.run(client.get_latest_news(limit=5))
+        for entry in self.manager.store.values():
+            entry['stored_at'] -= 301
+        asyncio.run(client.get_latest_news(limit=5))
+
+        assert len(transport.requests) == 2
+        assert self.cache.get_stats('guardian')['misses'] == 2
+
+    def test_disabled_cache_always_requests(self):
+        """With the cache disabled nothing is stored"""
+        self.cache.enabled = False
+        client, transport = self._client([FakeResponse(200, PAYLOAD), FakeResponse(200, PAYLOAD)])
+
+        asyncio.run(client.get_latest_news(limit=5))
+        asyncio.run(client.get_latest_news(limit=5))
+
+        assert len(transport.requests) == 2
+        assert self.manager.store == {}
@@ -0,0 +1,261 @@
+"""
+Unit tests for the search result cache
+"""
+
+import asyncio
+import json
+import subprocess
+import sys
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from app.core.search_cache import SearchResultCache
+from app.db.models import Article
+from app.services.search_service import SearchService
+from app.utils import search_cache_invalidation
+
+
+class FakePipeline:
+    """Buffered commands of a FakeRedis pipeline"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """In-memory subset of the redis.asyncio client (strings and sets)"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        return True
+
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+        return len(members)
+
+    async def expire(self, key, seconds):
+        return True
+
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+class FakeCacheManager:
+    """In-memory stand-in for a connected RedisCacheManager"""
+
+    def __init__(self):
+        self.redis = FakeRedis()
+        self.mget_calls = 0
+
+    async def get(self, key):
+        value = self.redis.data.get(key)
+        return json.loads(value) if isinstance(value, str) else value
+
+    async def batch_get(self, keys):
+        self.mget_calls += 1
+        return {key: dict(self.redis.data[key]) for key in keys if key in self.redis.data}
+
+    async def batch_set(self, items):
+        for key, (value, ttl) in items.items():
+            self.redis.data[key] = dict(value)
+        return len(items)
+
+
+SOURCE_A, SOURCE_B = uuid.uuid4(), uuid.uuid4()
+
+
+def _document(article_id, title="Headline"):
+    """Formatted search result"""
+    return {"id": article_id, "title": title, "published_at": datetime(2026, 10, 16, 9)}
+
+
+class TestSearchResultCache:
+    """Test suite for SearchResultCache"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.manager = FakeCacheManager()
+        self.cache = SearchResultCache(ttl=300, document_ttl=3600, enabled=True, cache_manager=self.manager)
+
+    def test_key_ignores_spacing_case_and_filter_order(self):
+        """Equivalent queries and filter dicts share one key"""
+        first = self.cache.make_key(
+            "AI  News", {"sources": ["Wired", "BBC"], "date_from": "2026-10-01", "min_relevance": 0, "sentiment": []},
+            sort="date", limit=20
+        )
+        second = self.cache.make_key(
+            " ai news", {"min_relevance": 0.0, "date_from": "2026-10-01T00:00:00", "sources": ["BBC", "Wired"]},
+            limit=20, sort="date"
+        )
+
+        assert first == second
+        assert first != self.cache.make_key("ai news", {"sources": ["BBC", "Wired"]}, sort="relevance", limit=20)
+
+    def test_tags_cover_source_and_day_pairs(self):
+        """Bounded ranges are tagged per day; open or long ranges use the day wildcard"""
+        tags = self.cache.search_tags([SOURCE_A], "2026-10-15", "2026-10-16T23:59:59")
+
+        assert tags == [f"{SOURCE_A}:2026-10-15", f"{SOURCE_A}:2026-10-16"]
+        assert self.cache.search_tags(None, "2026-10-01", None) == ["*:*"]
+        assert self.cache.search_tags(None, "2026-01-01", "2026-10-16") == ["*:*"]
+        assert self.cache.search_tags(None, "2026-10-16", "2026-10-01") == []
+
+    def test_new_article_drops_only_matching_pages(self):
+        """An article invalidates the pages of its source and day plus the wildcard pages"""
+        pages = {
+            "a_day": self.cache.search_tags([SOURCE_A], "2026-10-16", "2026-10-16"),
+            "b_day": self.cache.search_tags([SOURCE_B], "2026-10-16", "2026-10-16"),
+            "a_old": self.cache.search_tags([SOURCE_A], "2026-09-01", "2026-09-02"),
+            "any": self.cache.search_tags(None, None, None),
+        }
+
+        async def scenario():
+            for key, tags in pages.items():
+                await self.cache.store(key, {"ids": [], "total": 0}, tags)
+            dropped = await self.cache.invalidate(self.cache.article_tags(SOURCE_A, datetime(2026, 10, 16, 12)))
+            return dropped, {key: await self.cache.lookup(key) for key in pages}
+
+        dropped, remaining = asyncio.run(scenario())
+
+        assert dropped == 2
+        assert remaining["a_day"] is None and remaining["any"] is None
+        assert remaining["b_day"] is not None and remaining["a_old"] is not None
+
+    def test_documents_round_trip_with_datetimes(self):
+        """Hydrated documents come back in one MGET with their datetime fields restored"""
+        async def scenario():
+            await self.cache.store_documents([_document("1"), _document("2")])
+            return await self.cache.get_documents(["1", "2", "3"])
+
+        documents = asyncio.run(scenario())
+
+        assert set(documents) == {"1", "2"}
+        assert documents["1"]["published_at"] == datetime(2026, 10, 16, 9)
+        assert self.manager.mget_calls == 1
+
+    def test_disabled_cache_never_stores(self):
+        """A disabled cache misses without touching Redis"""
+        cache = SearchResultCache(enabled=False, cache_manager=self.manager)
+
+        assert asyncio.run(cache.store("key", {"ids": []}, ["*:*"])) is False
+        assert self.manager.redis.data == {}
+
+
+class TestSearchServiceCache:
+    """Test suite for the result cache in SearchService.advanced_search"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.manager = FakeCacheManager()
+        self.service = SearchService()
+        self.service.search_cache = SearchResultCache(
+            ttl=300, document_ttl=3600, enabled=True, cache_manager=self.manager
+        )
+        self.service.term_dictionary = Mock()
+        self.service.term_dictionary.suggest.return_value = {"did_you_mean": None, "corrections": {}, "expansions": ["llm"]}
+        self.db = Mock()
+
+    def _search(self, query):
+        return asyncio.run(self.service.advanced_search(query, {}, include_facets=False, db=self.db))
+
+    def test_equivalent_query_is_served_from_cache(self):
+        """The second search reuses the cached ids and hydrates them without querying"""
+        page = {
+            "ids": ["1", "2"], "total": 2, "total_is_exact": True, "total_display": "2",
+            "count_strategy": "exact", "next_cursor": None
+        }
+        with patch.object(SearchService, '_build_filtered_query'), \
+                patch.object(SearchService, '_execute_search', return_value=([_document("1"), _document("2")], page)) as execute:
+            first = self._search("AI  news")
+            second = self._search("ai news")
+
+        assert execute.call_count == 1
+        assert [result["id"] for result in second["results"]] == ["1", "2"]
+        assert second["total"] == first["total"] == 2
+        assert second["related_terms"] == ["llm"]
+        self.db.query.assert_not_called()
+
+    def test_missing_documents_are_loaded_in_one_query(self):
+        """Documents evicted from Redis are read back together and cached again"""
+        first, second = uuid.uuid4(), uuid.uuid4()
+        self.manager.redis.data["search_doc:" + str(first)] = _document(str(first), "Cached")
+        rows = [(SimpleNamespace(id=second), SimpleNamespace(name="Wired"))]
+        self.db.query.return_value.join.return_value.filter.return_value.all.return_value = rows
+
+        with patch.object(SearchService, '_format_article', side_effect=lambda article, source: _document(str(article.id))):
+            results = asyncio.run(self.service._hydrate_page([str(first), str(second)], self.db))
+
+        assert [result["id"] for result in results] == [str(first), str(second)]
+        assert results[0]["title"] == "Cached"
+        assert "search_doc:" + str(second) in self.manager.redis.data
+        self.db.query.assert_called_once()
+
+
+class TestSearchCacheInvalidation:
+    """Test suite for the session listeners that invalidate cached pages"""
+
+    def test_commit_schedules_tags_of_flushed_articles(self):
+        """Inserted articles are collected on flush and invalidated after commit"""
+        article = Article(source_id=SOURCE_A, published_at=datetime(2026, 10, 16, 8))
+        session = SimpleNamespace(new=[article], dirty=[], deleted=[], info={})
+        cache = Mock(enabled=True)
+
+        with patch.object(search_cache_invalidation, 'get_search_cache', return_value=cache):
+            search_cache_invalidation._collect_search_cache_tags(session, None)
+            search_cache_invalidation._invalidate_search_cache(session)
+
+        tags, article_ids = cache.schedule_invalidation.call_args[0]
+        assert set(tags) == {"*:*", f"{SOURCE_A}:*", "*:2026-10-16", f"{SOURCE_A}:2026-10-16"}
+        assert not article_ids and session.info == {}
+
+    def test_rollback_discards_collected_tags(self):
+        """Rolled back changes invalidate nothing"""
+        session = SimpleNamespace(info={search_cache_invalidation.TAGS_INFO_KEY: {"*:*"}})
+
+        search_cache_invalidation._discard_search_cache_tags(session)
+
+        assert session.info == {}
+
+    def test_celery_tasks_register_the_listeners(self):
+        """Importing the Celery tasks package alone loads the invalidation listeners"""
+        check = "import sys, app.tasks; print('app.utils.search_cache_invalidation' in sys.modules)"
+
+        output = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, timeout=120).stdout
+
+        assert output.strip().endswith("True")
+
+    def test_close_waits_for_scheduled_invalidations(self):
+        """close() at the end of a task loop awaits the invalidations scheduled by its commits"""
+        cache = SearchResultCache(cache_manager=Mock(), enabled=True)
+        done = []
+
+        async def invalidate(tags, article_ids):
+            await asyncio.sleep(0)
+            done.append(tags)
+
+        async def task_body():
+            assert cache.schedule_invalidation(["*:*"])
+            await cache.close()
+
+        with patch.object(cache, 'invalidate', side_effect=invalidate):
+            asyncio.run(task_body())
+
+        assert done == [["*:*"]]
@@ -0,0 +1,105 @@
+"""
+Unit tests for single-pass search facets
+"""
+
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.models import Article, Source
+from app.services.search_service import FacetCache, SearchService
+
+
+# (source, sentiment_label, published_at, bias_score, topic_tags)
+FILTERED_ROWS = [
+    ("Wired", "positive", datetime(2026, 10, 1, 9), 0.1, ["quantum", "hardware"]),
+    ("Wired", "neutral", datetime(2026, 10, 1, 18), 0.55, ["quantum"]),
+    ("The Verge", "positive", datetime(2026, 10, 2, 7), 1.0, None),
+    ("The Verge", None, None, None, []),
+]
+
+
+def _filtered_query(rows):
+    """Filtered query stub whose facet projection yields the given rows"""
+    filtered_query = Mock()
+    filtered_query.with_entities.return_value.order_by.return_value.yield_per.return_value = iter(rows)
+    return filtered_query
+
+
+class TestSearchFacets:
+    """Test suite for SearchService facets"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.service = SearchService()
+        self.db = Mock()
+
+    @pytest.mark.asyncio
+    async def test_counts_every_facet_in_one_pass(self):
+        """All facets are counted from a single scan of the filtered articles"""
+        filtered_query = _filtered_query(FILTERED_ROWS)
+
+        with patch.object(SearchService, '_is_postgres', return_value=False):
+            facets = await self.service._get_search_facets("quantum", {}, self.db, filtered_query)
+
+        filtered_query.with_entities.assert_called_once()
+        assert facets["sources"] == [{"name": "The Verge", "count": 2}, {"name": "Wired", "count": 2}]
+        assert facets["sentiment"] == [{"name": "positive", "count": 2}, {"name": "neutral", "count": 1}]
+        assert facets["topics"] == [{"name": "quantum", "count": 2}, {"name": "hardware", "count": 1}]
+        assert facets["date_histogram"] == [
+            {"name": "2026-10-01", "count": 2},
+            {"name": "2026-10-02", "count": 1}
+        ]
+        assert facets["bias"] == [
+            {"name": "0.0-0.2", "count": 1},
+            {"name": "0.4-0.6", "count": 1},
+            {"name": "0.8-1.0", "count": 1}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cached_per_normalized_query_and_filters(self):
+        """Equivalent queries and filters reuse the cached counts"""
+        with patch.object(SearchService, '_is_postgres', return_value=False):
+            first = await self.service._get_search_facets(
+                "Quantum", {"sources": ["Wired", "The Verge"], "sentiment": None},
+                self.db, _filtered_query(FILTERED_ROWS)
+            )
+            second_query = _filtered_query(FILTERED_ROWS)
+            second = await self.service._get_search_facets(
+                "  quantum ", {"sources": ["The Verge", "Wired"]}, self.db, second_query
+            )
+
+        second_query.with_entities.assert_not_called()
+        assert second == first
+
+    def test_cache_entries_expire(self):
+        """Entries older than the TTL are dropped"""
+        cache = FacetCache(ttl_seconds=0, max_entries=10)
+        cache.set("key", {"sources": []})
+
+        assert cache.get("key") is None
+
+    def test_cache_is_bounded(self):
+        """The oldest entries are evicted past max_entries"""
+        cache = FacetCache(ttl_seconds=60, max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.set(key, {})
+
+        assert cache.get("a") is None
+        assert cache.get("c") == {}
+
+    def test_postgres_facets_are_one_grouped_statement(self):
+        """On Postgres all facets come from one GROUPING SETS query plus unnested tags"""
+        filtered_query = Session().query(Article, Source).join(Source).filter(Source.name.in_(["Wired"]))
+
+        sql = str(self.service._facet_statement(filtered_query).compile(dialect=postgresql.dialect()))
+
+        assert sql.count("WITH facet_rows AS") == 1
+        assert "GROUPING SETS" in sql
+        assert "json_array_elements_text" in sql
+        assert "UNION ALL" in sql
+        # Bias buckets are clamped to [0, BIAS_FACET_BUCKETS - 1] like the in-memory scan
+        assert "greatest(" in sql and "least(floor(" in sql
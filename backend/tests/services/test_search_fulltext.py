@@ -0,0 +1,90 @@
+"""
+Unit tests for the Postgres full-text search path of SearchService
+"""
+
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, create_mock_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.database import Base
+from app.db.models import Article, Source
+from app.services.search_service import SearchService
+
+
+def _sql(query) -> str:
+    """Compile a query for Postgres"""
+    return str(query.statement.compile(dialect=postgresql.dialect()))
+
+
+class TestFullTextSearch:
+    """Test suite for the tsvector search path"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.service = SearchService()
+        self.query = Session().query(Article, Source).join(Source)
+
+    def test_postgres_uses_websearch_tsquery_on_search_vector(self):
+        """The text filter matches the indexed tsvector instead of LIKE scans"""
+        with patch.object(SearchService, '_uses_fulltext', return_value=True):
+            sql = _sql(self.service._apply_text_search(self.query, 'quantum -startup'))
+
+        assert 'articles.search_vector @@ websearch_to_tsquery' in sql
+        assert 'LIKE' not in sql.upper()
+
+    def test_relevance_sort_ranks_by_ts_rank_cd(self):
+        """sort=relevance orders by text rank, then stored relevance"""
+        with patch.object(SearchService, '_uses_fulltext', return_value=True):
+            sql = _sql(self.service._apply_sorting(self.query, 'relevance', 'quantum'))
+
+        order_by = sql.split('ORDER BY')[1]
+        assert order_by.index('ts_rank_cd') < order_by.index('articles.relevance_score')
+
+    def test_relevance_without_query_uses_stored_score(self):
+        """Empty queries keep the previous relevance ordering"""
+        with patch.object(SearchService, '_uses_fulltext', return_value=True):
+            sql = _sql(self.service._apply_sorting(self.query, 'relevance', ''))
+
+        order_by = sql.split('ORDER BY')[1]
+        assert 'ts_rank_cd' not in sql
+        assert order_by.index('articles.relevance_score') < order_by.index('DESC')
+
+    def test_other_databases_fall_back_to_like(self):
+        """Without Postgres the search keeps the LIKE filter"""
+        with patch.object(SearchService, '_uses_fulltext', return_value=False):
+            sql = _sql(self.service._apply_text_search(self.query, 'quantum'))
+
+        assert 'websearch_to_tsquery' not in sql
+        assert 'LIKE' in sql.upper()
+
+
+class TestFulltextSetup:
+    """Test suite for the search_vector DDL and the startup detection"""
+
+    def test_create_all_installs_the_search_vector_trigger(self):
+        """Databases bootstrapped with create_all get the trigger that fills search_vector"""
+        statements = []
+        engine = create_mock_engine(
+            "postgresql+psycopg2://", lambda sql, *args, **kwargs: statements.append(str(sql.compile(dialect=engine.dialect)))
+        )
+
+        Base.metadata.create_all(engine, checkfirst=False)
+
+        ddl = "\n".join(statements)
+        assert "CREATE OR REPLACE FUNCTION articles_search_vector_update()" in ddl
+        assert "CREATE TRIGGER update_articles_search_vector" in ddl
+        assert ddl.index("CREATE TABLE articles") < ddl.index("CREATE TRIGGER update_articles_search_vector")
+
+    def test_fulltext_support_is_detected_once_and_not_changed_by_searches(self):
+        """Detection sets the flag; a search on Postgres does not flip the shared service state"""
+        service = SearchService()
+        with create_engine("sqlite://").connect() as connection:
+            assert service.detect_fulltext_index(connection) is False
+
+        with patch.object(SearchService, '_is_postgres', return_value=True):
+            sql = _sql(service._apply_text_search(Session().query(Article, Source).join(Source), 'quantum'))
+
+        assert service.fulltext_index_available is False
+        assert 'LIKE' in sql.upper()
@@ -428,6 +428,27 @@ class TestSearchEndpoints:
         # Debería devolver error de validación o manejar graciosamente
         assert response.status_code in [200, 422, 500]
 
+    def test_similar_articles_rejects_malformed_id(self):
+        """Test artículos similares: un ID mal formado es error de validación, no 500"""
+        from fastapi import FastAPI
+        from app.api.v1.endpoints import search as search_endpoints
+        from app.db.database import get_db
+
+        router_app = FastAPI()
+        router_app.include_router(search_endpoints.router)
+        router_app.dependency_overrides[get_db] = lambda: None
+        client = TestClient(router_app)
+        article_id = "0b6f1c8e-3f5a-4c1d-9a7e-2d4b5c6e7f80"
+
+        with patch.object(search_service, 'find_similar_articles', return_value=None) as find_similar:
+            malformed = client.get("/search/similar/not-a-uuid")
+            missing = client.get(f"/search/similar/{article_id}")
+
+        assert malformed.status_code == 422
+        assert missing.status_code == 404
+        find_similar.assert_called_once()
+        assert find_similar.call_args.kwargs['article_id'] == article_id
+
 
 class TestTextProcessing:
     """Tests para procesamiento de texto"""
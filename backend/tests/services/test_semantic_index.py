@@ -0,0 +1,204 @@
+"""
+Unit tests for embedding-based semantic search
+"""
+
+import threading
+import time
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from app.services.search_service import SearchService
+from app.utils import vector_index
+from app.utils.embeddings import HashingEmbeddingBackend, normalize_rows
+from app.utils.search_utils import SemanticSearchHelper
+from app.utils.semantic_index import ArticleVectorIndex, vector_to_bytes
+from app.utils.vector_index import HNSWIndex
+
+
+def _clustered_vectors(count, dim=32, clusters=20, seed=0):
+    """Unit vectors grouped around random centers"""
+    rng = np.random.RandomState(seed)
+    centers = rng.randn(clusters, dim)
+    return normalize_rows(centers[rng.randint(0, clusters, count)] + 0.3 * rng.randn(count, dim))
+
+
+def _article(title, content=None):
+    """Article-like object with the fields used for embeddings"""
+    return SimpleNamespace(id=uuid.uuid4(), title=title, summary=None, content=content)
+
+
+class TestHNSWIndex:
+    """Test suite for the in-process HNSW index"""
+
+    def test_graph_search_matches_exact_neighbours(self):
+        """Graph search finds (almost) the same top-k as a full scan"""
+        vectors = _clustered_vectors(600)
+        queries = _clustered_vectors(20, seed=1)
+        index = HNSWIndex(dim=32, m=8, ef_construction=64)
+
+        with patch.object(vector_index, 'EXACT_SEARCH_MAX_SIZE', 50):
+            index.add_many(list(range(len(vectors))), vectors)
+            index.link_pending()
+            found = sum(
+                len({key for key, _ in index.search(query, 10)} & set(np.argsort(-(vectors @ query))[:10]))
+                for query in queries
+            )
+
+        assert found / 200 >= 0.95
+
+    def test_pending_vectors_are_searchable_before_linking(self):
+        """Bulk-loaded vectors are scanned exactly until they join the graph"""
+        vectors = _clustered_vectors(100)
+        index = HNSWIndex(dim=32)
+        index.add_many(list(range(100)), vectors)
+
+        assert index.pending == 100
+        assert index.search(vectors[42], 1)[0][0] == 42
+        assert index.link_pending() == 100 and index.pending == 0
+
+    def test_existing_key_replaces_vector(self):
+        """Re-adding a key updates its vector instead of duplicating it"""
+        vectors = _clustered_vectors(3)
+        index = HNSWIndex(dim=32)
+        index.add("a", vectors[0])
+        index.add("a", vectors[1])
+
+        assert len(index) == 1
+        assert index.search(vectors[1], 1)[0][1] == pytest.approx(1.0, abs=1e-5)
+
+    @pytest.mark.skipif(not vector_index.HNSWLIB_AVAILABLE, reason="hnswlib not installed")
+    def test_hnswlib_index_grows_and_replaces_vectors(self):
+        """The hnswlib index links on insert, resizes past its capacity and keeps key semantics"""
+        vectors = _clustered_vectors(300)
+        index = vector_index.HnswlibIndex(dim=32, capacity=100)
+
+        assert index.add_many(list(range(300)), vectors) == 300
+        assert index.pending == 0
+        assert index.search(vectors[250], 1)[0] == (250, pytest.approx(1.0, abs=1e-4))
+        assert index.add_many([250], vectors[:1]) == 0
+        assert index.search(vectors[0], 2)[1][0] in (0, 250)
+
+
+class TestEmbeddings:
+    """Test suite for the hashing embedding backend"""
+
+    def test_hashing_backend_is_deterministic(self):
+        """Separate instances produce the same vectors (stored vectors stay comparable)"""
+        text = "Open source language models run on laptops"
+
+        np.testing.assert_array_equal(
+            HashingEmbeddingBackend(dim=64).embed_one(text),
+            HashingEmbeddingBackend(dim=64).embed_one(text)
+        )
+
+    def test_related_texts_are_closer(self):
+        """Texts sharing vocabulary are more similar than unrelated ones"""
+        query, related, unrelated = HashingEmbeddingBackend(dim=128).embed([
+            "language model release",
+            "OpenAI announces the release of a new language model",
+            "Local football club wins the championship final"
+        ])
+
+        assert query @ related > query @ unrelated
+        assert np.linalg.norm(query) == pytest.approx(1.0, abs=1e-5)
+
+    @pytest.mark.asyncio
+    async def test_find_similar_articles_ranks_by_embedding(self):
+        """Candidates are scored in one batch and returned by similarity"""
+        articles = [
+            {"title": "Stock markets fall", "content": "Shares dropped across Europe"},
+            {"title": "New language model", "content": "A language model for code was released"},
+        ]
+
+        with patch('app.utils.search_utils.get_embedding_backend', return_value=HashingEmbeddingBackend(dim=128)):
+            similar = await SemanticSearchHelper().find_similar_articles("language model for code", articles, limit=1)
+
+        assert [item['article']['title'] for item in similar] == ["New language model"]
+
+
+class TestArticleVectorIndex:
+    """Test suite for stored article vectors and the semantic search service"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.vector_index = ArticleVectorIndex(backend=HashingEmbeddingBackend(dim=64), index_backend='hnsw')
+        self.db = Mock()
+
+    def test_inserted_article_is_stored_and_searchable(self):
+        """index_article stores the vector and adds it to a loaded index right away"""
+        self.vector_index.hnsw.built_at = 1.0
+        article = _article("Chip makers race to build AI accelerators")
+
+        assert self.vector_index.index_article(self.db, article)
+
+        rows = self.db.execute.call_args[0][1]
+        assert rows[0]['article_id'] == article.id
+        assert rows[0]['model'] == self.vector_index.backend.name
+        matches = self.vector_index.hnsw.search(self.vector_index.embed_query("AI accelerators"), 1)
+        assert matches[0][0] == article.id
+
+    def test_refresh_loads_only_new_vectors(self):
+        """After the first load only vectors past the watermark are read"""
+        articles = [_article("Quantum computing milestone"), _article("Election results announced")]
+        vectors = self.vector_index.embed_articles(articles)
+        query = self.db.query.return_value.filter.return_value
+        query.order_by.return_value.limit.return_value.all.return_value = [
+            (article.id, vector_to_bytes(vector), datetime(2026, 10, 16, 10))
+            for article, vector in zip(articles, vectors)
+        ]
+
+        with patch('app.utils.semantic_index.settings') as settings:
+            settings.SEMANTIC_INDEX_REFRESH_SECONDS = 0
+            settings.SEMANTIC_INDEX_MAX_ARTICLES = 100
+            assert self.vector_index.refresh(self.db) == 2
+            query.filter.return_value.order_by.return_value.all.return_value = []
+            assert self.vector_index.refresh(self.db) == 0
+
+        query.filter.assert_called_once()
+        assert self.vector_index.hnsw.search(vectors[0], 1)[0][0] == articles[0].id
+
+    def test_search_schedules_the_load_in_the_background(self):
+        """search() only reads the loaded index; the load runs on the loader thread"""
+        article = _article("Quantum computing milestone")
+        vector = self.vector_index.embed_articles([article])[0]
+        loaded = threading.Event()
+
+        def refresh(db):
+            self.vector_index.hnsw.add_many([article.id], vector[None, :])
+            self.vector_index.hnsw.built_at = time.time()
+            loaded.set()
+            return 1
+
+        with patch.object(self.vector_index, 'refresh', side_effect=refresh), \
+                patch('app.utils.semantic_index.Session') as session:
+            assert self.vector_index.search(self.db, vector, 1) == []
+            assert loaded.wait(5)
+            self.vector_index._loader.submit(lambda: None).result(5)
+
+        session.return_value.close.assert_called_once()
+        assert not self.vector_index._refresh_scheduled
+        assert self.vector_index.search(self.db, vector, 1)[0][0] == article.id
+
+    @pytest.mark.asyncio
+    async def test_semantic_search_hydrates_matches_in_similarity_order(self):
+        """Results follow the index order, drop weak matches and report their similarity"""
+        service = SearchService()
+        service.vector_index = Mock()
+        first, second, weak = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        service.vector_index.search.return_value = [(first, 0.9), (second, 0.6), (weak, 0.1)]
+        rows = [
+            (SimpleNamespace(id=article_id), SimpleNamespace(name="Wired"))
+            for article_id in (second, first)
+        ]
+        self.db.query.return_value.join.return_value.filter.return_value.all.return_value = rows
+
+        with patch.object(SearchService, '_format_article', side_effect=lambda article, source: {"id": str(article.id)}):
+            results = await service.semantic_search("chips", limit=3, similarity_threshold=0.3, db=self.db)
+
+        assert [result["id"] for result in results["results"]] == [str(first), str(second)]
+        assert results["avg_similarity"] == pytest.approx(0.75)
@@ -0,0 +1,66 @@
+"""
+Unit tests for the cached sparse rerank engine
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.utils.search_utils import RerankEngine, SemanticSearchHelper, TextProcessor, text_processor
+
+
+DOCUMENTS = [
+    {"id": "1", "title": "Weather forecast", "content": "Rain expected tomorrow", "relevance_score": 0.9},
+    {"id": "2", "title": "AI breakthrough announced", "content": "Details about the AI breakthrough", "relevance_score": 0.8},
+    {"id": "3", "title": "", "content": "", "relevance_score": 0.1},
+]
+
+
+class TestRerankEngine:
+    """Test suite for RerankEngine and semantic_rerank"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.engine = RerankEngine(text_processor)
+
+    def test_scores_match_token_cosine(self):
+        """The sparse product gives the same cosine as calculate_text_similarity"""
+        query = "AI breakthrough in weather forecasting"
+        scores = self.engine.score(query, DOCUMENTS)
+
+        for doc, score in zip(DOCUMENTS, scores):
+            expected = text_processor.calculate_text_similarity(query, RerankEngine.document_text(doc), 'cosine')
+            assert score == pytest.approx(expected, abs=1e-6)
+
+    def test_documents_are_tokenized_once_per_version(self):
+        """Repeated reranks reuse cached vectors until the article version changes"""
+        with patch.object(text_processor, 'tokenize', wraps=text_processor.tokenize) as tokenize:
+            self.engine.score("ai", DOCUMENTS)
+            self.engine.score("weather", DOCUMENTS)
+            assert tokenize.call_count == 2 + len(DOCUMENTS)
+
+            updated = dict(DOCUMENTS[1], ai_processed_at="2026-10-16T10:00:00")
+            self.engine.score("ai", [updated])
+            assert tokenize.call_count == 2 + len(DOCUMENTS) + 2
+
+    def test_cache_is_bounded(self):
+        """The least recently used document vectors are evicted"""
+        engine = RerankEngine(text_processor, max_documents=2)
+        engine.score("ai", DOCUMENTS)
+
+        assert len(engine._documents) == 2
+
+    def test_processor_instances_share_compiled_patterns(self):
+        """Creating a TextProcessor does not rebuild stopwords or regexes"""
+        assert TextProcessor().url_pattern is text_processor.url_pattern
+        assert TextProcessor().stopwords is text_processor.stopwords
+
+    @pytest.mark.asyncio
+    async def test_semantic_rerank_orders_by_combined_score(self):
+        """Documents are sorted by 0.6 * relevance + 0.4 * semantic score"""
+        documents = [dict(doc) for doc in DOCUMENTS]
+
+        reranked = await SemanticSearchHelper().semantic_rerank("AI breakthrough", documents)
+
+        assert [doc["id"] for doc in reranked] == ["2", "1", "3"]
+        assert reranked[0]["combined_score"] == pytest.approx(0.8 * 0.6 + reranked[0]["semantic_score"] * 0.4)
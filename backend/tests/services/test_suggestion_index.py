@@ -0,0 +1,113 @@
+"""
+Unit tests for the in-memory search suggestion index
+"""
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from app.services.search_service import SearchService
+from app.utils.suggestion_index import SuggestionIndex, normalize_suggestion_text
+
+
+ENTRIES = [
+    ("TechCrunch", "source", 1200),
+    ("The Verge", "source", 800),
+    ("Machine Learning", "topic", 0.9),
+    ("Quantum Computing", "topic", 0.4),
+    ("learning", "term", 340),
+    ("machine", "term", 500),
+    ("Médecine", "term", 20),
+]
+
+
+class TestSuggestionIndex:
+    """Test suite for SuggestionIndex"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.index = SuggestionIndex(ENTRIES)
+
+    def test_normalizes_case_accents_and_spaces(self):
+        """Normalization removes accents and collapses whitespace"""
+        assert normalize_suggestion_text("  Médecine   Générale ") == "medecine generale"
+
+    def test_matches_prefix_of_any_word(self):
+        """A prefix matches the start of the text and of interior words"""
+        texts = [suggestion['text'] for suggestion in self.index.search("learn")]
+
+        assert "learning" in texts
+        assert "Machine Learning" in texts
+        assert "Quantum Computing" not in texts
+
+    def test_leading_match_ranks_first_within_type(self):
+        """Matching the first word scores above an interior word of the same entry type"""
+        index = SuggestionIndex([("learning models", "topic", 1), ("deep learning", "topic", 1)])
+
+        results = index.search("learn")
+
+        assert results[0]['text'] == "learning models"
+
+    def test_type_filter(self):
+        """Only the requested suggestion types are returned"""
+        results = self.index.search("t", types=["source"])
+
+        assert results
+        assert {suggestion['type'] for suggestion in results} == {"source"}
+
+    def test_accent_insensitive_lookup(self):
+        """Accented entries are found from unaccented input"""
+        assert self.index.search("medec")[0]['text'] == "Médecine"
+
+    def test_rebuild_replaces_entries(self):
+        """build() swaps the previous contents"""
+        self.index.build([("Reuters", "source", 10)])
+
+        assert len(self.index) == 1
+        assert self.index.search("tech") == []
+        assert not self.index.is_stale(60)
+
+    def test_lookup_latency_on_large_vocabulary(self):
+        """Lookups stay well under 5 ms on a 50k entry vocabulary"""
+        entries = [(f"term{i:05d} topic{i % 97}", "term", i % 50) for i in range(50000)]
+        index = SuggestionIndex(entries)
+
+        prefixes = ["t", "te", "term1", "term12", "topic4", "term49999"]
+        started = time.perf_counter()
+        for _ in range(20):
+            for prefix in prefixes:
+                index.search(prefix, limit=10)
+        per_lookup_ms = (time.perf_counter() - started) * 1000 / (20 * len(prefixes))
+
+        assert per_lookup_ms < 5
+
+
+class TestSuggestionIndexRefresh:
+    """Test suite for the search service's background suggestion index reload"""
+
+    def test_stale_index_reloads_in_the_background(self):
+        """A stale index is rebuilt off the request thread, with its own session"""
+        service = SearchService()
+        release = threading.Event()
+        loader_threads = []
+        background_db = Mock()
+
+        def load_entries(db):
+            loader_threads.append(threading.current_thread())
+            release.wait(5)
+            return ENTRIES
+
+        with patch.object(service, '_load_suggestion_entries', side_effect=load_entries), \
+                patch('app.services.search_service.Session', return_value=background_db):
+            assert service._schedule_suggestion_refresh(Mock()) is True
+            assert service._schedule_suggestion_refresh(Mock()) is False
+            assert service.suggestion_index.search("learn") == []
+            release.set()
+            deadline = time.monotonic() + 5
+            while service._suggestion_refresh_scheduled and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert loader_threads and loader_threads[0] is not threading.current_thread()
+        background_db.close.assert_called_once()
+        assert service.suggestion_index.search("learn")
+        assert service._schedule_suggestion_refresh(Mock()) is False
@@ -0,0 +1,122 @@
+"""
+Unit tests for the corpus term dictionary (spelling correction and query expansion)
+"""
+
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from app.utils.search_utils import SemanticSearchHelper
+from app.utils.term_dictionary import TermDictionary, edit_distance, tokenize_terms
+
+
+TITLES = [
+    "Machine learning model beats benchmark",
+    "New machine learning chips from Nvidia",
+    "Machine learning for climate forecasts",
+    "Election results announced",
+    "Election polls tighten",
+    "Quantum computing milestone",
+]
+
+
+def _rows(titles, start):
+    """(title, topic_tags, created_at) rows as returned by the dictionary query"""
+    return [(title, [], start + timedelta(minutes=index)) for index, title in enumerate(titles)]
+
+
+class TestTermDictionary:
+    """Test suite for TermDictionary"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.dictionary = TermDictionary(max_terms=1000, max_vocabulary=1000, min_documents=1, max_distance=2)
+        self.dictionary.add_documents(tokenize_terms(title) for title in TITLES)
+        self.dictionary.compile()
+
+    def test_edit_distance_counts_transpositions_once(self):
+        """Adjacent swaps cost one edit and the cutoff caps the result"""
+        assert edit_distance("machien", "machine", 2) == 1
+        assert edit_distance("machne", "machine", 2) == 1
+        assert edit_distance("quantum", "election", 2) == 3
+
+    def test_misspelled_query_gets_did_you_mean(self):
+        """Unknown words are corrected to the closest frequent term"""
+        suggestion = self.dictionary.suggest("machne lerning")
+
+        assert suggestion["corrections"] == {"machne": "machine", "lerning": "learning"}
+        assert suggestion["did_you_mean"] == "machine learning"
+
+    def test_known_query_has_no_correction(self):
+        """Words present in the corpus are never rewritten"""
+        suggestion = self.dictionary.suggest("Election polls")
+
+        assert suggestion["did_you_mean"] is None
+        assert suggestion["corrections"] == {}
+
+    def test_expansions_come_from_cooccurring_terms(self):
+        """Terms sharing at least two articles with the query are suggested"""
+        suggestion = self.dictionary.suggest("machine")
+
+        assert suggestion["expansions"] == ["learning"]
+        assert self.dictionary.suggest("quantum")["expansions"] == []
+
+    def test_refresh_loads_only_new_articles(self):
+        """The second load filters by the watermark and extends the vocabulary"""
+        dictionary = TermDictionary(max_terms=1000, max_vocabulary=1000, min_documents=1, max_distance=2)
+        start = datetime(2026, 10, 16, 8)
+        db = Mock()
+        query = db.query.return_value.filter.return_value
+        query.order_by.return_value.limit.return_value.all.return_value = _rows(TITLES, start)
+        query.filter.return_value.order_by.return_value.all.return_value = _rows(
+            ["Quantum computing startup raises funds"], start + timedelta(hours=1)
+        )
+
+        with patch('app.utils.term_dictionary.settings') as settings:
+            settings.TERM_DICTIONARY_REFRESH_SECONDS = 600
+            settings.TERM_DICTIONARY_MAX_ARTICLES = 100
+            first = dictionary.refresh(db, background=False)
+            skipped = dictionary.refresh(db, background=False)
+            dictionary.built_at = 0.0
+            second = dictionary.refresh(db, background=False)
+
+        assert (first, skipped, second) == (6, 0, 1)
+        query.filter.assert_called_once()
+        assert dictionary.suggest("quantm startup")["did_you_mean"] == "quantum startup"
+
+    def test_scheduled_refresh_loads_in_the_background(self):
+        """schedule_refresh returns at once; the load runs in the background thread with its own session"""
+        dictionary = TermDictionary(max_terms=1000, max_vocabulary=1000, min_documents=1, max_distance=2)
+        release = threading.Event()
+        db = Mock()
+        db.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = _rows(
+            TITLES, datetime(2026, 10, 16, 8)
+        )
+        sessions = []
+
+        def session_factory():
+            sessions.append(threading.current_thread())
+            release.wait(5)
+            return db
+
+        with patch('app.utils.term_dictionary.settings') as settings:
+            settings.TERM_DICTIONARY_REFRESH_SECONDS = 600
+            settings.TERM_DICTIONARY_MAX_ARTICLES = 100
+            assert dictionary.schedule_refresh(session_factory) is True
+            assert dictionary.schedule_refresh(session_factory) is False
+            assert dictionary.suggest("machne")["did_you_mean"] is None
+            release.set()
+            dictionary._compiler.submit(lambda: None).result(timeout=5)
+
+        assert sessions and sessions[0] is not threading.current_thread()
+        db.close.assert_called_once()
+        assert dictionary.suggest("machne")["did_you_mean"] == "machine"
+
+    def test_expand_query_adds_corpus_terms(self):
+        """expand_query keeps the original query first and adds corrected and related variants"""
+        with patch('app.utils.search_utils.get_term_dictionary', return_value=self.dictionary):
+            expanded = asyncio.run(SemanticSearchHelper().expand_query("machne"))
+
+        assert expanded[0] == "machne"
+        assert "machine" in expanded and "machine learning" in expanded
@@ -0,0 +1,190 @@
+"""
+Unit tests for token counting and token-budgeted content truncation
+"""
+
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from app.core.ai_cache import AIResultCache
+from app.core.config import settings
+from app.services.ai_processor import CacheManager, CostOptimizer, SentimentAnalyzer
+from app.utils import tokenizer
+from app.utils.tokenizer import (
+    DEFAULT_CONTENT_TOKENS, TOKENS_PER_MESSAGE, TOKENS_PER_REPLY, TokenCounter,
+    content_token_budget, count_prompt_tokens, get_token_counter
+)
+
+
+class FakeEncoding:
+    """Word-level stand-in for a tiktoken Encoding: every word with its leading spaces is one token"""
+
+    name = "fake_words"
+
+    def __init__(self):
+        self.encode_calls = 0
+
+    def encode_ordinary(self, text):
+        self.encode_calls += 1
+        return [match.start() for match in re.finditer(r'\s*\S+', text)]
+
+    def decode_with_offsets(self, tokens):
+        return "", list(tokens)
+
+
+class TestTokenCounter:
+    """Test suite for TokenCounter"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.encoding = FakeEncoding()
+        self.counter = TokenCounter(self.encoding, cache_size=8)
+        self.text = "One two three. Four five six! Seven eight nine?"
+
+    def test_truncate_keeps_whole_sentences_within_budget(self):
+        """The cut falls on the last sentence end that fits the token budget"""
+        assert self.counter.count(self.text) == 9
+        assert self.counter.truncate(self.text, 8) == "One two three. Four five six!"
+        assert self.counter.truncate(self.text, 9) == self.text
+        assert self.counter.truncate(self.text, 0) == ""
+
+    def test_sentence_longer_than_budget_is_cut_at_a_word(self):
+        """Without a sentence end inside the budget the text is cut after max_tokens words"""
+        assert self.counter.truncate("alpha beta gamma delta epsilon. Zeta.", 3) == "alpha beta gamma"
+
+    def test_layout_is_memoized_by_content_hash(self):
+        """Counting and truncating the same text again does not encode it again"""
+        self.counter.count(self.text)
+        self.counter.truncate(self.text, 5)
+        self.counter.count(self.text)
+
+        assert self.encoding.encode_calls == 1
+        assert self.counter.get_stats()["hits"] == 2
+        assert self.counter.get_stats()["misses"] == 1
+
+    def test_memo_is_bounded(self):
+        """The least recently used layouts are evicted beyond cache_size"""
+        counter = TokenCounter(self.encoding, cache_size=2)
+        for text in ("first text", "second text", "third text"):
+            counter.count(text)
+
+        counter.count("first text")
+
+        assert counter.get_stats()["size"] == 2
+        assert self.encoding.encode_calls == 4
+
+    def test_character_estimate_without_tokenizer(self):
+        """Without tiktoken four characters count as one token and cuts still end on a sentence"""
+        counter = TokenCounter(None)
+
+        assert not counter.exact
+        assert counter.count("a" * 40) == 10
+        assert counter.truncate("Short one. " + "b" * 100, 10) == "Short one."
+
+    def test_chat_messages_include_role_and_framing_tokens(self):
+        """Each message adds its role and fixed tokens, plus the reply priming"""
+        messages = [{"role": "system", "content": "You are terse."}, {"role": "user", "content": "Rate this."}]
+
+        assert self.counter.count_messages(messages) == 2 * TOKENS_PER_MESSAGE + 2 + 3 + 2 + TOKENS_PER_REPLY
+
+
+class TestEncodingLoading:
+    """Test suite for get_encoding"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.tiktoken = Mock()
+        self.patches = [
+            patch.object(tokenizer, 'tiktoken', self.tiktoken, create=True),
+            patch.object(tokenizer, 'TIKTOKEN_AVAILABLE', True),
+            patch.dict(tokenizer._encodings, clear=True),
+            patch.dict(tokenizer._encoding_failures, clear=True),
+        ]
+        for active in self.patches:
+            active.start()
+
+    def teardown_method(self):
+        """Restore the module state after each test"""
+        for active in reversed(self.patches):
+            active.stop()
+
+    def test_failed_load_is_retried_instead_of_cached(self):
+        """A failed download gives the estimate, and a later call loads the encoder"""
+        encoding = FakeEncoding()
+        self.tiktoken.get_encoding.side_effect = [OSError("offline"), encoding]
+
+        assert tokenizer.get_encoding() is None
+        assert tokenizer.get_encoding() is None
+        with patch.object(tokenizer, 'ENCODING_RETRY_SECONDS', 0):
+            assert tokenizer.get_encoding() is encoding
+        assert tokenizer.get_encoding() is encoding
+        assert self.tiktoken.get_encoding.call_count == 2
+
+    def test_callers_do_not_wait_for_a_load_in_progress(self):
+        """While another thread loads, get_encoding returns None without blocking"""
+        with tokenizer._encodings_lock:
+            assert tokenizer.get_encoding() is None
+        self.tiktoken.get_encoding.assert_not_called()
+
+    def test_warm_encoding_loads_in_a_thread(self):
+        """warm_encoding loads the model's encoder on a background thread"""
+        encoding = FakeEncoding()
+        self.tiktoken.encoding_for_model.return_value = encoding
+
+        tokenizer.warm_encoding("gpt-3.5-turbo").join(5)
+
+        assert tokenizer._encodings["gpt-3.5-turbo"] is encoding
+
+
+class TestPromptTokens:
+    """Test suite for content budgets and prompt token accounting"""
+
+    def test_budgets_per_analysis_type(self):
+        """Summaries get more article tokens than classifications; unknown types use the default"""
+        assert content_token_budget("summary") == settings.AI_CONTENT_TOKEN_BUDGETS["summary"]
+        assert content_token_budget("summary") > content_token_budget("sentiment")
+        assert content_token_budget("bias") == DEFAULT_CONTENT_TOKENS
+
+    def test_billed_prompt_tokens_take_precedence(self):
+        """usage.prompt_tokens from the API is used as is; without it the messages are counted"""
+        messages = [{"role": "user", "content": "Some article text."}]
+        counted = get_token_counter("gpt-3.5-turbo").count_messages(messages)
+
+        assert count_prompt_tokens(SimpleNamespace(usage=SimpleNamespace(prompt_tokens=321)), messages) == 321
+        assert count_prompt_tokens(SimpleNamespace(usage=None), messages, "gpt-3.5-turbo") == counted
+        assert count_prompt_tokens(Mock(), messages, "gpt-3.5-turbo") == counted
+
+
+class TestAnalyzerTokenBudget:
+    """Test suite for analyzers sending token-budgeted content and costing counted tokens"""
+
+    def setup_method(self):
+        """Setup test environment before each test"""
+        self.analyzer = SentimentAnalyzer()
+        self.analyzer.cache = CacheManager(shared_cache=AIResultCache(enabled=False))
+        self.analyzer.async_client = Mock()
+        self.analyzer.async_client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(
+                content=json.dumps({"sentiment": "positive", "score": 0.5, "emotions": []})
+            ))],
+            usage=SimpleNamespace(prompt_tokens=None, completion_tokens=20),
+            model="gpt-3.5-turbo"
+        )
+
+    def test_long_article_is_cut_at_a_sentence_and_cost_uses_counted_tokens(self):
+        """Only the sentiment budget of the article is sent and its exact prompt tokens are billed"""
+        article = " ".join(f"Sentence number {index} about the markets." for index in range(500))
+        counter = get_token_counter("gpt-3.5-turbo")
+
+        result = asyncio.run(self.analyzer.analyze_sentiment_async(article))
+
+        messages = self.analyzer.async_client.chat.completions.create.call_args.kwargs["messages"]
+        sent_article = messages[1]["content"].split("Artículo:\n", 1)[1].split("\n\nResponde", 1)[0]
+        assert sent_article.endswith("about the markets.")
+        assert counter.count(sent_article) <= content_token_budget("sentiment")
+        assert article.startswith(sent_article)
+        input_tokens = counter.count_messages(messages)
+        assert result.tokens_used == input_tokens + 20
+        assert result.cost == CostOptimizer.calculate_cost("gpt-3.5-turbo", input_tokens, 20)
@@ -25,9 +25,30 @@ INSERT INTO user_preferences (user_id, preferred_sources, preferred_topics, sent
  'mixed'
 );
 
+-- Weighted full-text search vector: title (A), summary (B), content (C)
+-- (same as backend/db/migrations/006_add_article_search_vector.sql)
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+
+CREATE OR REPLACE FUNCTION articles_search_vector_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.content, '')), 'C');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_articles_search_vector ON articles;
+CREATE TRIGGER update_articles_search_vector
+BEFORE INSERT OR UPDATE OF title, summary, content ON articles
+FOR EACH ROW EXECUTE FUNCTION articles_search_vector_update();
+
+UPDATE articles SET title = title WHERE search_vector IS NULL;
+
 -- Create index for better performance
-CREATE INDEX idx_articles_title_search ON articles USING gin(to_tsvector('english', title));
-CREATE INDEX idx_articles_content_search ON articles USING gin(to_tsvector('english', content));
+CREATE INDEX IF NOT EXISTS idx_articles_search_vector ON articles USING gin(search_vector);
 
 -- Create function to update timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()